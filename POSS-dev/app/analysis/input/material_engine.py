@@ -0,0 +1,327 @@
+import bisect
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+"""
+자재만족률 벡터 연산 엔진
+와일드카드 모델 패턴을 한 번만 펼쳐 아이템 x 자재 BOM 희소 행렬(CSR)로 만들고,
+대체 자재 그룹은 그룹 x 자재 행렬로 묶어 소요량/On-Hand 를 행렬 곱으로 집계한다.
+아이템별 생산 가능 수량은 BOM 의 (아이템, 자재) 항목별 값을 NumPy 최소값 reduce 로 구한다.
+계산 규칙은 material_rate_validator 의 아이템별 계산과 같다
+"""
+
+
+"""
+와일드카드 패턴 확인 (pattern.split('*') 결과로 비교)
+첫 조각으로 시작하고 마지막 조각으로 끝나며, 가운데 조각이 첫 조각 뒤에 순서대로 나와야 일치
+"""
+def match_pattern_parts(item, parts) :
+    if not item.startswith(parts[0]) or not item.endswith(parts[-1]) :
+        return False
+
+    current_pos = len(parts[0])
+
+    for part in parts[1:-1] :
+        if part :
+            pos = item.find(part, current_pos)
+
+            if pos == -1 :
+                return False
+
+            current_pos = pos + len(part)
+
+    return True
+
+
+"""
+아이템 코드 패턴 인덱스
+고유 아이템 코드를 정렬한 목록과 뒤집어 정렬한 목록을 들고 있어,
+패턴의 앞 조각(접두어)/뒤 조각(접미어)에 해당하는 범위를 이분 탐색으로 찾아 두 범위에 모두 드는 아이템을 고르고, 가운데 조각은 그 후보만 확인한다
+"""
+class ItemPatternIndex :
+    def __init__(self, items) :
+        self.items = list(items)
+        codes = [code for code, item in enumerate(self.items) if isinstance(item, str)]
+
+        by_prefix = sorted(codes, key=lambda code : self.items[code])
+        self._prefix_keys = [self.items[code] for code in by_prefix]
+        self._prefix_codes = np.array(by_prefix, dtype=np.intp)
+
+        by_suffix = sorted(codes, key=lambda code : self.items[code][::-1])
+        self._suffix_keys = [self.items[code][::-1] for code in by_suffix]
+        self._suffix_codes = np.array(by_suffix, dtype=np.intp)
+
+        # 아이템 번호 -> 각 정렬 목록에서의 위치
+        self._prefix_rank = np.zeros(len(self.items), dtype=np.intp)
+        self._prefix_rank[self._prefix_codes] = np.arange(len(by_prefix))
+        self._suffix_rank = np.zeros(len(self.items), dtype=np.intp)
+        self._suffix_rank[self._suffix_codes] = np.arange(len(by_suffix))
+
+        self._matches = {}
+
+    """
+    패턴과 일치하는 아이템 번호 배열 (정렬됨, 패턴별로 캐시)
+    """
+    def match(self, pattern) :
+        if not isinstance(pattern, str) :
+            return np.empty(0, dtype=np.intp)
+
+        matched = self._matches.get(pattern)
+
+        if matched is None :
+            parts = pattern.split('*')
+            lo, hi = self._range(self._prefix_keys, parts[0])
+            suffix_lo, suffix_hi = self._range(self._suffix_keys, parts[-1][::-1])
+
+            # 접두어와 접미어 조건은 좁은 범위의 후보 중 다른 범위 안에 있는 것, 가운데 조각이 있을 때만 후보를 하나씩 확인
+            if hi - lo <= suffix_hi - suffix_lo :
+                candidates = self._prefix_codes[lo:hi]
+                rank = self._suffix_rank[candidates]
+                matched = candidates[(rank >= suffix_lo) & (rank < suffix_hi)]
+            else :
+                candidates = self._suffix_codes[suffix_lo:suffix_hi]
+                rank = self._prefix_rank[candidates]
+                matched = candidates[(rank >= lo) & (rank < hi)]
+            matched = np.sort(matched)
+
+            if len(parts) > 2 :
+                matched = np.array([code for code in matched
+                                    if match_pattern_parts(self.items[code], parts)], dtype=np.intp)
+            self._matches[pattern] = matched
+
+        return matched
+
+    """
+    정렬된 키 목록에서 prefix 로 시작하는 키의 [lo, hi) 범위
+    """
+    @staticmethod
+    def _range(keys, prefix) :
+        if not prefix :
+            return 0, len(keys)
+
+        lo = bisect.bisect_left(keys, prefix)
+
+        if ord(prefix[-1]) >= 0x10FFFF :
+            return lo, len(keys)
+
+        upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        return lo, bisect.bisect_left(keys, upper, lo)
+
+
+class MaterialSatisfactionEngine :
+    """
+    Args:
+        material_df (DataFrame): Active_OX/Material/On-Hand/입고 날짜 컬럼을 가진 자재 수량 데이터
+        material_item_df (DataFrame): Active_OX/Material/Top_Model_* 컬럼을 가진 자재-모델 데이터
+        demand_df (DataFrame): Item/MFG 컬럼을 가진 수요 데이터 (Item 이 없으면 인덱스를 아이템으로 사용)
+        material_equal_df (DataFrame): Material* 컬럼을 가진 대체 자재 그룹 데이터
+        date_columns (list): On-Hand 에 더할 입고 예정 날짜 컬럼
+    """
+    def __init__(self, material_df, material_item_df, demand_df, material_equal_df=None, date_columns=None) :
+        self._load_demand(demand_df)
+
+        onhand_materials, onhand_values = self._onhand_rows(material_df, date_columns or [])
+        bom_materials, bom_items = self._bom_rows(material_item_df)
+        group_materials, group_ids = self._group_rows(material_equal_df)
+
+        # 세 데이터의 자재를 한 번에 번호로 변환 (NaN 도 하나의 자재로 취급)
+        all_materials = np.concatenate([onhand_materials, bom_materials, group_materials])
+        codes, self.materials = pd.factorize(all_materials, use_na_sentinel=False)
+        onhand_codes, bom_codes, group_codes = np.split(codes, [len(onhand_materials),
+                                                                len(onhand_materials) + len(bom_materials)])
+        n_materials = len(self.materials)
+
+        # 자재별 On-Hand (같은 자재가 여러 행이면 마지막 행 값)
+        self.material_onhand = dict(zip(onhand_materials, onhand_values.tolist()))
+        last = ~pd.Series(onhand_codes).duplicated(keep='last').to_numpy()
+        self.onhand = np.zeros(n_materials)
+        self.onhand[onhand_codes[last]] = onhand_values[last]
+
+        # 아이템 x 자재 BOM (값은 일치한 자재 행 수)
+        self.bom = sparse.csr_matrix((np.ones(len(bom_codes)), (bom_items, bom_codes)),
+                                     shape=(len(self.items), n_materials))
+        self.bom.sum_duplicates()
+        self.bom.sort_indices()
+
+        # 자재별 총 소요량 = 수요가 있는 아이템의 수요량을 BOM 을 따라 합산
+        demand_positive = np.where(self.demand > 0, self.demand, 0.0)
+        self.requirements = self.bom.T @ demand_positive
+        self.material_requirements = self._requirement_dict(bom_items, bom_codes, demand_positive)
+
+        # 대체 자재 그룹 (자재가 여러 그룹에 있으면 마지막 그룹)
+        n_groups = int(group_ids.max()) + 1 if len(group_ids) else 0
+        groups = sparse.csr_matrix((np.ones(len(group_codes)), (group_ids, group_codes)),
+                                   shape=(n_groups, n_materials))
+        self.group_of = np.full(n_materials, -1, dtype=np.intp)
+        self.group_of[group_codes] = group_ids
+        self.group_onhand = groups @ self.onhand
+        self.group_requirements = groups @ self.requirements
+
+    """
+    아이템별 생산 가능 수량 배열 (self.items 순서)
+    BOM 항목마다 자재(또는 대체 그룹) On-Hand 를 수요 비율로 배분한 수량을 구해 아이템별 최소값
+    """
+    def producible(self) :
+        in_group = self.group_of >= 0
+        group_index = np.where(in_group, self.group_of, 0)
+        onhand = np.where(in_group, self.group_onhand[group_index] if len(self.group_onhand) else 0.0, self.onhand)
+        requirements = np.where(in_group, self.group_requirements[group_index] if len(self.group_requirements) else 0.0,
+                                self.requirements)
+
+        entry_items = np.repeat(np.arange(len(self.items)), np.diff(self.bom.indptr))
+        demand = self.demand[entry_items]
+        entry_onhand = onhand[self.bom.indices]
+        entry_requirements = requirements[self.bom.indices]
+
+        ratio = np.divide(demand, entry_requirements, out=np.zeros(len(demand)), where=entry_requirements > 0)
+        allocated = np.where(entry_requirements > 0,
+                             np.maximum(0, np.floor(entry_onhand * ratio)),
+                             np.minimum(demand, np.floor(entry_onhand)))
+        allocated = np.where(entry_onhand <= 0, 0.0, allocated)
+
+        producible = np.zeros(len(self.items))
+        has_materials = np.diff(self.bom.indptr) > 0
+
+        if has_materials.any() :
+            producible[has_materials] = np.minimum.reduceat(allocated, self.bom.indptr[:-1][has_materials])
+
+        producible[self.demand <= 0] = 0
+        return producible
+
+    """
+    아이템별 자재만족률(%) 배열. 수요가 0 이하이면 100
+    """
+    def satisfaction_rates(self, producible) :
+        demand = pd.to_numeric(pd.Series(self.demand_values), errors='coerce').to_numpy(dtype=float)
+        rates = np.divide(producible, demand, out=np.full(len(demand), 100.0), where=demand > 0)
+        return np.where(demand > 0, rates * 100, 100.0)
+
+    """
+    수요 아이템 (아이템별 첫 번째 행 기준, Item 컬럼이 있으면 빈 아이템 제외)
+    """
+    def _load_demand(self, demand_df) :
+        if 'Item' in demand_df.columns :
+            items = demand_df['Item']
+            first = ~items.duplicated() & items.notna()
+        else :
+            items = pd.Series(demand_df.index, index=demand_df.index)
+            first = ~items.duplicated()
+
+        self.items = items[first].tolist()
+        self.demand_values = demand_df['MFG'][first.to_numpy()].to_numpy()
+        self.demand = pd.to_numeric(pd.Series(self.demand_values), errors='coerce').fillna(0).to_numpy(dtype=float)
+
+    """
+    활성 자재의 (자재, On-Hand + 입고 예정 수량) 배열
+    """
+    @staticmethod
+    def _onhand_rows(material_df, date_columns) :
+        empty = (np.empty(0, dtype=object), np.empty(0))
+
+        if material_df is None or material_df.empty :
+            return empty
+
+        if 'Active_OX' in material_df.columns :
+            material_df = material_df[material_df['Active_OX'] == 'O']
+
+        if 'Material' not in material_df.columns or 'On-Hand' not in material_df.columns :
+            return empty
+
+        on_hand = material_df['On-Hand']
+        numeric = pd.to_numeric(on_hand, errors='coerce')
+        # 숫자로 바꿀 수 없는 값은 건너뛰고, 빈 값은 0
+        valid = (numeric.notna() | on_hand.isna()).to_numpy()
+
+        columns = [col for col in date_columns if col in material_df.columns]
+
+        if columns :
+            numeric = numeric + sum(MaterialSatisfactionEngine._supply(material_df[col]) for col in columns)
+
+        values = numeric.fillna(0).to_numpy(dtype=float)
+
+        return material_df['Material'].to_numpy(dtype=object)[valid], values[valid]
+
+    """
+    입고 예정 컬럼에서 숫자 값만 (빈 값/문자열은 0)
+    """
+    @staticmethod
+    def _supply(column) :
+        if pd.api.types.is_numeric_dtype(column) :
+            return column.fillna(0)
+
+        return column.map(lambda x : x if isinstance(x, (int, float)) and pd.notnull(x) else 0).astype(float)
+
+    """
+    활성 자재 행별 Top_Model_* 패턴과 일치하는 (자재, 아이템 번호) 배열 (아이템 순, 같은 아이템은 자재 행 순)
+    """
+    def _bom_rows(self, material_item_df) :
+        empty = (np.empty(0, dtype=object), np.empty(0, dtype=np.intp))
+
+        if material_item_df is None or material_item_df.empty or not self.items :
+            return empty
+
+        model_columns = [col for col in material_item_df.columns if isinstance(col, str) and col.startswith('Top_Model_')]
+
+        if not model_columns or 'Active_OX' not in material_item_df.columns :
+            return empty
+
+        active = material_item_df[material_item_df['Active_OX'] == 'O']
+        index = ItemPatternIndex(self.items)
+
+        row_numbers = []
+        item_codes = []
+
+        for row_number, patterns in enumerate(active[model_columns].to_numpy(dtype=object)) :
+            matched = [index.match(pattern) for pattern in patterns if isinstance(pattern, str) and pattern]
+
+            if not matched :
+                continue
+
+            codes = matched[0] if len(matched) == 1 else np.unique(np.concatenate(matched))
+            row_numbers.append(np.full(len(codes), row_number, dtype=np.intp))
+            item_codes.append(codes)
+
+        if not item_codes :
+            return empty
+
+        row_numbers = np.concatenate(row_numbers)
+        item_codes = np.concatenate(item_codes)
+        order = np.lexsort((row_numbers, item_codes))
+
+        return active['Material'].to_numpy(dtype=object)[row_numbers[order]], item_codes[order]
+
+    """
+    대체 자재 그룹의 (자재, 그룹 번호) 배열. 그룹 번호는 자재가 하나 이상 있는 행 순서
+    """
+    @staticmethod
+    def _group_rows(material_equal_df) :
+        empty = (np.empty(0, dtype=object), np.empty(0, dtype=np.intp))
+
+        if material_equal_df is None or material_equal_df.empty :
+            return empty
+
+        valid_columns = [col for col in material_equal_df.columns if isinstance(col, str) and col.startswith('Material')]
+
+        if not valid_columns :
+            return empty
+
+        materials = []
+        group_ids = []
+
+        for row in material_equal_df[valid_columns].to_numpy(dtype=object) :
+            group = [material for material in row if pd.notnull(material) and material]
+
+            if group :
+                materials.extend(group)
+                group_ids.extend([group_ids[-1] + 1 if group_ids else 0] * len(group))
+
+        return np.array(materials, dtype=object), np.array(group_ids, dtype=np.intp)
+
+    """
+    {자재: 총 소요량} (수요가 있는 아이템의 자재만, 아이템 순으로 처음 나온 순서)
+    """
+    def _requirement_dict(self, bom_items, bom_codes, demand_positive) :
+        used = bom_codes[demand_positive[bom_items] > 0]
+        codes = pd.unique(used)
+        return dict(zip(self.materials[codes].tolist(), self.requirements[codes].tolist()))
@@ -1,4 +1,6 @@
+import numpy as np
 import pandas as pd
+from app.analysis.input.material_engine import MaterialSatisfactionEngine, match_pattern_parts
 from app.models.input.material import process_material_satisfaction_data
 from app.utils.error_handler import (error_handler, safe_operation, CalculationError)
 
@@ -26,126 +28,36 @@ def calculate_material_satisfaction(data, threshold=90) :
             material_equal_df = data.get('material_equal_df')
             date_columns = data.get('date_columns', [])
 
-        try :
-            if isinstance(material_df, pd.DataFrame) and date_columns :
-                material_df['Original_On_Hand'] = material_df['On-Hand'].copy()
-
-                for idx, row in material_df.iterrows() :
-                    try :
-                        future_supply = 0
-
-                        for date_col in date_columns :
-                            if date_col in material_df.columns and pd.notnull(row[date_col]) and isinstance(row[date_col], (int, float)) :
-                                future_supply += row[date_col]
-
-                        material_df.at[idx, 'On-Hand'] = row['Original_On_Hand'] + future_supply
-                    except Exception as e :
-                        continue
-
-                data['date_columns_used'] = date_columns
+        if isinstance(material_df, pd.DataFrame) and date_columns :
+            data['date_columns_used'] = date_columns
+            data['start_date'] = date_columns[0]
+            data['end_date'] = date_columns[-1]
 
-                if date_columns :
-                    data['start_date'] = date_columns[0]
-                    data['end_date'] = date_columns[-1]
-        except Exception as e :
-            pass
-            
-        substitute_groups, material_to_group = safe_operation(
-            create_substitute_groups,
-            'Error creating substitute groups',
-            material_equal_df
+        # 입고 예정 수량을 더한 On-Hand, BOM 행렬, 대체 그룹 집계는 엔진에서 한 번에 계산
+        engine = MaterialSatisfactionEngine(
+            material_df, material_item_df, demand_df, material_equal_df,
+            date_columns if isinstance(material_df, pd.DataFrame) else None
         )
 
-        if substitute_groups is None :
-            substitute_groups = []
-        
-        if material_to_group is None :
-            material_to_group = {}
+        producible = engine.producible()
+        rates = engine.satisfaction_rates(producible)
+        producible = [int(value) if float(value).is_integer() else float(value) for value in producible]
 
-        item_to_materials = safe_operation(
-            map_items_to_materials,
-            'Error mapping items to materials',
-            material_item_df, demand_df
-        )
-
-        if item_to_materials is None :
-            item_to_materials = {}
-
-        material_onhand = safe_operation(
-            extract_material_onhand,
-            'Error extracting material on-hand',
-            material_df
-        )
-
-        if material_onhand is None :
-            material_onhand = {}
-
-        material_requirements = safe_operation(
-            calculate_material_requirements,
-            'Error calculating material requirements',
-            item_to_materials, demand_df
-        )
-
-        if material_requirements is None :
-            material_requirements = {}
-
-        group_requirements, group_onhand = safe_operation(
-            calculate_group_values,
-            'Error calculating group values',
-            substitute_groups, material_requirements, material_onhand
-        )
-
-        if group_requirements is None :
-            group_requirements = {}
-
-        if group_onhand is None :
-            group_onhand = {}
-
-        item_producible = safe_operation(
-            calculate_item_producible_quantity,
-            'Error calculating item producible quantity',
-            item_to_materials, material_onhand, material_to_group,
-            group_onhand, material_requirements, group_requirements, demand_df
-        )
-
-        if item_producible is None :
-            item_producible = {}
-
-        item_satisfaction_rates = safe_operation(
-            calculate_item_satisfaction_rates,
-            'Error culculating item satisfaction rates',
-            item_producible, demand_df
-        )
+        item_producible = dict(zip(engine.items, producible))
+        item_satisfaction_rates = dict(zip(engine.items, rates.tolist()))
 
         passed_items = [item for item, rate in item_satisfaction_rates.items() if rate >= threshold]
         failed_items = [item for item, rate in item_satisfaction_rates.items() if rate < threshold]
 
-        rows = []
-
-        for item, rate in item_satisfaction_rates.items() :
-            try :
-                producible = item_producible.get(item, 0)
-                pass_status = '통과' if rate >= threshold else '미통과'
-
-                demand = 0
-
-                if 'Item' in demand_df.columns :
-                    item_rows = demand_df[demand_df['Item'] == item]
-
-                    if not item_rows.empty :
-                        demand = item_rows['MFG'].values[0]
-
-                rows.append({
-                    '모델명' : item,
-                    '수요량' : demand,
-                    '생산가능수량' : producible,
-                    '자재만족률' : round(rate, 2),
-                    '통과여부' : pass_status
-                })
-            except Exception as e :
-                continue
+        table = {
+            '모델명' : engine.items,
+            '수요량' : engine.demand_values if 'Item' in demand_df.columns else [0] * len(engine.items),
+            '생산가능수량' : producible,
+            '자재만족률' : np.round(rates, 2),
+            '통과여부' : np.where(rates >= threshold, '통과', '미통과')
+        }
 
-        result_df = pd.DataFrame(rows)
+        result_df = pd.DataFrame(table)
 
         try :
             total_demand = result_df['수요량'].sum()
@@ -180,17 +92,10 @@ def calculate_material_satisfaction(data, threshold=90) :
             "passed_items": passed_items,
             "failed_items": failed_items,
             "threshold": threshold,
-            "material_requirements": material_requirements,
-            "material_onhand": material_onhand
+            "material_requirements": engine.material_requirements,
+            "material_onhand": engine.material_onhand
         }
 
-        try :
-            if 'Original_On_Hand' in material_df.columns :
-                material_df['On-Hand'] = material_df['Original_On_Hand']
-                material_df.drop(columns=['Original_On_Hand'], inplace=True)
-        except Exception as e :
-            pass
-
         return result
         
     except Exception as e :
@@ -309,29 +214,7 @@ def match_pattern(item, pattern) :
         if not isinstance(item, str) or not isinstance(pattern, str) :
             return False
         
-        parts = pattern.split('*')
-
-        if not parts :
-            return False
-
-        if not item.startswith(parts[0]) :
-            return False
-        
-        if not item.endswith(parts[-1]) :
-            return False
-        
-        current_pos = len(parts[0])
-
-        for part in parts[1:-1] :
-            if part :
-                pos = item.find(part, current_pos)
-
-                if pos == -1 :
-                    return False
-                
-                current_pos = pos + len(part)
-
-        return True
+        return match_pattern_parts(item, pattern.split('*'))
     except Exception as e :
         return False
 
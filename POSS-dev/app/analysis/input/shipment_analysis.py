@@ -77,7 +77,7 @@ def calculate_fulfillment_rate(processed_data) :
 
     project_fulfillment = {}
 
-    for project, group in result_df.groupby('Project') :
+    for project, group in result_df.groupby('Project', observed=True) :
         project_sop = group['SOP'].sum()
         project_production = group['Production_Qty'].sum()
         project_rate = (project_production / project_sop * 100) if project_sop > 0 else 100
@@ -89,7 +89,7 @@ def calculate_fulfillment_rate(processed_data) :
 
     site_fulfillment = {}
 
-    for site, group in result_df.groupby('Tosite_group') :
+    for site, group in result_df.groupby('Tosite_group', observed=True) :
         site_sop = group['SOP'].sum()
         site_production = group['Production_Qty'].sum()
         site_rate = (site_production / site_sop * 100) if site_sop > 0 else 100
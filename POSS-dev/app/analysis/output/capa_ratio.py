@@ -3,6 +3,8 @@ import matplotlib.pyplot as plt
 import os
 import numpy as np
 from app.models.common.file_store import FilePaths
+from app.utils.fileHandler import load_sheet
+from app.utils.workbook_cache import WorkbookCache
 
 class CapaRatioAnalyzer:  
     @staticmethod
@@ -32,14 +34,14 @@ class CapaRatioAnalyzer:
                 try:
                     # 시트명이 제공된 경우
                     if sheet_name:
-                        df = pd.read_excel(file_path, sheet_name=sheet_name)
+                        df = WorkbookCache.read(file_path, sheet_name=sheet_name)
                     else:
                         # 시트명이 제공되지 않은 경우 첫 번째 시트 사용
-                        df = pd.read_excel(file_path)
+                        df = WorkbookCache.read(file_path)
                 except ValueError:
                     # 시트명이 없을 경우 첫 번째 시트를 사용
                     # print(f"Sheet '{sheet_name}' not found. Using the first sheet instead.")
-                    df = pd.read_excel(file_path)
+                    df = WorkbookCache.read(file_path)
             else:
                 raise ValueError("Either data_df or file_path must be provided.")
             
@@ -66,29 +68,14 @@ class CapaRatioAnalyzer:
             df['Qty'] = pd.to_numeric(df['Qty'], errors='coerce').fillna(0)
             
             # 제조동별 QTY 합계 계산
-            pivot_table = df.pivot_table(
-                index='name',  # 제조동을 행으로
-                values='Qty',  # QTY 열을 집계
-                aggfunc='sum'  # 합계 계산
-            ).reset_index()
-            
+            building_qty = df.groupby('name')['Qty'].sum()
+
             # 데이터가 비어있는지 확인
-            if len(pivot_table) == 0:
+            if len(building_qty) == 0:
                 raise ValueError("No data to analyze.")
-            
-            # 전체 QTY 합계 계산
-            total_qty = pivot_table['Qty'].sum()
-            
-            # 전체 합계가 0인 경우 처리
-            if total_qty == 0:
-                # print("Warning: Total QTY sum is 0.")
-                pivot_table['ratio'] = 0
-            else:
-                # 비중(%) 컬럼 추가
-                pivot_table['ratio'] = (pivot_table['Qty'] / total_qty * 100).round(2)
-            
+
             # 결과 딕셔너리 생성 (Plant: Ratio 형태)
-            result_dict = dict(zip(pivot_table['name'], pivot_table['ratio']))
+            result_dict = CapaRatioAnalyzer.ratio_from_building_qty(building_qty)
             
             # 상세 분석 결과 출력 (초기 분석이 아닐 때만)
             if not is_initial:
@@ -104,6 +91,27 @@ class CapaRatioAnalyzer:
             traceback.print_exc()
             return {}  # 오류 발생 시 빈 딕셔너리 반환
     
+    @staticmethod
+    def ratio_from_building_qty(building_qty):
+        """
+        제조동별 생산량 합계로 제조동별 비율(%) 계산
+
+        Args:
+            building_qty (Series/dict): 제조동별 QTY 합계
+
+        Returns:
+            dict: 제조동별 비율 데이터 {'I': 30.5, 'K': 25.2, ...}
+        """
+        building_qty = pd.Series(building_qty, dtype=float).sort_index()
+        total_qty = building_qty.sum()
+
+        # 전체 합계가 0인 경우 처리
+        if total_qty == 0:
+            return {name: 0 for name in building_qty.index}
+
+        # 비중(%) 계산
+        return (building_qty / total_qty * 100).round(2).to_dict()
+
     # 플랜트별 생산량 업데이트 (셀 이동 시)
     @staticmethod
     def update_capa_ratio_for_cell_move(data_df, item_data, new_data, is_initial=False):
@@ -192,7 +200,7 @@ class CapaRatioAnalyzer:
             
             # capa_portion 시트 로드
             try:
-                portion_df = pd.read_excel(master_file, sheet_name="capa_portion")
+                portion_df = load_sheet(master_file, "capa_portion")
             except Exception as e:
                 print(f"capa_portion 시트 로드 오류: {str(e)}")
                 return {}
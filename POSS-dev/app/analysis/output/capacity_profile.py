@@ -0,0 +1,178 @@
+import math
+import numpy as np
+import pandas as pd
+from app.models.common.file_store import FilePaths
+from app.utils.fileHandler import load_sheet
+
+"""
+capa_qty 시트 기반 생산 능력 프로파일
+마스터 데이터에만 의존하는 값(제조동별 Max_line/Max_qty 제약을 반영한 시프트별 best 생산 능력,
+라인별 용량, 제조동 라인의 용량 순위)을 마스터 데이터 버전마다 한 번만 계산해 공유한다.
+KpiScore(가동률 점수), CapaUtilization(요일별 가동률), PlanAdjustmentValidator(라인 용량/가동률 검증)가 사용
+"""
+class CapacityProfile:
+    FACTORIES = ['I', 'D', 'K', 'M']
+    SHIFTS = list(range(1, 15))
+    DAYS = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+
+    # 마스터 데이터 버전(capa_qty 내용 해시) -> CapacityProfile
+    _profiles = {}
+    _max_profiles = 4
+
+    """
+    capa_qty 시트로 프로파일 조회 (같은 내용이면 캐시된 프로파일 반환)
+    """
+    @classmethod
+    def from_capa_qty(cls, df_capa_qty):
+        version = cls._version(df_capa_qty)
+        profile = cls._profiles.get(version)
+        if profile is None:
+            profile = cls(df_capa_qty)
+            if len(cls._profiles) >= cls._max_profiles:
+                cls._profiles.pop(next(iter(cls._profiles)))
+            cls._profiles[version] = profile
+        return profile
+
+    """
+    현재 마스터 파일의 capa_qty 로 프로파일 조회. 마스터 파일이 없거나 비어 있으면 None
+    """
+    @classmethod
+    def load(cls):
+        master_file = FilePaths.get("master_excel_file")
+        if not master_file:
+            print("마스터 파일 경로가 설정되지 않았습니다.")
+            return None
+
+        try:
+            df_capa_qty = load_sheet(master_file, "capa_qty")
+
+            if df_capa_qty.empty:
+                print("capa_qty 데이터가 비어 있습니다.")
+                return None
+
+        except Exception as e:
+            print(f"생산능력 데이터 로드 중 오류 발생: {str(e)}")
+            return None
+
+        return cls.from_capa_qty(df_capa_qty)
+
+    def __init__(self, df_capa_qty):
+        self.columns = set(df_capa_qty.columns)
+        self._df = df_capa_qty.copy()
+        self._factory_lines = {}  # (제조동, 시프트) -> [(라인, 용량)] 용량 내림차순
+
+        # 라인 이름 -> 첫 번째 행의 {컬럼: 값}
+        self._rows = {}
+        if 'Line' in self._df.columns:
+            for record in self._df.to_dict('records'):
+                self._rows.setdefault(record['Line'], record)
+
+        # 제조동 x 시프트 best 생산 능력 (FACTORIES x SHIFTS)
+        self.factory_shift = np.zeros((len(self.FACTORIES), len(self.SHIFTS)))
+        for i, factory in enumerate(self.FACTORIES):
+            self.factory_shift[i] = self._best_factory_capacity(factory)
+
+        self.shift_capacity = self.factory_shift.sum(axis=0)
+        # 시프트 2개씩 (주간/야간) 묶어 요일별 합계
+        self.day_capacity = self.shift_capacity.reshape(len(self.DAYS), 2).sum(axis=1)
+
+    """
+    시프트별 best 생산 능력 {1: ..., 14: ...}
+    """
+    def shift_capacity_dict(self):
+        return {shift: self._number(value) for shift, value in zip(self.SHIFTS, self.shift_capacity)}
+
+    """
+    요일별 생산 가능량 {'Mon': ..., 'Sun': ...}
+    """
+    def day_capacity_dict(self):
+        return {day: self._number(value) for day, value in zip(self.DAYS, self.day_capacity)}
+
+    """
+    제조동/시프트 best 생산 능력 (FACTORIES 에 없는 제조동은 0)
+    """
+    def building_capacity(self, factory, shift):
+        if factory not in self.FACTORIES or shift not in self.SHIFTS:
+            return 0
+        return self._number(self.factory_shift[self.FACTORIES.index(factory), self.SHIFTS.index(shift)])
+
+    """
+    capa_qty 의 (Line 컬럼 값, 시프트) 원본 값. 행이나 시프트 컬럼이 없으면 None
+    """
+    def value(self, line, shift):
+        row = self._rows.get(line)
+        if row is None or shift not in self.columns:
+            return None
+        return row[shift]
+
+    """
+    라인/시프트 기본 용량 (값이 없거나 NaN 이면 None)
+    """
+    def line_capacity(self, line, shift):
+        capacity = self.value(line, shift)
+        if capacity is None or pd.isna(capacity):
+            return None
+        return float(capacity)
+
+    """
+    제조동('I' -> 'I_' 로 시작하는 라인)의 시프트 용량 목록 [(라인, 용량)], 용량 내림차순 (NaN 제외)
+    """
+    def lines_by_capacity(self, factory, shift):
+        key = (factory, shift)
+        if key not in self._factory_lines:
+            lines = []
+            if 'Line' in self._df.columns and shift in self.columns:
+                factory_rows = self._df[self._df['Line'].str.startswith(f'{factory}_', na=False)]
+                lines = [(line, float(capacity)) for line, capacity in zip(factory_rows['Line'], factory_rows[shift])
+                         if pd.notna(capacity)]
+                lines.sort(key=lambda x: x[1], reverse=True)
+            self._factory_lines[key] = lines
+        return self._factory_lines[key]
+
+    """
+    제조동의 시프트별 best 생산 능력
+    용량이 큰 라인부터 Max_line 개까지 채우고 합계를 Max_qty 로 제한 (Max_line/Max_qty 가 0 이면 0)
+    """
+    def _best_factory_capacity(self, factory):
+        best = np.zeros(len(self.SHIFTS))
+        if 'Line' not in self._df.columns:
+            return best
+
+        factory_rows = self._df[self._df['Line'].str.startswith(f'{factory}_', na=False)]
+        if factory_rows.empty:
+            return best
+
+        shifts = [shift for shift in self.SHIFTS if shift in self.columns]
+        if not shifts:
+            return best
+
+        # 라인 x 시프트 용량 행렬을 시프트별로 내림차순 정렬한 누적합 (NaN 라인은 0)
+        capacities = factory_rows[shifts].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+        capacities = np.where(np.isnan(capacities), 0.0, capacities)
+        cumulative = np.vstack([np.zeros(len(shifts)), np.cumsum(-np.sort(-capacities, axis=0), axis=0)])
+
+        for col, shift in enumerate(shifts):
+            max_line = self.value(f'Max_line_{factory}', shift)
+            max_qty = self.value(f'Max_qty_{factory}', shift)
+            max_line = len(factory_rows) if max_line is None or pd.isna(max_line) else max_line
+            max_qty = float('inf') if max_qty is None or pd.isna(max_qty) else max_qty
+            if max_line == 0 or max_qty == 0:
+                continue
+
+            # i < Max_line 인 라인까지 사용 (소수면 올림)
+            line_count = min(max(math.ceil(max_line), 0), len(factory_rows))
+            best[self.SHIFTS.index(shift)] = max(0.0, min(cumulative[line_count, col], max_qty))
+        return best
+
+    """
+    capa_qty 내용 기준 버전 키
+    """
+    @staticmethod
+    def _version(df_capa_qty):
+        content = pd.util.hash_pandas_object(df_capa_qty.astype(str), index=False)
+        return tuple(map(str, df_capa_qty.columns)), len(df_capa_qty), int(content.sum())
+
+    @staticmethod
+    def _number(value):
+        value = float(value)
+        return int(value) if value.is_integer() else value
@@ -1,8 +1,9 @@
 import pandas as pd
 import numpy as np
 from app.models.common.file_store import FilePaths
-from app.utils.fileHandler import load_file
+from app.utils.fileHandler import load_sheet
 from app.utils.item_key_manager import ItemKeyManager
+from app.analysis.output.capacity_profile import CapacityProfile
 
 """
 요일별 가동률 계산 함수
@@ -13,6 +14,17 @@ Returns:
     dict: 요일별 가동률 데이터 {'Mon': 75.5, 'Tue': 82.3, ...}
 """
 class CapaUtilization:
+    # 근무를 요일에 매핑
+    SHIFT_TO_DAY = {
+        1: 'Mon', 2: 'Mon',
+        3: 'Tue', 4: 'Tue',
+        5: 'Wed', 6: 'Wed',
+        7: 'Thu', 8: 'Thu',
+        9: 'Fri', 10: 'Fri',
+        11: 'Sat', 12: 'Sat',
+        13: 'Sun', 14: 'Sun',
+    }
+
     @staticmethod
     def analyze_utilization(data_df):
         try:
@@ -30,12 +42,7 @@ class CapaUtilization:
                 return {day: 0 for day in ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']}
 
             try:
-                sheets = load_file(master_file, sheet_name="capa_qty")
-
-                if isinstance(sheets, dict):
-                    df_capa_qty = sheets.get('capa_qty', pd.DataFrame())
-                else:
-                    df_capa_qty = sheets
+                df_capa_qty = load_sheet(master_file, "capa_qty")
                 
                 if df_capa_qty.empty:
                     print("capa_qty 데이터가 비어 있습니다.")
@@ -44,138 +51,84 @@ class CapaUtilization:
             except Exception as e:
                 print(f"생산능력 데이터 로드 중 오류 발생: {str(e)}")
                 return {day: 0 for day in ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']}
-            
-                
-            # 근무를 요일에 매핑
-            shift_to_day = {
-                1: 'Mon', 2: 'Mon',
-                3: 'Tue', 4: 'Tue',
-                5: 'Wed', 6: 'Wed',
-                7: 'Thu', 8: 'Thu',
-                9: 'Fri', 10: 'Fri',
-                11: 'Sat', 12: 'Sat',
-                13: 'Sun', 14: 'Sun',
-            }
-
-            # 일별 생산능력 계산
-            day_capacity = {}
-            for day in ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']:
-                day_shifts = [shift for shift, d in shift_to_day.items() if d == day]
-                day_total_capacity = 0
-
-                for shift in day_shifts:
-                    shift_capacity = 0
-
-                    # 각 제조동별 처리
-                    for factory in ['I', 'D', 'K', 'M']:
-                        # 해당 공장 라인들 가져오기
-                        factory_lines = df_capa_qty[df_capa_qty['Line'].str.startswith(f'{factory}_')].index.tolist()
-                    
-                        if not factory_lines or shift not in df_capa_qty.columns:
-                            continue
-
-                        # 최대 라인/수량 제약 확인
-                        max_line_key = f'Max_line_{factory}'
-                        max_qty_key = f'Max_qty_{factory}'
-
-                        # 'Line' 컬럼에서 제약 조건 행 찾기
-                        max_line_row = df_capa_qty[df_capa_qty['Line'] == max_line_key]
-                        max_qty_row = df_capa_qty[df_capa_qty['Line'] == max_qty_key]
-
-                        # 제약 값 확인
-                        if not max_line_row.empty and shift in max_line_row.columns and pd.notna(max_line_row.iloc[0][shift]):
-                            max_line = max_line_row.iloc[0][shift]
-                            
-                            # 중요: 제약이 0이면 해당 제조동의 생산량은 0
-                            if max_line == 0:
-                                continue
-                        else:
-                            max_line = len(factory_lines)
-
-                        if not max_qty_row.empty and shift in max_qty_row.columns and pd.notna(max_qty_row.iloc[0][shift]):
-                            max_qty = max_qty_row.iloc[0][shift]
-                            
-                            # 중요: 제약이 0이면 해당 제조동의 생산량은 0
-                            if max_qty == 0:
-                                continue
-                        else:
-                            max_qty = float('inf')
-
-                        # 각 라인의 생산 능력 가져오기
-                        line_capacities = [(line, df_capa_qty.loc[line, shift]) for line in factory_lines if pd.notna(df_capa_qty.loc[line, shift])]
-                        line_capacities.sort(key=lambda x:x[1], reverse=True)  # Sort by capacity in descending order
-                 
-                        # 라인 수와 최대 수량 간의 더 제한적인 제약 적용
-                        factory_capacity = 0
-                        for i, (line, capacity) in enumerate(line_capacities):
-                            if i >= max_line:
-                                break  # 라인 수 초과
-
-                            if factory_capacity + capacity <= max_qty:
-                                factory_capacity += capacity
-                            elif factory_capacity < max_qty:
-                                # 남은 만큼만 추가
-                                remaining = max_qty - factory_capacity
-                                if remaining > 0:
-                                    factory_capacity += remaining
-                                break
-                            else:
-                                break
-
-                        shift_capacity += factory_capacity
-
-                    day_total_capacity += shift_capacity
-                
-                day_capacity[day] = day_total_capacity
-            print(f"요일별 생산 가능량: {day_capacity}")
-            
+
+            day_capacity = CapaUtilization.daily_capacity(df_capa_qty)
+
             # 수요 수량에 기반한 일별 생산량 계산
-            df_demand['Day'] = df_demand['Time'].map(shift_to_day)
+            df_demand['Day'] = df_demand['Time'].map(CapaUtilization.SHIFT_TO_DAY)
             day_production = df_demand.groupby('Day')['Qty'].sum()
-      
-            # 일별 가동률 계산
-            utilization_rate = {}
-            for day in ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']:
-                if day in day_capacity:
-                    # 생산 능력이 있는 경우
-                    if day_capacity[day] > 0:
-                        if day in day_production:
-                            # 생산량이 생산 능력보다 적거나 같은 경우 - 정상 가동률
-                            if day_production[day] <= day_capacity[day]:
-                                utilization_rate[day] = (day_production[day] / day_capacity[day]) * 100
-                            # 생산량이 생산 능력보다 많은 경우 - 과도한 생산
-                            else:
-                                # 옵션 1: 100%로 클리핑
-                                utilization_rate[day] = 100.0
-                                print(f"경고: {day}에 생산 능력({day_capacity[day]})보다 많은 생산량({day_production[day]})이 있습니다. 가동률은 100%로 제한됩니다.")
-                        else:
-                            utilization_rate[day] = 0
-                    # 생산 능력이 0인 경우
-                    else:
-                        if day in day_production and day_production[day] > 0:
-                            # 생산 능력은 0이지만 생산량이 있는 경우
-                            print(f"경고: {day}에 생산 능력이 0이지만 생산량({day_production[day]})이 있습니다.")
-                            # 옵션 1: 100%로 설정 (가장 보수적인 처리)
-                            utilization_rate[day] = 100.0
-                        else:
-                            # 생산 능력도 0이고 생산량도 0인 경우
-                            utilization_rate[day] = 0
-                else:
-                    # day_capacity에 해당 일이 없는 경우 (발생하지 않아야 함)
-                    utilization_rate[day] = 0
-
-            print("daily utilization rate(%):")
-            for day, rate in utilization_rate.items():
-                if rate is not None:
-                    print(f"{day}: {rate:.2f}%")
-                else:
-                    print(f"{day}: No capacity availble")
 
-            return utilization_rate
+            return CapaUtilization.utilization_from_production(day_production, day_capacity)
         
         except Exception as e:
                 print(f"가동률 계산 중 오류 발생: {str(e)}")
 
+    """
+    capa_qty 시트로 요일별 생산 가능량 계산 (제조동별 최대 라인 수/최대 수량 제약 반영)
+
+    Args:
+        df_capa_qty (DataFrame): capa_qty 시트
+    Returns:
+        dict: 요일별 생산 가능량 {'Mon': 12000, ...}
+    """
+    @staticmethod
+    def daily_capacity(df_capa_qty):
+        # 마스터 데이터 버전별로 한 번만 계산된 생산 능력 프로파일 사용
+        day_capacity = CapacityProfile.from_capa_qty(df_capa_qty).day_capacity_dict()
+        print(f"요일별 생산 가능량: {day_capacity}")
+        return day_capacity
+
+    """
+    요일별 생산량과 생산 가능량으로 요일별 가동률 계산
+
+    Args:
+        day_production (Series/dict): 요일별 생산량
+        day_capacity (dict): 요일별 생산 가능량
+    Returns:
+        dict: 요일별 가동률 {'Mon': 75.5, ...}
+    """
+    @staticmethod
+    def utilization_from_production(day_production, day_capacity):
+        # 일별 가동률 계산
+        utilization_rate = {}
+        for day in ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']:
+            if day in day_capacity:
+                # 생산 능력이 있는 경우
+                if day_capacity[day] > 0:
+                    if day in day_production:
+                        # 생산량이 생산 능력보다 적거나 같은 경우 - 정상 가동률
+                        if day_production[day] <= day_capacity[day]:
+                            utilization_rate[day] = (day_production[day] / day_capacity[day]) * 100
+                        # 생산량이 생산 능력보다 많은 경우 - 과도한 생산
+                        else:
+                            # 옵션 1: 100%로 클리핑
+                            utilization_rate[day] = 100.0
+                            print(f"경고: {day}에 생산 능력({day_capacity[day]})보다 많은 생산량({day_production[day]})이 있습니다. 가동률은 100%로 제한됩니다.")
+                    else:
+                        utilization_rate[day] = 0
+                # 생산 능력이 0인 경우
+                else:
+                    if day in day_production and day_production[day] > 0:
+                        # 생산 능력은 0이지만 생산량이 있는 경우
+                        print(f"경고: {day}에 생산 능력이 0이지만 생산량({day_production[day]})이 있습니다.")
+                        # 옵션 1: 100%로 설정 (가장 보수적인 처리)
+                        utilization_rate[day] = 100.0
+                    else:
+                        # 생산 능력도 0이고 생산량도 0인 경우
+                        utilization_rate[day] = 0
+            else:
+                # day_capacity에 해당 일이 없는 경우 (발생하지 않아야 함)
+                utilization_rate[day] = 0
+
+        print("daily utilization rate(%):")
+        for day, rate in utilization_rate.items():
+            if rate is not None:
+                print(f"{day}: {rate:.2f}%")
+            else:
+                print(f"{day}: No capacity availble")
+
+        return utilization_rate
+
     """
     셀 이동 시 요일별 가동률 업데이트
 
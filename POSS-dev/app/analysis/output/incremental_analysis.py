@@ -0,0 +1,261 @@
+import time
+import pandas as pd
+from collections import defaultdict
+
+"""
+결과 계획 증분 분석
+AssignmentModel 의 수정(이동/복사/수량 변경/삭제)을 행 단위 변경분으로 받아 집계값만 갱신하고,
+변경된 집계 단위에 의존하는 분석만 다시 실행한다
+"""
+
+
+"""
+집계 단위 정의
+name: 집계 단위 이름 (분석이 depends_on 으로 선언하는 값)
+columns: 키를 만드는 컬럼. 'Building' 은 Line 의 '_' 앞부분 (제조동)
+due_only: True 면 Time <= Due_LT 인 행만 집계
+"""
+class PlanScope:
+    def __init__(self, name, columns, due_only=False):
+        self.name = name
+        self.columns = tuple(columns)
+        self.due_only = due_only
+
+    """
+    결과 데이터프레임 전체 집계 -> ({키: 수량 합계}, {키: 행 수}). 필요한 컬럼이 없으면 None
+    """
+    def aggregate(self, df):
+        required = set(self.columns) - {'Building'}
+        if self.due_only:
+            required |= {'Time', 'Due_LT'}
+        if not required <= set(df.columns):
+            return None
+
+        if self.due_only:
+            df = df[df['Time'] <= df['Due_LT']]
+        if not self.columns:
+            return {(): df['Qty'].sum()}, {(): len(df)}
+
+        keys = [df['Line'].astype(str).str.split('_').str[0].rename('Building') if column == 'Building' else df[column]
+                for column in self.columns]
+        grouped = df['Qty'].groupby(keys, sort=False)
+        qty = grouped.sum()
+        rows = grouped.size()
+        if len(self.columns) == 1:
+            return ({(key,): value for key, value in qty.items()},
+                    {(key,): value for key, value in rows.items()})
+        return dict(qty.items()), dict(rows.items())
+
+    """
+    행(dict) 하나의 키. 집계 대상이 아니거나 키에 빈 값이 있으면 None
+    """
+    def key(self, row):
+        if self.due_only:
+            due_lt = row.get('Due_LT')
+            if due_lt is None or pd.isna(due_lt) or not row['Time'] <= due_lt:
+                return None
+        key = tuple(str(row['Line']).split('_')[0] if column == 'Building' else row.get(column)
+                    for column in self.columns)
+        # groupby 와 같이 빈 값이 있는 키는 집계하지 않는다
+        if any(value is None or pd.isna(value) for value in key):
+            return None
+        return key
+
+
+PLAN_SCOPES = [
+    PlanScope('total', ()),
+    PlanScope('shift', ('Time',)),
+    PlanScope('line', ('Line',)),
+    PlanScope('line_shift', ('Line', 'Time')),
+    PlanScope('building', ('Building',)),
+    PlanScope('item', ('Item',)),
+    PlanScope('item_line', ('Item', 'Line')),
+    PlanScope('item_shift', ('Item', 'Time')),
+    PlanScope('cell', ('Line', 'Time', 'Item')),
+    PlanScope('due_demand', ('Item', 'To_site'), due_only=True),
+]
+
+
+"""
+집계 단위별 수량 합계/행 수
+행 추가/삭제 변경분으로 갱신하고, 실제로 값이 바뀐 키를 집계 단위별로 돌려준다
+"""
+class PlanAggregates:
+    def __init__(self, df):
+        self.qty = {}
+        self.rows = {}
+        for scope in PLAN_SCOPES:
+            result = scope.aggregate(df)
+            if result is not None:
+                self.qty[scope.name], self.rows[scope.name] = result
+
+    """
+    변경분 적용
+
+    Args:
+        changes (list): (부호, 행 dict) 리스트. 부호 +1 은 행 추가, -1 은 행 삭제.
+            수량 변경/이동은 이전 행 삭제 + 새 행 추가로 표현
+    Returns:
+        dict: {집계 단위 이름: 바뀐 키 집합}. 합쳐서 변화가 없는 키는 빠진다
+    """
+    def apply(self, changes):
+        before = defaultdict(dict)
+
+        for sign, row in changes:
+            row = self._normalize(row)
+            for scope in PLAN_SCOPES:
+                if scope.name not in self.qty:
+                    continue
+                key = scope.key(row)
+                if key is None:
+                    continue
+
+                qty, rows = self.qty[scope.name], self.rows[scope.name]
+                if key not in before[scope.name]:
+                    before[scope.name][key] = (qty.get(key, 0), rows.get(key, 0))
+
+                rows[key] = rows.get(key, 0) + sign
+                qty[key] = qty.get(key, 0) + sign * row['Qty']
+                if rows[key] <= 0:
+                    del rows[key]
+                    qty.pop(key, None)
+
+        affected = {}
+        for name, keys in before.items():
+            qty, rows = self.qty[name], self.rows[name]
+            changed = {key for key, value in keys.items() if (qty.get(key, 0), rows.get(key, 0)) != value}
+            if changed:
+                affected[name] = changed
+        return affected
+
+    """
+    전체 데이터프레임과 행 수/총 수량이 같은지 확인 (변경분 누락 감지용)
+    """
+    def matches(self, df):
+        return (self.rows['total'].get((), 0) == len(df)
+                and self.qty['total'].get((), 0) == df['Qty'].sum())
+
+    """
+    집계 단위의 {키: 수량} (단일 컬럼 키는 튜플을 풀어서 반환)
+    """
+    def totals(self, name):
+        qty = self.qty.get(name)
+        if qty is None:
+            return None
+        return {key[0] if len(key) == 1 else key: value for key, value in qty.items()}
+
+    @staticmethod
+    def _normalize(row):
+        row = dict(row)
+        row['Line'] = str(row.get('Line'))
+        row['Time'] = int(pd.to_numeric(row.get('Time'), errors='coerce') or 0)
+        row['Qty'] = int(pd.to_numeric(row.get('Qty'), errors='coerce') or 0)
+        if 'Item' in row:
+            row['Item'] = str(row['Item'])
+        return row
+
+
+"""
+증분 분석 엔진
+분석마다 의존하는 집계 단위(depends_on)를 등록해두고, 변경분이 해당 집계 단위의 값을 바꾼 경우에만 다시 실행한다.
+depends_on 이 비어 있는 분석은 전체 재분석 때만 실행된다 (계획 수정과 무관한 분석).
+run() 은 순서대로 바로 실행하고, 비동기 실행은 plan() 으로 대상을 정한 뒤 compute()/record() 로 분석별 실행/기록한다
+"""
+class IncrementalAnalysisEngine:
+    def __init__(self):
+        self._analyses = {}
+        self._pending = set()  # 실행 대상으로 정해졌지만 아직 결과가 기록되지 않은 분석 (취소되면 다음 실행에 포함)
+        self.aggregates = None
+        self.results = {}
+        self.timings = {}
+        self.last_run = []
+
+    """
+    분석 등록 (등록 순서대로 실행)
+
+    Args:
+        name (str): 결과 딕셔너리 키
+        compute (function): compute(df, aggregates, affected, original_df) -> 결과. 전체 재분석이면 affected 는 None
+        depends_on (iterable): 의존하는 집계 단위 이름 (PLAN_SCOPES)
+        requires (iterable): 같은 실행에서 먼저 끝나야 하는 분석 이름 (결과나 분석 엔진 상태를 사용하는 경우)
+    """
+    def register(self, name, compute, depends_on=(), requires=()):
+        self._analyses[name] = (compute, set(depends_on), tuple(requires))
+
+    """
+    전체 재분석이 필요하도록 상태 초기화
+    """
+    def reset(self):
+        self.aggregates = None
+        self.results = {}
+        self._pending = set()
+
+    """
+    변경분을 집계에 반영하고 다시 실행할 분석 결정
+
+    Args:
+        df (DataFrame): 현재 결과 데이터
+        changes (list): 마지막 실행 이후의 변경분 (PlanAggregates.apply 형식). None 이면 전체 재분석
+    Returns:
+        tuple: (다시 실행할 분석 이름 리스트 (등록 순서), 바뀐 집계 키 딕셔너리 - 전체 재분석이면 None)
+    """
+    def plan(self, df, changes=None):
+        affected = None
+        if changes is not None and self.aggregates is not None:
+            affected = self.aggregates.apply(changes)
+            # 변경분이 누락되어 집계가 어긋났으면 전체 재분석
+            if not self.aggregates.matches(df):
+                print("IncrementalAnalysisEngine: 집계 불일치 - 전체 재분석")
+                affected = None
+
+        if affected is None:
+            self.aggregates = PlanAggregates(df)
+            self.results = {}
+
+        names = [name for name, (_, depends_on, _) in self._analyses.items()
+                 if affected is None or name not in self.results or name in self._pending
+                 or depends_on & affected.keys()]
+        self._pending.update(names)
+        self.last_run = []
+        return names, affected
+
+    """
+    분석 하나 실행 (결과는 기록하지 않음 - 작업 스레드에서 호출 가능)
+    original_df: 원본 계획 데이터 (조정 전후 비교 분석용, 없으면 None)
+    """
+    def compute(self, name, df, affected, original_df=None):
+        return self._analyses[name][0](df, self.aggregates, affected, original_df)
+
+    """
+    분석 결과 기록
+    """
+    def record(self, name, result, elapsed):
+        self.results[name] = result
+        self.timings[name] = elapsed
+        self._pending.discard(name)
+        self.last_run.append(name)
+
+    """
+    분석이 같은 실행에서 먼저 끝나야 하는 분석 이름
+    """
+    def requires(self, name):
+        return self._analyses[name][2]
+
+    """
+    분석 실행 (등록 순서대로)
+
+    Args:
+        df (DataFrame): 현재 결과 데이터
+        changes (list): 마지막 실행 이후의 변경분 (PlanAggregates.apply 형식). None 이면 전체 재분석
+        original_df (DataFrame): 원본 계획 데이터 (조정 전후 비교 분석용, 없으면 None)
+    Returns:
+        dict: {분석 이름: 결과}. 다시 실행하지 않은 분석은 이전 결과
+    """
+    def run(self, df, changes=None, original_df=None):
+        names, affected = self.plan(df, changes)
+        for name in names:
+            start = time.perf_counter()
+            result = self.compute(name, df, affected, original_df)
+            self.record(name, result, time.perf_counter() - start)
+
+        return dict(self.results)
@@ -4,7 +4,8 @@ import pandas as pd
 import numpy as np
 from app.models.common.file_store import FilePaths, DataStore
 from app.models.common.settings_store import SettingsStore
-from app.utils.fileHandler import load_file
+from app.analysis.output.capacity_profile import CapacityProfile
+from app.utils.workbook_cache import WorkbookCache
 
 """
 KPI Score 계산
@@ -17,6 +18,8 @@ class KpiScore:
         self.material_analyzer = None
         self.demand_df = None
         self.kpi_widget = None
+        self._shift_capacity = None  # (마스터 파일 (경로, 수정시각, 크기), shift별 best 생산 능력)
+        self._demand_summary = None  # (demand_df, Item/To_site별 SOP 요구량)
 
     """
     설정값 가져오기
@@ -45,6 +48,13 @@ class KpiScore:
         self.material_analyzer = material_anaylsis
         self.demand_df = demand_df
 
+    """
+    생산 능력/수요 요약 캐시 비우기 (마스터/수요 데이터가 바뀐 경우)
+    """
+    def reset_cache(self):
+        self._shift_capacity = None
+        self._demand_summary = None
+
     """
     KPI 위젯 참조 저장
     """
@@ -54,13 +64,15 @@ class KpiScore:
     
     """
     자재 점수 계산
+    total_qty 를 주면 결과 데이터프레임 대신 그 값을 총 할당량으로 사용
     """
-    def calculate_material_score(self):
+    def calculate_material_score(self, total_qty=None):
         if not self.material_analyzer or not hasattr(self.material_analyzer, 'shortage_results'):
             return 0
         
         # 총 할당량
-        total_qty = self.df['Qty'].sum()
+        if total_qty is None:
+            total_qty = self.df['Qty'].sum()
         
         # 자재부족량
         neg_shortage = 0
@@ -78,34 +90,28 @@ class KpiScore:
 
     """
     SOP 점수 계산
+    due_production({(Item, To_site): Due_LT 내 생산량}) 을 주면 결과 데이터프레임을 다시 집계하지 않는다
     """ 
-    def calculate_sop_score(self):
+    def calculate_sop_score(self, due_production=None):
         if self.df is None or self.demand_df is None:
             return 0
         
         # Due_LT 내에 모두 충족된 수요
         # Item과 To_site 조합으로 실제 생산량과 요구량 비교
         df = self.df
-        demand_copy = self.demand_df.copy()
-
-        if 'To_Site' in demand_copy.columns and 'To_site' not in demand_copy.columns:
-            demand_copy = demand_copy.rename(columns={'To_Site': 'To_site'})
-            print("demand_df 컬럼명 'To_Site' -> 'To_site'로 변경")
-        print(f"통일 후 result_data To_site: {'To_site' in df.columns}")
-        print(f"통일 후 demand_df To_site: {'To_site' in demand_copy.columns}")
-
-        demand_summary = pd.DataFrame()
-        # 전체 모델/To_site 조합 수
-        if 'SOP' in demand_copy.columns:
-            demand_summary = demand_copy.groupby(['Item', 'To_site'])['SOP'].first().reset_index()
-            demand_summary.rename(columns={'SOP':'DemandQty'}, inplace=True)
-
+        demand_summary = self._get_demand_summary()
         total_demand = len(demand_summary)
 
         # Due_LT 내의 생산량만 집계
-        due_lt_mask = df['Time'] <= df['Due_LT']
-        due_lt_production = df[due_lt_mask].groupby(['Item', 'To_site'])['Qty'].sum().reset_index()
-        due_lt_production.rename(columns={'Qty': 'ProducedQty'}, inplace=True)
+        if due_production is None:
+            due_lt_mask = df['Time'] <= df['Due_LT']
+            due_lt_production = df[due_lt_mask].groupby(['Item', 'To_site'])['Qty'].sum().reset_index()
+            due_lt_production.rename(columns={'Qty': 'ProducedQty'}, inplace=True)
+        else:
+            due_lt_production = pd.DataFrame(
+                [(item, to_site, qty) for (item, to_site), qty in due_production.items()],
+                columns=['Item', 'To_site', 'ProducedQty']
+            )
 
         # 병합하여 비교
         comparison = pd.merge(demand_summary, due_lt_production, on=['Item', 'To_site'], how='left')
@@ -119,39 +125,49 @@ class KpiScore:
         
         return sop_score
 
+    """
+    Item/To_site 별 SOP 요구량 (같은 demand_df 면 다시 계산하지 않음)
+    """
+    def _get_demand_summary(self):
+        if self._demand_summary is not None and self._demand_summary[0] is self.demand_df:
+            return self._demand_summary[1]
+
+        demand_copy = self.demand_df.copy()
+
+        if 'To_Site' in demand_copy.columns and 'To_site' not in demand_copy.columns:
+            demand_copy = demand_copy.rename(columns={'To_Site': 'To_site'})
+            print("demand_df 컬럼명 'To_Site' -> 'To_site'로 변경")
+        print(f"통일 후 demand_df To_site: {'To_site' in demand_copy.columns}")
+
+        demand_summary = pd.DataFrame()
+        # 전체 모델/To_site 조합 수
+        if 'SOP' in demand_copy.columns:
+            demand_summary = demand_copy.groupby(['Item', 'To_site'])['SOP'].first().reset_index()
+            demand_summary.rename(columns={'SOP':'DemandQty'}, inplace=True)
+
+        self._demand_summary = (self.demand_df, demand_summary)
+        return demand_summary
+
 
     """
     가동률 점수 계산
+    shift_qty({Time: 생산량}) 를 주면 결과 데이터프레임을 다시 집계하지 않는다
     """
-    def calculate_utilization_score(self):
-        # 마스터 파일에서 생산능력 데이터(capa_qty) 로드
-        master_file = FilePaths.get("master_excel_file")
-        if not master_file:
-            print("마스터 파일 경로가 설정되지 않았습니다.")
+    def calculate_utilization_score(self, shift_qty=None):
+        shift_capacity = self.get_shift_capacity()
+        if shift_capacity is None:
             return {}
 
-        try:
-            sheets = load_file(master_file, sheet_name="capa_qty")
+        if shift_qty is None:
+            # 총 생산량 계산
+            total_qty = self.df['Qty'].sum()
 
-            if isinstance(sheets, dict):
-                df_capa_qty = sheets.get('capa_qty', pd.DataFrame())
-            else:
-                df_capa_qty = sheets
-            
-            if df_capa_qty.empty:
-                print("capa_qty 데이터가 비어 있습니다.")
-                return {}
-            
-        except Exception as e:
-            print(f"생산능력 데이터 로드 중 오류 발생: {str(e)}")
-            return {}
-
-        # 총 생산량 계산
-        total_qty = self.df['Qty'].sum()
-        
-        # Shift별 실제 생산량
-        result_pivot = self.df.groupby('Time')['Qty'].sum()
-        # print(f"Time별 생산량: {result_pivot.to_dict()}")  # 디버깅용
+            # Shift별 실제 생산량
+            result_pivot = self.df.groupby('Time')['Qty'].sum()
+            # print(f"Time별 생산량: {result_pivot.to_dict()}")  # 디버깅용
+        else:
+            result_pivot = pd.Series(shift_qty, dtype='float64')
+            total_qty = result_pivot.sum()
 
         # 가중치 적용 : weight_day_ox가 켜져있으면 weight_day 사용
         if self.opts.get('weight_day_ox', 0):
@@ -159,84 +175,6 @@ class KpiScore:
         else:  # 아니면 균등 가중치
             weights = [1.0] * 14  
 
-        # shift별 best 생산 능력 계산
-        shift_capacity = {}
-        for shift in range(1, 15):
-            if shift not in df_capa_qty.columns:
-                shift_capacity[shift] = 0
-                continue
-
-            shift_total_capacity = 0
-
-            # 각 제조동별 처리
-            for factory in ['I', 'D', 'K', 'M']:
-                # 해당 공장 라인들 가져오기
-                factory_lines = df_capa_qty[df_capa_qty['Line'].str.startswith(f'{factory}_')].index.tolist()
-                # print(f"factor_lines : {factory_lines}")
-            
-                if not factory_lines:
-                    print(f"Factory {factory}에 라인 없음")
-                    continue
-
-                # 최대 라인/수량 제약 확인
-                max_line_key = f'Max_line_{factory}'
-                max_qty_key = f'Max_qty_{factory}'
-
-                # 'Line' 컬럼에서 제약 조건 행 찾기
-                max_line_row = df_capa_qty[df_capa_qty['Line'] == max_line_key]
-                max_qty_row = df_capa_qty[df_capa_qty['Line'] == max_qty_key]
-
-                # 제약 값 확인
-                if not max_line_row.empty and shift in max_line_row.columns and pd.notna(max_line_row.iloc[0][shift]):
-                    max_line = max_line_row.iloc[0][shift]
-                    # print(f"Factory {factory} Max Line 값: {max_line}")
-                    
-                    # 중요: 제약이 0이면 해당 제조동의 생산량은 0
-                    if max_line == 0:
-                        # print(f"Factory {factory}의 Max Line이 0이므로 생산 능력 0")
-                        continue
-                else:
-                    max_line = len(factory_lines)
-                    # print(f"Factory {factory} Max Line 정보 없음, 기본값 사용: {max_line}")
-
-                if not max_qty_row.empty and shift in max_qty_row.columns and pd.notna(max_qty_row.iloc[0][shift]):
-                    max_qty = max_qty_row.iloc[0][shift]
-                    # print(f"Factory {factory} Max Qty 값: {max_qty}")
-                    
-                    # 중요: 제약이 0이면 해당 제조동의 생산량은 0
-                    if max_qty == 0:
-                        # print(f"Factory {factory}의 Max Qty가 0이므로 생산 능력 0")
-                        continue
-                else:
-                    max_qty = float('inf')
-                    # print(f"Factory {factory} Max Qty 정보 없음, 무제한으로 설정")
-
-                # 각 라인의 생산 능력 가져오기
-                line_capacities = [(line, df_capa_qty.loc[line, shift]) for line in factory_lines if pd.notna(df_capa_qty.loc[line, shift])]
-                line_capacities.sort(key=lambda x:x[1], reverse=True)  # 내림차순 정렬 
-    
-                # 라인 수와 최대 수량 간의 더 제한적인 제약 적용
-                factory_capacity = 0
-                for i, (line, capacity) in enumerate(line_capacities):
-                    if i >= max_line:
-                        break  # 라인 수 초과
-
-                    if factory_capacity + capacity <= max_qty:
-                        factory_capacity += capacity
-                    elif factory_capacity < max_qty:
-                        # 남은 만큼만 채움
-                        remaining = max_qty - factory_capacity
-                        if remaining > 0:
-                            factory_capacity += remaining
-                        break
-                    else:
-                        break  # 이미 max_qty를 넘었음
-
-                shift_total_capacity += factory_capacity
-
-            shift_capacity[shift] = shift_total_capacity
-            # print(f"Shift {shift} 생산 능력: {shift_total_capacity}")
-
         # Best 배치 계산: 앞 시프트부터 최대로 채움
         best_allocation = {}
         remaining_qty = total_qty
@@ -279,6 +217,28 @@ class KpiScore:
             print("Best 합계가 0, Util 점수는 100%로 설정")
         
         return util_score
+
+
+    """
+    shift별 best 생산 능력 계산 (마스터 파일의 경로, 수정 시각, 크기가 같으면 다시 계산하지 않음)
+    """
+    def get_shift_capacity(self):
+        master_file = FilePaths.get("master_excel_file")
+        try:
+            master_stamp = WorkbookCache.stamp(master_file) if master_file else None
+        except OSError:
+            master_stamp = None
+        if self._shift_capacity is not None and master_stamp is not None and self._shift_capacity[0] == master_stamp:
+            return self._shift_capacity[1]
+
+        # 마스터 파일의 capa_qty 로 만든 생산 능력 프로파일 (마스터 데이터 버전별로 한 번만 계산)
+        profile = CapacityProfile.load()
+        if profile is None:
+            return None
+        shift_capacity = profile.shift_capacity_dict()
+
+        self._shift_capacity = (master_stamp, shift_capacity)
+        return shift_capacity
     
 
     """
@@ -302,8 +262,11 @@ class KpiScore:
 
     """
     모든 점수 계산
+    plan_totals: 결과 데이터프레임 대신 사용할 집계값 (IncrementalAnalysisEngine 의 PlanAggregates 에서 만든 값)
+        {'total_qty': 총 수량, 'shift_qty': {Time: 수량}, 'due_production': {(Item, To_site): Due_LT 내 수량} 또는 None}
     """
-    def calculate_all_scores(self):
+    def calculate_all_scores(self, plan_totals=None):
+        plan_totals = plan_totals or {}
         self.get_options()
 
         print("==== KPI 계산 디버깅 ====")
@@ -316,19 +279,19 @@ class KpiScore:
 
         # 각 점수 계산
         try:
-            mat_score = self.calculate_material_score()
+            mat_score = self.calculate_material_score(plan_totals.get('total_qty'))
         except Exception as e:
             print(f"자재 점수 계산 오류: {e}")
             mat_score = 0.0
         
         try:
-            sop_score = self.calculate_sop_score()
+            sop_score = self.calculate_sop_score(plan_totals.get('due_production'))
         except Exception as e:
             print(f"SOP 점수 계산 오류: {e}")
             sop_score = 0.0
         
         try:
-            util_score = self.calculate_utilization_score()
+            util_score = self.calculate_utilization_score(plan_totals.get('shift_qty'))
             # util_score가 딕셔너리인지 확인하고 숫자 값 추출
             if isinstance(util_score, dict):
                 print(f"util_score가 딕셔너리입니다: {util_score}")
@@ -4,6 +4,7 @@ import re
 import os
 import traceback
 from app.utils.fileHandler import load_file
+from app.utils.workbook_cache import WorkbookCache
 from app.models.common.file_store import FilePaths, DataStore
 
 """
@@ -51,13 +52,12 @@ class MaterialShortageAnalyzer:
                 # Material Detail 시트 로드 시도
                 try:
                     # 모든 시트 이름 가져오기
-                    xl = pd.ExcelFile(result_path)
-                    sheet_names = xl.sheet_names
+                    sheet_names = WorkbookCache.sheet_names(result_path)
                     
                     # 결과 파일의 두 번째 시트를 material_detail로 가정
                     if len(sheet_names) > 1:
                         material_detail_sheet = sheet_names[1]
-                        self.material_detail_df = pd.read_excel(result_path, sheet_name=material_detail_sheet)
+                        self.material_detail_df = WorkbookCache.read(result_path, sheet_name=material_detail_sheet)
                     else:
                         pass
                 except Exception as e:
@@ -1,5 +1,5 @@
 import pandas as pd
-from app.utils.item_key_manager import ItemKeyManager
+from app.analysis.output.plan_retention import PlanRetentionEngine
 
 """
 생산 계획의 유지율을 계산하는 클래스
@@ -68,81 +68,13 @@ class PlanMaintenanceAnalyzer:
     """
     @staticmethod
     def _calculate_item_maintenance(prev_df, curr_df):
-        # 1. 그룹화
-        prev_grouped = prev_df.groupby(['Line', 'Time', 'Item'])['Qty'].sum().reset_index()
-        curr_grouped = curr_df.groupby(['Line', 'Time', 'Item'])['Qty'].sum().reset_index()
+        keys = ['Line', 'Time', 'Item']
+        merged = PlanRetentionEngine.compare(prev_df, curr_df, keys)
         
-        # 2. 병합
-        merged = pd.merge(
-            prev_grouped, curr_grouped,
-            on=['Line', 'Time', 'Item'],
-            how='outer',
-            suffixes=('_prev', '_curr')
-        )
-        
-        # NaN을 0으로 처리
-        merged['Qty_prev'] = merged['Qty_prev'].fillna(0)
-        merged['Qty_curr'] = merged['Qty_curr'].fillna(0)
-        
-        # 3. 유지 수량 계산
-        merged['maintenance'] = merged.apply(
-            lambda x: min(x['Qty_prev'], x['Qty_curr']) 
-            if x['Qty_prev'] > 0 and x['Qty_curr'] > 0 else 0, 
-            axis=1
-        )
-        
-        # 4. 변경된 아이템 식별 (UI 표시용) - ID 기반으로만
-        changed_items = set()
-        for _, row in merged.iterrows():
-            if row['Qty_prev'] != row['Qty_curr']:
-                # ID로 해당 아이템 찾기
-                mask = ItemKeyManager.create_mask_for_item(
-                    curr_df, 
-                    row['Line'], 
-                    row['Time'], 
-                    row['Item']
-
-                )
-                if mask.any():
-                    # ID가 있으면 ID 우선, 없으면 Line-Time-Item 조합 사용
-                    if '_id' in curr_df.columns:
-                        item_ids = curr_df.loc[mask, '_id'].dropna().unique()
-                        for item_id in item_ids:
-                            changed_items.add(f"id_{item_id}")
-                    else:
-                        # ID가 없는 경우 Line-Time-Item 조합으로 키 생성
-                        item_key = ItemKeyManager.get_item_key(
-                            row['Line'], 
-                            row['Time'], 
-                            row['Item']
-                        )
-                        changed_items.add(f"key_{item_key}")
-        
-        # 5. 결과 정리
-        result_df = merged.rename(columns={
-            'Line': 'Line',
-            'Time': 'Shift',
-            'Item': 'Item',
-            'Qty_prev': 'prev_plan',
-            'Qty_curr': 'curr_plan'
-        })
-        
-        # 6. 합계 및 유지율 계산
-        prev_sum = result_df['prev_plan'].sum()
-        maintenance_sum = result_df['maintenance'].sum()
-        rate = (maintenance_sum / prev_sum) * 100 if prev_sum > 0 else 0
-        
-        # 7. Total 행 추가
-        total_row = {
-            'Line': 'Total',
-            'Shift': '',
-            'Item': '',
-            'prev_plan': prev_sum,
-            'curr_plan': result_df['curr_plan'].sum(),
-            'maintenance': maintenance_sum
-        }
-        result_df = pd.concat([result_df, pd.DataFrame([total_row])], ignore_index=True)
+        # 변경된 아이템 식별 (UI 표시용) - ID 기반으로만 (ID가 없으면 Line-Time-Item 조합)
+        changed_items = PlanRetentionEngine.changed_keys(merged, curr_df, keys, normalize=True)
         
+        result_df, rate = PlanMaintenanceAnalyzer._summarize(merged, 'Item')
         return result_df, rate, changed_items
     
     """
@@ -154,77 +86,41 @@ class PlanMaintenanceAnalyzer:
         if 'RMC' not in prev_df.columns or 'RMC' not in curr_df.columns:
             return pd.DataFrame(), 0.0, set()
         
-        # 1. 그룹화
-        prev_grouped = prev_df.groupby(['Line', 'Time', 'RMC'])['Qty'].sum().reset_index()
-        curr_grouped = curr_df.groupby(['Line', 'Time', 'RMC'])['Qty'].sum().reset_index()
+        keys = ['Line', 'Time', 'RMC']
+        merged = PlanRetentionEngine.compare(prev_df, curr_df, keys)
         
-        # 2. 병합
-        merged = pd.merge(
-            prev_grouped, curr_grouped,
-            on=['Line', 'Time', 'RMC'],
-            how='outer',
-            suffixes=('_prev', '_curr')
-        )
+        # 변경된 RMC 식별 (UI 표시용) - ID 기반으로만 (ID가 없으면 Line-Time-RMC 조합)
+        changed_rmcs = PlanRetentionEngine.changed_keys(merged, curr_df, keys)
         
-        # NaN을 0으로 처리
-        merged['Qty_prev'] = merged['Qty_prev'].fillna(0)
-        merged['Qty_curr'] = merged['Qty_curr'].fillna(0)
-        
-        # 3. 유지 수량 계산
-        merged['maintenance'] = merged.apply(
-            lambda x: min(x['Qty_prev'], x['Qty_curr']) 
-            if x['Qty_prev'] > 0 and x['Qty_curr'] > 0 else 0, 
-            axis=1
-        )
-        
-        # 4. 변경된 RMC 식별 (UI 표시용) - ID 기반으로만
-        changed_rmcs = set()
-        for _, row in merged.iterrows():
-            if row['Qty_prev'] != row['Qty_curr']:
-                # ID로 해당 RMC 찾기
-                rmc_mask = (
-                    (curr_df['Line'] == row['Line']) & 
-                    (curr_df['Time'] == row['Time']) & 
-                    (curr_df['RMC'] == row['RMC'])
-                )
-                if rmc_mask.any():
-                    # ID가 있으면 ID 우선, 없으면 Line-Time-RMC 조합 사용
-                    if '_id' in curr_df.columns:
-                        rmc_ids = curr_df.loc[rmc_mask, '_id'].dropna().unique()
-                        for rmc_id in rmc_ids:
-                            changed_rmcs.add(f"id_{rmc_id}")
-                    else:
-                        # ID가 없는 경우 Line-Time-RMC 조합으로 키 생성
-                        rmc_key = f"{row['Line']}_{row['Time']}_{row['RMC']}"
-                        changed_rmcs.add(f"key_{rmc_key}")
-        
-        # 5. 결과 정리
+        result_df, rate = PlanMaintenanceAnalyzer._summarize(merged, 'RMC')
+        return result_df, rate, changed_rmcs
+    
+    """
+    비교 결과 정리 - 컬럼 이름 변경, 유지율 계산, Total 행 추가
+    """
+    @staticmethod
+    def _summarize(merged, key):
+        # 1. 결과 정리
         result_df = merged.rename(columns={
-            'Line': 'Line',
             'Time': 'Shift',
-            'RMC': 'RMC',
             'Qty_prev': 'prev_plan',
             'Qty_curr': 'curr_plan'
         })
         
-        # 6. 합계 및 유지율 계산
+        # 2. 합계 및 유지율 계산
         prev_sum = result_df['prev_plan'].sum()
         maintenance_sum = result_df['maintenance'].sum()
         rate = (maintenance_sum / prev_sum) * 100 if prev_sum > 0 else 0
         
-        # 7. Total 행 추가
+        # 3. Total 행 추가
         total_row = {
             'Line': 'Total',
             'Shift': '',
-            'RMC': '',
+            key: '',
             'prev_plan': prev_sum,
             'curr_plan': result_df['curr_plan'].sum(),
             'maintenance': maintenance_sum
         }
         result_df = pd.concat([result_df, pd.DataFrame([total_row])], ignore_index=True)
         
-        return result_df, rate, changed_rmcs
-
-
-        
-    
\ No newline at end of file
+        return result_df, rate
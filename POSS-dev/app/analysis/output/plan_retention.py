@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+from app.utils.item_key_manager import ItemKeyManager
+
+"""
+계획 유지율 계산 엔진
+이전/현재 계획을 키(Line/Time/Item 또는 Line/Time/RMC)별로 맞춰 유지 수량을 배열 연산으로 계산하고,
+변경된 키에 해당하는 현재 계획 행을 한 번의 병합으로 찾는다.
+PlanMaintenanceAnalyzer(결과 화면 Item/RMC 유지율)와 calc_plan_retention(수요 대비 최대 유지율)이 사용
+"""
+class PlanRetentionEngine:
+
+    """
+    이전/현재 계획 비교
+
+    Args:
+        prev_df (DataFrame): 이전 계획
+        curr_df (DataFrame): 현재 계획
+        keys (list): 비교 키 컬럼
+    Returns:
+        DataFrame: keys + Qty_prev, Qty_curr (없는 쪽은 0), maintenance (둘 다 양수면 작은 값, 아니면 0)
+    """
+    @staticmethod
+    def compare(prev_df, curr_df, keys):
+        prev_grouped = prev_df.groupby(keys)['Qty'].sum().reset_index()
+        curr_grouped = curr_df.groupby(keys)['Qty'].sum().reset_index()
+
+        merged = pd.merge(
+            prev_grouped, curr_grouped,
+            on=keys,
+            how='outer',
+            suffixes=('_prev', '_curr')
+        )
+
+        # NaN을 0으로 처리
+        merged['Qty_prev'] = merged['Qty_prev'].fillna(0)
+        merged['Qty_curr'] = merged['Qty_curr'].fillna(0)
+
+        prev_qty = merged['Qty_prev'].to_numpy()
+        curr_qty = merged['Qty_curr'].to_numpy()
+        merged['maintenance'] = np.where((prev_qty > 0) & (curr_qty > 0), np.minimum(prev_qty, curr_qty), 0)
+        return merged
+
+    """
+    수량이 바뀐 키에 해당하는 현재 계획 행의 UI 표시용 키
+    현재 계획에 '_id' 가 있으면 'id_{_id}', 없으면 'key_{Line}_{Time}_{키 값}'
+
+    Args:
+        merged (DataFrame): compare() 결과
+        curr_df (DataFrame): 현재 계획
+        keys (list): 비교 키 컬럼 (Line, Time, 키 순서)
+        normalize (bool): True 면 ItemKeyManager 와 같이 Line/키 는 문자열, Time 은 정수로 맞춰 비교
+    Returns:
+        set: 변경된 행 키
+    """
+    @staticmethod
+    def changed_keys(merged, curr_df, keys, normalize=False):
+        changed = merged.loc[merged['Qty_prev'] != merged['Qty_curr'], keys].drop_duplicates()
+        if changed.empty or curr_df.empty:
+            return set()
+        changed = changed.assign(_changed=np.arange(len(changed)))
+
+        has_id = '_id' in curr_df.columns
+        rows = curr_df[keys + ['_id']] if has_id else curr_df[keys]
+        if normalize:
+            changed_match = PlanRetentionEngine._normalized(changed, keys)
+            rows = PlanRetentionEngine._normalized(rows, keys)
+        else:
+            changed_match = changed
+
+        matched = pd.merge(changed_match, rows, on=keys)
+
+        if has_id:
+            item_ids = matched['_id']
+            return {f"id_{item_id}" for item_id in item_ids[item_ids.notna()].unique()}
+
+        # ID가 없는 경우 Line-Time-키 조합으로 키 생성 (원래 키 값 사용)
+        changed = changed.iloc[np.unique(matched['_changed'].to_numpy())]
+        return {f"key_{ItemKeyManager.get_item_by_not_id(*values)}"
+                for values in zip(*(changed[column].tolist() for column in keys))}
+
+    """
+    행 순서대로 그룹별 용량을 min(수량, 남은 용량) 만큼 차감하며 배분한 수량
+    (수량이 음수가 아니면 남은 용량은 '용량 - 앞 행 수량 누적' 을 0 아래로 내리지 않은 값)
+
+    Args:
+        qty (Series): 행별 수량
+        groups (Series): 행별 그룹 키
+        capacity (Series): 그룹 키 -> 용량. 없는 그룹의 행은 0
+    Returns:
+        ndarray: 행별 배분 수량 (정수로 반올림)
+    """
+    @staticmethod
+    def capped_allocation(qty, groups, capacity):
+        qty = pd.to_numeric(qty, errors='coerce')
+        cap = groups.map(capacity).to_numpy(dtype=float)
+        prior = (qty.groupby(groups, sort=False).cumsum() - qty).to_numpy(dtype=float)
+        qty = qty.to_numpy(dtype=float)
+
+        allocation = np.minimum(qty, np.maximum(cap - prior, 0))
+        # 용량이 음수면 첫 행이 음수 용량을 그대로 받고 이후 행은 0
+        first = ~groups.duplicated().to_numpy()
+        allocation = np.where(cap < 0, np.where(first, cap, 0), allocation)
+        return np.round(np.where(np.isnan(cap) | np.isnan(qty), 0, allocation)).astype(int)
+
+    @staticmethod
+    def _normalized(df, keys):
+        line, time, key = keys
+        times = pd.to_numeric(df[time], errors='coerce')
+        valid = times.notna().to_numpy()
+        normalized = df[valid].copy()
+        normalized[line] = normalized[line].astype(str)
+        normalized[time] = np.trunc(times[valid].to_numpy()).astype(np.int64)
+        normalized[key] = normalized[key].astype(str)
+        return normalized
@@ -1,8 +1,15 @@
 import pandas as pd
 import numpy as np
 import re
-from collections import defaultdict
+import itertools
+import threading
 from app.models.common.file_store import FilePaths, DataStore
+from app.utils.workbook_cache import WorkbookCache
+
+# (내용 키, only_split) -> (Region 컬럼 값, 프로젝트 분석, 모델 분석). 계획 수정마다 다시 호출되므로 최근 결과를 재사용
+_analysis_cache = {}
+_analysis_lock = threading.Lock()
+_MAX_CACHED = 4
 
 def extract_region_from_item(item, project):
     """
@@ -53,7 +60,7 @@ def analyze_line_allocation(result_df=None, only_split=True):
                 result_file_path = FilePaths.get("result_file")
                 if result_file_path:
                     try:
-                        result_df = pd.read_excel(result_file_path)
+                        result_df = WorkbookCache.read(result_file_path)
                         print(f"결과 파일 로드: {result_file_path}")
                     except Exception as e:
                         print(f"결과 파일 로드 실패: {e}")
@@ -71,115 +78,129 @@ def analyze_line_allocation(result_df=None, only_split=True):
         # print(f"고유 프로젝트 수: {result_df['Project'].nunique()}")
         # print(f"고유 모델(Item) 수: {result_df['Item'].nunique()}")
         
+        # 같은 내용(Line/Item/Project/Qty)으로 분석한 적이 있으면 저장된 결과 반환
+        cache_key = (_content_key(result_df), only_split)
+        with _analysis_lock:
+            cached = _analysis_cache.get(cache_key)
+        if cached is not None:
+            regions, project_df, model_df = cached
+            result_df['Region'] = regions.copy()
+            return result_df, project_df.copy(), model_df.copy()
+        
         # 올바른 방법으로 Item에서 지역 추출
-        result_df['Region'] = result_df.apply(
-            lambda row: extract_region_from_item(str(row['Item']), str(row['Project'])), 
-            axis=1
+        # 같은 (Item, Project) 조합이 라인/시프트마다 반복되므로 고유 조합에 대해서만 추출
+        item_project = pd.MultiIndex.from_arrays(
+            [result_df['Item'].astype(str), result_df['Project'].astype(str)]
         )
+        unique_pairs = item_project.unique()
+        regions = pd.Series(
+            [extract_region_from_item(item, project) for item, project in unique_pairs],
+            index=unique_pairs
+        )
+        result_df['Region'] = regions.reindex(item_project).to_numpy()
         
-        # 1. 프로젝트 & 지역별 라인 할당 분석
-        # 프로젝트 + 지역 그룹화
-        project_region_groups = defaultdict(lambda: {'records': [], 'lines': set(), 'models': set(), 'qty': 0})
-        
-        for _, row in result_df.iterrows():
-            project = row['Project'] + row['Region']
-            region = row['Region']
-            line = row['Line']
-            item = row['Item']
-            qty = row['Qty']
-            
-            # 지역 정보가 없으면 건너뛰기
-            if not region:
-                continue
-                
-            # 프로젝트 & 지역별 그룹화
-            project_key = f"{project}_{region}"
-            project_region_groups[project_key]['records'].append(row)
-            project_region_groups[project_key]['lines'].add(line)
-            project_region_groups[project_key]['models'].add(item)
-            project_region_groups[project_key]['qty'] += qty
-        
-        # 프로젝트 분석 데이터 생성
-        project_analysis = []
-        for project_key, data in project_region_groups.items():
-            project, region = project_key.split('_', 1)
-            lines = data['lines']
-            line_count = len(lines)
-            is_split = line_count > 1
-            
-            # only_split이 True이고 분할되지 않은 경우 건너뛰기
-            if only_split and not is_split:
-                continue
-                
-            project_analysis.append({
-                'Project': project,
-                'Region': region,
-                'LineCount': line_count,
-                'Lines': ', '.join(sorted(lines)),
-                'ModelCount': len(data['models']),
-                'TotalQty': data['qty'],
-                'IsSplit': is_split
-            })
+        # 지역 정보가 있는 행만 분석
+        region_df = result_df.loc[result_df['Region'] != '', ['Project', 'Region', 'Line', 'Item', 'Qty']]
         
-        # 데이터프레임으로 변환하고 정렬
-        project_df = pd.DataFrame(project_analysis)
+        # 1. 프로젝트 & 지역별 라인 할당 분석 (프로젝트 표시값은 프로젝트 + 지역)
+        project_df = _allocation_summary(region_df, 'Project', 'Item', only_split, join_detail=False)
         if not project_df.empty:
+            project_df = pd.DataFrame({
+                'Project': project_df['Project'] + project_df['Region'],
+                'Region': project_df['Region'],
+                'LineCount': project_df['LineCount'],
+                'Lines': project_df['Lines'],
+                'ModelCount': project_df['Count'],
+                'TotalQty': project_df['TotalQty'],
+                'IsSplit': project_df['IsSplit']
+            })
             project_df.sort_values(by=['LineCount', 'TotalQty'], ascending=[False, False], inplace=True)
         
         # 2. 모델 & 지역별 라인 할당 분석
-        # 모델 + 지역 그룹화
-        model_region_groups = defaultdict(lambda: {'records': [], 'lines': set(), 'projects': set(), 'qty': 0})
-        
-        for _, row in result_df.iterrows():
-            project = row['Project']
-            region = row['Region']
-            line = row['Line']
-            item = row['Item']
-            qty = row['Qty']
-            
-            # 지역 정보가 없으면 건너뛰기
-            if not region:
-                continue
-            
-            # 모델 & 지역별 그룹화
-            model_key = f"{item}_{region}"
-            model_region_groups[model_key]['records'].append(row)
-            model_region_groups[model_key]['lines'].add(line)
-            model_region_groups[model_key]['projects'].add(project)
-            model_region_groups[model_key]['qty'] += qty
-        
-        # 모델 분석 데이터 생성
-        model_analysis = []
-        for model_key, data in model_region_groups.items():
-            item, region = model_key.split('_', 1)
-            lines = data['lines']
-            line_count = len(lines)
-            is_split = line_count > 1
-            
-            # only_split이 True이고 분할되지 않은 경우 건너뛰기
-            if only_split and not is_split:
-                continue
-                
-            model_analysis.append({
-                'Item': item,
-                'Region': region,
-                'LineCount': line_count,
-                'Lines': ', '.join(sorted(lines)),
-                'ProjectCount': len(data['projects']),
-                'Projects': ', '.join(sorted(data['projects'])),
-                'TotalQty': data['qty'],
-                'IsSplit': is_split
-            })
-        
-        # 데이터프레임으로 변환하고 정렬
-        model_df = pd.DataFrame(model_analysis)
+        model_df = _allocation_summary(region_df, 'Item', 'Project', only_split)
         if not model_df.empty:
+            model_df = pd.DataFrame({
+                'Item': model_df['Item'],
+                'Region': model_df['Region'],
+                'LineCount': model_df['LineCount'],
+                'Lines': model_df['Lines'],
+                'ProjectCount': model_df['Count'],
+                'Projects': model_df['Joined'],
+                'TotalQty': model_df['TotalQty'],
+                'IsSplit': model_df['IsSplit']
+            })
             model_df.sort_values(by=['LineCount', 'TotalQty'], ascending=[False, False], inplace=True)
         
-        return result_df, project_df, model_df
+        with _analysis_lock:
+            if len(_analysis_cache) >= _MAX_CACHED and cache_key not in _analysis_cache:
+                _analysis_cache.pop(next(iter(_analysis_cache)))
+            _analysis_cache[cache_key] = (result_df['Region'].to_numpy(), project_df, model_df)
+        
+        return result_df, project_df.copy(), model_df.copy()
         
     except Exception as e:
         print(f"라인 할당 분석 중 오류 발생: {e}")
         import traceback
         traceback.print_exc()
-        return None, None, None
\ No newline at end of file
+        return None, None, None
+
+
+def _content_key(result_df):
+    """
+    분석에 쓰이는 컬럼(Line/Item/Project/Qty) 내용 기준 키. 행 순서가 바뀌어도 다른 키가 된다
+    """
+    columns = [column for column in ['Line', 'Item', 'Project', 'Qty'] if column in result_df.columns]
+    hashes = pd.util.hash_pandas_object(result_df[columns], index=False).to_numpy()
+    return tuple(columns), len(result_df), hash(hashes.tobytes())
+
+
+def _allocation_summary(region_df, key, detail, only_split, join_detail=True):
+    """
+    (key, Region) 그룹별 라인 할당 요약 (그룹이 처음 나온 순서)
+    
+    Args:
+        region_df (DataFrame): 지역 정보가 있는 행 (Project/Region/Line/Item/Qty)
+        key (str): 그룹 컬럼 ('Project' 또는 'Item')
+        detail (str): 그룹 안에서 고유 개수를 세는 컬럼
+        only_split (bool): True일 경우 여러 라인에 분산된 그룹만 반환
+        join_detail (bool): True일 경우 detail 고유값을 정렬해 연결한 Joined 컬럼 추가
+    
+    Returns:
+        DataFrame: key, Region, LineCount, Count, TotalQty, IsSplit, Lines, (Joined).
+            그룹이 없으면 빈 데이터프레임
+    """
+    grouped = region_df.groupby([key, 'Region'], sort=False)
+    summary = grouped.agg(
+        LineCount=('Line', 'nunique'),
+        Count=(detail, 'nunique'),
+        TotalQty=('Qty', 'sum')
+    )
+    is_split = (summary['LineCount'] > 1).to_numpy()
+    summary['IsSplit'] = is_split
+    selected = is_split if only_split else np.ones(len(summary), dtype=bool)
+    if not selected.any():
+        return pd.DataFrame()
+    
+    # 행별 그룹 번호 (summary 행 순서와 같음) - 반환할 그룹의 행만 연결
+    codes = grouped.ngroup().to_numpy()
+    rows = selected[codes]
+    codes = codes[rows].tolist()
+    summary = summary[selected]
+    selected_codes = np.flatnonzero(selected)
+    
+    lines = _sorted_join(codes, region_df['Line'].to_numpy()[rows].tolist())
+    summary['Lines'] = [lines[code] for code in selected_codes]
+    if join_detail:
+        joined = _sorted_join(codes, region_df[detail].to_numpy()[rows].tolist())
+        summary['Joined'] = [joined[code] for code in selected_codes]
+    return summary.reset_index()
+
+
+def _sorted_join(codes, values):
+    """
+    그룹 번호별 고유값을 정렬해 ', ' 로 연결 -> {그룹 번호: 문자열}
+    """
+    joined = {}
+    for code, pairs in itertools.groupby(sorted(set(zip(codes, values))), key=lambda pair: pair[0]):
+        joined[code] = ', '.join(value for _, value in pairs)
+    return joined
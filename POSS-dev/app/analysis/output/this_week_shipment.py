@@ -2,6 +2,7 @@ import pandas as pd
 import numpy as np
 import os
 from app.models.common.file_store import FilePaths, DataStore
+from app.utils.workbook_cache import WorkbookCache
 
 """
 결과 데이터를 분석하여 출하 성능 결과를 반환
@@ -12,6 +13,7 @@ def analyze_and_get_results(result_data=None):
 """
 Result 파일을 사용하여 당주 출하 실패 건과 만족률을 계산
 출하 가능 조건: Item별로 Due_LT 내 생산량이 SOP 이상
+Item 그룹 번호(정렬 순서) 기준 배열 연산으로 모델별/행별 결과를 한 번에 계산
 """
 def analyze_shipment_performance(result_data=None):
     try:
@@ -28,10 +30,7 @@ def analyze_shipment_performance(result_data=None):
                 if result_file and os.path.exists(result_file):
                     try:
                         # 모든 시트 확인
-                        xl = pd.ExcelFile(result_file)
-                        sheets = xl.sheet_names
-                        if len(sheets) > 0:
-                            result_df = pd.read_excel(result_file, sheet_name=sheets[0])  # 첫 번째 시트 사용
+                        result_df = WorkbookCache.read(result_file, sheet_name=0)  # 첫 번째 시트 사용
                     except Exception as e:
                         return None, None, None
                         
@@ -58,8 +57,6 @@ def analyze_shipment_performance(result_data=None):
         result_df['Qty'] = pd.to_numeric(result_df['Qty'], errors='coerce').fillna(0).astype(int)
         
         # 결과 분석을 위한 데이터 준비
-        models = []
-        analysis_records = []
         sop_inconsistencies = []  # SOP 불일치 항목 저장
         
         # SOP 컬럼 확인
@@ -78,117 +75,118 @@ def analyze_shipment_performance(result_data=None):
         else:
             # SOP 컬럼이 있는 경우 숫자로 변환
             result_df['SOP'] = pd.to_numeric(result_df['SOP'], errors='coerce').fillna(0).astype(int)
-            
+        
+        # Item 이 있는 행만 분석 (groupby 와 같이 빈 Item 은 제외)
+        item_rows = result_df['Item'].notna().to_numpy()
+        df = result_df[item_rows]
+        if df.empty:
+            return None, None, None
+        
+        # 행별 Item 그룹 번호 (Item 정렬 순서)
+        codes = df.groupby('Item', sort=True).ngroup().to_numpy()
+        # 그룹 번호별 첫 번째 행 위치
+        first_positions = np.unique(codes, return_index=True)[1]
+        
         # 각 Item별로 SOP 값이 일관되는지 확인
-        for item, group in result_df.groupby('Item'):
-            unique_sops = group['SOP'].unique()
-            if len(unique_sops) > 1:
-                # SOP 값이 일관되지 않음 - 경고 기록
+        first_sop = df.groupby(codes)['SOP'].transform('first')
+        inconsistent_rows = (df['SOP'] != first_sop).to_numpy()
+        if inconsistent_rows.any():
+            # 불일치 아이템의 SOP 값 (나온 순서대로) - 경고 기록 (첫 번째 값 선택)
+            inconsistent_codes = np.isin(codes, codes[inconsistent_rows])
+            sop_values = pd.DataFrame({'code': codes[inconsistent_codes],
+                                       'SOP': df['SOP'].to_numpy()[inconsistent_codes]}).drop_duplicates()
+            sop_values = sop_values['SOP'].astype(str).groupby(sop_values['code']).agg(', '.join)
+            item_of_code = df['Item'].to_numpy()[first_positions]
+            selected_sops = first_sop.to_numpy()[first_positions]
+            
+            for code, values in sop_values.items():
                 sop_inconsistencies.append({
-                    'Item': item,
-                    'SOP_Values': ', '.join(map(str, unique_sops)),
-                    'Selected_SOP': int(group['SOP'].iloc[0])  # 첫 번째 값 선택 (정수로 변환)
+                    'Item': item_of_code[code],
+                    'SOP_Values': values,
+                    'Selected_SOP': int(selected_sops[code])
                 })
                 
-                # 해당 아이템의 모든 행에 대해 첫 번째 SOP 값으로 통일
-                first_sop = group['SOP'].iloc[0]
-                result_df.loc[result_df['Item'] == item, 'SOP'] = first_sop
-                
                 # 로그에 기록 (디버깅용)
-                print(f"SOP 불일치 발견: 아이템 {item}, 값들: {unique_sops}, 선택된 값: {first_sop}")
-        
-        # 먼저 To_site별 아이템 목록을 수집 (To_site 통합을 위해)
-        item_tosites = {}
-        for item, group in result_df.groupby('Item'):
-            tosites = group['Tosite'].unique()
-            item_tosites[item] = ', '.join([str(ts) for ts in tosites if pd.notna(ts) and str(ts).strip() != ''])
-        
-        # 1. Item으로만 모델 데이터 그룹화
-        model_groups = {}
-        for item, group in result_df.groupby('Item'):
-            # SOP 값 (첫 번째 SOP 값을 사용)
-            sop = group['SOP'].iloc[0]
-            
-            # SOP 값에 일관성이 없는 경우 체크
-            is_inconsistent = any(inc['Item'] == item for inc in sop_inconsistencies)
-            
-            # Due_LT 내 생산량 계산 - 각 행의 Time이 Due_LT 이하인 경우만 합산
-            # 각 행별로 Due_LT 조건을 확인하고 만족하는 경우만 Qty 합산
-            due_lt_production = group[group['Time'] <= group['Due_LT']]['Qty'].sum()
-            
-            # 전체 생산량 (Time과 상관없이 모든 생산량)
-            total_production = group['Qty'].sum()
-            
-            # 출하 성공 여부 계산 (Due_LT 내 생산량 >= SOP)
-            is_shippable = due_lt_production >= sop
-            
-            # 각 모델의 To_site 정보 수집
-            to_sites = item_tosites.get(item, "")
-
-            # 첫 번째 To_site 값 가져오기 (대표값)
-            first_tosite = group['Tosite'].iloc[0] if not group['Tosite'].empty else ""
-
-            # SOP 불일치 여부 확인
-            is_inconsistent = any(inc['Item'] == item for inc in sop_inconsistencies)
-
-            # 출하 성공 여부 계산 - SOP 불일치가 있어도 실패로 간주
-            # due_lt_production >= sop 조건은 유지하되, SOP 불일치시에도 실패 표시
-            is_shippable = due_lt_production >= sop and not is_inconsistent
-
-            # 모델 정보 저장
-            model_info = {
-                'Item': item,
-                'Tosite': first_tosite,
-                'AllToSites': to_sites,
-                'Tosite_group': first_tosite,  # 호환성 유지
-                'To_site': first_tosite,       # 호환성 유지
-                'SOP': sop,
-                'SOP_Inconsistent': is_inconsistent,
-                'DueLTProduction': due_lt_production,
-                'TotalProduction': total_production,
-                'IsShippable': is_shippable,
-                'ShipmentStatus': "출하가능" if is_shippable else "출하실패",
-                'FailureReason': "" if is_shippable else 
-                                "SOP 값 불일치" if is_inconsistent else 
-                                "Qty<SOP" if due_lt_production < sop else "Unknown"
-            }
-            models.append(model_info)
-            model_groups[item] = model_info
+                print(f"SOP 불일치 발견: 아이템 {item_of_code[code]}, 값들: [{values}], 선택된 값: {selected_sops[code]}")
             
-            # 해당 모델의 각 행에 대한 상세 분석 정보 저장
-            for idx, row in group.iterrows():
-                time_condition_met = row['Time'] <= row['Due_LT']
-                
-                record = {
-                    'Index': idx,
-                    'Item': item,
-                    'Tosite': row['Tosite'],  # 원래 To_site 값 유지
-                    'Tosite_group': row['Tosite_group'],
-                    'To_site': row['To_site'],
-                    'Line': row.get('Line', ''),
-                    'Time': row['Time'],
-                    'Due_LT': row['Due_LT'],
-                    'Qty': row['Qty'],
-                    'SOP': sop,
-                    'SOP_Inconsistent': is_inconsistent,
-                    'DueLTProduction': due_lt_production,  # 모델 전체의 Due_LT 내 생산량
-                    'TotalProduction': total_production,   # 모델 전체의 총 생산량
-                    'TimeConditionMet': time_condition_met,
-                    'QtyConditionMet': due_lt_production >= sop,
-                    'IsShippable': is_shippable,
-                    'MatchType': "exact",
-                    'FailureReason': "" if is_shippable else "Qty<SOP" if due_lt_production < sop else "Unknown"
-                }
-                analysis_records.append(record)
-
-        # 분석 결과를 데이터프레임으로 변환
-        models_df = pd.DataFrame(models)
-        analysis_df = pd.DataFrame(analysis_records)
-
-        # ShipmentStatus 컬럼 추가
-        analysis_df['ShipmentStatus'] = analysis_df['IsShippable'].apply(
-            lambda x: "출하가능" if x else "출하실패"
-        )
+            # 해당 아이템의 모든 행에 대해 첫 번째 SOP 값으로 통일
+            sop_column = result_df.columns.get_loc('SOP')
+            result_df.iloc[np.flatnonzero(item_rows), sop_column] = first_sop.to_numpy()
+            df = result_df[item_rows]
+        
+        # 1. Item으로만 모델 데이터 그룹화 (Item 정렬 순서, 값은 각 Item 의 첫 번째 행 기준)
+        first_rows = df.iloc[first_positions]
+        items = first_rows['Item'].to_numpy()
+        sop = first_rows['SOP'].to_numpy()
+        first_tosite = first_rows['Tosite'].to_numpy()
+        
+        # Due_LT 내 생산량 - 각 행의 Time이 Due_LT 이하인 경우만 합산
+        time_condition = (df['Time'] <= df['Due_LT']).to_numpy()
+        qty = df['Qty'].to_numpy()
+        due_lt_production = np.bincount(codes, weights=np.where(time_condition, qty, 0), minlength=len(items))
+        # 전체 생산량 (Time과 상관없이 모든 생산량)
+        total_production = np.bincount(codes, weights=qty, minlength=len(items))
+        if np.issubdtype(qty.dtype, np.integer):
+            due_lt_production = due_lt_production.astype(qty.dtype)
+            total_production = total_production.astype(qty.dtype)
+        
+        # 각 모델의 To_site 정보 수집 (빈 값을 뺀 To_site 를 나온 순서대로 연결)
+        tosite = df['Tosite']
+        has_tosite = (tosite.notna() & (tosite.astype(str).str.strip() != '')).to_numpy()
+        tosite_rows = pd.DataFrame({'code': codes[has_tosite], 'Tosite': tosite[has_tosite].to_numpy()}).drop_duplicates()
+        all_tosites = tosite_rows['Tosite'].astype(str).groupby(tosite_rows['code']).agg(', '.join)
+        all_tosites = all_tosites.reindex(range(len(items)), fill_value="").to_numpy()
+        
+        # SOP 불일치 여부, 출하 성공 여부 (Due_LT 내 생산량 >= SOP) - SOP 불일치가 있어도 실패로 간주
+        is_inconsistent = np.isin(np.arange(len(items)), codes[inconsistent_rows])
+        qty_condition = due_lt_production >= sop
+        is_shippable = qty_condition & ~is_inconsistent
+        shipment_status = np.where(is_shippable, "출하가능", "출하실패")
+        
+        # 모델 정보 저장
+        models_df = pd.DataFrame({
+            'Item': items,
+            'Tosite': first_tosite,
+            'AllToSites': all_tosites,
+            'Tosite_group': first_tosite,  # 호환성 유지
+            'To_site': first_tosite,       # 호환성 유지
+            'SOP': sop,
+            'SOP_Inconsistent': is_inconsistent,
+            'DueLTProduction': due_lt_production,
+            'TotalProduction': total_production,
+            'IsShippable': is_shippable,
+            'ShipmentStatus': shipment_status,
+            'FailureReason': np.select([is_shippable, is_inconsistent, ~qty_condition],
+                                       ["", "SOP 값 불일치", "Qty<SOP"], "Unknown")
+        })
+        
+        # 해당 모델의 각 행에 대한 상세 분석 정보 (모델 순서, 모델 안에서는 원래 행 순서)
+        order = np.argsort(codes, kind='stable')
+        rows = df.iloc[order]
+        row_codes = codes[order]
+        analysis_df = pd.DataFrame({
+            'Index': rows.index,
+            'Item': rows['Item'].to_numpy(),
+            'Tosite': rows['Tosite'].to_numpy(),  # 원래 To_site 값 유지
+            'Tosite_group': rows['Tosite_group'].to_numpy(),
+            'To_site': rows['To_site'].to_numpy(),
+            'Line': rows['Line'].to_numpy() if 'Line' in rows.columns else '',
+            'Time': rows['Time'].to_numpy(),
+            'Due_LT': rows['Due_LT'].to_numpy(),
+            'Qty': rows['Qty'].to_numpy(),
+            'SOP': sop[row_codes],
+            'SOP_Inconsistent': is_inconsistent[row_codes],
+            'DueLTProduction': due_lt_production[row_codes],  # 모델 전체의 Due_LT 내 생산량
+            'TotalProduction': total_production[row_codes],   # 모델 전체의 총 생산량
+            'TimeConditionMet': time_condition[order],
+            'QtyConditionMet': qty_condition[row_codes],
+            'IsShippable': is_shippable[row_codes],
+            'MatchType': "exact",
+            'FailureReason': np.select([is_shippable[row_codes], ~qty_condition[row_codes]], ["", "Qty<SOP"], "Unknown"),
+            'ShipmentStatus': shipment_status[row_codes]
+        })
+        models = [dict(zip(models_df.columns, values))
+                  for values in zip(*(models_df[column].tolist() for column in models_df.columns))]
         
         # 원본 데이터프레임에 출하 상태 및 실패 이유 추가
         result_df = pd.merge(
@@ -200,16 +198,16 @@ def analyze_shipment_performance(result_data=None):
         )
         
         # 통계 요약 계산
-        total_models = len(models)
-        success_models = sum(1 for model in models if model['IsShippable'])
+        total_models = len(models_df)
+        success_models = int(is_shippable.sum())
         model_success_rate = (success_models / total_models * 100) if total_models > 0 else 0
         
-        total_production = sum(model['TotalProduction'] for model in models)
-        success_production = sum(model['TotalProduction'] for model in models if model['IsShippable'])
+        success_production = total_production[is_shippable].sum()
+        total_production = total_production.sum()
         qty_success_rate = (success_production / total_production * 100) if total_production > 0 else 0
         
         # 총 SOP 합계
-        total_sop = sum(model['SOP'] for model in models)
+        total_sop = sop.sum()
         
         # 통계 요약 생성
         summary = {
@@ -48,7 +48,8 @@ class AdjustmentController(QObject):
         
         df = self.model.get_dataframe()
 
-         # 초기화는 Controller에서 분석 후 배포
+         # 초기화는 Controller에서 분석 후 배포 (이후 수정분은 모델이 변경분으로 기록)
+        self.model.take_changes()
         analysis_results = self.analysis_manager.run_all_analyses(df)
         
         # View 초기화 (분석 결과와 함께)
@@ -104,7 +105,8 @@ class AdjustmentController(QObject):
         
         df = self.model.get_dataframe()
         
-        # 분석 매니저가 모든 분석 담당
+        # 분석 매니저가 모든 분석 담당 (리셋/적용 등은 전체 재분석)
+        self.model.take_changes()
         analysis_results = self.analysis_manager.run_all_analyses(df)
         
         # 분석 결과와 함께 UI 업데이트 요청 (재분석 없음)
@@ -313,27 +315,39 @@ class AdjustmentController(QObject):
             if current_df is None or current_df.empty:
                 return
             
-            # 2. AnalysisManager로 모든 분석 실행
-            analysis_results = self.analysis_manager.run_all_analyses(current_df)
-            
-            # 3. 모든 결과를 UI에 반영
-            self._apply_all_analysis_results(analysis_results)
-            
-            # 4. 에러 상태 업데이트
-            self.error_manager.update_error_display()
-            
-            print("완전한 분석 완료")
+            # 2. AnalysisManager로 변경분에 영향받는 분석만 작업 스레드에서 병렬 실행 (변경분이 없으면 전체 재분석)
+            #    끝난 분석부터 UI에 반영하고, 모두 끝나면 에러 상태 업데이트
+            self.analysis_manager.start_incremental_analyses(
+                current_df, self.model.take_changes(),
+                on_result=self._apply_analysis_result,
+                on_finished=self._on_analysis_finished)
             
         except Exception as e:
             print(f"분석 중 오류: {e}")
 
+    """
+    분석 하나가 끝날 때마다 해당 결과만 UI에 반영
+    """
+    def _apply_analysis_result(self, name, result):
+        self._apply_all_analysis_results({name: result}, updated={name})
+
+    """
+    모든 분석 완료 후 에러 상태 업데이트
+    """
+    def _on_analysis_finished(self, analysis_results):
+        self.error_manager.update_error_display()
+        print("완전한 분석 완료")
+
     """
     분석 결과를 모든 UI에 적용
     """
-    def _apply_all_analysis_results(self, analysis_results):
-        
+    def _apply_all_analysis_results(self, analysis_results, updated=None):
+        # 이번에 다시 계산된 분석만 UI 에 반영
+        if updated is None:
+            updated = set(self.analysis_manager.last_updated())
+
         # 1. KPI 업데이트
-        if 'kpi' in analysis_results and self.result_page:
+        if 'kpi' in updated and 'kpi' in analysis_results and self.result_page:
             kpi_data = analysis_results['kpi']
             self.result_page.kpi_widget.update_scores(
                 base_scores=kpi_data.get('base_scores', {}),
@@ -342,7 +356,7 @@ class AdjustmentController(QObject):
             print("KPI 업데이트")
         
         # 2. 차트 데이터 설정
-        if self.result_page:
+        if self.result_page and updated & {'capa_ratio', 'utilization'}:
             if 'capa_ratio' in analysis_results:
                 self.result_page.capa_ratio_data = analysis_results['capa_ratio']
             if 'utilization' in analysis_results:
@@ -352,7 +366,8 @@ class AdjustmentController(QObject):
             self.result_page.update_all_visualizations()
         
         # 4. 자재부족/출하실패 상태를 아이템에 적용
-        self._apply_status_to_items(analysis_results)
+        if updated & {'material', 'shipment'}:
+            self._apply_status_to_items(analysis_results)
     
     """
     분석 결과를 개별 아이템에 상태로 적용
@@ -4,6 +4,8 @@ from typing import List, Tuple
 from app.models.input.maintenance import ItemMaintenance, RMCMaintenance, DataLoader
 from app.models.common.file_store import DataStore, FilePaths
 from app.utils.fileHandler import load_file
+from app.utils.workbook_cache import WorkbookCache
+from app.analysis.output.plan_retention import PlanRetentionEngine
 
 def melt_plan(df: pd.DataFrame) -> pd.DataFrame:
     if df.empty:
@@ -109,11 +111,7 @@ def calc_item_plan_retention(df_result: pd.DataFrame, df_demand: pd.DataFrame) -
         int: item 계획 유지율 
     """
     df_demand_mfg = df_demand.groupby('Item')['MFG'].sum()
-    df_result['Next MFG'] = 0
-    for idx,row in df_result.iterrows():
-        max_mfg = min(row['Qty'],df_demand_mfg[row['Item']])
-        df_result.loc[idx,'Next MFG'] = max_mfg
-        df_demand_mfg[row['Item']] -= max_mfg
+    df_result['Next MFG'] = PlanRetentionEngine.capped_allocation(df_result['Qty'], df_result['Item'], df_demand_mfg)
     return df_result['Next MFG'].sum()/df_result['Qty'].sum()
 
 """ RMC 계획 유지율 계산 함수"""
@@ -127,12 +125,8 @@ def calc_rmc_plan_retention(df_result: pd.DataFrame, df_demand: pd.DataFrame) ->
     """
     df_demand['RMC'] = df_demand['Item'].str[3:11]
     df_demand_mfg = df_demand.groupby('RMC')['MFG'].sum()
-    df_result['Next MFG'] = 0
-    for idx,row in df_result.iterrows():
-        rmc = row['Item'][3:11]
-        max_mfg = min(row['Qty'],df_demand_mfg[rmc])
-        df_result.loc[idx,'Next MFG'] = max_mfg
-        df_demand_mfg[rmc] -= max_mfg
+    df_result['Next MFG'] = PlanRetentionEngine.capped_allocation(
+        df_result['Qty'], df_result['Item'].str[3:11], df_demand_mfg)
     return df_result['Next MFG'].sum()/df_result['Qty'].sum()
 
 """계획 유지율 계산 함수"""
@@ -150,29 +144,29 @@ def calc_plan_retention():
         return (None,None,None)
     demand_file = load_file(demand_path)
     df_demand = demand_file.get('demand', pd.DataFrame())
-    df_result = pd.read_excel(result_path,sheet_name=0)
+    df_result = WorkbookCache.read(result_path, sheet_name=0)
+    return plan_retention_from_data(df_result, df_demand)
+
+"""수요 대비 계획 유지율 계산 (result/demand 데이터프레임)"""
+def plan_retention_from_data(df_result: pd.DataFrame, df_demand: pd.DataFrame):
+    """
+    result 행 순서대로 Item(또는 RMC)별 수요 MFG 를 min(Qty, 남은 MFG) 만큼 배분한 합계를 유지 가능 수량으로 본다
+    Return: 
+        (int,int,df): item 계획 유지율 , RMC 계획 유지율, result 데이터프레임
+    """
     sum_qty = df_result['Qty'].sum()
 
     df_demand_item_mfg = df_demand.groupby('Item')['MFG'].sum()
-    df_result['Next item MFG'] = 0
-    for idx,row in df_result.iterrows():
-        if row['Item'] in df_demand_item_mfg.index:
-            max_mfg = min(row['Qty'],df_demand_item_mfg[row['Item']])
-            df_result.loc[idx,'Next item MFG'] = int(round(max_mfg))
-            df_demand_item_mfg[row['Item']] -= int(round(max_mfg))
+    df_result['Next item MFG'] = PlanRetentionEngine.capped_allocation(
+        df_result['Qty'], df_result['Item'], df_demand_item_mfg)
 
     sum_item_qty = df_result['Next item MFG'].sum()
     item_plan_retention = sum_item_qty/sum_qty
 
     df_demand['RMC'] = df_demand['Item'].str[3:11]
     df_demand_rmc_mfg = df_demand.groupby('RMC')['MFG'].sum()
-    df_result['Next RMC MFG'] = 0
-    for idx,row in df_result.iterrows():
-        rmc = row['Item'][3:11]
-        if rmc in df_demand_rmc_mfg.index:
-            max_mfg = min(row['Qty'],df_demand_rmc_mfg[rmc])
-            df_result.loc[idx,'Next RMC MFG'] = int(round(max_mfg))
-            df_demand_rmc_mfg[rmc] -= int(round(max_mfg))
+    df_result['Next RMC MFG'] = PlanRetentionEngine.capped_allocation(
+        df_result['Qty'], df_result['Item'].str[3:11], df_demand_rmc_mfg)
 
     sum_rmc_qty = df_result['Next RMC MFG'].sum()
     rmc_plan_retention = sum_rmc_qty/sum_qty
@@ -182,4 +176,4 @@ def calc_plan_retention():
     df_result = df_result.sort_values(by=['Line','Time','RMC','Previous Qty'],ascending=[True,True,True,False])
     df_result.loc[len(df_result)] = ['total','','','',sum_qty,sum_item_qty,sum_rmc_qty]
 
-    return (item_plan_retention * 100, rmc_plan_retention * 100, df_result)
\ No newline at end of file
+    return (item_plan_retention * 100, rmc_plan_retention * 100, df_result)
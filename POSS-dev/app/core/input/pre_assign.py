@@ -1,4 +1,6 @@
+import copy
 import fnmatch
+import threading
 import pulp
 from pulp import PULP_CBC_CMD
 
@@ -17,6 +19,12 @@ for k, v in df_opts.items():
     pd.set_option(k, v)
 
 from ...models.input.pre_assign import PreAssignFailures, DataLoader
+from .pre_assign_feasibility import PreAssignFeasibility
+
+# 입력 데이터 내용 키 -> run_allocation 결과 (같은 입력으로 다시 검사하면 재사용)
+_allocation_cache = {}
+_allocation_lock = threading.Lock()
+_MAX_CACHED = 4
 
 """dynamic, demand, master 데이터를 로드"""
 def load_data():
@@ -462,7 +470,10 @@ def check_max_qty_violations(
 
     return pd.DataFrame(records)
 
-"""모든 제약조건(Capacity, MaxLine, MaxQty)을 동시에 검사하여 위반 제약을 반환합니다."""
+"""
+모든 제약조건(Capacity, MaxLine, MaxQty)을 동시에 검사하여 위반 제약을 반환합니다.
+서로 요청으로 연결되지 않은 교대 묶음은 따로(병렬로) 풀고, MaxLine 이 걸리는 그룹에만 정수 변수를 씁니다. (PreAssignFeasibility)
+"""
 def check_all_violations(
     fx: pd.DataFrame,
     cap: pd.DataFrame,
@@ -470,157 +481,31 @@ def check_all_violations(
     max_qtys: pd.DataFrame
 ) -> pd.DataFrame:
     fx['Qty'] = pd.to_numeric(fx['Qty'], errors='coerce').fillna(0)
-    
-    # 가능한 모든 (라인, 교대) 조합을 준비합니다.
-    combos = {
-        r: [(ln, sh)
-            for ln in fx.at[r, 'Fixed_Line']
-            for sh in fx.at[r, 'Fixed_Time']]
-        for r in fx.index
-    }
-
-    # 제약치 조회용 딕셔너리를 생성합니다.
-    cap_dict = cap.set_index(['Line','Shift'])['Capacity'].to_dict()
-    ml_dict  = max_lines.set_index(['GroupPrefix','Shift'])['MaxLines'].to_dict()
-    mq_dict  = max_qtys.set_index(['GroupPrefix','Shift'])['MaxQty'].to_dict()
-
-    # MILP 모델 생성 (모든 슬랙 최소화)
-    prob = pulp.LpProblem("AllConstraintsCheck", pulp.LpMinimize)
-
-    # 분할 할당을 위한 연속 변수 x_vars[(r,ln,sh)] ≥ 0
-    x_vars = {
-        (r, ln, sh): pulp.LpVariable(f"x_{r}_{ln}_{sh}", lowBound=0)
-        for r, cmb in combos.items()
-        for ln, sh in cmb
-    }
-
-    # Capacity 초과 슬랙 변수
-    s_cap = {
-        (ln, sh): pulp.LpVariable(f"s_cap_{ln}_{sh}", lowBound=0)
-        for (ln, sh) in cap_dict
-    }
-    # MaxLine 초과 슬랙 변수 (제약 없는 항목은 제외)
-    s_line = {
-        (p, sh): pulp.LpVariable(f"s_line_{p}_{sh}", lowBound=0)
-        for (p, sh), v in ml_dict.items() if pd.notna(v)
-    }
-    # MaxQty 초과 슬랙 변수 (제약 없는 항목은 제외)
-    s_qty = {
-        (p, sh): pulp.LpVariable(f"s_qty_{p}_{sh}", lowBound=0)
-        for (p, sh), v in mq_dict.items() if pd.notna(v)
-    }
-
-    # MaxLine 활성화를 위한 이진변수 y_vars[(r,ln,sh)] 과 라인·교대별 활성화 z_line[(ln,sh)]
-    M   = fx['Qty'].sum()
-    eps = 1e-6
-    y_vars  = {}
-    z_line  = {}
-    for r, cmb in combos.items():
-        for ln, sh in cmb:
-            # 요청별 활성화 여부
-            y = pulp.LpVariable(f"y_{r}_{ln}_{sh}", cat="Binary")
-            y_vars[(r, ln, sh)] = y
-            # 라인·교대별 활성화 여부
-            if (ln, sh) not in z_line:
-                z_line[(ln, sh)] = pulp.LpVariable(f"z_line_{ln}_{sh}", cat="Binary")
-            # Big-M 연계제약
-            prob += x_vars[(r, ln, sh)] <= M * y
-            prob += x_vars[(r, ln, sh)] >= eps * y
-            # y_vars ≤ z_line (same ln,sh 그룹화)
-            prob += y <= z_line[(ln, sh)]
-
-    # 목적식: Capacity, MaxLine, MaxQty 슬랙만 최소화
-    prob += (
-        pulp.lpSum(s_cap.values()) +
-        pulp.lpSum(s_line.values()) +
-        pulp.lpSum(s_qty.values())
-    )
-
-    # 요청량 제약: 분할 할당 합 == Qty
-    for r, cmb in combos.items():
-        prob += (
-            pulp.lpSum(x_vars[(r, ln, sh)] for ln, sh in cmb)
-            == fx.at[r, 'Qty']
-        )
-
-    # Capacity 제약: 각 (라인,교대)별 할당합 ≤ Capacity + s_cap
-    for (ln, sh), cap_val in cap_dict.items():
-        if pd.isna(cap_val):
-            continue
-        prob += (
-            pulp.lpSum(x_vars.get((r, ln, sh), 0) for r in fx.index)
-            <= cap_val + s_cap[(ln, sh)]
-        )
-
-    # MaxLine 제약: 서로 다른 라인 z_line 합 ≤ MaxLines + s_line
-    for (p, sh), max_ln in ml_dict.items():
-        if pd.isna(max_ln):
-            continue
-        prob += (
-            pulp.lpSum(
-                z_line[(ln, ss)]
-                for (ln, ss) in z_line
-                if ln.split('_')[0] == p and ss == sh
-            )
-            <= max_ln + s_line[(p, sh)]
-        )
+    return PreAssignFeasibility(fx, cap, max_lines, max_qtys).check()
 
-    # MaxQty 제약: 할당량 합 ≤ MaxQty + s_qty
-    for (p, sh), max_q in mq_dict.items():
-        if pd.isna(max_q):
-            continue
-        prob += (
-            pulp.lpSum(
-                x_vars.get((r, ln, ss), 0) * fx.at[r, 'Qty']
-                for r in fx.index
-                for ln, ss in combos[r]
-                if ln.split('_')[0] == p and ss == sh
-            )
-            <= max_q + s_qty[(p, sh)]
-        )
+"""전체 할당 실행"""
+def run_allocation() -> PreAssignFailures:
+    # 데이터 로드
+    fx, pa, dm, la, cq = load_data()
 
-    # 최적화 실행
-    prob.solve(PULP_CBC_CMD(msg=True))
+    # 같은 입력으로 검사한 결과가 있으면 재사용
+    cache_key = _content_key(fx, pa, dm, la, cq)
+    with _allocation_lock:
+        cached = _allocation_cache.get(cache_key)
+    if cached is not None:
+        return copy.deepcopy(cached)
 
-    # 발생한 슬랙을 모두 모아 테이블로 반환
-    records = []
-    for (ln, sh), var in s_cap.items():
-        v = var.varValue or 0
-        if v > 1e-6:
-            records.append({
-                'Constraint':   'Capacity',
-                'Line(GroupPrefix)':         ln,
-                'Shift':        sh,
-                'Limit':        cap_dict[(ln, sh)],
-                'ViolationAmt': v
-            })
-    for (p, sh), var in s_line.items():
-        v = var.varValue or 0
-        if v > 1e-6:
-            records.append({
-                'Constraint':   'MaxLine',
-                'Line(GroupPrefix)':  p,
-                'Shift':        sh,
-                'Limit':        ml_dict[(p, sh)],
-                'ViolationAmt': v
-            })
-    for (p, sh), var in s_qty.items():
-        v = var.varValue or 0
-        if v > 1e-6:
-            records.append({
-                'Constraint':   'MaxQty',
-                'Line(GroupPrefix)':  p,
-                'Shift':        sh,
-                'Limit':        mq_dict[(p, sh)],
-                'ViolationAmt': v
-            })
+    failures = _check_allocation(fx, pa, dm, la, cq)
 
-    return pd.DataFrame(records)
+    with _allocation_lock:
+        if len(_allocation_cache) >= _MAX_CACHED and cache_key not in _allocation_cache:
+            _allocation_cache.pop(next(iter(_allocation_cache)))
+        _allocation_cache[cache_key] = copy.deepcopy(failures)
+    return failures
 
-"""전체 할당 실행"""
-def run_allocation() -> PreAssignFailures:
-    # 데이터 로드 및 전처리
-    fx, pa, dm, la, cq = load_data()
+"""로드한 데이터로 사전할당 검사 (전처리 -> 결측/라인 에러 -> 제약 위반)"""
+def _check_allocation(fx, pa, dm, la, cq) -> PreAssignFailures:
+    # 전처리
     fx = fill_missing_lines(fx, la)
     fx = fill_missing_times(fx)
     fx = process_all_qty(fx, dm)
@@ -686,4 +571,14 @@ def run_allocation() -> PreAssignFailures:
             record['Reason'] = 'maximum production quantity'
 
         failures['preassign'].append(record)
-    return failures
\ No newline at end of file
+    return failures
+
+def _content_key(*frames):
+    """
+    입력 데이터 내용 기준 키. 컬럼, 인덱스, 값 중 하나라도 바뀌면 다른 키가 된다
+    """
+    key = []
+    for df in frames:
+        hashes = pd.util.hash_pandas_object(df.reset_index().astype(str), index=False).to_numpy()
+        key.append((tuple(map(str, df.columns)), df.shape, hash(hashes.tobytes())))
+    return tuple(key)
@@ -0,0 +1,174 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pulp
+
+"""
+사전할당(fixed_option/pre_assign) 실행 가능성 검사 엔진
+요청(Qty)을 허용된 (라인, 교대) 조합에 나눠 배정할 때 Capacity/MaxQty/MaxLine 초과량(슬랙) 합이 최소가 되는 배정을 찾는다.
+
+- 제약은 모두 교대 단위이므로, 여러 교대에 걸친 요청으로 연결된 교대끼리만 한 문제로 묶어 따로 푼다 (묶음별 병렬)
+- Capacity/MaxQty 는 연속 변수만 쓰는 LP (배정 흐름 + 초과 슬랙)
+- MaxLine 은 후보 라인 수가 MaxLines 를 넘는 (그룹, 교대)에만 라인 가동 이진 변수를 추가 (그 외에는 LP 그대로)
+- 어떤 요청도 쓰지 않는 제약은 풀지 않고, 제약값이 음수일 때만 그 크기를 초과량으로 본다
+"""
+class PreAssignFeasibility:
+    TOLERANCE = 1e-6
+
+    """
+    Args:
+        fx (DataFrame): 요청 (Fixed_Line 리스트, Fixed_Time 리스트, Qty)
+        cap (DataFrame): Line, Shift, Capacity
+        max_lines (DataFrame): GroupPrefix, Shift, MaxLines
+        max_qtys (DataFrame): GroupPrefix, Shift, MaxQty
+    """
+    def __init__(self, fx, cap, max_lines, max_qtys):
+        self.cap_dict = self._limits(cap, ['Line', 'Shift'], 'Capacity')
+        self.ml_dict = self._limits(max_lines, ['GroupPrefix', 'Shift'], 'MaxLines')
+        self.mq_dict = self._limits(max_qtys, ['GroupPrefix', 'Shift'], 'MaxQty')
+
+        # 음수 요청량은 배정할 수 없으므로 0 으로 본다
+        self.qty = pd.to_numeric(fx['Qty'], errors='coerce').fillna(0).clip(lower=0).to_numpy(dtype=float)
+
+        # 요청별 (라인, 교대) 조합 (중복 제거)
+        combos = []
+        for r, (lines, times) in enumerate(zip(fx['Fixed_Line'], fx['Fixed_Time'])):
+            for ln, sh in dict.fromkeys((ln, sh) for ln in lines for sh in times):
+                combos.append((r, ln, sh, str(ln).split('_')[0]))
+        self.combos = pd.DataFrame(combos, columns=['Request', 'Line', 'Shift', 'Prefix'])
+
+    """
+    모든 제약 위반 검사
+
+    Args:
+        max_workers (int): 교대 묶음을 동시에 풀 스레드 수. None 이면 CPU 수
+    Returns:
+        DataFrame: Constraint, Line(GroupPrefix), Shift, Limit, ViolationAmt (Capacity -> MaxLine -> MaxQty, 제약 표 순서)
+    """
+    def check(self, max_workers=None):
+        components = self._components()
+        violations = {}
+
+        workers = min(len(components), max_workers or os.cpu_count() or 1)
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='pre_assign') as executor:
+                for result in executor.map(self._solve, components):
+                    violations.update(result)
+        else:
+            for component in components:
+                violations.update(self._solve(component))
+
+        records = []
+        for constraint, limits in (('Capacity', self.cap_dict), ('MaxLine', self.ml_dict), ('MaxQty', self.mq_dict)):
+            for key, limit in limits.items():
+                if pd.isna(limit):
+                    continue
+                # 어떤 요청도 쓰지 않는 제약은 제약값이 음수일 때만 위반
+                amount = violations.get((constraint, key), max(0.0, -float(limit)))
+                if amount > self.TOLERANCE:
+                    records.append({
+                        'Constraint':        constraint,
+                        'Line(GroupPrefix)': key[0],
+                        'Shift':             key[1],
+                        'Limit':             limit,
+                        'ViolationAmt':      amount
+                    })
+        return pd.DataFrame(records)
+
+    """
+    여러 교대에 걸친 요청으로 연결된 교대끼리 묶은 조합 목록 (묶음마다 독립된 문제)
+    """
+    def _components(self):
+        if self.combos.empty:
+            return []
+
+        parent = {}
+
+        def find(shift):
+            parent.setdefault(shift, shift)
+            while parent[shift] != shift:
+                parent[shift] = parent[parent[shift]]
+                shift = parent[shift]
+            return shift
+
+        # 요청의 첫 교대에 나머지 교대를 합친다
+        first_shift = {}
+        for r, shift in zip(self.combos['Request'], self.combos['Shift']):
+            parent[find(shift)] = find(first_shift.setdefault(r, shift))
+
+        roots = self.combos['Shift'].map(find)
+        return [group for _, group in self.combos.groupby(roots, sort=False)]
+
+    """
+    교대 묶음 하나의 최소 초과량 배정 (MaxLine 이 걸리지 않으면 LP, 걸리면 그 그룹의 라인에만 이진 변수를 둔 MILP)
+
+    Returns:
+        dict: {(제약 이름, 키): 초과량} - 이 묶음이 쓰는 제약 전체
+    """
+    def _solve(self, combos):
+        requests, cells, groups = {}, {}, {}
+        x_vars = []
+        for i, (r, ln, sh, prefix) in enumerate(zip(combos['Request'], combos['Line'], combos['Shift'], combos['Prefix'])):
+            x = pulp.LpVariable(f"x_{i}", lowBound=0)
+            x_vars.append(x)
+            requests.setdefault(r, []).append(x)
+            cells.setdefault((ln, sh), []).append((r, x))
+            groups.setdefault((prefix, sh), {})[ln] = (ln, sh)
+
+        prob = pulp.LpProblem("PreAssignFeasibility", pulp.LpMinimize)
+        slacks = {}
+
+        # 요청량: 조합별 배정량 합 == Qty
+        for r, xs in requests.items():
+            prob += pulp.lpSum(xs) == self.qty[r]
+
+        # Capacity: (라인, 교대)별 배정량 합 <= Capacity + 슬랙
+        for key, members in cells.items():
+            limit = self.cap_dict.get(key)
+            if limit is not None and pd.notna(limit):
+                slack = slacks[('Capacity', key)] = pulp.LpVariable(f"s_cap_{len(slacks)}", lowBound=0)
+                prob += pulp.lpSum(x for _, x in members) <= limit + slack
+
+        for key, lines in groups.items():
+            # MaxQty: (그룹, 교대)별 배정량 합 <= MaxQty + 슬랙
+            limit = self.mq_dict.get(key)
+            if limit is not None and pd.notna(limit):
+                slack = slacks[('MaxQty', key)] = pulp.LpVariable(f"s_qty_{len(slacks)}", lowBound=0)
+                prob += pulp.lpSum(x for cell in lines.values() for _, x in cells[cell]) <= limit + slack
+
+            # MaxLine: 후보 라인이 MaxLines 이하면 걸리지 않으므로 제약을 두지 않는다
+            limit = self.ml_dict.get(key)
+            if limit is None or pd.isna(limit) or len(lines) <= limit:
+                continue
+            slack = slacks[('MaxLine', key)] = pulp.LpVariable(f"s_line_{len(slacks)}", lowBound=0)
+            z_vars = []
+            for cell in lines.values():
+                # 라인 가동 여부: 조합 배정량 <= 요청량 * z
+                z = pulp.LpVariable(f"z_{len(slacks)}_{len(z_vars)}", cat="Binary")
+                z_vars.append(z)
+                for r, x in cells[cell]:
+                    prob += x <= self.qty[r] * z
+            prob += pulp.lpSum(z_vars) <= limit + slack
+
+        if not slacks:
+            return {}
+
+        prob += pulp.lpSum(slacks.values())
+        prob.solve(pulp.PULP_CBC_CMD(msg=False))
+
+        if prob.sol_status == pulp.LpSolutionNoSolutionFound:
+            print(f"[PreAssignFeasibility] 교대 {sorted(set(combos['Shift']))} 풀이 실패: {pulp.LpStatus[prob.status]}")
+            return {}
+
+        violations = {key: var.varValue or 0 for key, var in slacks.items()}
+        # 걸리지 않는 MaxLine 제약은 후보 라인 수가 제약값 이하이므로 위반 없음
+        for key in groups:
+            violations.setdefault(('MaxLine', key), 0.0)
+        return violations
+
+    @staticmethod
+    def _limits(df, keys, column):
+        if df.empty or not set(keys + [column]) <= set(df.columns):
+            return {}
+        return df.set_index(keys)[column].to_dict()
@@ -1,10 +1,78 @@
 import pandas as pd
 import pulp 
 import re
+import time
+from collections import defaultdict
 from pulp import LpStatus
+from app.core.solver import SolverConfig
+from app.utils.item_code import decode_item_codes
+
+
+def allowed_triples(items, df_line_available, lines, shifts):
+    """
+    line_available 시트와 아이템을 프로젝트(아이템 코드 [3:7]) 기준으로 조인하여
+    생산 가능한 (아이템, 라인, 시프트) 조합만 만든다
+
+    Parameters:
+        items (list) : 아이템 코드 리스트
+        df_line_available (DataFrame) : 'Project' 컬럼 + 라인별 생산 가능 여부(1) 컬럼
+        lines (list) : 라인 리스트. line_available 에 없는 라인은 제외된다
+        shifts (list) : 시프트 리스트
+
+    Returns:
+        DataFrame : ['Item','Line','Shift'] 컬럼. 라인, 시프트, 아이템 입력 순서로 정렬
+    """
+    lines = [l for l in lines if l in df_line_available.columns]
+    available = df_line_available.melt(id_vars='Project', value_vars=lines, var_name='Line', value_name='Available')
+    available = available.loc[available['Available'] == 1, ['Project','Line']].drop_duplicates()
+
+    items = list(dict.fromkeys(items))
+    df_items = pd.DataFrame({'Item': items, 'item_order': range(len(items))})
+    decode_item_codes(df_items, fields=['Project'])
+
+    pairs = df_items.merge(available, on='Project')
+    pairs['line_order'] = pairs['Line'].map({l: i for i, l in enumerate(lines)})
+    df_shifts = pd.DataFrame({'Shift': list(shifts), 'shift_order': range(len(shifts))})
+    triples = pairs.merge(df_shifts, how='cross').sort_values(['line_order','shift_order','item_order'])
+    return triples[['Item','Line','Shift']].reset_index(drop=True)
+
+
+class ModelIndex:
+    """
+    희소 결정변수 x 를 아이템/라인/라인*시프트/제조동*시프트 별로 묶어둔 인덱스.
+    제약조건을 만들 때마다 x 전체를 l.startswith(...) 로 다시 훑지 않도록 한 번만 계산한다.
+    제조동은 라인 이름의 첫 글자 ('I','D','K','M')
+    """
+    def __init__(self, x, lines, shifts):
+        self.lines = list(lines)
+        self.shifts = list(shifts)
+        self.by_item = defaultdict(list)
+        self.by_line = defaultdict(list)
+        self.by_line_shift = defaultdict(list)
+        self.by_block_shift = defaultdict(list)
+        for (m, l, s), var in x.items():
+            self.by_item[m].append((l, s, var))
+            self.by_line[l].append(var)
+            self.by_line_shift[(l, s)].append((m, var))
+            self.by_block_shift[(l[0], s)].append(var)
+
+        # 변수가 하나라도 있는 (라인*시프트). 변수가 없는 (라인*시프트)는 가동될 수 없으므로 y 도 만들지 않는다
+        self.line_shifts = [(l, s) for l in self.lines for s in self.shifts if (l, s) in self.by_line_shift]
+        self.blocks = list(dict.fromkeys(l[0] for l in self.lines))  # 제조동 리스트 ['I','D','K','M']
+        self.line_shifts_by_block_shift = defaultdict(list)
+        for (l, s) in self.line_shifts:
+            self.line_shifts_by_block_shift[(l[0], s)].append((l, s))
+
+    def with_prefix(self, prefix):
+        """이름이 prefix 로 시작하는 라인들의 변수 리스트 (capa_portion 의 name)"""
+        return [var for l in self.lines if l.startswith(prefix) for var in self.by_line[l]]
+
+    def line_shift_sum(self, l, s):
+        return pulp.lpSum(var for _, var in self.by_line_shift[(l, s)])
+
 
 class Optimization:
-    def __init__(self,input):
+    def __init__(self,input, solver_configs=None, progress_callback=None, cancel_event=None):
         """
         input 데이터를 받아서 optimization 객체를 생성합니다
 
@@ -23,6 +91,11 @@ class Optimization:
                     ...
                 }
             }
+        solver_configs (dictionary) : {1: SolverConfig, 2: SolverConfig}. 1차(pre_assign, linear_programming)/2차(execute) 솔버 설정.
+            지정하지 않은 단계는 SettingsStore 설정을 사용
+        progress_callback (function) : 진행 상황 딕셔너리를 받는 함수. 'name' 키에 함수 이름, 'phase' 키에
+            'build'(변수/제약조건 수) 또는 'solve'(현재 해, bound, 갭) 가 들어감
+        cancel_event (Event) : set 되면 진행 중인 풀이를 중단하고 그때까지 찾은 가장 좋은 해로 결과를 만든다
         """
         # 각 엑셀 파일 불러오기. 시트이름이 키, 데이터프레임이 값인 딕셔너리로 저장됨.
         self.demand_excel = input['demand']
@@ -30,13 +103,7 @@ class Optimization:
         self.dynamic_excel = input['dynamic']
 
         # demand 엑셀 파일의 시트를 데이터프레임으로 만들고 주로 쓰일 변수도 정의
-        self.df_demand = self.demand_excel['demand'] 
-        for i, row in self.df_demand.iterrows() :    
-            self.df_demand.loc[i, "Project"] = row["Item"][3:7]
-            self.df_demand.loc[i, "Basic2"] = row['Item'][3:8]
-            self.df_demand.loc[i, "Tosite_group"] = row["Item"][7:8]
-            self.df_demand.loc[i, "RMC"] = row['Item'][3:-3]
-            self.df_demand.loc[i, "Color"] = row['Item'][8:-4]
+        self.df_demand = decode_item_codes(self.demand_excel['demand'])
 
         self.item = self.df_demand.index.tolist()
         self.project = self.df_demand["Basic2"].unique()
@@ -70,6 +137,16 @@ class Optimization:
 
         self.df_pre_result = None
         self.df_result = None
+        self.df_combined = None
+
+        self.solver_configs = solver_configs or {}
+        self.progress_callback = progress_callback
+        self.cancel_event = cancel_event
+        # 함수별 마지막 솔버 통계 (상태, 목적함수 값, bound, 갭 등)
+        self.solver_stats = {}
+
+        # 함수별 모델 구성/풀이 소요시간(초)과 모델 크기. {'pre_assign': {'build':..,'solve':..,'variables':..,'constraints':..}}
+        self.timings = {}
 
         self.df_material_item = self.df_material_item.drop(['종류','가용 L/T'],axis=1)
         self.df_material_item = self.df_material_item[self.df_material_item['Active_OX']=='O']
@@ -118,76 +195,63 @@ class Optimization:
         df_new_labels = pd.DataFrame(new_labels)
         self.df_combined = pd.concat([self.df_combined,df_new_labels], ignore_index=True)
 
-        self.df_line_available = self.df_line_available.set_index('Project')
-        self.df_capa_qty = self.df_capa_qty.set_index('Line')
+        line_available = self.df_line_available
+        capa_qty = self.df_capa_qty.set_index('Line')
         demands = df_demand_item.index
 
         df_demand_item = df_demand_item.reset_index()
-        df_demand_item['Project'] = df_demand_item['Item'].str[3:7]
-        df_demand_item['Tosite_group'] = df_demand_item['Item'].str[7:8]
+        decode_item_codes(df_demand_item, fields=['Project','Tosite_group'])
         df_demand_item = pd.merge(df_demand_item,self.df_due_LT,how='left',on=['Project','Tosite_group'])
         df_demand_item = df_demand_item.set_index('Item')
 
+        build_start = time.perf_counter()
+
         # 문제 정의
-        x = pulp.LpVariable.dicts("produce", [(d, l, t) for d in demands for l in self.line for t in self.time], lowBound=0, cat='Continuous')
+        # 제약조건 2: 라인/시프트에서 생산 가능한 모델만 허용 -> 생산 가능한 (아이템, 라인, 시프트) 조합에만 변수를 만든다
+        triples = allowed_triples(demands, line_available, self.line, self.time)
+        x = pulp.LpVariable.dicts("produce", list(triples.itertuples(index=False, name=None)), lowBound=0, cat='Continuous')
+        index = ModelIndex(x, self.line, self.time)
         model = pulp.LpProblem("LineShift_Production_Scheduling", pulp.LpMaximize)
         
-        # 제약조건 0: 사전할당 테이블
+        # 제약조건 0: 사전할당 테이블 (생산 불가능한 조합은 변수가 없으므로 0 으로 취급)
         for idx, row in self.df_combined.iterrows():
             line = list(map(str.strip,str(row['Line']).split(','))) if pd.notna(row['Line']) else self.line
-            time = list(map(int, str(row['Time']).split(','))) if pd.notna(row['Time']) else self.time
-            model += (pulp.lpSum([x[(row['Item'], l, t)] for l in line for t in time]) >= row['Qty'], f"pre_assign_{row['Item']}_{idx}")
+            time_list = list(map(int, str(row['Time']).split(','))) if pd.notna(row['Time']) else self.time
+            model += (pulp.lpSum([x[(row['Item'], l, t)] for l in line for t in time_list if (row['Item'], l, t) in x]) >= row['Qty'], f"pre_assign_{row['Item']}_{idx}")
 
         # 제약조건 1: 모델별 총 수요량 충족 
         for d in demands:
-            model += pulp.lpSum([x[(d, l, t)] for l in self.line for t in self.time]) <= df_demand_item.loc[d,'MFG']
-
-        # 제약조건 2: 라인/시프트에서 생산 가능한 모델만 허용
-        for d in demands:
-            for l in self.line:
-                for t in self.time:
-                    if self.df_line_available.loc[d[3:7],l] != 1:
-                        model += x[(d, l, t)] == 0
+            model += pulp.lpSum([var for _, _, var in index.by_item[d]]) <= df_demand_item.loc[d,'MFG']
 
          # 제약조건 3: 제조동별 물량 비중 상한/하한
+        total_sum = pulp.lpSum(x.values())
         for ids,row in self.df_capa_portion.iterrows():
-            model += (
-               row['upper_limit'] * pulp.lpSum([x[(d, l, t)] for (d, l, t) in x]) >=
-               pulp.lpSum([x[(d, l, t)] for (d, l, t) in x if l.startswith(row['name'])])
-            )
-            model += (
-                pulp.lpSum([x[(d, l, t)] for (d, l, t) in x if l.startswith(row['name'])]) >=
-                row['lower_limit'] * pulp.lpSum([x[(d, l, t)] for (d, l, t) in x])
-            )
+            block_sum = pulp.lpSum(index.with_prefix(row['name']))
+            model += row['upper_limit'] * total_sum >= block_sum
+            model += block_sum >= row['lower_limit'] * total_sum
+
         # 제약조건 4: 각 라인/시프트 조합의 최대 생산량 제한.
-        for l in self.line:
-            for t in self.time:
-                model += pulp.lpSum([x[(d, l, t)] for d in demands]) <= self.df_capa_qty.loc[l,t]
+        for (l, t) in index.line_shifts:
+            model += index.line_shift_sum(l, t) <= capa_qty.loc[l,t]
 
         # 제약조건 5: 각 (제조동 * 시프트) 별 가동가능한 최대 라인 수. Max_line.
-        y = pulp.LpVariable.dicts("line_shift_active", [(l,t) for l in self.line for t in self.time], cat="Binary")
+        y = pulp.LpVariable.dicts("line_shift_active", index.line_shifts, cat="Binary")
         BIG_M = 10_000_000  # 충분히 큰 값
-        for l in self.line:
+        for (l, t) in index.line_shifts:
+            total_produced = index.line_shift_sum(l, t)
+            model += total_produced <= BIG_M * y[(l, t)]
+            model += total_produced >= 1 * y[(l, t)] 
+
+        for b in index.blocks:
             for t in self.time:
-                total_produced = pulp.lpSum(x[(d, l, t)] for d in demands)
-                model += total_produced <= BIG_M * y[(l, t)]
-                model += total_produced >= 1 * y[(l, t)] 
-
-        blocks = list(set(l[0] for l in self.line))
-        for b in blocks:
-            for time in self.time:
-                max_line = self.df_capa_qty.loc[f'Max_line_{b}',time] if pd.notna(self.df_capa_qty.loc[f'Max_line_{b}',time]) else 100
-                model += pulp.lpSum(
-                    y[(l, t)] for l in self.line for t in self.time if l.startswith(b) and t == time
-                ) <= max_line
+                max_line = capa_qty.loc[f'Max_line_{b}',t] if pd.notna(capa_qty.loc[f'Max_line_{b}',t]) else 100
+                model += pulp.lpSum(y[ls] for ls in index.line_shifts_by_block_shift[(b, t)]) <= max_line
 
         # 제약조건 6: 각 (제조동 * 시프트) 별 최대 생산 수량. Max_qty
-        for b in blocks:
-            for time in self.time:
-                max_qty = self.df_capa_qty.loc[f'Max_qty_{b}',time] if pd.notna(self.df_capa_qty.loc[f'Max_qty_{b}',time]) else 10_000_000
-                model += pulp.lpSum(
-                    x[(d, l, t)] for (d,l,t) in x if l.startswith(b) and t == time
-                ) <= max_qty
+        for b in index.blocks:
+            for t in self.time:
+                max_qty = capa_qty.loc[f'Max_qty_{b}',t] if pd.notna(capa_qty.loc[f'Max_qty_{b}',t]) else 10_000_000
+                model += pulp.lpSum(index.by_block_shift[(b, t)]) <= max_qty
 
         
 
@@ -197,27 +261,28 @@ class Optimization:
         for d in demands:
             lt = df_demand_item.loc[d,'Due_date_LT']
             sop = df_demand_item.loc[d,'SOP']
-            sop_result = pulp.lpSum(x[(d, l, t)] for l in self.line for t in range(1,lt+1))
+            sop_result = pulp.lpSum(var for _, t, var in index.by_item[d] if t <= lt)
             model += sop_result - sop <= BIG_M * shipment_variable[d]
             model += sop_result >= sop * shipment_variable[d]
 
 
         shift_weight = [0,0,0.001,0.001,0.003,0.003,0.006,0.006,0.02,0.02,0.1,0.1,0.1,0.1]
-        obj1 = pulp.lpSum(shift_weight[t-1] * x[(d, l, t)] for d in demands for l in self.line for t in self.time)
+        obj1 = pulp.lpSum(shift_weight[t-1] * x[(d, l, t)] for (d, l, t) in x)
         obj2 = pulp.lpSum(shipment_variable[d] for d in demands)
         # model += -1 * obj1 + obj2
         model += obj2
-        model.solve()
 
-        
+        build_end = time.perf_counter()
+        self._solve('pre_assign', model, phase=1)
+        self._record_timing('pre_assign', model, build_end - build_start, time.perf_counter() - build_end)
 
         print(pulp.value(model.objective))
         results = []
         for l in self.line:
             for t in self.time:
                 print(f"{l} - {t} 시프트:")
-                for d in demands:
-                    units = int(pulp.value(x[(d, l, t)]))
+                for d, var in index.by_line_shift.get((l, t), []):
+                    units = int(var.value() or 0)
                     if units > 0:
                         print(f"  모델 {d} → {units}개 생산")
                         sop = -99
@@ -226,11 +291,11 @@ class Optimization:
                         to_site = "XX"
                         results.append((l,t,d+to_site,d,units,d[3:7],to_site,sop,mfg,d[3:11],due_lt)) 
         print('총 수요량',df_demand_item['MFG'].sum())
-        print(f"\n총 생산량: {sum(x[d, l, t].value() for d in demands for l in self.line for t in self.time)}개")
+        print(f"\n총 생산량: {sum(var.value() or 0 for var in x.values())}개")
         print('목적함수 값',pulp.value(model.objective))
-        total_production = pulp.value(pulp.lpSum([x[(d, l, t)] for (d, l, t) in x]))
+        total_production = pulp.value(total_sum) or 0
         for (idx,row) in self.df_capa_portion.iterrows():
-            line_production =pulp.value(pulp.lpSum([x[(d, l, t)] for (d, l, t) in x if l.startswith(row['name'])]))
+            line_production =pulp.value(pulp.lpSum(index.with_prefix(row['name']))) or 0
             line_ratio = (line_production / total_production) * 100 if total_production != 0 else 0
             print(f"{row['name']}라인 생산량: {int(line_production)}개, {row['name']}라인 비중: {line_ratio:.2f}%")
         if LpStatus[model.status] == 'Optimal':
@@ -313,11 +378,10 @@ class Optimization:
         
         
         # 라인*시프트 별 Capa (최대 생산 가능량)
-        capacity = {(l,s):int(self.df_capa_qty.loc[self.df_capa_qty['Line'] == l, s].values[0]) for (l, s) in line_shifts}
+        capa_qty = self.df_capa_qty.set_index('Line')
 
 
         # 라인*시프트 별 생산가능 아이템. pre_assign, fixed_option 시트의 조건들이 들어가야함.
-        allowed_items = {} # (line*shift) 별 생산 가능한 모델
         fixed_line_shifts = {}
         for idx, row in self.df_combined.iterrows():
             fixed_lines = row['Fixed_Line'].split(",") if pd.notna(row['Fixed_Line']) else self.line
@@ -336,93 +400,86 @@ class Optimization:
 
         if showlog: print('fixed_line_shifts : ',fixed_line_shifts)
 
-        for l, s in line_shifts:
+        for l in self.line:
             if l not in self.df_line_available.columns:
                 raise ValueError(f"라인 {l}는 line_available에 존재하지 않습니다.")
-            projects = self.df_line_available[self.df_line_available[l] == 1]['Project'].tolist()
-            # 특정 라인*시프트에서는 특정 프로젝트의 모델만 생산 가능하고,그 모델은 사전할당에서 지정한 라인*시프트 범위 내여야 한다
-            allowed = []
+
+        build_start = time.perf_counter()
+
+        # 특정 라인*시프트에서는 특정 프로젝트의 모델만 생산 가능하고,그 모델은 사전할당에서 지정한 라인*시프트 범위 내여야 한다
+        # line_available 조인으로 프로젝트 조건을 만족하는 조합을 구한 뒤 사전할당 범위로 거른다
+        triples = allowed_triples(items, self.df_line_available, self.line, self.time)
+        fixed_sets = {m: set(fixed_line_shifts.get(m, ())) for m in items}
+        keys = [(m, l, s) for (m, l, s) in triples.itertuples(index=False, name=None) if (l, s) in fixed_sets[m]]
+        if showlog:
+            allowed_keys = set(keys)
             for m in items:
-                if any(m[3:7] == project for project in projects) and (l,s) in fixed_line_shifts[m]:
-                    allowed.append(m)
-                elif not any(m[3:7] == project for project in projects) and (l,s) in fixed_line_shifts[m]:
-                    if showlog: print(f"{m} 아이템은 {l},{s} 에서 생산할 수 없는 아이템입니다")
-            allowed_items[(l, s)] = allowed
-        if showlog: print('allowed_items : ',allowed_items)
+                for (l, s) in fixed_line_shifts.get(m, ()):
+                    if (m, l, s) not in allowed_keys:
+                        print(f"{m} 아이템은 {l},{s} 에서 생산할 수 없는 아이템입니다")
 
         # 결정 변수: 모델 m을 라인 l, 시프트 s에서 몇 개 생산할지. 카테고리는 정수형.
-        x = pulp.LpVariable.dicts("produce", [(m, l, s) for m in items for (l, s) in line_shifts], lowBound=0, cat='Integer')
+        # 제약조건 2: 라인/시프트에서 생산 가능한 모델만 허용 -> 허용된 (아이템, 라인, 시프트) 에만 변수를 만든다
+        x = pulp.LpVariable.dicts("produce", keys, lowBound=0, cat='Integer')
+        index = ModelIndex(x, self.line, self.time)
+        if showlog: print('allowed_items : ',{ls: [m for m, _ in index.by_line_shift[ls]] for ls in index.line_shifts})
 
         # y 는 각 (라인 * 시프트) 를 키값으로, 그 (라인*시프트) 가 가동중이면 1, 아니면 0 을 value 값으로 갖는 pulp 딕셔너리
-        y = pulp.LpVariable.dicts("line_shift_active", line_shifts, cat="Binary")
+        y = pulp.LpVariable.dicts("line_shift_active", index.line_shifts, cat="Binary")
 
         # 문제 정의. 최대화 문제
         model = pulp.LpProblem("LineShift_Production_Scheduling", pulp.LpMaximize)
         
         # 목적함수: 총 생산량 최대화
-        model += pulp.lpSum([x[(m, l, s)] for m in items for (l, s) in line_shifts])
+        model += pulp.lpSum(x.values())
  
         # 제약조건 1: 모델별 총 수요량 충족 + 사전할당 알고리즘에서 모든 아이템은 무조건 할당되어야함
         # 아래의 조건에서는 <= 부등식을 넣었지만 최종 생산량이 수요량과 같지 않은 경우는 사전할당에 실패한 경우로 보고 
         # 딕셔너리에 'error' 키를 담아서 반환
         for m in items:
-            model += (pulp.lpSum([x[(m, l, s)] for (l, s) in line_shifts]) <= demand[m],f'constraint1 ({m})')
-
-        # 제약조건 2: 라인/시프트에서 생산 가능한 모델만 허용
-        for (l, s) in line_shifts:
-            for m in items:
-                if m not in allowed_items.get((l, s), []):
-                    model += (x[(m, l, s)] == 0, f"constraint2 ({m},{l},{s})")
-        #  model += x[(m, l, s)] == 0 으로 넣어도 동작하지만 제약조건 각각에 constraint2 와같이 이름을 붙여준 것은 
-        # 해를 찾지 못했을 경우 위배되는 제약조건이 무엇인지 알 수 있게 하기 위함.
+            model += (pulp.lpSum([var for _, _, var in index.by_item[m]]) <= demand[m],f'constraint1 ({m})')
 
         # 제약조건 3: 제조동별 물량 비중 상한/하한 (사전 할당에서는 물량 비중을 고려하지 않는게 맞다는 판단 하에 제약조건 제외)
 
         # 제약조건 4: 각 라인/시프트 조합의 최대 생산량 제한
-        for (l, s) in line_shifts:
-            model += (pulp.lpSum([x[(m, l, s)] for m in items]) <= capacity[(l, s)],f'constraint4 ({l},{s})')
+        for (l, s) in index.line_shifts:
+            model += (index.line_shift_sum(l, s) <= int(capa_qty.loc[l, s]),f'constraint4 ({l},{s})')
 
         # 제약조건 5: 각 (제조동 * 시프트) 별 가동가능한 최대 라인 수. capa_qty 시트와 관련됨. Max_line
         # 특정 y[(l,s)] 가 1이면 그 (라인*시프트) 에서 생산되는 모델이 적어도 1개는 있다는 뜻.반대로 0이면 하나도 없다는 뜻.
         BIG_M = 1_000_000  # 충분히 큰 값. _ 는 오직 가독성을 위한 표현.
-        for (l, s) in line_shifts:
-            total_produced = pulp.lpSum(x[(m, l, s)] for m in items)
+        for (l, s) in index.line_shifts:
+            total_produced = index.line_shift_sum(l, s)
             model += (total_produced <= BIG_M * y[(l, s)],f'constraint5-1 ({l},{s})')
             model += (y[(l, s)] <= total_produced ,f'constraint5-2 ({l},{s})')
             
-        blocks = list(set(l[0] for l in self.line)) # 제조동 리스트 ['I','D','K','M']
-
-        # for (l, s) in line_shifts:
-        #     print(f"y[{(l, s)}]:", type(y[(l, s)]))
-
-
-        for b in blocks:
+        for b in index.blocks:
             for shift in self.time:
-                series = self.df_capa_qty.loc[self.df_capa_qty['Line'] == f"Max_line_{b}", shift]
-                max_line = int(series.values[0]) if pd.notna(series.values[0]) else 100
+                max_line = capa_qty.loc[f"Max_line_{b}", shift]
+                max_line = int(max_line) if pd.notna(max_line) else 100
                 model += (pulp.lpSum(
-                    y[(l, s)] for (l, s) in line_shifts if l.startswith(b) and s == shift
+                    y[ls] for ls in index.line_shifts_by_block_shift[(b, shift)]
                 ) <= max_line,f'constraint5-3,({b},{shift})')
 
         # 제약조건 6: 각 (제조동 * 시프트) 별 최대 생산 수량. capa_qty 시트와 관련됨. Max_qty
-        for b in blocks:
+        for b in index.blocks:
             for shift in self.time:
-                series = self.df_capa_qty.loc[self.df_capa_qty['Line'] == f"Max_qty_{b}", shift]
-                max_qty = int(series.values[0]) if pd.notna(series.values[0]) else 10_000_000
-                model += (pulp.lpSum(
-                    x[(m, l, s)] for m in items for (l, s) in line_shifts if l.startswith(b) and s == shift
-                ) <= max_qty,f'constraint6 ({b},{shift})')
+                max_qty = capa_qty.loc[f"Max_qty_{b}", shift]
+                max_qty = int(max_qty) if pd.notna(max_qty) else 10_000_000
+                model += (pulp.lpSum(index.by_block_shift[(b, shift)]) <= max_qty,f'constraint6 ({b},{shift})')
 
         # 최적화
-        model.solve()
+        build_end = time.perf_counter()
+        self._solve('linear_programming', model, phase=1)
+        self._record_timing('linear_programming', model, build_end - build_start, time.perf_counter() - build_end)
 
         # 결과 저장 & 출력
         results = []
         if showlog: print(y.values())
         for (l, s) in line_shifts:
             if showlog: print(f"{l} - {s} 시프트:")
-            for m in items:
-                units = int(pulp.value(x[(m, l, s)]))
+            for m, var in index.by_line_shift.get((l, s), []):
+                units = int(var.value() or 0)
                 if units > 0:
                     if showlog: print(f"  모델 {m} → {units}개 생산")
                     # 아이템의 SOP 와 MFG 값은 demand 시트에서 참조, due_LT 값은 due_LT 시트에서 참조
@@ -434,9 +491,9 @@ class Optimization:
                     results.append((l,s,m+to_site,m,units,m[3:7],to_site,sop,mfg,m[3:11],due_lt)) 
                     
         # 제조동별 생산량
-        total_production = pulp.value(pulp.lpSum([x[(m, l, s)] for (m, l, s) in x]))
+        total_production = pulp.value(pulp.lpSum(x.values())) or 0
         for (idx,row) in self.df_capa_portion.iterrows():
-            line_production =pulp.value(pulp.lpSum([x[(m, l, s)] for (m, l, s) in x if l.startswith(row['name'])]))
+            line_production =pulp.value(pulp.lpSum(index.with_prefix(row['name']))) or 0
             line_ratio = (line_production / total_production) * 100 if total_production != 0 else 0
             print(f"{row['name']}라인 생산량:{int(line_production)}개, {row['name']}라인 비중: {line_ratio:.2f}%")
 
@@ -493,28 +550,29 @@ class Optimization:
     def execute(self,showlog = False):
         # 아이템에 To_site 까지 포함해서 아이템의 단위로 설정 (출하 capa를 목적함수에 포함시키기 위함)
         # 반면에 사전할당은 To_site 미포함
-        items = self.df_demand['Item'].tolist()
+        items = list(dict.fromkeys(self.df_demand['Item'].tolist()))
         line_shifts = [(l,s) for l in self.line for s in self.time]
         demand = dict(zip(self.df_demand['Item'], self.df_demand['MFG']))
-        capacity = {(l,s):int(self.df_capa_qty.loc[self.df_capa_qty['Line'] == l, s].values[0]) for (l, s) in line_shifts}
+        capa_qty = self.df_capa_qty.set_index('Line')
 
-        allowed_items = {}
-        for l, s in line_shifts:
+        for l in self.line:
             if l not in self.df_line_available.columns:
                 print(f"라인 {l}는 line_available에 존재하지 않습니다.")
-                continue
-            # line_available에서 값이 1 인 프로젝트들의 리스트
-            projects = self.df_line_available[self.df_line_available[l] == 1]['Project'].tolist()
-            allowed = [m for m in items if any(m[3:7] == project for project in projects)]
-            allowed_items[(l, s)] = allowed
+
+        build_start = time.perf_counter()
 
         # 결정 변수 x : 모델 m을 라인 l, 시프트 s에서 몇 개 생산할지의 딕셔너리
-        x = pulp.LpVariable.dicts("produce", [(m, l, s) for m in items for (l, s) in line_shifts], lowBound=0, cat='Integer')
+        # 제약조건 2: 라인/시프트에서 생산 가능한 모델만 허용. line_available 시트와 관련됨.
+        # -> line_available 에서 값이 1 인 프로젝트의 아이템 조합에만 변수를 만든다
+        triples = allowed_triples(items, self.df_line_available, self.line, self.time)
+        x = pulp.LpVariable.dicts("produce", list(triples.itertuples(index=False, name=None)), lowBound=0, cat='Integer')
+        index = ModelIndex(x, self.line, self.time)
         # 문제 정의
         model = pulp.LpProblem("LineShift_Production_Scheduling", pulp.LpMaximize)
         
         # 목적함수: 총 생산량 최대화 (추후 지표 8가지를 최적화 하는 목적함수로 수정 예정)
-        model += pulp.lpSum([x[(m, l, s)] for m in items for (l, s) in line_shifts])
+        total_sum = pulp.lpSum(x.values())
+        model += total_sum
 
         # 제약조건 0: 사전할당 결과가 있다면 그 결과를 제약조건에 포함시켜서 고정
         if self.df_pre_result is not None:
@@ -524,67 +582,63 @@ class Optimization:
 
         # 제약조건 1: 모델별 수요량 보다 적게 생산. 꼭 모든 수요를 만족시키지 않아도 됨. demand 시트와 관련됨. 
         for m in items:
-            model += pulp.lpSum([x[(m, l, s)] for (l, s) in line_shifts]) <= demand[m]
-
-        # 제약조건 2: 라인/시프트에서 생산 가능한 모델만 허용. line_available 시트와 관련됨.
-        for (l, s) in line_shifts:
-            for m in items:
-                if m not in allowed_items.get((l, s), []):
-                    model += x[(m, l, s)] == 0
+            model += pulp.lpSum([var for _, _, var in index.by_item[m]]) <= demand[m]
 
         # 제약조건 3: 제조동별 물량 비중 상한/하한. capa_portion 시트와 관련됨.
         for (ids,row) in self.df_capa_portion.iterrows():
-            model += (
-               row['upper_limit'] * pulp.lpSum([x[(m, l, s)] for (m, l, s) in x]) >=
-               pulp.lpSum([x[(m, l, s)] for (m, l, s) in x if l.startswith(row['name'])])
-            )
-            model += (
-                pulp.lpSum([x[(m, l, s)] for (m, l, s) in x if l.startswith(row['name'])]) >=
-                row['lower_limit'] * pulp.lpSum([x[(m, l, s)] for (m, l, s) in x])
-            )
+            block_sum = pulp.lpSum(index.with_prefix(row['name']))
+            model += row['upper_limit'] * total_sum >= block_sum
+            model += block_sum >= row['lower_limit'] * total_sum
 
         # 제약조건 4: 각 라인/시프트 조합의 최대 생산량 제한. capa_qty 시트와 관련됨.
-        for (l, s) in line_shifts:
-            model += pulp.lpSum([x[(m, l, s)] for m in items]) <= capacity[(l, s)]
+        for (l, s) in index.line_shifts:
+            model += index.line_shift_sum(l, s) <= int(capa_qty.loc[l, s])
         
         # 제약조건 5: 각 (제조동 * 시프트) 별 가동가능한 최대 라인 수. capa_qty 시트와 관련됨. Max_line
         # 결정변수 y 추가. y 는 각 (라인 * 시프트) 를 키값으로, 그 (라인*시프트) 가 가동중이면 1, 아니면 0 을 value 값으로 갖는 pulp 딕셔너리
-        y = pulp.LpVariable.dicts("line_shift_active", line_shifts, cat="Binary")
+        y = pulp.LpVariable.dicts("line_shift_active", index.line_shifts, cat="Binary")
         # 특정 y[(l,s)] 가 1이면 그 (라인*시프트) 에서 생산되는 모델이 적어도 1개는 있다는 뜻.반대로 0이면 하나도 없다는 뜻.
         BIG_M = 10_000_000  # 충분히 큰 값. _ 는 오직 가독성을 위한 표현.
-        for (l, s) in line_shifts:
-            total_produced = pulp.lpSum(x[(m, l, s)] for m in items)
+        for (l, s) in index.line_shifts:
+            total_produced = index.line_shift_sum(l, s)
             model += total_produced <= BIG_M * y[(l, s)]
             model += total_produced >= 1 * y[(l, s)]  
             
-        blocks = list(set(l[0] for l in self.line)) # 제조동 리스트 ['I','D','K','M']
-
-        for b in blocks:
+        for b in index.blocks:
             for shift in self.time:
-                series = self.df_capa_qty.loc[self.df_capa_qty['Line'] == f"Max_line_{b}", shift]
-                max_line = int(series.values[0]) if pd.notna(series.values[0]) else 100
+                max_line = capa_qty.loc[f"Max_line_{b}", shift]
+                max_line = int(max_line) if pd.notna(max_line) else 100
                 model += pulp.lpSum(
-                    y[(l, s)] for (l, s) in line_shifts if l.startswith(b) and s == shift
+                    y[ls] for ls in index.line_shifts_by_block_shift[(b, shift)]
                 ) <= max_line
 
         # 제약조건 6: 각 (제조동 * 시프트) 별 최대 생산 수량. capa_qty 시트와 관련됨. Max_qty
-        for b in blocks:
+        for b in index.blocks:
             for shift in self.time:
-                series = self.df_capa_qty.loc[self.df_capa_qty['Line'] == f"Max_qty_{b}", shift]
-                max_qty = int(series.values[0]) if pd.notna(series.values[0]) else 10_000_000
-                model += pulp.lpSum(
-                    x[(m, l, s)] for m in items for (l, s) in line_shifts if l.startswith(b) and s == shift
-                ) <= max_qty
+                max_qty = capa_qty.loc[f"Max_qty_{b}", shift]
+                max_qty = int(max_qty) if pd.notna(max_qty) else 10_000_000
+                model += pulp.lpSum(index.by_block_shift[(b, shift)]) <= max_qty
+
+        # 사전할당 결과가 있으면 그 할당량을 초기해(warm start)로 넣어서 첫 해를 빨리 찾도록 함
+        warm_start = self.df_pre_result is not None and not self.df_pre_result.empty
+        if warm_start:
+            start = self.df_pre_result.groupby(['Item','Line','Time'])['Qty'].sum().to_dict()
+            for key, var in x.items():
+                var.setInitialValue(start.get(key, 0))
+            for (l, s) in index.line_shifts:
+                y[(l, s)].setInitialValue(int(any(start.get((m, l, s), 0) > 0 for m, _ in index.by_line_shift[(l, s)])))
 
         # 최적화
-        model.solve()
+        build_end = time.perf_counter()
+        self._solve('execute', model, phase=2, warm_start=warm_start)
+        self._record_timing('execute', model, build_end - build_start, time.perf_counter() - build_end)
 
         # 결과 출력
         results = []
         for (l, s) in line_shifts:
             if showlog: print(f"{l} - {s} 시프트:")
-            for m in items:
-                units = int(pulp.value(x[(m, l, s)]))
+            for m, var in index.by_line_shift.get((l, s), []):
+                units = int(var.value() or 0)
                 if units > 0:
                     if showlog: print(f"  모델 {m} → {units}개 생산")
                     # 아이템의 SOP 와 MFG 값은 demand 시트에서 참조, due_LT 값은 due_LT 시트에서 참조
@@ -596,17 +650,44 @@ class Optimization:
                     # mfg = self.df_demand.loc[(self.df_demand['Item']==m[:-2])&(self.df_demand['To_Site']==m[-2:]),'MFG'].values[0]
                     # due_lt= self.df_due_LT.loc[(self.df_due_LT['Project']==m[3:7])&(self.df_due_LT['Tosite_group']==m[7:8]),'Due_date_LT'].values[0]
                     results.append((l,s,m+to_site,m,units,m[3:7],to_site,sop,mfg,m[3:11],due_lt)) 
-        print(f"\n총 생산량: {int(pulp.value(model.objective))}개")
+        print(f"\n총 생산량: {int(pulp.value(model.objective) or 0)}개")
         # 제조동별 생산량
-        total_production = pulp.value(pulp.lpSum([x[(m, l, s)] for (m, l, s) in x]))
+        total_production = pulp.value(total_sum) or 0
         for (idx,row) in self.df_capa_portion.iterrows():
-            line_production =pulp.value(pulp.lpSum([x[(m, l, s)] for (m, l, s) in x if l.startswith(row['name'])]))
+            line_production =pulp.value(pulp.lpSum(index.with_prefix(row['name']))) or 0
             line_ratio = (line_production / total_production) * 100 if total_production != 0 else 0
             print(f"{row['name']}라인 생산량: {int(line_production)}개, {row['name']}라인 비중: {line_ratio:.2f}%")
 
-        df_result = pd.DataFrame(results,columns=['Line','Time','Demand','Item','Qty','Project','To_site','SOP','MFG','RMC','Due_LT'])
-        print(df_result)
+        self.df_result = pd.DataFrame(results,columns=['Line','Time','Demand','Item','Qty','Project','To_site','SOP','MFG','RMC','Due_LT'])
+        print(self.df_result)
         return {'result':self.df_result, 'combined' : self.df_combined }
+
+    def _solve(self, name, model, phase, warm_start=False):
+        """
+        단계별 솔버 설정(시간 제한, 갭, 스레드, CBC/HiGHS)으로 모델을 풀고 솔버 통계를 저장.
+        시간 제한에 걸리면 그때까지 찾은 가장 좋은 해(incumbent)가 변수 값으로 남는다
+        """
+        config = self.solver_configs.get(phase) or SolverConfig.from_settings(phase)
+        callback = None
+        if self.progress_callback:
+            callback = lambda stats: self.progress_callback(dict(stats, name=name))
+            callback({'phase': 'build', 'variables': model.numVariables(), 'constraints': model.numConstraints()})
+        stats = config.solve(model, callback=callback, warm_start=warm_start, cancel_event=self.cancel_event)
+        self.solver_stats[name] = stats
+        print(f"[{name}] {stats['solver']} 상태: {stats['status']} ({stats['solution']}), "
+              f"목적함수 {stats['objective']}, bound {stats['bound']}, 갭 {stats['gap']}")
+        return stats
+
+    def _record_timing(self, name, model, build_time, solve_time):
+        """모델 구성 시간과 풀이 시간을 분리하여 기록/출력"""
+        self.timings[name] = {
+            'build': build_time,
+            'solve': solve_time,
+            'variables': model.numVariables(),
+            'constraints': model.numConstraints(),
+        }
+        print(f"[{name}] 모델 구성 {build_time:.3f}s / 풀이 {solve_time:.3f}s "
+              f"(변수 {model.numVariables()}개, 제약조건 {model.numConstraints()}개)")
     
 
 
@@ -0,0 +1,112 @@
+import multiprocessing
+import queue
+import time
+import traceback
+
+from app.models.common.settings_store import SettingsStore
+
+
+def _run_optimization(dataframes, settings, method, events, cancel_event):
+    """
+    최적화 프로세스 진입점. 진행 상황을 events 큐에 딕셔너리로 넣는다
+
+    events:
+        {'phase': 'prepare'}                                  데이터 준비 시작
+        {'phase': 'prepared', 'elapsed': 초}                  데이터 준비 완료
+        {'phase': 'build', 'name':.., 'variables':.., 'constraints':..}   모델 구성 완료
+        {'phase': 'solve', 'name':.., 'incumbent':.., 'bound':.., 'gap':.., ...}  풀이 중 솔버 통계
+        {'phase': 'done', 'result': 결과 딕셔너리, 'cancelled': bool, 'timings':.., 'solver_stats':..}
+        {'phase': 'error', 'message': 오류 문구, 'traceback': 문자열}
+    """
+    try:
+        from app.core.optimization import Optimization
+
+        # spawn 된 프로세스는 설정을 파일에서 새로 읽으므로 저장 전 변경 사항까지 부모 프로세스 설정으로 맞춘다
+        SettingsStore.update(settings)
+
+        events.put({'phase': 'prepare'})
+        started = time.perf_counter()
+        optimization = Optimization(dataframes, progress_callback=events.put, cancel_event=cancel_event)
+        events.put({'phase': 'prepared', 'elapsed': time.perf_counter() - started})
+
+        result = getattr(optimization, method)()
+        events.put({
+            'phase': 'done',
+            'result': result,
+            'cancelled': cancel_event.is_set(),
+            'timings': optimization.timings,
+            'solver_stats': optimization.solver_stats,
+        })
+    except Exception as e:
+        events.put({'phase': 'error', 'message': str(e), 'traceback': traceback.format_exc()})
+
+
+"""
+최적화 프로세스 클래스
+Optimization 의 pre_assign/linear_programming/execute 를 별도 프로세스에서 실행한다.
+GUI 스레드와 GIL 을 나눠 쓰지 않고, 취소하면 솔버를 중단시켜 그때까지 찾은 가장 좋은 해를 돌려받는다
+"""
+class OptimizationProcess:
+    # 취소 후 이 시간(초) 안에 결과가 오지 않으면 프로세스를 강제 종료
+    CANCEL_GRACE = 10.0
+
+    def __init__(self, dataframes, method='pre_assign'):
+        # Qt 스레드가 떠 있는 프로세스를 fork 하지 않도록 모든 OS 에서 spawn 사용
+        context = multiprocessing.get_context('spawn')
+        self.events = context.Queue()
+        self.cancel_event = context.Event()
+        self.process = context.Process(
+            target=_run_optimization,
+            args=(dataframes, SettingsStore.get_all(), method, self.events, self.cancel_event),
+            daemon=True,
+        )
+        self._cancel_time = None
+
+    def start(self):
+        self.process.start()
+
+    def cancel(self):
+        """솔버 중단 요청. 결과는 이후 'done' 이벤트로 전달된다"""
+        if self._cancel_time is None:
+            self._cancel_time = time.monotonic()
+        self.cancel_event.set()
+
+    def is_cancelled(self):
+        return self.cancel_event.is_set()
+
+    def terminate(self):
+        """프로세스 강제 종료 후 join (시작 전이면 아무것도 하지 않음)"""
+        if self.process.pid is None:
+            return
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process.join(timeout=5)
+
+    def iter_events(self, timeout=0.1):
+        """
+        'done' 또는 'error' 이벤트가 올 때까지 진행 이벤트를 순서대로 반환.
+        프로세스가 결과 없이 끝나거나 취소 후 응답이 없으면 'error'/'done'(결과 없음) 이벤트를 만들어 반환
+        """
+        while True:
+            try:
+                event = self.events.get(timeout=timeout)
+            except queue.Empty:
+                if self._cancel_time is not None and time.monotonic() - self._cancel_time > self.CANCEL_GRACE:
+                    self.terminate()
+                    yield {'phase': 'done', 'result': None, 'cancelled': True}
+                    return
+                if not self.process.is_alive():
+                    # 프로세스가 끝났는데 큐가 비어 있으면 마지막으로 한 번 더 확인
+                    try:
+                        event = self.events.get(timeout=timeout)
+                    except queue.Empty:
+                        yield {'phase': 'error',
+                               'message': f'Optimization process exited unexpectedly (exit code {self.process.exitcode})'}
+                        return
+                else:
+                    continue
+
+            yield event
+            if event.get('phase') in ('done', 'error'):
+                self.process.join(timeout=5)
+                return
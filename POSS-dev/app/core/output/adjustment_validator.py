@@ -2,8 +2,10 @@ import os
 import pandas as pd
 from app.models.common.file_store import DataStore, FilePaths
 from app.analysis.output.capa_ratio import CapaRatioAnalyzer
+from app.analysis.output.capacity_profile import CapacityProfile
+from app.core.output.capacity_ledger import CapacityLedger
 from app.utils.conversion import convert_value
-from app.utils.item_key_manager import ItemKeyManager
+from app.utils.fileHandler import load_sheet
 
 """
 결과 조정 시 제약사항 점검 클래스
@@ -34,10 +36,10 @@ class PlanAdjustmentValidator:
             if master_path and os.path.exists(master_path):
                 try:
                     self.master_data = {
-                        "capa_qty": pd.read_excel(master_path, sheet_name="capa_qty"),
-                        "line_available": pd.read_excel(master_path, sheet_name="line_available"),
-                        "capa_portion": pd.read_excel(master_path, sheet_name="capa_portion"),
-                        "due_LT" : pd.read_excel(master_path, sheet_name="due_LT")
+                        "capa_qty": load_sheet(master_path, "capa_qty"),
+                        "line_available": load_sheet(master_path, "line_available"),
+                        "capa_portion": load_sheet(master_path, "capa_portion"),
+                        "due_LT" : load_sheet(master_path, "due_LT")
                         # 필요한 시트가 더 있다면 여기에 추가
                     }
                     print(f"[로드] master 파일에서 데이터 로드: {master_path}")
@@ -53,7 +55,7 @@ class PlanAdjustmentValidator:
             if demand_path and os.path.exists(demand_path):
                 try:
                     self.demand_data = {
-                        "demand": pd.read_excel(demand_path, sheet_name="demand"),
+                        "demand": load_sheet(demand_path, "demand"),
                     }
                     print(f"[로드] demand 파일에서 데이터 로드: {demand_path}")
                 except Exception as e:
@@ -63,6 +65,9 @@ class PlanAdjustmentValidator:
 
         self.capa_qty_data = self.master_data.get("capa_qty", pd.DataFrame())
 
+        # 라인/시프트별 할당량 원장 (AssignmentModel 이 수정 시마다 갱신)
+        self.ledger = CapacityLedger(result_data)
+
         # 제약사항 추출 및 캐싱
         self._extract_constraints()
         self._cache_reference_data()
@@ -138,16 +143,14 @@ class PlanAdjustmentValidator:
 
     """
     현재 결과 데이터에서 참조 정보 추출하여 캐싱
-    - 라인별 시프트별 현재 할당량
+    - 라인별 시프트별 마스터 용량 제약 (할당량은 원장에서 조회)
     - 라인별 사용 가능한 아이템 목록
     """
     def _cache_reference_data(self):
+        self._capacity_limits = {}
         if self.result_data is None or self.result_data.empty:
             return
 
-        # 라인별 시프트별 현재 할당량 계산
-        self.line_shift_allocation = {}
-
         # 라인별 사용 가능한 아이템 목록 캐싱
         self.line_available_items = self.result_data.groupby('Line')['Item'].apply(set).to_dict()
         
@@ -266,30 +269,20 @@ class PlanAdjustmentValidator:
         tuple: (성공 여부, 오류 메시지)
     """
     def validate_capacity(self, line, time, new_qty, item=None, is_move=False, item_id=None):
-        # 현재 데이터 갱신
-        self.result_data = self.result_page.left_section.data
-        
-        # 현재 라인-시프트의 총 할당량 계산
-        grouped_data = self.result_data.groupby(['Line', 'Time'])['Qty'].sum()
-        self.line_shift_allocation = {f"{line}_{time}": qty for (line, time), qty in grouped_data.items()}
-        
-        # 라인-시프트 키 생성
-        key = f"{line}_{time}"
-        
-        # 시프트의 현재 할당량 확인
-        current_allocation = self.line_shift_allocation.get(key, 0)
+        # 현재 라인-시프트의 총 할당량 (원장 조회)
+        current_allocation = self.ledger.allocation(line, time)
         
         # 같은 위치에서 수량만 변경인 경우 기존 할당량 제외
         existing_qty = 0
         if not is_move and item:
-            # ID가 있으면 ID로 마스크 생성, 없으면 Line/Time/Item으로 마스크 생성
+            # ID가 있으면 ID로, 없으면 Line/Time/Item으로 조회
             if item_id:
-                mask = ItemKeyManager.create_mask_by_id(self.result_data, item_id)
+                row = self.ledger.row(item_id)
+                existing_qty = row[3] if row else None
             else:
-                mask = ItemKeyManager.create_mask_for_item(self.result_data, line, time, item)
+                existing_qty = self.ledger.item_qty(line, time, item)
                 
-            if mask.any():
-                existing_qty = self.result_data.loc[mask, 'Qty'].iloc[0]
+            if existing_qty is not None:
                 current_allocation -= existing_qty
             else:
                 print(f"해당 아이템을 찾을 수 없음 (수량 변경)")
@@ -299,12 +292,9 @@ class PlanAdjustmentValidator:
             
             if item_id:
                 # ID로 원래 위치의 아이템 찾기
-                mask = ItemKeyManager.create_mask_by_id(self.result_data, item_id)
-                if mask.any():
-                    original_row = self.result_data.loc[mask].iloc[0]
-                    original_qty = original_row['Qty']
-                    original_line = original_row['Line']
-                    original_time = original_row['Time']
+                original_row = self.ledger.row(item_id)
+                if original_row:
+                    original_line, original_time, _, original_qty = original_row
                     
                     # 원래 위치와 목표 위치가 다른 경우
                     if str(original_line) != str(line) or int(original_time) != int(time):
@@ -317,10 +307,8 @@ class PlanAdjustmentValidator:
                 else:
                     # ID로 찾지 못한 경우, Line/Time/Item으로 재시도
                     print(f"Line/Time/Item으로 재시도")
-                    mask = ItemKeyManager.create_mask_for_item(self.result_data, line, time, item)
-                    print(f"Line/Time/Item 마스크 결과: {mask.sum()}개 매칭")
-                    if mask.any():
-                        existing_qty = self.result_data.loc[mask, 'Qty'].iloc[0]
+                    existing_qty = self.ledger.item_qty(line, time, item)
+                    if existing_qty is not None:
                         current_allocation -= existing_qty
                         print(f"기존 수량 {existing_qty} 제외, 조정된 할당량: {current_allocation}")
                     else:
@@ -328,9 +316,8 @@ class PlanAdjustmentValidator:
             else:
                 # ID가 없는 경우 기존 로직 (하위 호환성)
                 print(f"ID 없이 이동하는 아이템 검색")
-                mask = ItemKeyManager.create_mask_for_item(self.result_data, line, time, item)
-                if mask.any():
-                    existing_qty = self.result_data.loc[mask, 'Qty'].iloc[0]
+                existing_qty = self.ledger.item_qty(line, time, item)
+                if existing_qty is not None:
                     current_allocation -= existing_qty
                     print(f"기존 수량 {existing_qty} 제외, 조정된 할당량: {current_allocation}")
                 else:
@@ -491,7 +478,106 @@ class PlanAdjustmentValidator:
    
         if not valid:
             return False, message
-        
+
+        return True, ""
+
+
+    """
+    여러 드롭 후보 위치를 한 번에 검증 (validate_adjustment 와 같은 규칙)
+    후보 위치의 할당량은 원장에서 한 번에 조회하고, 위치와 무관한 제조동 비율 검증은 한 번만 실행
+
+    Args:
+        item (str): 아이템 코드
+        new_qty (int/str): 생산량
+        targets (iterable): (라인, 시프트) 후보 리스트
+        source_line (str, optional): 이동 시 원래 라인
+        source_time (int/str, optional): 이동 시 원래 시프트
+        item_id (str, optional): 아이템 ID
+
+    Returns:
+        dict: {(라인, 시프트): (성공 여부, 오류 메시지)}
+    """
+    def validate_drop_targets(self, item, new_qty, targets, source_line=None, source_time=None, item_id=None):
+        is_move = source_line is not None and source_time is not None
+        targets = list(dict.fromkeys((str(line), convert_value(time, int, None)) for line, time in targets))
+        new_qty = convert_value(new_qty, int, 0, special_values={'ALL'})
+
+        if item is None:
+            return {target: (False, "Missing data.") for target in targets}
+
+        if new_qty == 'ALL' or new_qty == 'All':
+            new_qty = self._get_total_demand_for_item(item)
+            if new_qty <= 0:
+                return {target: (False, f"No qty for item {item}.") for target in targets}
+
+        # 위치와 무관한 검증
+        building_result = self.validate_building_ratios()
+
+        # 후보 위치의 현재 할당량, 용량
+        allocations = self.ledger.allocations(targets).tolist()
+        capacities = [self.get_line_capacity(line, time) if time is not None else None for line, time in targets]
+        source_row = self.ledger.row(item_id)
+
+        results = {}
+        for (line, time), allocation, capacity in zip(targets, allocations, capacities):
+            if time is None:
+                results[(line, time)] = (False, "Missing data.")
+                continue
+
+            # 이 아이템이 이미 후보 위치에 있으면 그 수량은 할당량에서 제외 (validate_capacity 와 동일)
+            position_qty = self.ledger.item_qty(line, time, item) or 0
+            if item_id and source_row:
+                at_target = source_row[0] == line and source_row[1] == time
+                existing_qty = source_row[3] if (at_target or not is_move) else 0
+                item_qty = source_row[3] if at_target else 0
+            else:
+                existing_qty = 0 if (item_id and not is_move) else position_qty
+                item_qty = 0 if item_id else position_qty
+
+            results[(line, time)] = self._first_failure([
+                self.validate_due_date(item, time),
+                self.validate_line_item_compatibility(line, item),
+                self._check_capacity(line, time, capacity, allocation - existing_qty, new_qty),
+                self._check_utilization(line, time, capacity, allocation - item_qty),
+                building_result
+            ])
+
+        return results
+
+    """
+    검증 결과 목록 중 첫 번째 실패 반환 (모두 통과면 성공)
+    """
+    @staticmethod
+    def _first_failure(validations):
+        for valid, message in validations:
+            if not valid:
+                return False, message
+        return True, ""
+
+    """
+    용량 검증 (validate_capacity 의 판정 부분, 출력 없음)
+    """
+    @staticmethod
+    def _check_capacity(line, time, capacity, current_allocation, new_qty):
+        if capacity is None:
+            return True, ""
+        if capacity <= 0:
+            return False, f"No capacity: line {line}, shift {time}."
+        if current_allocation + new_qty > capacity:
+            return False, f"Over capacity({capacity}): line {line}, shift {time}. Current: {current_allocation}, Adding: {new_qty}, Total: {current_allocation + new_qty}"
+        return True, ""
+
+    """
+    가동률 검증 (validate_utilization_rate 의 판정 부분)
+    """
+    @staticmethod
+    def _check_utilization(line, time, capacity, new_total_allocation):
+        if capacity is None:
+            return True, ""
+        if capacity <= 0:
+            return False, f"No capacity: line {line}, shift {time}."
+        if new_total_allocation / capacity * 100 > 100:
+            return False, f"Over utilization: shift {time}."
         return True, ""
 
     
@@ -506,23 +592,42 @@ class PlanAdjustmentValidator:
         int or None: 해당 라인과 시프트의 생산 용량, 없으면 None
     """
     def get_line_capacity(self, line, time):
-        # 이미 캐싱된 capa_qty_data 사용
+        # 마스터 데이터로 정해지는 부분은 라인/시프트별로 한 번만 계산
+        key = (line, time)
+        if key not in self._capacity_limits:
+            self._capacity_limits[key] = self._get_line_capacity_limit(line, time)
+        limit = self._capacity_limits[key]
+
+        # 제조동 Max_qty 제약: 현재 제조동 할당량을 뺀 남은 용량과 개별 라인 용량 중 최소값
+        if isinstance(limit, tuple):
+            basic_capacity, max_qty, factory = limit
+            remaining_capacity = max(0, max_qty - self.get_factory_allocation(factory, time))
+            return min(basic_capacity, remaining_capacity)
+        return limit
+
+    """
+    마스터 데이터(capa_qty)만으로 정해지는 라인/시프트 용량 제약
+
+    Returns:
+        용량(또는 None). 제조동 Max_qty 제약이 있으면 (개별 라인 용량, Max_qty, 제조동) 튜플
+    """
+    def _get_line_capacity_limit(self, line, time):
+        # 이미 캐싱된 capa_qty_data 의 생산 능력 프로파일 사용
         if self.capa_qty_data is None or self.capa_qty_data.empty:
             print("capa_qty 데이터가 비어 있습니다.")
             return None
 
         try:
+            profile = CapacityProfile.from_capa_qty(self.capa_qty_data)
+
             # 핵심 수정: 제조동 제약을 가장 먼저 확인 (CapaUtilization과 동일하게)
             if len(line) >= 1:
                 factory = line[0]  # 라인 코드의 첫 글자 (예: 'I'_01 -> 'I')
                 
                 # 1. Max_line 제약 확인 - 최우선 체크
-                max_line_key = f'Max_line_{factory}'
-                max_line_rows = self.capa_qty_data[self.capa_qty_data['Line'] == max_line_key]
+                max_line = profile.value(f'Max_line_{factory}', time)
                 
-                if not max_line_rows.empty and time in max_line_rows.columns:
-                    max_line = max_line_rows.iloc[0][time]
-                    
+                if max_line is not None:
                     # NaN 처리 및 타입 변환
                     if pd.notna(max_line):
                         try:
@@ -537,12 +642,9 @@ class PlanAdjustmentValidator:
                         print(f"[DEBUG] Max_line이 NaN이므로 제약 없음")
                 
                 # 2. Max_qty 제약 확인 - 최우선 체크
-                max_qty_key = f'Max_qty_{factory}'
-                max_qty_rows = self.capa_qty_data[self.capa_qty_data['Line'] == max_qty_key]
+                max_qty = profile.value(f'Max_qty_{factory}', time)
                 
-                if not max_qty_rows.empty and time in max_qty_rows.columns:
-                    max_qty = max_qty_rows.iloc[0][time]
-                    
+                if max_qty is not None:
                     # 안전한 NaN 처리 및 타입 변환
                     if pd.notna(max_qty):
                         try:
@@ -557,13 +659,7 @@ class PlanAdjustmentValidator:
                         print(f"[DEBUG] Max_qty가 NaN이므로 제약 없음")
 
             # 개별 라인의 기본 용량 확인
-            basic_capacity = None
-            if 'Line' in self.capa_qty_data.columns and time in self.capa_qty_data.columns:
-                line_rows = self.capa_qty_data[self.capa_qty_data['Line'] == line]
-                if not line_rows.empty:
-                    capacity = line_rows.iloc[0][time]
-                    if pd.notna(capacity):
-                        basic_capacity = float(capacity)
+            basic_capacity = profile.line_capacity(line, time)
 
             # 기본 용량이 없으면 None 반환
             if basic_capacity is None:
@@ -575,13 +671,9 @@ class PlanAdjustmentValidator:
                 factory = line[0]  # 라인 코드의 첫 글자 ('I'_01 -> 'I')
                 
                 # 3-1. Max_line 제약: 사용 가능한 라인 수 제한
-                max_line_key = f'Max_line_{factory}'
-                max_line_rows = self.capa_qty_data[self.capa_qty_data['Line'] == max_line_key]
+                max_line = profile.value(f'Max_line_{factory}', time)
                 
-                if not max_line_rows.empty and time in max_line_rows.columns:
-                    max_line = max_line_rows.iloc[0][time]
-        
-
+                if max_line is not None:
                     # NaN이 아니고 유효한 경우만 라인 수 제한 적용
                     if pd.notna(max_line):
                         max_line_float = float(max_line)
@@ -590,21 +682,8 @@ class PlanAdjustmentValidator:
                         if max_line_float > 0:
                             max_line_int = int(max_line_float)
                 
-                        # 해당 제조동의 모든 라인 찾기
-                        factory_lines = self.capa_qty_data[
-                            self.capa_qty_data['Line'].str.startswith(f'{factory}_', na=False)
-                        ]
-                    
-                        # 생산능력 기준으로 라인 정렬 (내림차순)
-                        line_capacities = []
-                        for l_idx, l_row in factory_lines.iterrows():
-                            l_name = l_row['Line']
-                            if time in self.capa_qty_data.columns:
-                                capacity = self.capa_qty_data.loc[l_idx, time]
-                                if pd.notna(capacity):
-                                    line_capacities.append((l_name, float(capacity)))
-                        
-                        line_capacities.sort(key=lambda x: x[1], reverse=True)
+                        # 해당 제조동의 라인을 생산능력 기준으로 정렬 (내림차순)
+                        line_capacities = profile.lines_by_capacity(factory, time)
                 
                         # 상위 N개 라인만 사용 가능
                         if max_line_int > 0 and len(line_capacities) > 0:
@@ -618,22 +697,12 @@ class PlanAdjustmentValidator:
                             return 0
                 
                 # 3-2. Max_qty 제약: 제조동 전체 수량 제한
-                max_qty_key = f'Max_qty_{factory}'
-                max_qty_rows = self.capa_qty_data[self.capa_qty_data['Line'] == f'Max_qty_{factory}']
+                max_qty = profile.value(f'Max_qty_{factory}', time)
                 
-                if not max_qty_rows.empty and time in max_qty_rows.columns:
-                    max_qty = max_qty_rows.iloc[0][time]
-
+                if max_qty is not None:
                     if pd.notna(max_qty) and max_qty != float('inf'):
-                        # 현재 제조동 할당량 계산
-                        current_factory_allocation = self.get_factory_allocation(factory, time)
-                        
-                        # 남은 용량 계산
-                        remaining_capacity = max(0, float(max_qty) - current_factory_allocation)
-                        
-                        # 개별 라인 용량과 제조동 남은 용량 중 최소값
-                        final_capacity = min(basic_capacity, remaining_capacity)
-                        return final_capacity
+                        # 남은 용량은 현재 제조동 할당량에 따라 get_line_capacity 에서 계산
+                        return basic_capacity, float(max_qty), factory
                     
             # 제조동 제약이 없거나 적용되지 않는 경우 기본 용량 반환
             return basic_capacity
@@ -673,33 +742,24 @@ class PlanAdjustmentValidator:
     def get_current_allocation(self, line=None, time=None, item=None, factory=None, item_id=None):
         # 0. ID 기준 할당량 조회 (ID로 아이템 검색)
         if item_id:
-            mask = ItemKeyManager.create_mask_by_id(self.result_data, item_id)
-            if mask.any():
-                if time is not None:  # 시간 조건도 확인
-                    mask = mask & (self.result_data['Time'] == time)
-                return float(self.result_data.loc[mask, 'Qty'].sum())
+            row = self.ledger.row(item_id)
+            if row:
+                if time is not None and row[1] != convert_value(time, int, None):  # 시간 조건도 확인
+                    return 0.0
+                return float(row[3])
 
         # 1. 특정 아이템의 할당량
         if line and time and item:
-            mask = ItemKeyManager.create_mask_for_item(self.result_data, line, time, item)
-            matched = self.result_data[mask]
-            return float(matched.iloc[0]['Qty']) if not matched.empty else 0
+            qty = self.ledger.item_qty(line, time, item)
+            return float(qty) if qty is not None else 0
         
         # 2. 특정 라인-시프트의 총 할당량
         elif line and time:
-            mask = (
-                (self.result_data['Line'] == line) &
-                (self.result_data['Time'] == time)
-            )
-            return self.result_data[mask]['Qty'].sum()
+            return self.ledger.allocation(line, time)
         
         # 3. 제조동 전체의 할당량
         elif factory and time:
-            mask = (
-                self.result_data['Line'].str.startswith(f'{factory}_', na=False) &
-                (self.result_data['Time'] == time)
-            )
-            return self.result_data[mask]['Qty'].sum()
+            return self.ledger.factory_allocation(factory, time)
         
         return 0
     
@@ -709,26 +769,18 @@ class PlanAdjustmentValidator:
     """
     def get_item_qty_at_position(self, line, time, item, item_id=None):
         try:
-            # ID가 있으면 ID로 마스크 생성
+            # ID가 있으면 ID로 조회
             if item_id:
-                mask = ItemKeyManager.create_mask_by_id(self.result_data, item_id)
+                row = self.ledger.row(item_id)
                 # 라인/시프트 조건 추가
-                if line is not None and time is not None:
-                    mask = mask & (
-                        (self.result_data['Line'] == str(line)) &
-                        (self.result_data['Time'] == int(time))
-                    )
-            else:
-                # Line/Time/Item으로 마스크 생성
-                mask = ItemKeyManager.create_mask_for_item(self.result_data, line, time, item)
+                if row and line is not None and time is not None:
+                    if row[0] != str(line) or row[1] != int(time):
+                        row = None
+                return float(row[3]) if row else 0
 
-            matched_rows = self.result_data[mask]
-
-            if not matched_rows.empty:
-                qty = matched_rows.iloc[0]['Qty']
-                return float(qty)
-            else:
-                return 0
+            # Line/Time/Item으로 조회
+            qty = self.ledger.item_qty(line, time, item)
+            return float(qty) if qty is not None else 0
 
         except Exception as e:
             print(f"[ERROR] get_item_qty_at_position 오류: {e}")
@@ -744,12 +796,15 @@ class PlanAdjustmentValidator:
         tuple: (성공 여부, 오류 메시지)
     """
     def validate_building_ratios(self, result_data=None):
-        data_df = self.result_data
-
-        building_ratios = CapaRatioAnalyzer.analyze_capa_ratio(
-            data_df=data_df,
-            is_initial=True
-        )
+        if result_data is not None:
+            building_ratios = CapaRatioAnalyzer.analyze_capa_ratio(
+                data_df=result_data,
+                is_initial=True
+            )
+        else:
+            # 원장의 제조동별 합계로 계산 (데이터프레임 재집계 없음)
+            building_totals = self.ledger.building_totals()
+            building_ratios = CapaRatioAnalyzer.ratio_from_building_qty(building_totals) if building_totals else {}
     
         if not building_ratios:
             return True, "No data."
@@ -0,0 +1,200 @@
+import numpy as np
+import pandas as pd
+
+"""
+라인/시프트별 할당량 원장
+결과 데이터를 한 번만 집계해 라인 x 시프트 행렬(NumPy)과 아이템 ID 인덱스로 들고 있고,
+AssignmentModel 의 수정(수량 변경/이동/추가/삭제)을 행 단위로 받아 O(1) 로 갱신한다.
+검증 시에는 데이터프레임을 다시 그룹핑하거나 마스크로 검색하지 않고 조회만 한다
+"""
+class CapacityLedger:
+    def __init__(self, df=None):
+        self.rebuild(df)
+
+    """
+    결과 데이터프레임 전체로 원장 재구성 (리셋/적용/새 데이터 로드 시)
+    """
+    def rebuild(self, df=None):
+        self._line_index = {}      # 라인 -> 행 번호
+        self._time_index = {}      # 시프트 -> 열 번호
+        self._factory_rows = {}    # 제조동('I_01' -> 'I') -> 행 번호 리스트
+        self._alloc = np.zeros((0, 0))
+        self._rows = {}            # 아이템 ID -> (라인, 시프트, 아이템, 수량)
+        self._cells = {}           # (라인, 시프트, 아이템) -> {행 키: 수량} (추가된 순서 유지)
+        self._anonymous = 0        # ID 없는 행에 붙이는 키 번호
+
+        if df is None or df.empty or not {'Line', 'Time', 'Qty'} <= set(df.columns):
+            return
+
+        lines = df['Line'].astype(str)
+        times = pd.to_numeric(df['Time'], errors='coerce').fillna(0).astype(int)
+        qtys = pd.to_numeric(df['Qty'], errors='coerce').fillna(0)
+
+        for line in lines.unique():
+            self._slot(line, None)
+        for time in sorted(times.unique()):
+            self._slot(None, int(time))
+
+        # 라인/시프트 집계는 한 번에 행렬로
+        line_codes = lines.map(self._line_index).to_numpy()
+        time_codes = times.map(self._time_index).to_numpy()
+        np.add.at(self._alloc, (line_codes, time_codes), qtys.to_numpy(dtype=float))
+
+        items = df['Item'].astype(str) if 'Item' in df.columns else pd.Series('', index=df.index)
+        ids = df['_id'] if '_id' in df.columns else pd.Series(None, index=df.index, dtype=object)
+        for line, time, item, qty, item_id in zip(lines, times, items, qtys, ids):
+            self._index(self._row_key(item_id), line, int(time), item, qty)
+
+    """
+    행 하나 추가/삭제 반영
+
+    Args:
+        row (dict): Line/Time/Item/Qty/_id 를 가진 행 데이터
+        sign (int): +1 추가, -1 삭제
+    """
+    def add(self, row, sign=1):
+        line, time, item, qty = self._normalize(row)
+        row_i, col_i = self._slot(line, time)
+        self._alloc[row_i, col_i] += sign * qty
+
+        key = row.get('_id')
+        if sign > 0:
+            self._index(self._row_key(key), line, time, item, qty)
+            return
+
+        cell = self._cells.get((line, time, item), {})
+        if key is None or pd.isna(key) or key not in cell:
+            # ID 없는 행은 같은 위치의 같은 수량 행 하나를 지운다
+            key = next((k for k, value in cell.items() if value == qty), next(iter(cell), None))
+        cell.pop(key, None)
+        if not cell:
+            self._cells.pop((line, time, item), None)
+        if self._rows.get(key, (None,) * 3)[:3] == (line, time, item):
+            del self._rows[key]
+
+    def remove(self, row):
+        self.add(row, sign=-1)
+
+    """
+    변경 전/후 행으로 원장 갱신 (이동, 수량 변경은 삭제 + 추가)
+    """
+    def apply(self, old_row=None, new_row=None):
+        if old_row is not None:
+            self.remove(old_row)
+        if new_row is not None:
+            self.add(new_row)
+
+    """
+    라인/시프트의 총 할당량
+    """
+    def allocation(self, line, time):
+        row_i = self._line_index.get(str(line))
+        col_i = self._time_index.get(self._to_time(time))
+        if row_i is None or col_i is None:
+            return 0
+        return self._number(self._alloc[row_i, col_i])
+
+    """
+    여러 (라인, 시프트) 의 총 할당량을 한 번에 조회
+
+    Args:
+        cells (iterable): (라인, 시프트) 리스트
+    Returns:
+        ndarray: cells 순서대로의 할당량
+    """
+    def allocations(self, cells):
+        cells = list(cells)
+        padded = np.pad(self._alloc, ((0, 1), (0, 1)))  # 없는 라인/시프트는 마지막 0 행/열로
+        missing_row, missing_col = self._alloc.shape
+        row_codes = np.fromiter((self._line_index.get(str(line), missing_row) for line, _ in cells),
+                                dtype=np.intp, count=len(cells))
+        col_codes = np.fromiter((self._time_index.get(self._to_time(time), missing_col) for _, time in cells),
+                                dtype=np.intp, count=len(cells))
+        values = padded[row_codes, col_codes]
+        return values.astype(np.int64) if np.array_equal(values, np.floor(values)) else values
+
+    """
+    제조동 전체의 시프트 할당량 ('I' -> 'I_' 로 시작하는 라인 합계)
+    """
+    def factory_allocation(self, factory, time):
+        col_i = self._time_index.get(self._to_time(time))
+        rows = self._factory_rows.get(str(factory))
+        if col_i is None or not rows:
+            return 0
+        return self._number(self._alloc[rows, col_i].sum())
+
+    """
+    제조동별 전체 할당량 {제조동: 수량} (라인 '_' 앞부분 기준)
+    """
+    def building_totals(self):
+        line_totals = self._alloc.sum(axis=1)
+        totals = {}
+        for line, row_i in self._line_index.items():
+            building = line.split('_')[0]
+            totals[building] = totals.get(building, 0.0) + float(line_totals[row_i])
+        return totals
+
+    """
+    아이템 ID 로 (라인, 시프트, 아이템, 수량) 조회. 없으면 None
+    """
+    def row(self, item_id):
+        return self._rows.get(item_id) if item_id else None
+
+    """
+    특정 위치의 아이템 수량 (같은 위치에 여러 행이 있으면 먼저 추가된 행). 없으면 None
+    """
+    def item_qty(self, line, time, item):
+        cell = self._cells.get((str(line), self._to_time(time), str(item)))
+        if not cell:
+            return None
+        return self._number(next(iter(cell.values())))
+
+    """
+    라인/시프트 행렬의 행/열 번호 (처음 보는 라인/시프트면 행렬을 늘린다)
+    """
+    def _slot(self, line, time):
+        row_i = col_i = None
+        if line is not None:
+            row_i = self._line_index.get(line)
+            if row_i is None:
+                row_i = self._line_index[line] = len(self._line_index)
+                self._factory_rows.setdefault(line.split('_')[0], []).append(row_i)
+                self._alloc = np.vstack([self._alloc, np.zeros((1, self._alloc.shape[1]))])
+        if time is not None:
+            col_i = self._time_index.get(time)
+            if col_i is None:
+                col_i = self._time_index[time] = len(self._time_index)
+                self._alloc = np.hstack([self._alloc, np.zeros((self._alloc.shape[0], 1))])
+        return row_i, col_i
+
+    def _index(self, key, line, time, item, qty):
+        qty = self._number(qty)
+        self._cells.setdefault((line, time, item), {})[key] = qty
+        self._rows[key] = (line, time, item, qty)
+
+    def _row_key(self, item_id):
+        if item_id is None or pd.isna(item_id):
+            self._anonymous += 1
+            return ('_row', self._anonymous)
+        return item_id
+
+    """
+    수량 값 (정수로 떨어지면 int, 결과 데이터의 Qty 와 같은 표기)
+    """
+    @staticmethod
+    def _number(value):
+        value = float(value)
+        return int(value) if value.is_integer() else value
+
+    @staticmethod
+    def _to_time(time):
+        try:
+            return int(time)
+        except (TypeError, ValueError):
+            return None
+
+    @classmethod
+    def _normalize(cls, row):
+        qty = pd.to_numeric(row.get('Qty'), errors='coerce')
+        return (str(row.get('Line')), cls._to_time(row.get('Time')) or 0, str(row.get('Item', '')),
+                0.0 if pd.isna(qty) else float(qty))
@@ -0,0 +1,334 @@
+import os
+import re
+import signal
+import subprocess
+import tempfile
+import threading
+import time
+
+import pulp
+from pulp.apis import coin_api, highs_api
+
+from app.models.common.settings_store import SettingsStore
+
+
+"""
+솔버 설정 클래스
+SettingsStore 의 솔버 설정(시간 제한, 상대 갭, 스레드 수, CBC/HiGHS)으로 pulp 솔버를 만들고,
+풀이 중 솔버 로그를 읽어 현재 해(incumbent), 상한/하한(bound), 갭을 콜백으로 전달한다
+"""
+class SolverConfig:
+    SOLVERS = ('CBC', 'HiGHS')
+
+    # 단계별 시간 제한 설정 키. 1차 = 사전할당, 2차 = 생산계획 최적화
+    TIME_LIMIT_KEYS = {1: 'time_limit1', 2: 'time_limit2'}
+
+    def __init__(self, solver='CBC', time_limit=None, gap_rel=None, threads=None, msg=True):
+        """
+        Parameters:
+            solver (str) : 'CBC' 또는 'HiGHS'
+            time_limit (float) : 풀이 시간 제한(초). None 이면 제한 없음
+            gap_rel (float) : 상대 갭 허용치 (0.01 = 1%). None 이면 솔버 기본값
+            threads (int) : 솔버 스레드 수. None 이면 솔버 기본값
+            msg (bool) : 솔버 로그를 콘솔에도 출력할지 여부
+        """
+        self.solver = solver if solver in self.SOLVERS else 'CBC'
+        self.time_limit = time_limit
+        self.gap_rel = gap_rel
+        self.threads = threads
+        self.msg = msg
+
+    @classmethod
+    def from_settings(cls, phase=1):
+        """
+        SettingsStore 에서 솔버 설정 생성
+
+        Parameters:
+            phase (int) : 1 = 1차(사전할당) -> time_limit1, 2 = 2차(최적화) -> time_limit2
+        """
+        time_limit = SettingsStore.get(cls.TIME_LIMIT_KEYS.get(phase, 'time_limit2'))
+        gap_rel = SettingsStore.get('solver_gap_rel', 0.0)
+        threads = SettingsStore.get('solver_threads', 0)
+        return cls(
+            solver=SettingsStore.get('solver_name', 'CBC'),
+            time_limit=float(time_limit) if time_limit else None,
+            gap_rel=float(gap_rel) if gap_rel else None,
+            threads=int(threads) if threads else None,
+        )
+
+    def create(self, warm_start=False, log_path=None):
+        """pulp 솔버 객체 생성. HiGHS 실행파일이 없으면 CBC 로 대체"""
+        options = dict(msg=self.msg, timeLimit=self.time_limit, gapRel=self.gap_rel,
+                       threads=self.threads, warmStart=warm_start, logPath=log_path)
+        if self.solver == 'HiGHS':
+            solver = pulp.HiGHS_CMD(**options)
+            if solver.available():
+                return solver
+            print("HiGHS 솔버를 찾을 수 없어 CBC 로 대체합니다.")
+        return pulp.PULP_CBC_CMD(**options)
+
+    def solve(self, model, callback=None, warm_start=False, cancel_event=None):
+        """
+        모델을 풀고 솔버 통계를 반환
+
+        Parameters:
+            model (LpProblem) : 풀 모델
+            callback (callable) : 풀이 중 통계 딕셔너리를 받는 함수. 마지막 호출은 'finished': True
+            warm_start (bool) : 변수에 setInitialValue 로 넣은 값을 초기해로 사용할지 여부
+            cancel_event (Event) : set 되면 솔버를 중단시킨다. 중단된 시점의 가장 좋은 해가 변수 값으로 남고
+                status 는 'Cancelled', solution 은 해가 있으면 'Solution Found' 가 된다
+                (Windows 에서는 솔버 프로세스를 종료하므로 해가 남지 않을 수 있음)
+
+        Returns:
+            dict : {'phase','solver','status','solution','objective','incumbent','bound','gap',
+                    'elapsed','time_limit','cancelled','finished'}
+        """
+        fd, log_path = tempfile.mkstemp(suffix='.log', prefix='poss_solver_')
+        os.close(fd)
+        solver = self.create(warm_start=warm_start, log_path=log_path)
+        stats = {
+            'phase': 'solve',
+            'solver': 'HiGHS' if isinstance(solver, pulp.HiGHS_CMD) else 'CBC',
+            'status': None,
+            'solution': None,
+            'objective': None,
+            'incumbent': None,
+            'bound': None,
+            'gap': None,
+            'elapsed': 0.0,
+            'time_limit': self.time_limit,
+            'cancelled': False,
+            'finished': False,
+        }
+        tracker = SolverProcessTracker()
+        tailer = SolverLogTailer(log_path, stats, model.sense == pulp.LpMaximize,
+                                 callback=callback, echo=self.msg,
+                                 cancel_event=cancel_event, tracker=tracker)
+        started = time.perf_counter()
+        tailer.start()
+        try:
+            if cancel_event is not None and cancel_event.is_set():
+                stats['cancelled'] = True
+            else:
+                with tracker:
+                    model.solve(solver)
+        except pulp.PulpSolverError:
+            # 취소로 솔버 프로세스가 비정상 종료된 경우
+            if not stats['cancelled']:
+                raise
+        finally:
+            tailer.stop()
+            try:
+                os.remove(log_path)
+            except OSError:
+                pass
+
+        stats['elapsed'] = time.perf_counter() - started
+        sol_status = model.sol_status
+        if stats['cancelled']:
+            # 중단된 풀이는 최적성이 증명되지 않았으므로 남은 해는 가능해로만 보고
+            stats['status'] = 'Cancelled'
+            if sol_status == pulp.LpSolutionOptimal:
+                sol_status = pulp.LpSolutionIntegerFeasible
+        else:
+            stats['status'] = pulp.LpStatus[model.status]
+        stats['solution'] = pulp.LpSolution[sol_status]
+        stats['objective'] = pulp.value(model.objective) if sol_status != pulp.LpSolutionNoSolutionFound else None
+        if stats['objective'] is not None:
+            stats['incumbent'] = stats['objective']
+            if sol_status == pulp.LpSolutionOptimal:
+                stats['bound'] = stats['objective']
+            stats['gap'] = relative_gap(stats['incumbent'], stats['bound'])
+        stats['finished'] = True
+        if callback:
+            callback(dict(stats))
+        return stats
+
+
+"""
+솔버 프로세스 추적 클래스
+with 블록 안에서 pulp 가 띄우는 솔버 프로세스(cbc, highs)를 기록해 두었다가 취소 시 인터럽트한다.
+POSIX 에서는 SIGINT 를 보내 CBC 가 현재까지의 가장 좋은 해를 저장하고 끝나게 하고,
+Windows 에서는 콘솔 인터럽트를 솔버에만 보낼 수 없으므로 프로세스를 종료한다
+"""
+class SolverProcessTracker:
+    SOLVER_MODULES = (coin_api, highs_api)
+
+    def __init__(self):
+        self.processes = []
+        self._lock = threading.Lock()
+        self._interrupted = False
+        self._saved = []
+
+    def __enter__(self):
+        tracker = self
+
+        class _Subprocess:
+            # pulp 솔버 모듈의 subprocess 참조를 대신해서 Popen 만 가로챈다
+            def __getattr__(self, name):
+                return getattr(subprocess, name)
+
+            def Popen(self, *args, **kwargs):
+                process = subprocess.Popen(*args, **kwargs)
+                tracker._register(process)
+                return process
+
+        proxy = _Subprocess()
+        for module in self.SOLVER_MODULES:
+            self._saved.append((module, module.subprocess))
+            module.subprocess = proxy
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        for module, original in self._saved:
+            module.subprocess = original
+        self._saved = []
+        return False
+
+    def _register(self, process):
+        with self._lock:
+            self.processes.append(process)
+            interrupted = self._interrupted
+        if interrupted:
+            self._interrupt_process(process)
+
+    def interrupt(self):
+        """실행 중인 솔버 프로세스 중단. 이후에 시작되는 솔버도 바로 중단된다"""
+        with self._lock:
+            self._interrupted = True
+            processes = list(self.processes)
+        for process in processes:
+            self._interrupt_process(process)
+
+    def terminate(self):
+        """인터럽트에 응답하지 않는 솔버 프로세스 강제 종료 (해는 남지 않음)"""
+        with self._lock:
+            processes = list(self.processes)
+        for process in processes:
+            if process.poll() is None:
+                try:
+                    process.terminate()
+                except OSError:
+                    pass
+
+    @staticmethod
+    def _interrupt_process(process):
+        if process.poll() is not None:
+            return
+        try:
+            if os.name == 'nt':
+                process.terminate()
+            else:
+                process.send_signal(signal.SIGINT)
+        except OSError:
+            pass
+
+
+def relative_gap(incumbent, bound):
+    """현재 해와 bound 사이 상대 갭 (해 또는 bound 가 없으면 None)"""
+    if incumbent is None or bound is None:
+        return None
+    return abs(bound - incumbent) / max(abs(incumbent), 1e-9)
+
+
+"""
+솔버 로그 추적 클래스
+솔버가 logPath 에 쓰는 로그를 별도 스레드에서 읽어 현재 해/bound/갭을 갱신하고 콜백을 호출한다
+"""
+class SolverLogTailer(threading.Thread):
+    # CBC 는 전처리/휴리스틱 중에는 인터럽트를 늦게 확인하므로, 이 시간(초) 안에 끝나지 않으면 강제 종료.
+    # 해를 읽어 결과를 보낼 시간을 남기도록 OptimizationProcess.CANCEL_GRACE 보다 작아야 한다
+    INTERRUPT_GRACE = 6.0
+
+    # CBC 는 최대화 문제도 내부적으로 최소화로 풀기 때문에 Cbc 메시지의 값은 부호가 반대로 출력된다
+    CBC_CONTINUOUS = re.compile(r'Continuous objective value is (\S+)')
+    CBC_SOLUTION = re.compile(r'Cbc00(?:04|12)I Integer solution of (\S+)')
+    CBC_PROGRESS = re.compile(r'Cbc0010I After \d+ nodes, \d+ on tree, (\S+) best solution, best possible (\S+)')
+    CBC_ROOT = re.compile(r'Cbc0013I At root node, .* objective from \S+ to (\S+)')
+    # HiGHS 분기한정 진행 테이블: ... BestBound BestSol Gap ...
+    HIGHS_PROGRESS = re.compile(r'^\s*[A-Za-z]?\s+\d+\s+\d+\s+\d+\s+\S+%\s+(\S+)\s+(\S+)\s+(\S+)')
+
+    def __init__(self, log_path, stats, maximize, callback=None, echo=False, interval=0.2,
+                 cancel_event=None, tracker=None):
+        super().__init__(daemon=True)
+        self.log_path = log_path
+        self.stats = stats
+        self.sign = -1 if maximize else 1
+        self.callback = callback
+        self.echo = echo
+        self.interval = interval
+        self.cancel_event = cancel_event
+        self.tracker = tracker
+        self._stop_event = threading.Event()
+        self._interrupt_time = None
+        self._start_time = time.perf_counter()
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+    def run(self):
+        with open(self.log_path, 'r', encoding='utf-8', errors='replace') as f:
+            buffer = ''
+            while True:
+                stopping = self._stop_event.is_set()
+                if self.cancel_event is not None and self.cancel_event.is_set():
+                    self._cancel()
+                chunk = f.read()
+                if chunk:
+                    buffer += chunk
+                    *lines, buffer = buffer.split('\n')
+                    if any([self.parse_line(line) for line in lines]) and self.callback:
+                        self.stats['elapsed'] = time.perf_counter() - self._start_time
+                        self.callback(dict(self.stats))
+                if stopping:
+                    if buffer:
+                        self.parse_line(buffer)
+                    return
+                self._stop_event.wait(self.interval)
+
+    def _cancel(self):
+        """취소 요청 처리. 처음엔 인터럽트, 유예 시간이 지나면 강제 종료"""
+        self.stats['cancelled'] = True
+        if self.tracker is None:
+            return
+        if self._interrupt_time is None:
+            self._interrupt_time = time.perf_counter()
+            self.tracker.interrupt()
+        elif time.perf_counter() - self._interrupt_time > self.INTERRUPT_GRACE:
+            self.tracker.terminate()
+
+    def parse_line(self, line):
+        """로그 한 줄 해석. 통계가 바뀌었으면 True"""
+        if self.echo:
+            print(line)
+        stats = self.stats
+        if (match := self.CBC_SOLUTION.search(line)):
+            incumbent, bound = self.sign * _to_float(match.group(1)), stats['bound']
+        elif (match := self.CBC_PROGRESS.search(line)):
+            incumbent, bound = self.sign * _to_float(match.group(1)), self.sign * _to_float(match.group(2))
+        elif (match := self.CBC_ROOT.search(line)):
+            incumbent, bound = stats['incumbent'], self.sign * _to_float(match.group(1))
+        elif (match := self.CBC_CONTINUOUS.search(line)):
+            incumbent, bound = stats['incumbent'], _to_float(match.group(1))
+        elif (match := self.HIGHS_PROGRESS.search(line)):
+            incumbent, bound = _to_float(match.group(2)), _to_float(match.group(1))
+        else:
+            return False
+        # 해가 아직 없으면 솔버는 1e+50 같은 무한대 값을 출력한다
+        stats['incumbent'] = incumbent if _is_finite(incumbent) else stats['incumbent']
+        stats['bound'] = bound if _is_finite(bound) else stats['bound']
+        stats['gap'] = relative_gap(stats['incumbent'], stats['bound'])
+        return True
+
+
+def _to_float(text):
+    """로그 숫자 문자열 -> float. 숫자가 아니면 nan (부호를 곱해도 안전하도록)"""
+    try:
+        return float(text)
+    except (TypeError, ValueError):
+        return float('nan')
+
+
+def _is_finite(value):
+    return value is not None and abs(value) < 1e30
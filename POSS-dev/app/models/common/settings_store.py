@@ -17,6 +17,9 @@ class SettingsStore:
         "weight_linecnt_bypjt": 1.0,  # PJT분산 가중치
         "weight_linecnt_byitem": 1.0,  # Item분산 가중치
         "weight_operation": 1.0,  # 가동률 가중치
+        "solver_name": "CBC",  # 최적화 솔버 (CBC / HiGHS)
+        "solver_gap_rel": 0.0,  # 솔버 상대 갭 허용치 (0 이면 솔버 기본값)
+        "solver_threads": 0,  # 솔버 스레드 수 (0 이면 솔버 기본값)
 
         # Pre_option 설정
         "op_timeset_1": [],  # 계획유지율_1 (1~14일 중 선택)
@@ -1,5 +1,6 @@
 import pandas as pd
 from app.utils.fileHandler import load_file
+from app.utils.item_code import decode_item_codes
 from app.models.common.file_store import FilePaths, DataStore
 from app.utils.error_handler import (
     error_handler, safe_operation, DataError, FileError
@@ -34,12 +35,7 @@ def process_data():
             if df_demand_demand.empty :
                 raise DataError('The demand data sheet is empty or not found')
 
-            for i, row in df_demand_demand.iterrows():
-                df_demand_demand.loc[i, "Project"] = row['Item'][3:7]
-                df_demand_demand.loc[i, "Basic2"] = row['Item'][3:8]
-                df_demand_demand.loc[i, "Tosite_group"] = row['Item'][7:8]
-                df_demand_demand.loc[i, "RMC"] = row['Item'][3:-3]
-                df_demand_demand.loc[i, "Color"] = row['Item'][8:-4]
+            decode_item_codes(df_demand_demand)
         except Exception as e :
             if not isinstance(e, (FileError, DataError)) :
                 raise DataError('An error occurred while processing demand data', {'error' : str(e)})
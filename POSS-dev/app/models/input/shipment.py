@@ -1,6 +1,7 @@
 import pandas as pd
 from app.models.common.file_store import FilePaths, DataStore
 from app.utils.fileHandler import load_file
+from app.utils.item_code import decode_item_codes
 from app.utils.error_handler import (
     error_handler, safe_operation,
     DataError, FileError
@@ -63,15 +64,7 @@ def preprocess_data_for_fulfillment_rate() :
             return None
         
         try :
-            for i, row in df_demand.iterrows() :
-                if 'Item' not in row or not isinstance(row['Item'], str) :
-                    continue
-
-                df_demand.loc[i, 'Project'] = row['Item'][3:7]
-                df_demand.loc[i, "Basic2"] = row['Item'][3:8]
-                df_demand.loc[i, "Tosite_group"] = row['Item'][7:8]
-                df_demand.loc[i, "RMC"] = row['Item'][3:-3]
-                df_demand.loc[i, "Color"] = row['Item'][8:-4]
+            decode_item_codes(df_demand)
         except Exception as e :
             raise DataError('Error processing demand items', {'error' : str(e)})
 
@@ -87,9 +80,9 @@ def preprocess_data_for_fulfillment_rate() :
                     'df' : df_demand,
                     'items' : df_demand.to_dict('records'),
                     'project_items' : {proj : group.to_dict('records')
-                                    for proj, group in df_demand.groupby('Project')},
+                                    for proj, group in df_demand.groupby('Project', observed=True)},
                     'site_items' : {site : group.to_dict('records')
-                                    for site, group in df_demand.groupby('Tosite_group')
+                                    for site, group in df_demand.groupby('Tosite_group', observed=True)
                                     if site and not pd.isna(site)}
                 },
                 'material' : safe_operation(
@@ -44,6 +44,10 @@ class AssignmentModel(QObject):
         self._df = assignment_df.copy()  # 실제 뷰로 전달되고 수정할 데이터
         self.pre_assigned = set(pre_assigned)  # 사전할당된 아이템 집합
         self.validator = validator  # 검증 인스턴스
+        self._rebuild_indexes()
+
+        # 마지막 분석 이후의 행 변경분 [(+1 추가 / -1 삭제, 행 dict)]. None 이면 전체 재분석 필요
+        self._changes = None
     
     """
     DataFrame의 타입을 올바르게 강제 변환
@@ -83,6 +87,52 @@ class AssignmentModel(QObject):
         df = self._df.copy()
         return self._ensure_correct_types(df)
 
+    """
+    마지막 호출 이후의 행 변경분을 반환하고 비움 (IncrementalAnalysisEngine.run 에 전달)
+    None 이면 리셋/적용/새 데이터 등으로 전체 재분석이 필요함
+    """
+    def take_changes(self):
+        changes = self._changes
+        self._changes = []
+        return changes
+
+    """
+    행 변경분 기록: 검증기의 할당량 원장은 항상 갱신하고,
+    변경분 목록은 전체 재분석이 예정된 상태면 기록하지 않음
+    """
+    def _record_change(self, old_row=None, new_row=None):
+        ledger = getattr(self.validator, 'ledger', None)
+        if ledger is not None:
+            ledger.apply(old_row, new_row)
+
+        if self._changes is None:
+            return
+        if old_row is not None:
+            self._changes.append((-1, dict(old_row)))
+        if new_row is not None:
+            self._changes.append((1, dict(new_row)))
+
+    """
+    마스크에 해당하는 행들을 수정하고 행마다 변경분 기록
+    """
+    def _update_rows(self, mask, values):
+        positions = mask.to_numpy(dtype=bool).nonzero()[0]
+        old_rows = self._df.loc[mask].to_dict('records')
+        for column, value in values.items():
+            self._df.loc[mask, column] = value
+        for pos, old_row, new_row in zip(positions, old_rows, self._df.loc[mask].to_dict('records')):
+            self._row_index.update_row(pos, old_row, new_row)
+            self._record_change(old_row, new_row)
+
+    """
+    현재 데이터로 행 위치 인덱스와 검증기의 할당량 원장 재구성 (리셋/새 데이터/행 삭제 등)
+    """
+    def _rebuild_indexes(self):
+        self._row_index = ItemKeyManager.attach_row_index(self._df)
+        ledger = getattr(self.validator, 'ledger', None)
+        if ledger is not None:
+            ledger.rebuild(self._df)
+
     """
     수량 변경 업데이트
     """
@@ -105,7 +155,7 @@ class AssignmentModel(QObject):
             return True  # 이미 동일한 값이면 변경 없이 성공으로 처리
 
         # 2) 해당 행의 수량만 업데이트
-        self._df.loc[mask, 'Qty'] = int(new_qty)
+        self._update_rows(mask, {'Qty': int(new_qty)})
         print(f"Model: {item} @ {line}-{time} 수량 변경: {new_qty}")
 
         # 3) 수정된 아이템에 대해 검증 수행
@@ -144,8 +194,7 @@ class AssignmentModel(QObject):
         old_data = self._df.loc[mask].iloc[0].to_dict()
 
         # Line/Time 컬럼 업데이트
-        self._df.loc[mask, 'Line'] = str(new_line)
-        self._df.loc[mask, 'Time'] = int(new_time)
+        self._update_rows(mask, {'Line': str(new_line), 'Time': int(new_time)})
 
         # 검증과 시그널을 한 번에 처리
         error_msg = self._validate_item(item, new_line, new_time, item_id, source_line=old_line, source_time=old_time)
@@ -166,6 +215,8 @@ class AssignmentModel(QObject):
     """
     def reset(self):
         self._df = self._original_df.copy()
+        self._changes = None
+        self._rebuild_indexes()
         self.dataModified.emit(False)
         self.modelDataChanged.emit()
 
@@ -174,6 +225,7 @@ class AssignmentModel(QObject):
     """
     def apply(self):
         self._original_df = self._df.copy()
+        self._changes = None
         self.modelDataChanged.emit()
 
     """
@@ -262,7 +314,7 @@ class AssignmentModel(QObject):
         if not (full_data and full_data.get('_is_copy')):
             mask = ItemKeyManager.create_mask_for_item(self._df, line, time, item)
             if mask.any():
-                self._df.loc[mask, 'Qty'] = qty
+                self._update_rows(mask, {'Qty': qty})
 
                 #기존 아이템 업데이트 시에도 검증 필요
                 error_msg = self._validate_item(item, line, time, new_row['_id'])
@@ -275,6 +327,9 @@ class AssignmentModel(QObject):
         
         # 새 행을 DataFrame에 추가
         self._df = pd.concat([self._df, pd.DataFrame([new_row])], ignore_index=True)
+        self._row_index.append_row(new_row)
+        ItemKeyManager.attach_row_index(self._df, self._row_index)
+        self._record_change(new_row=new_row)
 
         # 새 아이템 추가 시에도 검증 필요 (복사 시 CAPA 초과 등 확인)
         error_msg = self._validate_item(item, line, time, new_row['_id'])
@@ -305,7 +360,11 @@ class AssignmentModel(QObject):
         line, time, item = ItemKeyManager.get_item_from_data(row.to_dict())
         
         # 아이템 삭제
+        deleted_rows = self._df.loc[mask].to_dict('records')
         self._df = self._df[~mask].reset_index(drop=True)
+        self._row_index = ItemKeyManager.attach_row_index(self._df)  # 뒤쪽 행 위치가 바뀌므로 재구성
+        for deleted_row in deleted_rows:
+            self._record_change(old_row=deleted_row)
         print(f"Model: 아이템 {item} @ {line}-{time} (ID: {item_id}) 삭제됨")
 
         # 원본과 현재 데이터 비교하여 변경 여부 확인
@@ -318,9 +377,12 @@ class AssignmentModel(QObject):
         return True
     
 
+    def get_original_dataframe(self):
+        return self._ensure_correct_types(self._original_df.copy())
+
     def get_comparison_dataframe(self):
         return {
-            'original': self._ensure_correct_types(self._original_df.copy()),
+            'original': self.get_original_dataframe(),
             'adjusted': self._ensure_correct_types(self._df.copy())
         }
 
@@ -333,6 +395,8 @@ class AssignmentModel(QObject):
 
         self._df = new_df.copy()
         self._original_df = new_df.copy()
+        self._changes = None
+        self._rebuild_indexes()
         print("[DEBUG] 모델에 새 데이터프레임 설정 완료")
 
         self.modelDataChanged.emit()
@@ -1,7 +1,8 @@
 import pandas as pd
 import os
-from app.models.common.file_store import FilePaths
+from app.models.common.file_store import FilePaths, DataStore
 from app.models.common.project_grouping import ProjectGroupManager
+from app.utils.workbook_cache import WorkbookCache
 
 """
 파일 유형 감지하는 함수
@@ -30,6 +31,12 @@ def load_file(file_path, sheet_name=None, **kwargs) :
         
         file_type = detect_file_type(file_path)
 
+        # 추가 파싱 옵션이 없으면 파싱/반올림 결과를 캐시에서 가져온다
+        if file_type in ('excel', 'csv') and not kwargs:
+            if file_type == 'csv' and sheet_name is not None and not isinstance(sheet_name, list):
+                sheet_name = 'Sheet1'
+            return WorkbookCache.read(file_path, sheet_name=sheet_name, postprocess=round_to_int)
+
         if file_type == 'excel':
             data =  pd.read_excel(file_path, sheet_name=sheet_name, **kwargs)
         elif file_type == 'csv':
@@ -74,9 +81,7 @@ def get_sheet_names(file_path):
             print(f"시트 이름 확인은 엑셀 파일만 지원합니다: {file_path}")
             return []
         
-        xlsx = pd.ExcelFile(file_path)
-
-        return xlsx.sheet_names
+        return WorkbookCache.sheet_names(file_path)
     except Exception as e:
         print(f"시트 이름 목록 가져오기 중 오류 발생: {e}")
         return []
@@ -90,11 +95,25 @@ def create_from_master():
     if not path:
         raise FileNotFoundError("master_excel_file 경로가 설정되어 있지 않습니다.")
     
-    df = pd.read_excel(path, sheet_name='line_available')
+    df = WorkbookCache.read(path, sheet_name='line_available')
     
     return ProjectGroupManager.create_project_groups(df)
 
 
+"""
+시트 하나를 DataFrame 으로 로드하는 함수
+데이터 입력 화면에서 불러와 DataStore 'dataframes' 에 올라가 있는 시트(사용자 수정 포함)를 우선 사용하고,
+없으면 워크북 캐시에서 읽는다. 호출한 쪽에서 수정해도 되도록 복사본을 반환
+"""
+def load_sheet(file_path, sheet_name):
+    dfs = DataStore.get("dataframes", {})
+    key = f"{file_path}:{sheet_name}"
+    if key in dfs:
+        return dfs[key].copy()
+
+    return WorkbookCache.read(file_path, sheet_name=sheet_name)
+
+
 """숫자형 컬럼들을 반올림하여 정수로 변환"""
 def round_to_int(df):
     # DataFrame의 복사본 생성
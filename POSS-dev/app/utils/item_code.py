@@ -0,0 +1,89 @@
+import weakref
+import numpy as np
+import pandas as pd
+
+"""
+아이템 코드 분해 유틸리티
+아이템 코드(예: AAAP495W5ZJ825U5BB)를 고정 위치로 잘라 Project/Basic2/Tosite_group/RMC/Color 컬럼을 만든다
+"""
+
+# 컬럼 이름 : 아이템 코드에서 잘라낼 위치
+ITEM_CODE_FIELDS = {
+    'Project' : slice(3, 7),
+    'Basic2' : slice(3, 8),
+    'Tosite_group' : slice(7, 8),
+    'RMC' : slice(3, -3),
+    'Color' : slice(8, -4),
+}
+
+# id(DataFrame) -> (약한 참조, 분해할 때의 아이템 코드 배열, 분해한 컬럼 집합)
+_decoded = {}
+
+
+"""
+아이템 코드 시리즈를 분해하여 컬럼 이름별 Categorical 반환
+같은 아이템 코드가 여러 행에 반복되므로 고유 코드만 .str 로 자른 뒤 코드 번호로 펼친다.
+문자열이 아닌 아이템 코드(NaN 등)는 모든 컬럼이 NaN
+
+Args:
+    items (Series): 아이템 코드
+    fields (iterable): 만들 컬럼 이름. None 이면 ITEM_CODE_FIELDS 전체
+Returns:
+    {컬럼 이름: Categorical} 딕셔너리
+"""
+def split_item_codes(items, fields=None):
+    fields = list(ITEM_CODE_FIELDS) if fields is None else list(fields)
+
+    codes, uniques = pd.factorize(np.asarray(items, dtype=object), use_na_sentinel=True)
+    uniques = pd.Series(uniques, dtype=object)
+    uniques = uniques.where(uniques.map(lambda value: isinstance(value, str)))
+
+    decoded = {}
+    for field in fields:
+        part_codes, categories = pd.factorize(uniques.str[ITEM_CODE_FIELDS[field]])
+        # 고유 코드 기준 번호를 행 기준 번호로 펼침 (-1 은 NaN)
+        row_codes = np.where(codes >= 0, part_codes[codes], -1)
+        decoded[field] = pd.Categorical.from_codes(row_codes, categories=pd.Index(categories, dtype=object))
+    return decoded
+
+
+"""
+DataFrame 의 아이템 코드 컬럼을 분해하여 Project/Basic2/Tosite_group/RMC/Color 컬럼을 제자리에 추가
+같은 DataFrame 객체를 다시 넘기면 아이템 코드가 바뀌지 않았고 컬럼이 남아 있는 한 다시 계산하지 않는다
+
+Args:
+    df (DataFrame): 'Item' 컬럼을 가진 데이터프레임 (제자리에서 수정됨)
+    fields (iterable): 만들 컬럼 이름. None 이면 ITEM_CODE_FIELDS 전체
+    item_column (str): 아이템 코드 컬럼 이름
+Returns:
+    인자로 받은 df
+"""
+def decode_item_codes(df, fields=None, item_column='Item'):
+    fields = list(ITEM_CODE_FIELDS) if fields is None else list(fields)
+    if df is None or item_column not in df.columns:
+        return df
+
+    items = df[item_column].to_numpy(dtype=object)
+    key = id(df)
+    cached = _decoded.get(key)
+    if cached is not None:
+        ref, cached_items, cached_fields = cached
+        if (ref() is df and set(fields) <= cached_fields
+                and all(field in df.columns for field in fields)
+                and len(cached_items) == len(items) and cached_items.equals(pd.Index(items, dtype=object))):
+            return df
+
+    for field, values in split_item_codes(items, fields).items():
+        df[field] = pd.Series(values, index=df.index)
+
+    _decoded[key] = (weakref.ref(df, _forget), pd.Index(items.copy(), dtype=object), set(fields))
+    return df
+
+
+"""
+DataFrame 이 사라지면 캐시 항목도 함께 지운다 (같은 id 로 새로 등록된 항목은 남긴다)
+"""
+def _forget(ref):
+    for key, cached in list(_decoded.items()):
+        if cached[0] is ref:
+            del _decoded[key]
@@ -1,13 +1,100 @@
 """
 아이템 식별을 위한 유틸리티 함수들
 """
+import weakref
+import numpy as np
 import pandas as pd
-from typing import Dict, Any, Optional, Tuple
+from typing import Dict, Any, List, Optional, Tuple
+
+"""
+DataFrame 행 위치 인덱스
+_id -> 행 위치, (Line, Time, Item) -> 행 위치 집합을 들고 있어 마스크 생성 시 전체 컬럼 비교를 하지 않는다.
+DataFrame 을 수정하는 쪽(AssignmentModel)이 update_row/append_row 로 함께 갱신한다
+"""
+class ItemRowIndex:
+    def __init__(self, df: pd.DataFrame):
+        self.rebuild(df)
+
+    """
+    DataFrame 전체로 인덱스 재구성 (행 삭제 등으로 위치가 바뀐 경우)
+    """
+    def rebuild(self, df: pd.DataFrame):
+        self.size = len(df)
+        self.by_id = {}
+        self.by_key = {}
+
+        if '_id' in df.columns:
+            for pos, item_id in enumerate(df['_id']):
+                if isinstance(item_id, str) or pd.notna(item_id):
+                    self.by_id.setdefault(item_id, set()).add(pos)
+
+        if all(col in df.columns for col in ['Line', 'Time', 'Item']):
+            times = pd.to_numeric(df['Time'], errors='coerce')
+            for pos, key in enumerate(zip(df['Line'], times, df['Item'])):
+                key = self._key(*key)
+                if key is not None:
+                    self.by_key.setdefault(key, set()).add(pos)
+
+    """
+    행 위치 목록 (오름차순)
+    """
+    def positions_by_id(self, item_id) -> List[int]:
+        return sorted(self.by_id.get(item_id, ()))
+
+    def positions_for_item(self, line, time, item) -> List[int]:
+        # create_mask_for_item 과 같이 None 은 빈 문자열/0 으로 비교
+        key = self._key("" if line is None else line, 0 if time is None else time, "" if item is None else item)
+        return sorted(self.by_key.get(key, ())) if key is not None else []
+
+    """
+    pos 위치 행의 Line/Time/Item/_id 가 old_row 에서 new_row 로 바뀐 경우 갱신
+    """
+    def update_row(self, pos: int, old_row: Dict[str, Any], new_row: Dict[str, Any]):
+        self._discard(pos, old_row)
+        self._add(pos, new_row)
+
+    """
+    DataFrame 끝에 추가된 행 반영
+    """
+    def append_row(self, row: Dict[str, Any]):
+        self._add(self.size, row)
+        self.size += 1
+
+    def _add(self, pos, row):
+        item_id = row.get('_id')
+        if isinstance(item_id, str) or (item_id is not None and pd.notna(item_id)):
+            self.by_id.setdefault(item_id, set()).add(pos)
+        key = self._key(row.get('Line'), row.get('Time'), row.get('Item'))
+        if key is not None:
+            self.by_key.setdefault(key, set()).add(pos)
+
+    def _discard(self, pos, row):
+        for index, key in ((self.by_id, row.get('_id')),
+                           (self.by_key, self._key(row.get('Line'), row.get('Time'), row.get('Item')))):
+            positions = index.get(key) if key is not None else None
+            if positions is not None:
+                positions.discard(pos)
+                if not positions:
+                    del index[key]
+
+    """
+    create_mask_for_item 과 같은 비교 기준의 키 (Line/Item 은 문자열, Time 은 정수)
+    """
+    @staticmethod
+    def _key(line, time, item):
+        try:
+            time = int(time)
+        except (TypeError, ValueError):
+            return None
+        return str(line), time, str(item)
+
 
 """
 아이템 고유 키 관리 클래스
 """
 class ItemKeyManager:
+    # id(DataFrame) -> (약한 참조, ItemRowIndex)
+    _row_indexes = {}
     
     """
     아이템의 고유 키 생성
@@ -80,6 +167,11 @@ class ItemKeyManager:
         # DataFrame에 필요한 컬럼이 있는지 확인
         if not all(col in df.columns for col in ['Line', 'Time', 'Item']):
             return pd.Series(dtype=bool)
+
+        # 행 위치 인덱스가 연결된 DataFrame 이면 인덱스로 마스크 생성
+        row_index = ItemKeyManager.get_row_index(df)
+        if row_index is not None:
+            return ItemKeyManager._mask_from_positions(df, row_index.positions_for_item(line, time, item))
         
         # 타입 변환 보장
         line_str = str(line) if line is not None else ""
@@ -126,6 +218,10 @@ class ItemKeyManager:
     def create_mask_by_id(df: pd.DataFrame, item_id: str) -> pd.Series:
         if '_id' not in df.columns:
             return pd.Series(False, index=df.index)
+
+        row_index = ItemKeyManager.get_row_index(df)
+        if row_index is not None:
+            return ItemKeyManager._mask_from_positions(df, row_index.positions_by_id(item_id))
         
         return df['_id'] == item_id
     
@@ -143,9 +239,8 @@ class ItemKeyManager:
         if '_id' not in df.columns or not item_id:
             return pd.Series()
         
-        mask = df['_id'] == item_id
-        matching_rows = df[mask]
-        return matching_rows.iloc[0] if not matching_rows.empty else pd.Series()
+        positions = ItemKeyManager.find_rows_by_id(df, item_id)
+        return df.iloc[positions[0]] if positions else pd.Series()
     
 
     """
@@ -188,4 +283,67 @@ class ItemKeyManager:
                 )
         else:
             # 개별 파라미터가 전달된 경우
-            return ItemKeyManager.get_item_by_not_id(item_info_or_line, time, item)
\ No newline at end of file
+            return ItemKeyManager.get_item_by_not_id(item_info_or_line, time, item)
+
+
+    """
+    DataFrame 에 행 위치 인덱스 연결
+    연결된 DataFrame 은 create_mask_by_id / create_mask_for_item / find_rows_* 가 인덱스를 사용한다.
+    DataFrame 을 수정하는 쪽이 인덱스를 함께 갱신해야 한다 (행 수가 달라지면 인덱스를 쓰지 않음)
+    Args:
+        df: 대상 DataFrame
+        row_index: 이미 갱신해둔 인덱스 (없으면 새로 만듦)
+    Returns:
+        ItemRowIndex
+    """
+    @staticmethod
+    def attach_row_index(df: pd.DataFrame, row_index: Optional[ItemRowIndex] = None) -> ItemRowIndex:
+        if row_index is None:
+            row_index = ItemRowIndex(df)
+        ItemKeyManager._row_indexes[id(df)] = (weakref.ref(df, ItemKeyManager._forget_row_index), row_index)
+        return row_index
+
+    """
+    DataFrame 에 연결된 행 위치 인덱스 (없거나 행 수가 맞지 않으면 None)
+    """
+    @staticmethod
+    def get_row_index(df: pd.DataFrame) -> Optional[ItemRowIndex]:
+        entry = ItemKeyManager._row_indexes.get(id(df))
+        if entry is None:
+            return None
+        ref, row_index = entry
+        if ref() is not df or row_index.size != len(df):
+            return None
+        return row_index
+
+    """
+    아이템 ID / Line-Time-Item 에 해당하는 행 위치 목록 (iloc 용)
+    """
+    @staticmethod
+    def find_rows_by_id(df: pd.DataFrame, item_id: str) -> List[int]:
+        row_index = ItemKeyManager.get_row_index(df)
+        if row_index is not None:
+            return row_index.positions_by_id(item_id)
+        if '_id' not in df.columns or not item_id:
+            return []
+        return np.flatnonzero((df['_id'] == item_id).to_numpy()).tolist()
+
+    @staticmethod
+    def find_rows_for_item(df: pd.DataFrame, line: Any, time: Any, item: Any) -> List[int]:
+        row_index = ItemKeyManager.get_row_index(df)
+        if row_index is not None:
+            return row_index.positions_for_item(line, time, item)
+        mask = ItemKeyManager.create_mask_for_item(df, line, time, item)
+        return np.flatnonzero(mask.to_numpy(dtype=bool)).tolist() if len(mask) else []
+
+    @staticmethod
+    def _mask_from_positions(df, positions):
+        mask = np.zeros(len(df), dtype=bool)
+        mask[positions] = True
+        return pd.Series(mask, index=df.index)
+
+    @staticmethod
+    def _forget_row_index(ref):
+        for key, entry in list(ItemKeyManager._row_indexes.items()):
+            if entry[0] is ref:
+                del ItemKeyManager._row_indexes[key]
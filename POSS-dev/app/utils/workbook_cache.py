@@ -0,0 +1,194 @@
+import hashlib
+import os
+import pickle
+import threading
+import pandas as pd
+
+"""
+엑셀/CSV 입력 파일 캐시
+파일 경로, 수정 시각, 크기가 같으면 시트를 다시 파싱하지 않고 메모리(또는 로컬 피클 캐시)에서 돌려준다.
+워크북은 처음 한 번만 전체 시트를 파싱하고, 시트별로 data/cache/workbooks 아래에 피클로 저장한다.
+프로그램을 다시 켜도 바뀌지 않은 파일은 엑셀 파싱 없이 피클만 읽는다
+"""
+class WorkbookCache:
+    _cache_dir = os.path.join('data', 'cache', 'workbooks')
+
+    # (절대경로, 수정시각 ns, 크기) -> {'sheets': [시트 이름], 'frames': {(시트, 후처리 이름): DataFrame}}
+    _workbooks = {}
+    _lock = threading.RLock()
+
+    """
+    pd.read_excel 과 같은 sheet_name 규칙으로 시트 로드
+
+    Args:
+        file_path (str): 엑셀(.xlsx/.xls/.xlsm) 또는 CSV 파일 경로
+        sheet_name: None 이면 모든 시트 딕셔너리, 리스트면 해당 시트 딕셔너리, 문자열/정수면 단일 DataFrame
+        postprocess (function): DataFrame 을 받아 DataFrame 을 돌려주는 후처리 함수. 결과도 함수 이름별로 캐시됨
+    Returns:
+        DataFrame 또는 {시트 이름: DataFrame}. 호출한 쪽에서 수정해도 캐시에 영향이 없도록 복사본을 반환
+    """
+    @classmethod
+    def read(cls, file_path, sheet_name=0, postprocess=None):
+        with cls._lock:
+            stamp, workbook = cls._workbook(file_path)
+
+            if sheet_name is None:
+                names = list(workbook['sheets'])
+            elif isinstance(sheet_name, list):
+                names = [cls._sheet_key(workbook, name) for name in sheet_name]
+            else:
+                return cls._frame(stamp, workbook, cls._sheet_key(workbook, sheet_name), postprocess).copy()
+
+            return {name: cls._frame(stamp, workbook, name, postprocess).copy() for name in names}
+
+    """
+    시트 이름 목록 (CSV 는 ['Sheet1'])
+    """
+    @classmethod
+    def sheet_names(cls, file_path):
+        with cls._lock:
+            return list(cls._workbook(file_path)[1]['sheets'])
+
+    """
+    파일 상태 (절대경로, 수정시각 ns, 크기). 파일 내용에 따라 다시 계산할 결과의 캐시 키로 사용
+    """
+    @staticmethod
+    def stamp(file_path):
+        stat = os.stat(file_path)
+        return os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size
+
+    """
+    메모리 캐시 비우기. file_path 를 주면 해당 파일만 비운다 (로컬 피클 캐시는 수정 시각으로 구분되므로 그대로 둔다)
+    """
+    @classmethod
+    def invalidate(cls, file_path=None):
+        with cls._lock:
+            if file_path is None:
+                cls._workbooks.clear()
+                return
+            path = os.path.abspath(file_path)
+            for stamp in [stamp for stamp in cls._workbooks if stamp[0] == path]:
+                del cls._workbooks[stamp]
+
+    """
+    파일 상태(경로, 수정시각, 크기)에 해당하는 워크북 항목 반환. 없으면 피클 캐시 또는 원본 파일에서 만든다
+    """
+    @classmethod
+    def _workbook(cls, file_path):
+        stamp = cls.stamp(file_path)
+
+        workbook = cls._workbooks.get(stamp)
+        if workbook is not None:
+            return stamp, workbook
+
+        # 같은 파일의 이전 버전은 메모리에서 제거
+        cls.invalidate(file_path)
+
+        sheets = cls._read_pickle(cls._cache_path(stamp, None))
+        if sheets is not None:
+            workbook = {'sheets': sheets, 'frames': {}}
+        else:
+            frames = cls._parse(file_path)
+            workbook = {'sheets': list(frames), 'frames': {(name, None): df for name, df in frames.items()}}
+            cls._store(stamp, frames)
+
+        cls._workbooks[stamp] = workbook
+        return stamp, workbook
+
+    """
+    시트 DataFrame 반환 (메모리 -> 피클 캐시 순서로 찾고, 후처리 결과도 메모리에 보관)
+    """
+    @classmethod
+    def _frame(cls, stamp, workbook, name, postprocess):
+        variant = getattr(postprocess, '__name__', None) if postprocess else None
+        df = workbook['frames'].get((name, variant))
+        if df is not None:
+            return df
+
+        df = workbook['frames'].get((name, None))
+        if df is None:
+            df = cls._read_pickle(cls._cache_path(stamp, name))
+            if df is None:
+                # 피클이 지워졌거나 손상된 경우 원본을 다시 파싱
+                frames = cls._parse(stamp[0])
+                cls._store(stamp, frames)
+                df = frames[name]
+            workbook['frames'][(name, None)] = df
+
+        if postprocess:
+            df = postprocess(df)
+            workbook['frames'][(name, variant)] = df
+        return df
+
+    """
+    원본 파일 파싱 -> {시트 이름: DataFrame}
+    """
+    @staticmethod
+    def _parse(file_path):
+        if os.path.splitext(file_path)[1].lower() == '.csv':
+            return {'Sheet1': pd.read_csv(file_path)}
+        return pd.read_excel(file_path, sheet_name=None)
+
+    """
+    정수 시트 번호를 시트 이름으로 변환하고, 없는 시트면 pd.read_excel 과 같이 ValueError
+    """
+    @staticmethod
+    def _sheet_key(workbook, sheet_name):
+        sheets = workbook['sheets']
+        if isinstance(sheet_name, int) and sheet_name not in sheets:
+            if 0 <= sheet_name < len(sheets):
+                return sheets[sheet_name]
+            raise ValueError(f"Worksheet index {sheet_name} is invalid, {len(sheets)} worksheets found")
+        if sheet_name not in sheets:
+            raise ValueError(f"Worksheet named '{sheet_name}' not found")
+        return sheet_name
+
+    """
+    피클 캐시 파일 경로. 파일 경로 해시를 접두어로 써서 이전 버전을 찾아 지울 수 있게 한다
+    sheet 가 None 이면 시트 이름 목록 파일
+    """
+    @classmethod
+    def _cache_path(cls, stamp, sheet):
+        path_hash = hashlib.sha1(stamp[0].encode('utf-8')).hexdigest()[:16]
+        entry = hashlib.sha1(repr((stamp[1], stamp[2], sheet)).encode('utf-8')).hexdigest()[:16]
+        return os.path.join(cls._cache_dir, f"{path_hash}_{entry}.pkl")
+
+    """
+    시트별 피클과 시트 이름 목록 저장. 같은 파일의 이전 버전 피클은 삭제
+    """
+    @classmethod
+    def _store(cls, stamp, frames):
+        try:
+            os.makedirs(cls._cache_dir, exist_ok=True)
+
+            current = {os.path.basename(cls._cache_path(stamp, name)) for name in frames}
+            current.add(os.path.basename(cls._cache_path(stamp, None)))
+            prefix = os.path.basename(cls._cache_path(stamp, None)).split('_')[0] + '_'
+            for file_name in os.listdir(cls._cache_dir):
+                if file_name.startswith(prefix) and file_name not in current:
+                    os.remove(os.path.join(cls._cache_dir, file_name))
+
+            for name, df in frames.items():
+                cls._write_pickle(cls._cache_path(stamp, name), df)
+            # 시트 목록은 마지막에 저장해서 목록이 있으면 시트 피클도 모두 있도록 한다
+            cls._write_pickle(cls._cache_path(stamp, None), list(frames))
+        except Exception as e:
+            print(f"워크북 캐시 저장 중 오류 발생: {e}")
+
+    @staticmethod
+    def _write_pickle(path, obj):
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'wb') as f:
+            pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)
+
+    @staticmethod
+    def _read_pickle(path):
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+        except Exception as e:
+            print(f"워크북 캐시 로드 중 오류 발생: {e}")
+            return None
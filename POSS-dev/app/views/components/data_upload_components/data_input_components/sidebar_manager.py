@@ -3,6 +3,7 @@ import pandas as pd
 from PyQt5.QtCore import Qt
 
 from app.views.components.data_upload_components.data_table_component import DataTableComponent
+from app.utils.workbook_cache import WorkbookCache
 
 """
 사이드바 관리를 위한 클래스
@@ -23,8 +24,7 @@ class SidebarManager:
             # 엑셀 파일인 경우 시트 목록 가져오기
             sheet_names = None
             if file_ext in ['.xls', '.xlsx']:
-                excel = pd.ExcelFile(file_path)
-                sheet_names = excel.sheet_names
+                sheet_names = WorkbookCache.sheet_names(file_path)
 
                 # 모든 시트 로드하여 저장
                 from app.models.common.file_store import DataStore
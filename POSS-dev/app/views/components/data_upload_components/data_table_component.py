@@ -3,6 +3,7 @@ from PyQt5.QtCore import Qt, QTimer
 import pandas as pd
 
 from app.utils.command.undo_command import undo_redo_manager, DataCommand
+from app.utils.workbook_cache import WorkbookCache
 
 
 class DataTableComponent:
@@ -201,10 +202,10 @@ class DataTableComponent:
 
         if file_ext == '.csv':
             # CSV 파일 로드
-            return pd.read_csv(file_path, encoding='utf-8')
+            return WorkbookCache.read(file_path)
         elif file_ext in ['.xls', '.xlsx']:
             # 엑셀 파일 로드 (시트명 지정 가능)
-            return pd.read_excel(file_path, sheet_name=sheet_name)
+            return WorkbookCache.read(file_path, sheet_name=sheet_name)
         else:
             raise ValueError("지원하지 않는 파일 형식입니다")
         
@@ -17,127 +17,132 @@ class OptimizationWorker(QThread):
     status_updated = pyqtSignal(str)  # 상태 메시지 업데이트 시그널
     optimization_finished = pyqtSignal(dict)  # 최적화 완료 시그널 (결과 포함)
     error_occurred = pyqtSignal(str)  # 오류 발생 시그널
+    solver_progress = pyqtSignal(dict)  # 솔버 통계(현재 해, bound, 갭, 경과시간) 시그널
+    optimization_cancelled = pyqtSignal()  # 취소되어 돌려줄 해가 없을 때 시그널
+
+    # 단계별 진행률 구간
+    PROGRESS_PREPARE = 10  # 입력 데이터프레임 정리 완료
+    PROGRESS_PREPARED = 20  # 최적화 데이터 준비 완료
+    PROGRESS_BUILT = 40  # 모델 구성 완료. 여기서부터 풀이 구간
+    PROGRESS_SOLVED = 90  # 풀이 완료
 
     def __init__(self, data_input_page, parent=None):
         super().__init__(parent)
         self.data_input_page = data_input_page
         self.is_cancelled = False
-        self.optimization_engine = None
+        self.is_stopped = False
+        self.optimization_process = None
+        self._progress = 0
 
     def run(self):
+        """
+        데이터 정리 후 최적화를 별도 프로세스에서 실행하고,
+        프로세스가 보내는 단계 이벤트(데이터 준비, 모델 구성, 풀이)로 실제 진행률을 표시
+        """
         try:
-            # UI 업데이트 처리를 위한 imports
-            from PyQt5.QtWidgets import QApplication
-            import time
-
-            # 진행 상황 초기화 - 0%부터 시작
+            self._progress = 0
             self.progress_updated.emit(0)
-            self.status_updated.emit("Initializing optimization...")
-            QApplication.processEvents()
-            time.sleep(0.1)  # UI가 업데이트될 시간을 줌
-
-            # 더 세분화된 진행률로 시작
-            for i in range(1, 5):
-                self.progress_updated.emit(i * 2)
-                QApplication.processEvents()
-                time.sleep(0.05)
-
-            # 데이터프레임 준비 (초기 10% 진행)
             self.status_updated.emit("Preparing the dataframe...")
-            self.progress_updated.emit(10)
-            QApplication.processEvents()
 
             self.data_input_page.prepare_dataframes_for_optimization()
-
-            # 데이터프레임 준비 후 진행률 업데이트
-            for i in range(6, 10):
-                self.progress_updated.emit(i * 2)
-                QApplication.processEvents()
-                time.sleep(0.05)
+            self._emit_progress(self.PROGRESS_PREPARE)
 
             if self.is_cancelled:
+                self.optimization_cancelled.emit()
                 return
 
-            # 최적화 엔진 초기화 (약 20% 진행)
-            self.status_updated.emit("Initializing the optimization engine...")
-            self.progress_updated.emit(20)
-            QApplication.processEvents()
-
-            from app.core.optimization import Optimization
+            from app.core.optimization_process import OptimizationProcess
             from app.models.common.file_store import DataStore
 
-            # 엔진 초기화 중간 진행률 업데이트
-            for i in range(11, 15):
-                self.progress_updated.emit(i * 2)
-                QApplication.processEvents()
-                time.sleep(0.05)
-
             all_dataframes = DataStore.get("organized_dataframes", {})
+            self.optimization_process = OptimizationProcess(all_dataframes, method='pre_assign')
+            self.optimization_process.start()
 
-            # 데이터프레임 로드 후 진행률 업데이트
-            for i in range(15, 20):
-                self.progress_updated.emit(i * 2)
-                QApplication.processEvents()
-                time.sleep(0.05)
-
-            self.optimization_engine = Optimization(all_dataframes)
-
-            if self.is_cancelled:
+            # 시작 직전에 stop() 된 경우
+            if self.is_stopped:
+                self.optimization_process.terminate()
                 return
 
-            # 모델 정의 및 제약 조건 설정 (약 40% 진행)
-            self.status_updated.emit("Building the optimization model...")
-            self.progress_updated.emit(40)
-            QApplication.processEvents()
-
-            # 모델 설정 진행률 세분화
-            for i in range(21, 30):
-                self.progress_updated.emit(i * 2)
-                QApplication.processEvents()
-                time.sleep(0.05)
-
-            if self.is_cancelled:
-                return
-
-            # 최적화 실행 (약 60% 진행)
-            self.status_updated.emit("Running the optimization model...")
-            self.progress_updated.emit(60)
-            QApplication.processEvents()
-
-            # 최적화 진행 중 단계적 업데이트
-            for i in range(31, 35):
-                self.progress_updated.emit(i * 2)
-                QApplication.processEvents()
-                time.sleep(0.05)
-
-            # 최적화 실행
-            result = self.optimization_engine.pre_assign()
-
-            # 결과 처리 중 진행률 업데이트
-            self.status_updated.emit("Processing optimization results...")
-            for i in range(70, 95, 5):
-                self.progress_updated.emit(i)
-                QApplication.processEvents()
-                time.sleep(0.05)
-
-            if self.is_cancelled:
-                return
-
-            # 완료 및 결과 반환
-            self.status_updated.emit("Optimization complete! Please wait a moment...")
-            self.progress_updated.emit(100)
-            QApplication.processEvents()
-            time.sleep(0.2)  # 완료 상태 표시를 위한 약간의 지연
-
-            self.optimization_finished.emit(result)
+            for event in self.optimization_process.iter_events():
+                # 프로세스 시작 전에 취소된 경우
+                if self.is_cancelled and not self.optimization_process.is_cancelled():
+                    self.optimization_process.cancel()
+                if self._handle_event(event):
+                    return
 
         except Exception as e:
             import traceback
             traceback.print_exc()
             self.error_occurred.emit(str(e))
 
+    def _handle_event(self, event):
+        """최적화 프로세스 이벤트 처리. 끝났으면 True"""
+        phase = event.get('phase')
+        if phase == 'prepare':
+            self.status_updated.emit("Preparing optimization data...")
+        elif phase == 'prepared':
+            self.status_updated.emit(f"Optimization data ready ({event['elapsed']:.1f}s)")
+            self._emit_progress(self.PROGRESS_PREPARED)
+        elif phase == 'build':
+            self.status_updated.emit(
+                f"Model built: {event['variables']:,} variables, {event['constraints']:,} constraints. Solving...")
+            self._emit_progress(self.PROGRESS_BUILT)
+        elif phase == 'solve':
+            self.solver_progress.emit(event)
+            time_limit = event.get('time_limit')
+            if event.get('finished'):
+                self._emit_progress(self.PROGRESS_SOLVED)
+            elif time_limit:
+                span = self.PROGRESS_SOLVED - self.PROGRESS_BUILT
+                self._emit_progress(self.PROGRESS_BUILT + int(span * min(1.0, event.get('elapsed', 0) / time_limit)))
+        elif phase == 'error':
+            if event.get('traceback'):
+                print(event['traceback'])
+            self.error_occurred.emit(event.get('message', 'Unknown error'))
+            return True
+        elif phase == 'done':
+            result = event.get('result')
+            has_result = bool(result) and result.get('result') is not None and not result['result'].empty
+            if event.get('cancelled') and not has_result:
+                self.optimization_cancelled.emit()
+                return True
+            result = dict(result or {})
+            result['cancelled'] = bool(event.get('cancelled'))
+            result['timings'] = event.get('timings', {})
+            result['solver_stats'] = event.get('solver_stats', {})
+            self._emit_progress(100)
+            if result['cancelled']:
+                self.status_updated.emit("Optimization stopped. Using the best solution found so far.")
+            else:
+                self.status_updated.emit("Optimization complete! Please wait a moment...")
+            self.optimization_finished.emit(result)
+            return True
+        return False
+
+    def _emit_progress(self, value):
+        # 진행률은 뒤로 가지 않도록
+        if value > self._progress:
+            self._progress = value
+            self.progress_updated.emit(value)
+
     def cancel(self):
+        """
+        취소 요청. 풀이 중이면 솔버를 중단시키고 그때까지 찾은 가장 좋은 해를 결과로 받는다
+        """
+        self.is_cancelled = True
+        if self.optimization_process is not None:
+            self.optimization_process.cancel()
+
+    def stop(self):
+        """
+        즉시 중단 (다이얼로그를 닫을 때). 결과를 기다리지 않고 최적화 프로세스를 종료한다
+        """
         self.is_cancelled = True
+        self.is_stopped = True
+        process = self.optimization_process
+        if process is not None:
+            process.cancel()
+            process.terminate()
 
 
 class OptimizationProgressDialog(QDialog):
@@ -391,9 +396,10 @@ class OptimizationProgressDialog(QDialog):
         self.worker.status_updated.connect(self.update_status)
         self.worker.optimization_finished.connect(self.on_optimization_finished)
         self.worker.error_occurred.connect(self.on_error_occurred)
+        self.worker.solver_progress.connect(self.update_solver_stats)
+        self.worker.optimization_cancelled.connect(self.on_optimization_cancelled)
 
-        # UI가 업데이트될 시간을 주기 위해 약간의 지연 후 작업 시작
-        QTimer.singleShot(200, self.worker.start)
+        self.worker.start()
         self.log_message("Starting the optimization process.")
 
     def update_progress(self, value):
@@ -454,6 +460,21 @@ class OptimizationProgressDialog(QDialog):
         # UI 업데이트 강제 실행
         QApplication.processEvents()
 
+    def update_solver_stats(self, stats):
+        """솔버 통계 표시 (현재 해, bound, 갭)"""
+        incumbent = stats.get('incumbent')
+        bound = stats.get('bound')
+        gap = stats.get('gap')
+        message = (f"[{stats.get('name', '')}] {stats.get('solver', '')} "
+                   f"incumbent: {'-' if incumbent is None else f'{incumbent:,.0f}'}, "
+                   f"bound: {'-' if bound is None else f'{bound:,.2f}'}, "
+                   f"gap: {'-' if gap is None else f'{gap:.2%}'}, "
+                   f"{stats.get('elapsed', 0):.1f}s")
+        if stats.get('finished'):
+            message += f" ({stats.get('status')})"
+        self.time_label.setText(message)
+        self.log_message(message)
+
     def log_message(self, message):
         """로그에 메시지 추가"""
         current_time = QTime.currentTime().toString("hh:mm:ss.zzz")
@@ -469,9 +490,15 @@ class OptimizationProgressDialog(QDialog):
     def on_optimization_finished(self, result):
         """최적화 완료 처리"""
         self.update_progress(100)
-        self.status_label.setText("Optimization is complete.")
+        if result.get('cancelled'):
+            self.status_label.setText("Optimization stopped. Using the best solution found so far.")
+        else:
+            self.status_label.setText("Optimization is complete.")
         self.time_label.setText("Complete! Please wait a moment.")
         self.cancel_button.setText("Cancel")
+        for name, timing in result.get('timings', {}).items():
+            self.log_message(f"{name}: build {timing['build']:.2f}s, solve {timing['solve']:.2f}s "
+                             f"({timing['variables']:,} variables, {timing['constraints']:,} constraints)")
         self.log_message("Optimization is complete. Please wait a moment.")
 
         # UI 업데이트 강제 실행
@@ -503,39 +530,39 @@ class OptimizationProgressDialog(QDialog):
         self.optimization_cancelled.emit()
 
     def cancel_optimization(self):
-        """최적화 취소"""
+        """최적화 취소. 솔버를 중단시키고 결과(또는 취소 완료) 시그널을 기다린다"""
         if self.worker and self.worker.isRunning():
             self.worker.cancel()
-            self.worker.wait()  # 스레드가 종료될 때까지 기다림
-
-            # 취소 메시지 표시
-            self.status_label.setText("The optimization has been canceled.")
-            self.cancel_button.setText("Cancel")
-            self.log_message("The optimization was canceled by the user.")
-
-            # UI 업데이트 강제 실행
-            QApplication.processEvents()
 
-            # 취소 시그널 발생
-            self.optimization_cancelled.emit()
-            self.reject()
+            self.status_label.setText("Stopping the optimization...")
+            self.cancel_button.setEnabled(False)
+            self.log_message("Cancel requested. Stopping the solver and keeping the best solution found so far.")
         else:
             self.accept()
 
+    def on_optimization_cancelled(self):
+        """취소되어 돌려받을 해가 없는 경우"""
+        self.status_label.setText("The optimization has been canceled.")
+        self.cancel_button.setText("Cancel")
+        self.log_message("The optimization was canceled by the user.")
+
+        # 취소 시그널 발생
+        self.optimization_cancelled.emit()
+
+        QTimer.singleShot(800, self.reject)
+
     def closeEvent(self, event):
-        """다이얼로그 닫기 이벤트 처리"""
-        if self.worker and self.worker.isRunning():
-            self.worker.cancel()
-            self.worker.wait()  # 스레드가 종료될 때까지 기다림
+        """다이얼로그 닫기 이벤트 처리. 실행 중인 최적화 프로세스를 종료하고 작업자 스레드가 끝날 때까지 기다린다"""
+        worker = self.worker
+        if worker and worker.isRunning():
+            # 닫힌 다이얼로그로 시그널이 오지 않도록 먼저 연결 해제
+            for signal in (worker.progress_updated, worker.status_updated, worker.optimization_finished,
+                           worker.error_occurred, worker.solver_progress, worker.optimization_cancelled):
+                try:
+                    signal.disconnect()
+                except TypeError:
+                    pass
+            worker.stop()
+            worker.wait()
             self.optimization_cancelled.emit()
         event.accept()
-
-    def keyPressEvent(self, event):
-        """키 이벤트 처리 - ESC 키 처리"""
-        if event.key() == Qt.Key_Escape:
-            if self.worker and self.worker.isRunning():
-                self.cancel_optimization()
-            else:
-                super().keyPressEvent(event)
-        else:
-            super().keyPressEvent(event)
\ No newline at end of file
@@ -1,20 +1,42 @@
+import time
 import pandas as pd
 from app.analysis.output.kpi_score import KpiScore
 from app.analysis.output.material_shortage_analysis import MaterialShortageAnalyzer
 from app.analysis.output.daily_capa_utilization import CapaUtilization
 from app.analysis.output.capa_ratio import CapaRatioAnalyzer
+from app.analysis.output.capacity_profile import CapacityProfile
+from app.analysis.output.incremental_analysis import IncrementalAnalysisEngine
+from app.views.components.result_components.manager.analysis_scheduler import AnalysisScheduler
 from app.models.common.file_store import DataStore
 
 """
 모든 분석을 담당하는 클래스
 """
 class AnalysisManager:
+    # 결과 위젯이 계산하는 분석 -> ResultPage 위젯 속성 이름 (계산은 compute_analysis, 화면 반영은 apply_analysis)
+    WIDGET_ANALYSES = {
+        'shipment': 'shipment_widget',
+        'plan_maintenance': 'plan_maintenance_widget',
+        'split_allocation': 'split_allocation_widget',
+        'summary': 'summary_widget',
+        'portcapa': 'portcapa_widget',
+    }
     
     def __init__(self, result_page, controller=None):
         self.result_page = result_page
         self.controller = controller
         self.engines = self._initialize_engines()
 
+        # 증분 분석: 분석별로 의존하는 집계 단위를 등록 (자재 결과를 KPI 가 쓰므로 자재가 먼저)
+        self.incremental = IncrementalAnalysisEngine()
+        self._register_incremental_analyses()
+        self._baselines = {}  # 원본 계획 기준 분석 결과 (원본이 바뀌는 전체 재분석 때만 다시 계산)
+        self._day_capacity = None  # 요일별 생산 가능량 캐시
+        self._has_adjustments = False
+
+        # 계획 수정 후 분석은 작업 스레드에서 병렬 실행
+        self.scheduler = AnalysisScheduler()
+
     """
     모든 분석 엔진을 Controller에서 초기화
     """
@@ -52,50 +74,263 @@ class AnalysisManager:
     
 
     """
-    모든 분석의 단일 진입점
+    증분 분석 엔진에 분석 등록
+    depends_on: 해당 집계 단위의 값이 바뀐 경우에만 다시 실행 (incremental_analysis.PLAN_SCOPES)
+    분석은 모델 대신 전달받은 df(현재 데이터 사본)와 original_df(원본 계획 사본)만 읽는다
+    """
+    def _register_incremental_analyses(self):
+        engine = self.incremental
+
+        # 1. 자재 분석 - 아이템별/시프트별 수량
+        engine.register('material', lambda df, aggregates, affected, original_df: self._run_material_analysis(df),
+                        depends_on=('item_shift',))
+
+        # 2. KPI 분석 - 자재 점수(아이템*시프트), SOP 점수(Due_LT 내 수량), 가동률 점수(시프트)
+        engine.register('kpi', self._update_kpi_analysis, depends_on=('item_shift', 'due_demand'),
+                        requires=('material',))
+
+        # 3. 출하 분석 - 라인/시프트/아이템 위치까지 결과에 포함
+        engine.register('shipment', lambda df, aggregates, affected, original_df: self._run_shipment_analysis(df),
+                        depends_on=('cell',))
+
+        # 4. 가동률 분석 - 시프트별 수량
+        engine.register('utilization', self._update_utilization_analysis, depends_on=('shift',))
+
+        # 5. 제조동 비율 분석 - 제조동별 수량
+        engine.register('capa_ratio', self._update_capa_analysis, depends_on=('building',))
+
+        # 6. 계획 유지율 분석 - 라인*시프트*아이템
+        engine.register('plan_maintenance', lambda df, aggregates, affected, original_df: self._run_plan_maintenance_analysis(df),
+                        depends_on=('cell',))
+
+        # 7. 분산 배치 분석 - 아이템별 라인
+        engine.register('split_allocation', lambda df, aggregates, affected, original_df: self._run_split_allocation_analysis(df),
+                        depends_on=('item_line',))
+
+        # 8. PortCapa 분석 - 수요/마스터 데이터만 사용하므로 계획 수정과 무관
+        engine.register('portcapa', lambda df, aggregates, affected, original_df: self._run_portcapa_analysis(df))
+
+        # 9. 요약 분석 - 라인*시프트 가동률, 제조동 비율
+        engine.register('summary', lambda df, aggregates, affected, original_df: self._run_summary_analysis(df),
+                        depends_on=('line_shift', 'building'))
+
+    """
+    모든 분석의 단일 진입점 (전체 재분석)
+    작업 스레드와 같은 분석 엔진을 쓰므로 실행 중인 병렬 분석이 끝나길 기다린 뒤 잠금을 잡고 실행
     """
     def run_all_analyses(self, df):
         print("AnalysisManager: 분석 시작")
         
-        if df is None or df.empty:
-            return self._get_empty_results()
-        
-        results = {}
-        
-        # 1. KPI 분석
-        results['kpi'] = self._run_kpi_analysis(df)
-        
-        # 2. 자재 분석
-        results['material'] = self._run_material_analysis(df)
-        
-        # 3. 출하 분석
-        results['shipment'] = self._run_shipment_analysis(df)
-        
-        # 4. 가동률 분석
-        results['utilization'] = self._run_utilization_analysis(df)
-        
-        # 5. 제조동 비율 분석
-        results['capa_ratio'] = self._run_capa_analysis(df)
-        
-        # 6. 계획 유지율 분석
-        results['plan_maintenance'] = self._run_plan_maintenance_analysis(df)
-        
-        # 7. 분산 배치 분석
-        results['split_allocation'] = self._run_split_allocation_analysis(df)
+        with self.scheduler.exclusive():
+            self._reset_analyses()
 
-        # 8. PortCapa 분석 추가
-        results['portcapa'] = self._run_portcapa_analysis(df)
-        
-        # 9. 요약 분석
-        results['summary'] = self._run_summary_analysis(df)
+            if df is None or df.empty:
+                return self._get_empty_results()
+
+            self._has_adjustments = self._check_for_adjustments()
+            results = self.incremental.run(df, original_df=self._get_original_df())
+        self._apply_widget_results(results)
         
         print("AnalysisManager: 모든 분석 완료")
         return results
+
+    """
+    계획 수정 후 증분 분석
+    changes: AssignmentModel.take_changes() 결과. None 이면 전체 재분석
+    """
+    def run_incremental_analyses(self, df, changes):
+        if changes is None or df is None or df.empty:
+            return self.run_all_analyses(df)
+
+        with self.scheduler.exclusive():
+            self._has_adjustments = self._check_for_adjustments()
+            results = self.incremental.run(df, changes, self._get_original_df())
+        self._apply_widget_results(results)
+
+        elapsed = sum(self.incremental.timings.get(name, 0) for name in self.incremental.last_run)
+        print(f"AnalysisManager: 증분 분석 완료 - 재실행 {self.incremental.last_run} ({elapsed * 1000:.1f}ms)")
+        return results
+
+    """
+    계획 수정 후 증분 분석을 작업 스레드에서 병렬 실행 (바로 반환)
+    서로 독립적인 분석은 동시에 실행되고, 끝난 분석부터 UI 스레드에서 위젯에 반영한 뒤 on_result 로 알린다.
+    진행 중에 다시 호출하면 이전 실행의 남은 결과는 버리고, 끝나지 않은 분석은 새 실행에 포함된다
+
+    Args:
+        df (DataFrame): 현재 결과 데이터 (작업 스레드에는 원본 계획과 함께 복사본을 넘긴다)
+        changes (list): AssignmentModel.take_changes() 결과. None 이면 전체 재분석
+        on_result (function): on_result(분석 이름, 결과) - 분석 하나가 반영될 때마다 호출
+        on_finished (function): on_finished(전체 결과 딕셔너리) - 모든 분석이 끝나면 호출
+    """
+    def start_incremental_analyses(self, df, changes, on_result=None, on_finished=None):
+        self.scheduler.cancel()
+        if df is None or df.empty:
+            results = self.run_all_analyses(df)
+            if on_finished:
+                on_finished(results)
+            return
+
+        if changes is None:
+            # 이전 실행의 작업이 초기화된 상태(기준 결과, KPI 캐시)에 쓰지 않도록 끝나길 기다린 뒤 초기화
+            with self.scheduler.exclusive():
+                self._reset_analyses()
+
+        self._has_adjustments = self._check_for_adjustments()
+        # 작업 스레드가 모델을 읽지 않도록 UI 스레드에서 현재/원본 데이터를 복사해 넘긴다
+        snapshot = df.copy()
+        original_snapshot = self._get_original_df()
+        names, affected = self.incremental.plan(snapshot, changes)
+        started = time.perf_counter()
+
+        def compute(name):
+            return lambda: self.incremental.compute(name, snapshot, affected, original_snapshot)
+
+        def handle_result(name, result, elapsed):
+            self.incremental.record(name, result, elapsed)
+            self._apply_widget_result(name, result)
+            if on_result:
+                on_result(name, result)
+
+        def handle_finished():
+            total = time.perf_counter() - started
+            print(f"AnalysisManager: 병렬 분석 완료 - 재실행 {self.incremental.last_run} ({total * 1000:.1f}ms)")
+            if on_finished:
+                on_finished(dict(self.incremental.results))
+
+        self.scheduler.start([(name, compute(name), self.incremental.requires(name)) for name in names],
+                             handle_result, handle_finished)
+
+    """
+    전체 재분석을 위한 상태 초기화 (scheduler.exclusive() 안에서 호출)
+    """
+    def _reset_analyses(self):
+        self.incremental.reset()
+        self._baselines = {}
+        self._day_capacity = None
+        if self.engines.get('kpi'):
+            self.engines['kpi'].reset_cache()
+
+    """
+    실행 중인 분석 취소 및 작업 스레드 정리 (화면 종료 시)
+    """
+    def shutdown(self):
+        self.scheduler.shutdown()
+
+    """
+    분석된 결과 중 마지막 실행에서 다시 계산된 분석 이름 목록
+    """
+    def last_updated(self):
+        return list(self.incremental.last_run)
+
+    """
+    KPI 증분 분석
+    Base 점수는 원본 계획 기준이므로 전체 재분석 때 계산한 값을 유지하고,
+    Adjust 점수는 결과 데이터프레임 대신 집계값으로 계산
+    """
+    def _update_kpi_analysis(self, df, aggregates, affected, original_df):
+        previous = self.incremental.results.get('kpi')
+        kpi_engine = self.engines.get('kpi')
+        if affected is None or not previous or not kpi_engine:
+            return self._run_kpi_analysis(df, original_df)
+
+        if not self._has_adjustments:
+            return {'base_scores': previous.get('base_scores', {}), 'adjust_scores': {}}
+
+        try:
+            kpi_engine.set_data(df, self.engines.get('material'), self._get_demand_data())
+            adjust_scores = kpi_engine.calculate_all_scores({
+                'total_qty': aggregates.totals('total').get((), 0),
+                'shift_qty': aggregates.totals('shift'),
+                'due_production': aggregates.totals('due_demand'),
+            })
+        except Exception as e:
+            print(f"KPI 분석 오류: {e}")
+            adjust_scores = {}
+
+        return {'base_scores': previous.get('base_scores', {}), 'adjust_scores': adjust_scores}
+
+    """
+    가동률 증분 분석 - 시프트별 수량 합계로 요일별 가동률 계산
+    """
+    def _update_utilization_analysis(self, df, aggregates, affected, original_df):
+        utilization_engine = self.engines.get('utilization')
+        day_capacity = self._get_day_capacity() if affected is not None else None
+        if not utilization_engine or day_capacity is None:
+            return self._run_utilization_analysis(df, original_df)
+
+        try:
+            day_production = {}
+            for shift, qty in aggregates.totals('shift').items():
+                day = CapaUtilization.SHIFT_TO_DAY.get(shift)
+                if day:
+                    day_production[day] = day_production.get(day, 0) + qty
+            adjusted = CapaUtilization.utilization_from_production(day_production, day_capacity)
+
+            if not self._has_adjustments:
+                return adjusted
+            return {
+                'original': self._get_baseline('utilization', utilization_engine.analyze_utilization, original_df),
+                'adjusted': adjusted
+            }
+        except Exception as e:
+            print(f"가동률 분석 오류: {e}")
+        return {}
+
+    """
+    제조동 비율 증분 분석 - 제조동별 수량 합계로 비율 계산
+    """
+    def _update_capa_analysis(self, df, aggregates, affected, original_df):
+        capa_engine = self.engines.get('capa_ratio')
+        if affected is None or not capa_engine:
+            return self._run_capa_analysis(df, original_df)
+
+        try:
+            adjusted = CapaRatioAnalyzer.ratio_from_building_qty(aggregates.totals('building'))
+
+            if not self._has_adjustments:
+                return adjusted
+            return {
+                'original': self._get_baseline('capa_ratio', capa_engine.analyze_capa_ratio, original_df),
+                'adjusted': adjusted
+            }
+        except Exception as e:
+            print(f"제조동 비율 분석 오류: {e}")
+        return {}
+
+    """
+    원본 계획 기준 분석 결과 (전체 재분석 전까지 재사용)
+    계산하는 동안 전체 재분석으로 초기화되었으면 이전 원본 기준 결과이므로 새 캐시에 쓰지 않는다
+    """
+    def _get_baseline(self, name, analyze, original_df):
+        baselines = self._baselines
+        if name not in baselines:
+            baselines[name] = analyze(original_df)
+        return baselines[name]
+
+    """
+    원본 계획 데이터 사본 (UI 스레드에서 호출). 모델이 없으면 None
+    """
+    def _get_original_df(self):
+        model = getattr(self.controller, 'model', None)
+        if model is None or getattr(model, '_original_df', None) is None:
+            return None
+        return model.get_original_dataframe()
+
+    """
+    요일별 생산 가능량 (전체 재분석 전까지 재사용). 마스터 데이터가 없으면 None
+    """
+    def _get_day_capacity(self):
+        if self._day_capacity is None:
+            profile = CapacityProfile.load()
+            if profile is None:
+                return None
+            self._day_capacity = profile.day_capacity_dict()
+        return self._day_capacity
     
     """
     KPI 분석 - 기존 로직을 별도 메서드로 분리
     """
-    def _run_kpi_analysis(self, df):
+    def _run_kpi_analysis(self, df, original_df):
         try:
             kpi_engine = self.engines['kpi']
             if not kpi_engine:
@@ -107,12 +342,11 @@ class AnalysisManager:
             kpi_engine.set_data(df, material_analyzer, demand_df)
             
             # 조정 여부 확인
-            has_adjustments = self._check_for_adjustments()
+            has_adjustments = self._has_adjustments
             if has_adjustments:
                 print("    → 조정 감지: Base/Adjust 점수 각각 계산")
 
                 # Base 점수: 원본 데이터로 계산
-                original_df = self.controller.model._original_df
                 kpi_engine.set_data(original_df, material_analyzer, demand_df)
                 base_scores = kpi_engine.calculate_all_scores()
                 
@@ -139,22 +373,20 @@ class AnalysisManager:
     
     """
     출하 분석 중앙집중화 - 한 곳에서만 실행
+    위젯 화면 반영은 _apply_widget_result 에서 UI 스레드로 따로 수행
     """
     def _run_shipment_analysis(self, df):
         try:
-            if (self.result_page and 
-                hasattr(self.result_page, 'shipment_widget') and 
-                self.result_page.shipment_widget):
-                
+            widget = self._get_widget('shipment')
+            if widget:
                 print("    → 출하 위젯 분석 실행")
-                self.result_page.shipment_widget.run_analysis(df)
-                
+                analysis = widget.compute_analysis(df)
+
                 # 🔧 분석 결과를 바로 가져와서 반환
-                failure_items = getattr(self.result_page.shipment_widget, 'failure_items', {})
-                
                 return {
                     'analyzed': True,
-                    'failure_items': failure_items
+                    'data': analysis,
+                    'failure_items': analysis['failure_items'] if analysis else {}
                 }
         except Exception as e:
             print(f"출하 분석 오류: {e}")
@@ -164,19 +396,18 @@ class AnalysisManager:
     """
     가동률 분석
     """
-    def _run_utilization_analysis(self, df):
+    def _run_utilization_analysis(self, df, original_df):
         try:
             if self.engines.get('utilization'):
                 utilization_engine = self.engines['utilization']
-                has_adjustments = self._check_for_adjustments()
+                has_adjustments = self._has_adjustments
 
                 if has_adjustments:
                     # 조정이 있는 경우: 원본과 조정된 데이터 모두 분석
-                    comparison_df = self.controller.model.get_comparison_dataframe()
-                    if comparison_df:
+                    if original_df is not None:
                         return {
-                            'original': utilization_engine.analyze_utilization(comparison_df['original']),
-                            'adjusted': utilization_engine.analyze_utilization(comparison_df['adjusted'])
+                            'original': self._get_baseline('utilization', utilization_engine.analyze_utilization, original_df),
+                            'adjusted': utilization_engine.analyze_utilization(df)
                         }
                 else:
                     # 조정이 없는 경우: 현재 데이터만 분석
@@ -188,18 +419,17 @@ class AnalysisManager:
     """
     제조동 비율 분석
     """
-    def _run_capa_analysis(self, df):
+    def _run_capa_analysis(self, df, original_df):
         try:
             if self.engines.get('capa_ratio'):
                 capa_engine = self.engines['capa_ratio']
-                has_adjustments = self._check_for_adjustments()
+                has_adjustments = self._has_adjustments
                 
                 if has_adjustments:
-                    comparison_df = self.controller.model.get_comparison_dataframe()
-                    if comparison_df:
+                    if original_df is not None:
                         return {
-                            'original': capa_engine.analyze_capa_ratio(comparison_df['original']),
-                            'adjusted': capa_engine.analyze_capa_ratio(comparison_df['adjusted'])
+                            'original': self._get_baseline('capa_ratio', capa_engine.analyze_capa_ratio, original_df),
+                            'adjusted': capa_engine.analyze_capa_ratio(df)
                         }
                 else:
                     return capa_engine.analyze_capa_ratio(data_df=df, is_initial=True)
@@ -233,13 +463,10 @@ class AnalysisManager:
     """
     def _run_plan_maintenance_analysis(self, df):
         try:
-            if (self.result_page and 
-                hasattr(self.result_page, 'plan_maintenance_widget') and 
-                self.result_page.plan_maintenance_widget):
-                
+            widget = self._get_widget('plan_maintenance')
+            if widget:
                 print("    → 계획 유지율 위젯 분석 실행")
-                self.result_page.plan_maintenance_widget.run_analysis(df)
-                return {'analyzed': True}
+                return {'analyzed': True, 'data': widget.compute_analysis(df)}
         except Exception as e:
             print(f"계획 유지율 분석 오류: {e}")
         
@@ -250,12 +477,9 @@ class AnalysisManager:
     """
     def _run_split_allocation_analysis(self, df):
         try:
-            if (self.result_page and 
-                hasattr(self.result_page, 'split_allocation_widget') and 
-                self.result_page.split_allocation_widget):
-                
-                self.result_page.split_allocation_widget.run_analysis(df)
-                return {'analyzed': True}
+            widget = self._get_widget('split_allocation')
+            if widget:
+                return {'analyzed': True, 'data': widget.compute_analysis(df)}
         except Exception as e:
             print(f"분산 배치 분석 오류: {e}")
         
@@ -266,12 +490,9 @@ class AnalysisManager:
     """
     def _run_summary_analysis(self, df):
         try:
-            if (self.result_page and 
-                hasattr(self.result_page, 'summary_widget') and 
-                self.result_page.summary_widget):
-                
-                self.result_page.summary_widget.run_analysis(df)
-                return {'analyzed': True}
+            widget = self._get_widget('summary')
+            if widget:
+                return {'analyzed': True, 'data': widget.compute_analysis(df)}
         except Exception as e:
             print(f"요약 분석 오류: {e}")
         
@@ -282,18 +503,44 @@ class AnalysisManager:
     """
     def _run_portcapa_analysis(self, df):
         try:
-            if (self.result_page and 
-                hasattr(self.result_page, 'portcapa_widget') and 
-                self.result_page.portcapa_widget):
-                
+            widget = self._get_widget('portcapa')
+            if widget:
                 print("    → PortCapa 위젯 분석 실행")
-                self.result_page.portcapa_widget.run_analysis(df)
-                return {'analyzed': True}
+                return {'analyzed': True, 'data': widget.compute_analysis(df)}
         except Exception as e:
             print(f"PortCapa 분석 오류: {e}")
         
         return {'analyzed': False}
 
+    """
+    마지막 실행에서 다시 계산된 위젯 분석 결과를 위젯에 반영
+    """
+    def _apply_widget_results(self, results):
+        for name in self.incremental.last_run:
+            self._apply_widget_result(name, results.get(name))
+
+    """
+    분석 이름에 해당하는 결과 위젯 (없으면 None)
+    """
+    def _get_widget(self, name):
+        if not self.result_page:
+            return None
+        return getattr(self.result_page, self.WIDGET_ANALYSES[name], None)
+
+    """
+    위젯 분석 결과를 위젯에 반영 (UI 스레드에서 호출)
+    """
+    def _apply_widget_result(self, name, result):
+        if name not in self.WIDGET_ANALYSES or not result or not result.get('analyzed'):
+            return
+
+        widget = self._get_widget(name)
+        if widget:
+            try:
+                widget.apply_analysis(result.get('data'))
+            except Exception as e:
+                print(f"{name} 위젯 반영 오류: {e}")
+
     """
     사용자 조정 여부 확인
     """
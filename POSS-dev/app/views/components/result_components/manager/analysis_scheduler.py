@@ -0,0 +1,183 @@
+import os
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from PyQt5.QtCore import QObject, pyqtSignal
+
+"""
+분석 스케줄러
+서로 독립적인 분석을 스레드 풀에서 동시에 실행하고, 끝나는 대로 큐 시그널로 UI 스레드에 결과를 전달한다.
+새 실행을 시작하면 이전 실행은 취소된다 (아직 시작하지 않은 작업은 실행하지 않고, 실행 중인 작업의 결과는 버린다).
+실행 상태(대기/완료 목록)는 UI 스레드에서만 다루고, 작업 스레드는 계산과 시그널 발생만 한다
+"""
+class AnalysisScheduler(QObject):
+    # 실행 번호, 분석 이름, 결과, 소요 시간(초). 작업 스레드에서 발생 -> UI 스레드로 큐 전달
+    task_finished = pyqtSignal(int, str, object, float)
+
+    def __init__(self, max_workers=None, parent=None):
+        super().__init__(parent)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers or max(2, min(4, os.cpu_count() or 1)),
+                                            thread_name_prefix='analysis')
+        # 분석 이름 -> Lock. 이전 실행의 같은 분석이 아직 돌고 있어도 같은 분석 엔진을 동시에 쓰지 않도록 한다
+        self._locks = {}
+        self._generation = 0
+        self._run = None
+
+        self.task_finished.connect(self._on_task_finished)
+
+    """
+    분석 실행 시작 (진행 중인 이전 실행은 취소)
+
+    Args:
+        tasks (list): (이름, compute, requires) 리스트. compute 는 인자 없이 호출되어 결과를 반환하는 함수,
+            requires 는 이번 실행에서 먼저 끝나야 하는 분석 이름 (이번 실행에 없는 이름은 무시)
+        on_result (function): on_result(이름, 결과, 소요 시간) - 분석 하나가 끝날 때마다 UI 스레드에서 호출
+        on_finished (function): 모든 분석이 끝나면 UI 스레드에서 호출
+    Returns:
+        int: 실행 번호
+    """
+    def start(self, tasks, on_result, on_finished=None):
+        self.cancel()
+
+        names = {name for name, _, _ in tasks}
+        self._run = {
+            'generation': self._generation,
+            'tasks': {name: (compute, set(requires) & names) for name, compute, requires in tasks},
+            'submitted': set(),
+            'done': set(),
+            'futures': [],
+            'cancelled': threading.Event(),
+            'on_result': on_result,
+            'on_finished': on_finished,
+        }
+
+        if not tasks:
+            self._finish()
+        else:
+            self._submit_ready()
+        return self._generation
+
+    """
+    진행 중인 실행 취소
+    """
+    def cancel(self):
+        run = self._run
+        self._generation += 1
+        self._run = None
+        if run is None:
+            return
+
+        run['cancelled'].set()
+        for future in run['futures']:
+            future.cancel()
+
+    """
+    진행 중인 실행을 취소하고, 이미 돌고 있는 작업이 끝날 때까지 기다린 뒤 모든 분석 잠금을 잡은 채 실행 (with 블록)
+    UI 스레드에서 분석 엔진을 동기로 쓰거나 분석 상태를 초기화할 때 작업 스레드와 겹치지 않도록 한다.
+    잠금은 작업 스레드와 같은 이름 순서로 잡아 교착 상태를 막는다
+    """
+    @contextmanager
+    def exclusive(self):
+        self.cancel()
+        locks = [self._locks[name] for name in sorted(self._locks)]
+        for lock in locks:
+            lock.acquire()
+        try:
+            yield
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+
+    """
+    진행 중인 실행이 있는지 여부
+    """
+    def is_running(self):
+        return self._run is not None
+
+    """
+    스레드 풀 종료 (대기 중인 작업은 취소)
+    """
+    def shutdown(self):
+        self.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    """
+    선행 분석이 모두 끝난 작업 제출
+    """
+    def _submit_ready(self):
+        run = self._run
+        for name, (compute, requires) in run['tasks'].items():
+            if name in run['submitted'] or not requires <= run['done']:
+                continue
+
+            run['submitted'].add(name)
+            locks = [self._locks.setdefault(lock_name, threading.Lock()) for lock_name in sorted(requires | {name})]
+            run['futures'].append(self._executor.submit(
+                self._execute, run['generation'], name, compute, locks, run['cancelled']))
+
+    """
+    작업 스레드에서 분석 실행 후 결과 시그널 발생
+    """
+    def _execute(self, generation, name, compute, locks, cancelled):
+        if cancelled.is_set():
+            return
+
+        # 이름 순서로 잠가서 교착 상태 방지
+        for lock in locks:
+            lock.acquire()
+        try:
+            if cancelled.is_set():
+                return
+
+            start = time.perf_counter()
+            try:
+                result = compute()
+            except Exception as e:
+                print(f"AnalysisScheduler: {name} 분석 오류: {e}")
+                traceback.print_exc()
+                result = None
+            elapsed = time.perf_counter() - start
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+
+        if cancelled.is_set():
+            return
+
+        try:
+            self.task_finished.emit(generation, name, result, elapsed)
+        except RuntimeError:
+            # 스케줄러가 이미 삭제된 경우 (프로그램 종료 중)
+            pass
+
+    """
+    UI 스레드에서 분석 결과 처리. 이전 실행의 결과는 버린다
+    """
+    def _on_task_finished(self, generation, name, result, elapsed):
+        run = self._run
+        if run is None or generation != run['generation']:
+            return
+
+        run['done'].add(name)
+        try:
+            run['on_result'](name, result, elapsed)
+        except Exception as e:
+            print(f"AnalysisScheduler: {name} 결과 반영 오류: {e}")
+            traceback.print_exc()
+
+        # 결과 반영 중 새 실행이 시작되었으면 중단
+        if self._run is not run:
+            return
+
+        if run['done'] >= run['tasks'].keys():
+            self._finish()
+        else:
+            self._submit_ready()
+
+    def _finish(self):
+        run = self._run
+        self._run = None
+        if run['on_finished']:
+            run['on_finished']()
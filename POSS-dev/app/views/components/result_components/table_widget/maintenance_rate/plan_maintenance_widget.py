@@ -8,6 +8,7 @@ from app.views.components.result_components.table_widget.maintenance_rate.mainte
 from app.views.components.common.enhanced_message_box import EnhancedMessageBox
 from app.analysis.output.plan_maintenance import PlanMaintenanceAnalyzer
 from app.models.common.file_store import DataStore, FilePaths
+from app.utils.workbook_cache import WorkbookCache
 
 """
 계획 유지율 표시 위젯
@@ -260,7 +261,7 @@ class PlanMaintenanceWidget(QWidget):
         if file_path:
             try:
                 # 이전 계획 로드
-                self.user_selected_plan_df = pd.read_excel(file_path)
+                self.user_selected_plan_df = WorkbookCache.read(file_path)
                 self.user_selected_plan_path = file_path
                 
                 # 상태 레이블 업데이트
@@ -294,33 +295,52 @@ class PlanMaintenanceWidget(QWidget):
     위젯 분석 시행 메소드
     """
     def run_analysis(self, df):
-        # UI 먼저 표시 (데이터 있으면 무조건 표시)
-        if df is not None and not df.empty:
-            self.no_data_message.hide()
-            self.content_container.show()
-        else:
-            self.no_data_message.show()
-            self.content_container.hide()
-            return
-        
+        self.apply_analysis(self.compute_analysis(df))
+
+    """
+    계획 유지율 계산만 수행 (UI 를 건드리지 않으므로 작업 스레드에서 호출 가능)
+    Returns:
+        dict: {'has_previous': 이전 계획 유무, 'result': 분석 결과}. 데이터가 없으면 None
+    """
+    def compute_analysis(self, df):
+        if df is None or df.empty:
+            return None
+
         try:
             # 이전 계획 가져오기 
             previous_df = self.get_previous_plan()
 
-            if previous_df is None or previous_df.empty:
-                self.plan_status_label.setText("No previous plan available for comparison")
-                self.plan_status_label.setStyleSheet("color: #6c757d; font-style: italic;")
-            
             # 분석 수행
-            result = PlanMaintenanceAnalyzer.analyze_maintenance_rate(df, previous_df)
-            
-            # UI 업데이트
-            self.apply_analysis_results(result)
+            return {
+                'has_previous': previous_df is not None and not previous_df.empty,
+                'result': PlanMaintenanceAnalyzer.analyze_maintenance_rate(df, previous_df)
+            }
             
         except Exception as e:
             print(f"PlanMaintenanceWidget: 분석 오류: {e}")
             import traceback
             traceback.print_exc()
+            return {'has_previous': True, 'result': None}
+
+    """
+    compute_analysis 결과를 화면에 반영 (UI 스레드에서 호출)
+    """
+    def apply_analysis(self, analysis):
+        # UI 먼저 표시 (데이터 있으면 무조건 표시)
+        if analysis is None:
+            self.no_data_message.show()
+            self.content_container.hide()
+            return
+
+        self.no_data_message.hide()
+        self.content_container.show()
+
+        if not analysis['has_previous']:
+            self.plan_status_label.setText("No previous plan available for comparison")
+            self.plan_status_label.setStyleSheet("color: #6c757d; font-style: italic;")
+
+        # UI 업데이트
+        self.apply_analysis_results(analysis['result'])
 
 
     """
@@ -491,7 +511,7 @@ class PlanMaintenanceWidget(QWidget):
         if file_path and os.path.exists(file_path):
             
             # 파일 로드 시도
-            previous_df = pd.read_excel(file_path)
+            previous_df = WorkbookCache.read(file_path)
 
             return previous_df
             
@@ -39,31 +39,44 @@ class PortCapaWidget(QWidget):
         # 기존 render_table() 메서드 호출
         self.render_table()
 
-    """port capa 테이블 그리는 함수"""
-    def render_table(self):
-        self.organized_dataframes = DataStore.get("organized_dataframes",{})
-        if not self.organized_dataframes:
-            self.table.set_message("No data available")
-            return 
+    """
+    PortCapa 테이블 데이터 계산만 수행 (UI 를 건드리지 않으므로 작업 스레드에서 호출 가능)
+    Returns:
+        DataFrame 또는 표시할 메시지(str)
+    """
+    def compute_analysis(self, df=None):
+        organized_dataframes = DataStore.get("organized_dataframes",{})
+        if not organized_dataframes:
+            return "No data available"
         
-        self.df_demand = self.organized_dataframes['demand'].get('demand',pd.DataFrame())
-        if self.df_demand.empty:
-            self.table.set_message("No demand data available")
-            return 
+        df_demand = organized_dataframes['demand'].get('demand',pd.DataFrame())
+        if df_demand.empty:
+            return "No demand data available"
         
-        self.df_capa_outgoing = self.organized_dataframes['master'].get('capa_outgoing',pd.DataFrame())
-        if self.df_capa_outgoing.empty:
-            self.table.set_message("No capacity data available")
-            return
+        df_capa_outgoing = organized_dataframes['master'].get('capa_outgoing',pd.DataFrame())
+        if df_capa_outgoing.empty:
+            return "No capacity data available"
         
         # 화면에 그릴 테이블의 데이터프레임 만들기 
-        self.df_demand = self.df_demand.drop(columns='Item').groupby('To_Site').sum()
-        df_portcapa = self.df_capa_outgoing.drop_duplicates(subset='Tosite_port').reset_index(drop=True)
+        df_demand = df_demand.drop(columns='Item').groupby('To_Site').sum()
+        df_portcapa = df_capa_outgoing.drop_duplicates(subset='Tosite_port').reset_index(drop=True)
         df_portcapa['Port Capa'] = df_portcapa.iloc[:, 2:9].sum(axis=1)
-        df_portcapa = pd.merge(df_portcapa,self.df_demand,on="To_Site",how='left').fillna(0)
+        df_portcapa = pd.merge(df_portcapa,df_demand,on="To_Site",how='left').fillna(0)
         df_portcapa['Rate(%)'] = df_portcapa['SOP']/df_portcapa['Port Capa'] * 100
         df_portcapa['Rate(%)'] = (df_portcapa['Rate(%)']).round(2)
-        df_portcapa = df_portcapa[['Tosite_port','SOP','Port Capa','Rate(%)']].sort_values(by='SOP',ascending=False)
+        return df_portcapa[['Tosite_port','SOP','Port Capa','Rate(%)']].sort_values(by='SOP',ascending=False)
+
+    """port capa 테이블 그리는 함수"""
+    def render_table(self):
+        self.apply_analysis(self.compute_analysis())
+
+    """
+    compute_analysis 결과를 테이블/차트에 반영 (UI 스레드에서 호출)
+    """
+    def apply_analysis(self, df_portcapa):
+        if isinstance(df_portcapa, str):
+            self.table.set_message(df_portcapa)
+            return
 
         self.table.setRowCount(len(df_portcapa))
         self.table.setColumnCount(len(df_portcapa.columns))
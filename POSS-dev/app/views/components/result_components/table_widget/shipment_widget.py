@@ -26,7 +26,8 @@ class ShipmentWidget(QWidget):
         self.failed_models_data = []  # 실패 모델 데이터 저장 (정렬용)
         self.sort_column = 0  # 정렬 기준 컬럼
         self.sort_order = Qt.AscendingOrder  # 정렬 방향
-        self.last_analyzed_data_hash = None
+        self._analysis_cache = None  # (데이터 해시, compute_analysis 결과)
+        self._applied_analysis = None  # 화면에 반영된 compute_analysis 결과
         self.init_ui()
         
     def init_ui(self):
@@ -394,6 +395,14 @@ class ShipmentWidget(QWidget):
 
     """당주 출하 분석 실행"""    
     def run_analysis(self, result_data=None):
+        self.apply_analysis(self.compute_analysis(result_data))
+
+    """
+    당주 출하 분석 계산만 수행 (UI 를 건드리지 않으므로 작업 스레드에서 호출 가능)
+    Returns:
+        dict: result_df/summary/analysis_df/failure_items. 분석할 수 없으면 None
+    """
+    def compute_analysis(self, result_data=None):
         try:
             # 데이터가 없으면 DataStore에서 가져오기 시도
             from app.models.common.file_store import DataStore
@@ -405,46 +414,59 @@ class ShipmentWidget(QWidget):
             
             # 데이터가 여전히 없으면 분석 중단
             if result_data is None:
-                self.reset_state()
-                return
+                return None
                 
             # 데이터 변경 여부 확인 (해시값 기반)
             current_hash = self._compute_data_hash(result_data)
             
             # 같은 데이터로 이미 분석했고 결과가 있다면 재분석 생략
-            if hasattr(self, 'last_analyzed_data_hash') and current_hash == self.last_analyzed_data_hash and self.result_df is not None and hasattr(self, 'failure_items'):
-                # 기존 결과로 시그널 재발생
-                self.shipment_status_updated.emit(self.failure_items)
-                return
-            
-            # 현재 해시 저장
-            self.last_analyzed_data_hash = current_hash
-            
-            # print("왼쪽 결과 테이블 데이터로 출하 분석 실행")
+            cached = self._analysis_cache
+            if cached is not None and cached[0] == current_hash:
+                return cached[1]
             
-            # 기존 분석 코드 계속 실행
             # analyze_and_get_results 함수 호출 및 반환값 예외 처리
             result = analyze_and_get_results(result_data=result_data)
             
-            # None이 반환된 경우 처리
-            if result is None:
-                self.reset_state()  # 상태 초기화
-                return
+            # 반환값이 3개 값을 포함한 튜플이 아니면 (None, 단일값 등) 분석 실패
+            if not isinstance(result, tuple) or len(result) != 3:
+                return None
+
+            result_df, summary, analysis_df = result
+            if result_df is None or summary is None:
+                return None
+
+            analysis = {
+                'result_df': result_df,
+                'summary': summary,
+                'analysis_df': analysis_df,
+                'failure_items': self.collect_failure_items(summary)
+            }
+            self._analysis_cache = (current_hash, analysis)
+            return analysis
             
-            # 반환값이 3개 값을 포함한 튜플인지 확인
-            if isinstance(result, tuple) and len(result) == 3:
-                self.result_df, self.summary, self.analysis_df = result
-            else:
-                # 반환값이 예상과 다른 형태인 경우 (단일값 등)
-                self.result_df = result if not isinstance(result, tuple) else None
-                self.summary = None
-                self.analysis_df = None
-                self.reset_state()
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            return None
+
+    """
+    compute_analysis 결과를 화면에 반영 (UI 스레드에서 호출)
+    """
+    def apply_analysis(self, analysis):
+        try:
+            if analysis is None:
+                self.reset_state()  # 상태 초기화
                 return
-                
-            if self.result_df is None or self.summary is None:
-                self.reset_state()
+
+            # 이미 화면에 반영된 결과면 시그널만 재발생
+            if analysis is self._applied_analysis and self.result_df is not None:
+                self.shipment_status_updated.emit(self.failure_items)
                 return
+
+            self.result_df = analysis['result_df']
+            self.summary = analysis['summary']
+            self.analysis_df = analysis['analysis_df']
+            self._applied_analysis = analysis
             
             # 기본 정보 업데이트
             self.update_summary_info()
@@ -456,7 +478,8 @@ class ShipmentWidget(QWidget):
             self.adjust_column_widths()
             
             # 실패 아이템 정보 전달
-            self.detect_and_emit_failures()
+            self.failure_items = analysis['failure_items']
+            self._emit_failure_status()
             
         except Exception as e:
             import traceback
@@ -598,7 +621,7 @@ class ShipmentWidget(QWidget):
         self.failed_models_data = []
         
         # SOP 불일치 정보 가져오기
-        sop_inconsistencies = self.summary.get('sop_inconsistencies', [])
+        sop_inconsistencies = summary.get('sop_inconsistencies', [])
         inconsistent_items_dict = {}
         for inc in sop_inconsistencies:
             inconsistent_items_dict[inc['Item']] = {
@@ -771,68 +794,8 @@ class ShipmentWidget(QWidget):
     
     def detect_and_emit_failures(self):
         try:
-            # 모든 검증 통과 후 실패 아이템 정보 수집
-            failure_items = {}
-            
-            # 모델 단위 출하 정보 확인
-            models_df = self.summary.get('models_df')
-            if models_df is None or models_df.empty:
-                self.failure_items = {}  # 빈 딕셔너리로 초기화
-                self.shipment_status_updated.emit({})
-                return
-                
-            # SOP 불일치 정보 검사
-            sop_inconsistencies = self.summary.get('sop_inconsistencies', [])
-            inconsistent_items = {inc['Item'] for inc in sop_inconsistencies} if sop_inconsistencies else set()
-            
-            # 출하 실패 또는 SOP 불일치 모델 필터링
-            failed_models = models_df[
-                (~models_df['IsShippable']) | 
-                (models_df['SOP_Inconsistent'] == True)
-            ]
-            
-            # 각 실패 모델에 대한 정보 수집
-            for _, row in failed_models.iterrows():
-                # Item 정보 처리 - 튜플인 경우 처리
-                item_code = row['Item']
-                if isinstance(item_code, tuple):
-                    item_code = item_code[0] if len(item_code) > 0 else ""
-                
-                # SOP와 생산량 정보 가져오기
-                sop = row.get('SOP', 0)
-                production = row.get('DueLTProduction', 0)
-                is_inconsistent = row.get('SOP_Inconsistent', False) or (item_code in inconsistent_items)
-                
-                # 출하 실패 이유 결정
-                if is_inconsistent:
-                    reason = "SOP Value Inconsistency"
-                    for inc in sop_inconsistencies:
-                        if inc['Item'] == item_code:
-                            all_values = inc['SOP_Values']
-                            selected = inc.get('Selected_SOP', inc.get('selected', 0))
-                            reason = f"SOP Value Inconsistency (Found: {all_values} / Used: {selected})"
-                            break
-                elif production < sop:
-                    reason = f"Insufficient Production (Produced: {production}, Required: {sop})"
-                else:
-                    reason = row.get('FailureReason', 'Unknown reason')
-                    
-                # 출하 실패 정보 구성
-                failure_items[item_code] = {
-                    'item': item_code,
-                    'sop': sop,
-                    'production': production,
-                    'reason': reason,
-                    'sop_inconsistent': is_inconsistent,  # SOP 불일치 플래그
-                    'status_type': 'shipment'  # 상태 타입 추가
-                }
-            
-            # 중요: 실패 아이템 정보 저장
-            self.failure_items = failure_items
-            
-            # 시그널 발생
-            print(f"출하 상태 업데이트: {len(failure_items)} 개의 실패 아이템")
-            # self.shipment_status_updated.emit(failure_items)
+            self.failure_items = self.collect_failure_items(self.summary)
+            self._emit_failure_status()
             
         except Exception as e:
             import traceback
@@ -841,6 +804,80 @@ class ShipmentWidget(QWidget):
             self.failure_items = {}
             self.shipment_status_updated.emit({})
 
+    """
+    실패 아이템 상태 알림 (모델 단위 출하 정보가 없으면 빈 값 시그널)
+    """
+    def _emit_failure_status(self):
+        models_df = self.summary.get('models_df') if self.summary else None
+        if models_df is None or models_df.empty:
+            self.shipment_status_updated.emit({})
+            return
+
+        # 시그널 발생
+        print(f"출하 상태 업데이트: {len(self.failure_items)} 개의 실패 아이템")
+        # self.shipment_status_updated.emit(self.failure_items)
+
+    """
+    출하 실패/SOP 불일치 모델의 실패 정보 {아이템: 정보} (UI 를 건드리지 않음)
+    """
+    @staticmethod
+    def collect_failure_items(summary):
+        # 모든 검증 통과 후 실패 아이템 정보 수집
+        failure_items = {}
+        
+        # 모델 단위 출하 정보 확인
+        models_df = summary.get('models_df') if summary else None
+        if models_df is None or models_df.empty:
+            return failure_items
+            
+        # SOP 불일치 정보 검사
+        sop_inconsistencies = summary.get('sop_inconsistencies', [])
+        inconsistent_items = {inc['Item'] for inc in sop_inconsistencies} if sop_inconsistencies else set()
+        
+        # 출하 실패 또는 SOP 불일치 모델 필터링
+        failed_models = models_df[
+            (~models_df['IsShippable']) | 
+            (models_df['SOP_Inconsistent'] == True)
+        ]
+        
+        # 각 실패 모델에 대한 정보 수집
+        for _, row in failed_models.iterrows():
+            # Item 정보 처리 - 튜플인 경우 처리
+            item_code = row['Item']
+            if isinstance(item_code, tuple):
+                item_code = item_code[0] if len(item_code) > 0 else ""
+            
+            # SOP와 생산량 정보 가져오기
+            sop = row.get('SOP', 0)
+            production = row.get('DueLTProduction', 0)
+            is_inconsistent = row.get('SOP_Inconsistent', False) or (item_code in inconsistent_items)
+            
+            # 출하 실패 이유 결정
+            if is_inconsistent:
+                reason = "SOP Value Inconsistency"
+                for inc in sop_inconsistencies:
+                    if inc['Item'] == item_code:
+                        all_values = inc['SOP_Values']
+                        selected = inc.get('Selected_SOP', inc.get('selected', 0))
+                        reason = f"SOP Value Inconsistency (Found: {all_values} / Used: {selected})"
+                        break
+            elif production < sop:
+                reason = f"Insufficient Production (Produced: {production}, Required: {sop})"
+            else:
+                reason = row.get('FailureReason', 'Unknown reason')
+                
+            # 출하 실패 정보 구성
+            failure_items[item_code] = {
+                'item': item_code,
+                'sop': sop,
+                'production': production,
+                'reason': reason,
+                'sop_inconsistent': is_inconsistent,  # SOP 불일치 플래그
+                'status_type': 'shipment'  # 상태 타입 추가
+            }
+
+        return failure_items
+
     """위젯 상태 초기화"""   
     def reset_state(self):
         # 데이터 초기화
@@ -849,6 +886,7 @@ class ShipmentWidget(QWidget):
         self.analysis_df = None
         self.failure_items = {}
         self.failed_models_data = []  # 정렬 데이터도 초기화
+        self._applied_analysis = None
         
         # 프로그레스바 초기화
         self.qty_progress.setValue(0)
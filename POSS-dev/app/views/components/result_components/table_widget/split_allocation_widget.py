@@ -182,12 +182,22 @@ class SplitAllocationWidget(QWidget):
     
     def run_analysis(self, result_data=None):
         """프로젝트 및 모델의 라인 할당 분석 실행"""
+        self.apply_analysis(self.compute_analysis(result_data))
+
+    def compute_analysis(self, result_data=None):
+        """라인 할당 분석 계산만 수행 (UI 를 건드리지 않으므로 작업 스레드에서 호출 가능). 데이터가 없으면 None"""
         if result_data is None or result_data.empty:
+            return None
+
+        return analyze_line_allocation(result_data, only_split=True)
+
+    def apply_analysis(self, analysis):
+        """compute_analysis 결과 (result_df, project_df, model_df) 를 테이블에 반영 (UI 스레드에서 호출)"""
+        if analysis is None:
             self.set_initial_message()
             return
-        
-        # 분석 실행
-        self.result_df, self.project_df, self.model_df = analyze_line_allocation(result_data, only_split=True)
+
+        self.result_df, self.project_df, self.model_df = analysis
         
         # 결과가 없으면 메시지 표시
         if self.project_df is None or self.project_df.empty:
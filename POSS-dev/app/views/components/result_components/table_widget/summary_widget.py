@@ -99,9 +99,15 @@ class SummaryWidget(QWidget):
     """
 
     def run_analysis(self, result_data):
+        self.apply_analysis(self.compute_analysis(result_data))
+
+    """
+    요약 데이터 계산만 수행 (UI 를 건드리지 않으므로 작업 스레드에서 호출 가능)
+    데이터가 없으면 None, 계산 오류면 False
+    """
+    def compute_analysis(self, result_data):
         if result_data is None or result_data.empty:
-            self.clear_table()
-            return
+            return None
 
         try:
             # 1. 라인별 생산능력 및 가동률
@@ -112,8 +118,23 @@ class SummaryWidget(QWidget):
             capa_ratios = CapaRatioAnalyzer.analyze_capa_ratio(data_df=result_data, is_initial=True)
 
             # 3. 상세 정보 추출
-            summary_data = self.create_summary(result_data, capa_ratios)
+            return self.create_summary(result_data, capa_ratios)
+
+        except Exception as e:
+            print(f"summary 요약 중 에러 : {e}")
+            return False
 
+    """
+    compute_analysis 결과를 테이블에 반영 (UI 스레드에서 호출)
+    """
+    def apply_analysis(self, summary_data):
+        if summary_data is None:
+            self.clear_table()
+            return
+        if summary_data is False:
+            return
+
+        try:
             # 4. 테이블 업데이트
             self.update_table(summary_data)
 
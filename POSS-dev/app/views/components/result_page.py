@@ -11,6 +11,7 @@ from ..components.visualization.visualization_updater import VisualizationUpdate
 from app.analysis.output.daily_capa_utilization import CapaUtilization
 from app.analysis.output.capa_ratio import CapaRatioAnalyzer
 from app.utils.export_manager import ExportManager
+from app.utils.workbook_cache import WorkbookCache
 from app.core.output.adjustment_validator import PlanAdjustmentValidator
 from app.resources.styles.result_style import ResultStyles 
 from app.views.components.result_components.modified_left_section import ModifiedLeftSection
@@ -1307,7 +1308,7 @@ class ResultPage(QWidget):
         demand_path = FilePaths.get("demand_excel_file")
         if demand_path and os.path.exists(demand_path):
             # 모든 시트를 dict 형태로 읽어오기
-            demand_df = pd.read_excel(demand_path, sheet_name='demand')
+            demand_df = WorkbookCache.read(demand_path, sheet_name='demand')
             
         data = self.result_data if (self.result_data is not None and not self.result_data.empty) else pd.DataFrame()
         self.kpi_score.set_data(
@@ -3,6 +3,7 @@ from PyQt5.QtGui import QFont
 from .base_tab import BaseTabComponent
 from .settings_section import ModernSettingsSectionComponent
 from app.models.common.settings_store import SettingsStore
+from app.core.solver import SolverConfig
 from app.resources.fonts.font_manager import font_manager
 
 
@@ -56,6 +57,30 @@ class ModernBasicTabComponent(BaseTabComponent):
             min=1, max=86400, default=SettingsStore.get("time_limit2", 300),
         )
 
+        # 솔버 섹션
+        solver_section = ModernSettingsSectionComponent("Solver")
+        solver_section.setting_changed.connect(self.on_setting_changed)
+
+        solver_names = list(SolverConfig.SOLVERS)
+        default_solver = SettingsStore.get("solver_name", "CBC")
+        solver_section.add_setting_item(
+            "Solver", "solver_name", "combobox",
+            items=solver_names,
+            default_index=solver_names.index(default_solver) if default_solver in solver_names else 0,
+            return_text=True
+        )
+
+        solver_section.add_setting_item(
+            "Relative Gap (0 = solver default)", "solver_gap_rel", "doublespinbox",
+            min=0.0, max=1.0, default=SettingsStore.get("solver_gap_rel", 0.0),
+            decimals=4, step=0.001
+        )
+
+        solver_section.add_setting_item(
+            "Solver Threads (0 = solver default)", "solver_threads", "spinbox",
+            min=0, max=64, default=SettingsStore.get("solver_threads", 0),
+        )
+
         # 가중치 섹션
         weight_section = ModernSettingsSectionComponent("Weight")
         weight_section.setting_changed.connect(self.on_setting_changed)
@@ -91,6 +116,7 @@ class ModernBasicTabComponent(BaseTabComponent):
         )
 
         self.content_layout.addWidget(running_section)
+        self.content_layout.addWidget(solver_section)
         self.content_layout.addWidget(weight_section)
 
         self.content_layout.addStretch(1)
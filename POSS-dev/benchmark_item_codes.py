@@ -0,0 +1,78 @@
+"""
+아이템 코드 분해 벤치마크
+기존 iterrows + df.loc 행 단위 대입 루프와 decode_item_codes(.str 슬라이싱 + Categorical) 비교
+
+사용법:
+    python benchmark_item_codes.py [행 수] [기존 방식 행 수]
+
+행 수(기본 100000)만큼 demand 시트를 만들어 decode_item_codes 의 최초 실행/캐시 적중 시간을 재고,
+기존 루프는 너무 느리므로 앞쪽 일부 행(기본 5000)에 대해서만 실행해 행 수만큼 환산한 시간과 결과 일치 여부를 출력한다.
+"""
+import random
+import sys
+import time
+
+import pandas as pd
+
+from app.utils.item_code import ITEM_CODE_FIELDS, decode_item_codes
+
+
+def make_demand(rows, n_items=3000, seed=0):
+    rnd = random.Random(seed)
+    projects = [f"P{100 + i}" for i in range(60)]
+    codes = [
+        f"AB-{rnd.choice(projects)}{rnd.choice('WKEU')}{rnd.randrange(10)}{rnd.choice('ZQ')}J{rnd.randrange(1000):03d}U{rnd.randrange(10)}"
+        for _ in range(n_items)
+    ]
+    return pd.DataFrame({
+        'Item': [rnd.choice(codes) for _ in range(rows)],
+        'To_Site': [rnd.choice(['KR', 'US', 'EU']) for _ in range(rows)],
+        'MFG': [rnd.randrange(0, 500) for _ in range(rows)],
+        'SOP': [rnd.randrange(0, 300) for _ in range(rows)],
+    })
+
+
+def legacy_decode(df):
+    """기존 방식 (Optimization.__init__ / capa.process_data 의 행 단위 루프)"""
+    for i, row in df.iterrows():
+        df.loc[i, "Project"] = row['Item'][3:7]
+        df.loc[i, "Basic2"] = row['Item'][3:8]
+        df.loc[i, "Tosite_group"] = row['Item'][7:8]
+        df.loc[i, "RMC"] = row['Item'][3:-3]
+        df.loc[i, "Color"] = row['Item'][8:-4]
+    return df
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    legacy_rows = min(rows, int(sys.argv[2]) if len(sys.argv) > 2 else 5000)
+
+    df_demand = make_demand(rows)
+    print(f"demand 행 수: {rows:,} (고유 아이템 {df_demand['Item'].nunique():,})")
+
+    start = time.perf_counter()
+    decode_item_codes(df_demand)
+    first = time.perf_counter() - start
+
+    start = time.perf_counter()
+    decode_item_codes(df_demand)
+    cached = time.perf_counter() - start
+
+    df_legacy = df_demand[['Item']].head(legacy_rows).copy()
+    start = time.perf_counter()
+    legacy_decode(df_legacy)
+    legacy = time.perf_counter() - start
+    legacy_estimate = legacy / legacy_rows * rows
+
+    same = all(
+        df_demand[field].head(legacy_rows).astype(object).tolist() == df_legacy[field].tolist()
+        for field in ITEM_CODE_FIELDS
+    )
+
+    print(f"기존 루프: {legacy:.2f}s ({legacy_rows:,}행) -> {rows:,}행 환산 {legacy_estimate:.1f}s")
+    print(f"decode_item_codes 최초: {first * 1000:.1f}ms, 캐시 적중: {cached * 1000:.1f}ms")
+    print(f"속도 향상: {legacy_estimate / first:.0f}배, 결과 일치: {same}")
+
+
+if __name__ == "__main__":
+    main()
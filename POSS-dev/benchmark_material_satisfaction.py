@@ -0,0 +1,144 @@
+"""
+자재만족률 계산 벤치마크
+기존 경로(iterrows On-Hand 합산 + match_pattern 아이템별 매핑 + 아이템별 dict 계산)와
+MaterialSatisfactionEngine(BOM 희소 행렬 + 그룹 행렬 + NumPy 최소값 reduce) 비교
+
+사용법:
+    python benchmark_material_satisfaction.py [아이템 수] [자재 수] [기존 방식 아이템 수]
+
+아이템 수(기본 10000) x 자재 수(기본 5000) 데이터를 만들어 엔진 전체 실행 시간을 재고,
+기존 경로는 너무 느리므로 앞쪽 일부 아이템(기본 30개)의 수요에 대해서만 실행해 아이템 수만큼 환산한 시간과
+같은 수요로 엔진을 돌린 결과와의 일치 여부를 출력한다.
+"""
+import random
+import sys
+import time
+
+import pandas as pd
+
+from app.analysis.input.material_engine import MaterialSatisfactionEngine
+from app.analysis.input.material_rate_validator import (
+    create_substitute_groups, map_items_to_materials, extract_material_onhand,
+    calculate_material_requirements, calculate_group_values,
+    calculate_item_producible_quantity, calculate_item_satisfaction_rates
+)
+
+DATE_COLUMNS = ['6/2(Mon)', '6/9(Mon)', '6/16(Mon)']
+
+
+def make_data(n_items, n_materials, seed=0):
+    rnd = random.Random(seed)
+    projects = [f"P{100 + i}" for i in range(60)]
+    items = list(dict.fromkeys(
+        f"AB-{rnd.choice(projects)}{rnd.choice('WKEU')}{rnd.randrange(10)}{rnd.choice('ZQ')}J{rnd.randrange(1000):03d}U{rnd.randrange(10)}"
+        for _ in range(n_items * 2)
+    ))[:n_items]
+
+    demand_df = pd.DataFrame({
+        'Item': items,
+        'MFG': [rnd.choice([0, rnd.randrange(50, 2000)]) if rnd.random() < 0.1 else rnd.randrange(50, 2000) for _ in items],
+    })
+
+    def pattern():
+        item = rnd.choice(items)
+        kind = rnd.random()
+        if kind < 0.4:
+            return item
+        if kind < 0.6:
+            return item[:8] + '*'
+        if kind < 0.8:
+            return item[:7] + '*' + item[-2:]
+        if kind < 0.98:
+            return '*' + item[-6:]
+        return item[:4] + '*' + item[8] + '*' + item[-1]
+
+    materials = [f"M{i:06d}" for i in range(n_materials)]
+    active = [rnd.choice('OOOOX') for _ in materials]
+    material_item_df = pd.DataFrame({
+        'Active_OX': active,
+        'Material': materials,
+        'Top_Model_1': [pattern() for _ in materials],
+        'Top_Model_2': [pattern() if rnd.random() < 0.5 else None for _ in materials],
+        'Top_Model_3': [pattern() if rnd.random() < 0.2 else None for _ in materials],
+    })
+
+    material_df = pd.DataFrame({
+        'Active_OX': active,
+        'Material': materials,
+        'On-Hand': [float(rnd.randrange(0, 20000)) if rnd.random() < 0.95 else 0.0 for _ in materials],
+        **{col: [float(rnd.randrange(0, 3000)) for _ in materials] for col in DATE_COLUMNS},
+    })
+
+    shuffled = materials[:]
+    rnd.shuffle(shuffled)
+    groups = [shuffled[i:i + rnd.choice([2, 3])] for i in range(0, n_materials // 5, 3)]
+    material_equal_df = pd.DataFrame({
+        f'Material{k + 1}': [group[k] if k < len(group) else None for group in groups] for k in range(3)
+    })
+
+    return material_df, material_item_df, demand_df, material_equal_df
+
+
+def legacy_satisfaction(material_df, material_item_df, demand_df, material_equal_df, date_columns):
+    """기존 방식 (calculate_material_satisfaction 의 아이템별 계산 경로)"""
+    material_df = material_df.copy()
+    material_df['Original_On_Hand'] = material_df['On-Hand'].copy()
+    for idx, row in material_df.iterrows():
+        future_supply = 0
+        for date_col in date_columns:
+            if date_col in material_df.columns and pd.notnull(row[date_col]) and isinstance(row[date_col], (int, float)):
+                future_supply += row[date_col]
+        material_df.at[idx, 'On-Hand'] = row['Original_On_Hand'] + future_supply
+
+    substitute_groups, material_to_group = create_substitute_groups(material_equal_df)
+    item_to_materials = map_items_to_materials(material_item_df, demand_df)
+    material_onhand = extract_material_onhand(material_df)
+    material_requirements = calculate_material_requirements(item_to_materials, demand_df)
+    group_requirements, group_onhand = calculate_group_values(substitute_groups, material_requirements, material_onhand)
+    item_producible = calculate_item_producible_quantity(
+        item_to_materials, material_onhand, material_to_group,
+        group_onhand, material_requirements, group_requirements, demand_df
+    )
+    return item_producible, calculate_item_satisfaction_rates(item_producible, demand_df)
+
+
+def engine_satisfaction(material_df, material_item_df, demand_df, material_equal_df, date_columns):
+    engine = MaterialSatisfactionEngine(material_df, material_item_df, demand_df, material_equal_df, date_columns)
+    producible = engine.producible()
+    rates = engine.satisfaction_rates(producible)
+    return dict(zip(engine.items, producible.tolist())), dict(zip(engine.items, rates.tolist()))
+
+
+def main():
+    n_items = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    n_materials = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+    legacy_items = min(n_items, int(sys.argv[3]) if len(sys.argv) > 3 else 30)
+
+    material_df, material_item_df, demand_df, material_equal_df = make_data(n_items, n_materials)
+    print(f"아이템 {len(demand_df):,}개 x 자재 {n_materials:,}개, 대체 그룹 {len(material_equal_df):,}개")
+
+    start = time.perf_counter()
+    producible, _ = engine_satisfaction(material_df, material_item_df, demand_df, material_equal_df, DATE_COLUMNS)
+    engine_time = time.perf_counter() - start
+    print(f"엔진: {engine_time * 1000:.1f}ms (자재가 매핑된 아이템 {sum(value > 0 for value in producible.values()):,}개 생산 가능)")
+
+    demand_subset = demand_df.head(legacy_items).copy()
+    start = time.perf_counter()
+    legacy_producible, legacy_rates = legacy_satisfaction(
+        material_df, material_item_df, demand_subset, material_equal_df, DATE_COLUMNS
+    )
+    legacy = time.perf_counter() - start
+    legacy_estimate = legacy / legacy_items * n_items
+
+    subset_producible, subset_rates = engine_satisfaction(
+        material_df, material_item_df, demand_subset, material_equal_df, DATE_COLUMNS
+    )
+    same = (subset_producible == legacy_producible
+            and all(abs(subset_rates[item] - rate) < 1e-9 for item, rate in legacy_rates.items()))
+
+    print(f"기존 경로: {legacy:.2f}s ({legacy_items:,}개 아이템) -> {n_items:,}개 환산 {legacy_estimate:.0f}s 이상")
+    print(f"속도 향상: {legacy_estimate / engine_time:.0f}배 이상, 결과 일치: {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
+import multiprocessing
 import sys
 import traceback
 from PyQt5.QtWidgets import QApplication, QMessageBox, QStyleFactory
@@ -148,6 +149,9 @@ def _styled_msgbox(parent, title, text,
 
 
 if __name__ == "__main__":
+    # 최적화를 별도 프로세스(spawn)로 실행하므로 패키징된 실행파일에서도 자식 프로세스가 동작하도록 필요
+    multiprocessing.freeze_support()
+
     # High DPI 설정
     if hasattr(Qt, 'AA_UseHighDpiPixmaps'):
         QApplication.setAttribute(Qt.AA_UseHighDpiPixmaps, True)
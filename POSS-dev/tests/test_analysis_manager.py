@@ -0,0 +1,173 @@
+"""
+결과 분석 매니저 테스트
+작업 스레드의 분석이 모델을 읽지 않고, 시작 시점에 UI 스레드에서 복사한 원본/조정 데이터만 쓰는지,
+동기 전체 재분석이 실행 중인 작업과 같은 분석 엔진을 동시에 쓰지 않고 이전 원본 기준 결과가 남지 않는지 확인
+"""
+import importlib.util
+import os
+import sys
+import threading
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import pandas as pd
+from PyQt5.QtWidgets import QApplication
+
+qt_app = QApplication.instance() or QApplication([])
+
+APP_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app")
+MANAGER_DIR = os.path.join(APP_DIR, "views", "components", "result_components", "manager")
+
+
+def _load(name, path):
+    """컴포넌트 패키지 __init__ 의 다른 화면들을 불러오지 않도록 모듈 파일을 직접 로드"""
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+_load("app.views.components.result_components.manager.analysis_scheduler",
+      os.path.join(MANAGER_DIR, "analysis_scheduler.py"))
+analysis_manager = _load("analysis_manager", os.path.join(MANAGER_DIR, "analysis_manager.py"))
+
+
+class FakeModel:
+    """원본/조정 데이터를 읽은 스레드를 기록하는 모델"""
+    def __init__(self, original, adjusted):
+        self._original = original
+        self._adjusted = adjusted
+        self.worker_reads = []
+
+    def _read(self, df):
+        if threading.current_thread() is not threading.main_thread():
+            self.worker_reads.append(threading.current_thread().name)
+        return df
+
+    @property
+    def _original_df(self):
+        return self._read(self._original)
+
+    @property
+    def _df(self):
+        return self._read(self._adjusted)
+
+    def get_original_dataframe(self):
+        return self._read(self._original).copy()
+
+    def get_comparison_dataframe(self):
+        return {'original': self._read(self._original).copy(), 'adjusted': self._read(self._adjusted).copy()}
+
+
+class FakeController:
+    def __init__(self, model):
+        self.model = model
+
+
+class GatedEngine:
+    """gate 가 열릴 때까지 기다렸다가 받은 데이터의 수량을 기록하는 분석 엔진"""
+    def __init__(self, gate):
+        self.gate = gate
+        self.seen = []
+
+    def analyze(self, df, **kwargs):
+        self.gate.wait(10)
+        self.seen.append(df['Qty'].tolist())
+        return df['Qty'].sum()
+
+    analyze_utilization = analyze
+    analyze_capa_ratio = analyze
+
+
+class CountingEngine(GatedEngine):
+    """동시에 analyze 를 실행 중인 스레드 수의 최댓값을 기록하는 분석 엔진"""
+    def __init__(self, gate):
+        super().__init__(gate)
+        self.entered = threading.Event()
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def analyze(self, df, **kwargs):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        self.entered.set()
+        try:
+            return super().analyze(df, **kwargs)
+        finally:
+            with self._lock:
+                self.active -= 1
+
+    analyze_utilization = analyze
+    analyze_capa_ratio = analyze
+
+
+def test_analysis_inputs_are_isolated_from_model_edits():
+    original = pd.DataFrame({'Line': ['L1', 'L2'], 'Time': [1, 2], 'Item': ['A', 'B'], 'Qty': [10, 20]})
+    adjusted = original.assign(Qty=[10, 50])
+    model = FakeModel(original, adjusted)
+
+    manager = analysis_manager.AnalysisManager(None, controller=FakeController(model))
+    gate = threading.Event()
+    utilization, capa = GatedEngine(gate), GatedEngine(gate)
+    manager.engines = {'kpi': None, 'material': None, 'utilization': utilization, 'capa_ratio': capa}
+
+    finished = []
+    try:
+        manager.start_incremental_analyses(adjusted.copy(), None, on_finished=finished.append)
+
+        # 분석이 도는 동안 UI 스레드에서 계획 수정
+        original['Qty'] = 999
+        adjusted['Qty'] = 999
+        gate.set()
+
+        deadline = time.monotonic() + 10
+        while not finished:
+            assert time.monotonic() < deadline, "시간 초과"
+            qt_app.processEvents()
+            time.sleep(0.01)
+    finally:
+        manager.shutdown()
+
+    assert model.worker_reads == []
+    assert sorted(utilization.seen) == [[10, 20], [10, 50]]
+    assert sorted(capa.seen) == [[10, 20], [10, 50]]
+    assert finished[0]['utilization'] == {'original': 30, 'adjusted': 60}
+    assert finished[0]['capa_ratio'] == {'original': 30, 'adjusted': 60}
+
+
+def test_full_run_waits_for_running_analyses():
+    original = pd.DataFrame({'Line': ['L1', 'L2'], 'Time': [1, 2], 'Item': ['A', 'B'], 'Qty': [10, 20]})
+    model = FakeModel(original, original.assign(Qty=[10, 50]))
+
+    manager = analysis_manager.AnalysisManager(None, controller=FakeController(model))
+    gate = threading.Event()
+    utilization, capa = CountingEngine(gate), CountingEngine(gate)
+    manager.engines = {'kpi': None, 'material': None, 'utilization': utilization, 'capa_ratio': capa}
+
+    try:
+        manager.start_incremental_analyses(model._adjusted.copy(), None)
+        # 작업 스레드가 이전 원본으로 기준 결과를 계산하는 중에 원본이 바뀌고 동기 전체 재분석 실행
+        assert utilization.entered.wait(10) and capa.entered.wait(10)
+        model._original = original.assign(Qty=[1, 2])
+        model._adjusted = original.assign(Qty=[1, 5])
+        timer = threading.Timer(0.3, gate.set)
+        timer.start()
+        results = manager.run_all_analyses(model._adjusted.copy())
+        timer.join()
+
+        for _ in range(20):
+            qt_app.processEvents()
+            time.sleep(0.01)
+    finally:
+        manager.shutdown()
+
+    assert utilization.max_active == 1
+    assert capa.max_active == 1
+    assert results['utilization'] == {'original': 3, 'adjusted': 6}
+    assert results['capa_ratio'] == {'original': 3, 'adjusted': 6}
+    assert manager._baselines == {'utilization': 3, 'capa_ratio': 3}
+    assert manager.incremental.results['utilization'] == {'original': 3, 'adjusted': 6}
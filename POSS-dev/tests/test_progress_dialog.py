@@ -0,0 +1,77 @@
+"""
+최적화 진행 다이얼로그 테스트
+실행 중에 다이얼로그를 닫으면 최적화 프로세스가 종료되고, 작업자가 없으면 취소 버튼이 다이얼로그를 닫는지 확인
+"""
+import importlib.util
+import multiprocessing
+import os
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication, QDialog
+
+# 폰트 관리자가 QApplication 을 필요로 하므로 다이얼로그 모듈보다 먼저 생성
+qt_app = QApplication.instance() or QApplication([])
+
+from app.core import optimization_process
+
+# 컴포넌트 패키지 __init__ 의 다른 화면들을 불러오지 않도록 모듈 파일을 직접 로드
+_spec = importlib.util.spec_from_file_location(
+    "progress_dialog",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                 "app", "views", "components", "data_upload_components", "progress_dialog.py"))
+progress_dialog = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(progress_dialog)
+OptimizationProgressDialog = progress_dialog.OptimizationProgressDialog
+
+
+class SleepingProcess(optimization_process.OptimizationProcess):
+    """최적화 대신 오래 잠자는 프로세스 (응답 없는 솔버 역할)"""
+    def __init__(self, dataframes, method='pre_assign'):
+        super().__init__(dataframes, method)
+        context = multiprocessing.get_context('spawn')
+        self.process = context.Process(target=time.sleep, args=(60,), daemon=True)
+
+
+class FakeDataInputPage:
+    def prepare_dataframes_for_optimization(self):
+        pass
+
+
+def wait_until(condition, timeout=30):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "시간 초과"
+        qt_app.processEvents()
+        time.sleep(0.05)
+
+
+def test_closing_dialog_terminates_process(monkeypatch):
+    monkeypatch.setattr(optimization_process, "OptimizationProcess", SleepingProcess)
+    dialog = OptimizationProgressDialog(FakeDataInputPage())
+    cancelled = []
+    dialog.optimization_cancelled.connect(lambda: cancelled.append(True))
+
+    dialog.show()
+    dialog.start_optimization()
+    worker = dialog.worker
+    wait_until(lambda: worker.optimization_process is not None and worker.optimization_process.process.is_alive())
+    process = worker.optimization_process.process
+
+    dialog.close()
+
+    assert not process.is_alive()
+    assert not worker.isRunning()
+    assert cancelled == [True]
+    assert not dialog.isVisible()
+
+
+def test_cancel_without_worker_closes_dialog():
+    dialog = OptimizationProgressDialog(FakeDataInputPage())
+    dialog.show()
+
+    dialog.cancel_optimization()
+
+    assert not dialog.isVisible()
+    assert dialog.result() == QDialog.Accepted
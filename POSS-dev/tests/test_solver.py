@@ -0,0 +1,51 @@
+"""
+솔버 설정 테스트
+풀이 중 취소하면 솔버가 중단되면서 그때까지의 가장 좋은 해가 변수 값으로 남고,
+상태가 최적으로 보고되지 않는지 확인
+"""
+import os
+import random
+import threading
+
+import pulp
+import pytest
+
+from app.core.optimization_process import OptimizationProcess
+from app.core.solver import SolverConfig, SolverLogTailer
+
+
+def make_knapsack(items=300, dimensions=30, seed=0):
+    """금방 풀리지 않는 다차원 배낭 문제"""
+    rng = random.Random(seed)
+    model = pulp.LpProblem('knapsack', pulp.LpMaximize)
+    x = [pulp.LpVariable(f'x{i}', cat='Binary') for i in range(items)]
+    model += pulp.lpSum(rng.randint(10, 100) * var for var in x)
+    for _ in range(dimensions):
+        weights = [rng.randint(5, 60) for _ in range(items)]
+        model += pulp.lpSum(w * var for w, var in zip(weights, x)) <= sum(weights) // 2
+    return model, x
+
+
+def test_interrupt_grace_fits_in_cancel_grace():
+    assert SolverLogTailer.INTERRUPT_GRACE < OptimizationProcess.CANCEL_GRACE
+
+
+@pytest.mark.skipif(os.name == 'nt', reason="Windows 에서는 솔버 프로세스를 종료하므로 해가 남지 않음")
+def test_cancel_keeps_incumbent():
+    model, x = make_knapsack()
+    cancel_event = threading.Event()
+
+    def cancel_on_incumbent(stats):
+        if stats.get('incumbent') is not None:
+            cancel_event.set()
+
+    stats = SolverConfig(time_limit=120, msg=False).solve(
+        model, callback=cancel_on_incumbent, cancel_event=cancel_event)
+
+    assert stats['cancelled']
+    assert stats['elapsed'] < 60
+    assert stats['status'] == 'Cancelled'
+    assert stats['solution'] == 'Solution Found'
+    assert all(var.varValue is not None for var in x)
+    assert all(constraint.valid() for constraint in model.constraints.values())
+    assert stats['objective'] == pytest.approx(pulp.value(model.objective))
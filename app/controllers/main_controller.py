@@ -2,7 +2,7 @@
 메인 컨트롤러
 MVC 패턴의 컨트롤러로 모델과 뷰를 연결
 """
-from PyQt5.QtCore import QObject, pyqtSignal
+from PyQt5.QtCore import QObject, QThread, pyqtSignal
 from PyQt5.QtWidgets import QMessageBox, QProgressDialog
 from datetime import datetime, timedelta
 
@@ -13,6 +13,35 @@ from app.utils.file_handler import FileHandler
 from app.views.schedule_grid_view import ScheduleGridView
 
 
+class ScheduleOptimizeWorker(QThread):
+    """
+    MILP 스케줄 최적화 작업 스레드
+    
+    현재 계획의 사본으로 최적화하므로 UI 스레드의 계획을 건드리지 않는다.
+    CBC 프로세스는 중간에 멈출 수 없으므로 취소하면 결과만 버리고, 풀이는 시간 제한 안에 끝난다.
+    결과는 finished 시그널 후 result 로 읽는다.
+    """
+    
+    def __init__(self, optimizer, plan: ProductionPlan, job_info: dict):
+        super().__init__()
+        self.optimizer = optimizer
+        self.plan = plan
+        self.job_info = job_info
+        self.cancelled = False
+        self.result = None  # (ProductionPlan, 통계)
+    
+    def run(self):
+        """최적화 실행 (실패하면 입력 계획을 그대로 반환)"""
+        try:
+            self.result = self.optimizer.optimize(self.plan, self.job_info)
+        except Exception as e:
+            self.result = (self.plan, {'status': f'Error: {e}'})
+    
+    def cancel(self):
+        """결과를 버리도록 표시"""
+        self.cancelled = True
+
+
 class MainController(QObject):
     """메인 컨트롤러"""
     
@@ -20,6 +49,7 @@ class MainController(QObject):
     schedule_generated = pyqtSignal(object)  # ProductionPlan
     schedule_updated = pyqtSignal()
     error_occurred = pyqtSignal(str)
+    optimization_finished = pyqtSignal(object)  # 최적화 통계 (취소/실패 포함)
     
     def __init__(self):
         super().__init__()
@@ -27,6 +57,9 @@ class MainController(QObject):
         self.scheduler = APSScheduler(self.master_data)
         self.current_plan = None
         self.current_sales_df = None
+        self.optimization_stats = None  # 최근 최적화 결과 (makespan/납기지연 개선량)
+        self._optimize_worker = None
+        self._optimize_base = None  # 최적화를 시작한 시점의 계획
     
     def load_sales_plan(self, file_path: str):
         """판매계획 로드"""
@@ -81,11 +114,8 @@ class MainController(QObject):
             # # 세척 블록 추가
             # self.scheduler.add_cleaning_blocks()
             
-            if progress_callback:
-                progress_callback(80, "최적화 중...")
-            
-            # 최적화 (추후 구현)
-            # self.scheduler.optimize_schedule()
+            # MILP 최적화는 start_optimization 으로 따로 실행
+            self.optimization_stats = None
             
             if progress_callback:
                 progress_callback(100, "완료!")
@@ -99,6 +129,66 @@ class MainController(QObject):
             self.error_occurred.emit(f"스케줄 생성 오류: {str(e)}")
             return None
     
+    def start_optimization(self) -> bool:
+        """
+        현재 계획의 MILP 최적화를 작업 스레드에서 시작
+        
+        결과는 optimization_finished 시그널로 전달되고, 개선된 계획이면 schedule_generated 도 발생한다.
+        
+        Returns:
+            bool: 시작 여부
+        """
+        if not self.current_plan:
+            self.error_occurred.emit("먼저 스케줄을 생성해주세요.")
+            return False
+        if self.is_optimizing():
+            self.error_occurred.emit("이전 최적화가 아직 끝나지 않았습니다.")
+            return False
+        
+        worker = ScheduleOptimizeWorker(
+            self.scheduler.create_optimizer(),
+            self.current_plan.copy(),
+            dict(self.scheduler.job_info)
+        )
+        worker.finished.connect(self._on_optimization_finished)
+        self._optimize_worker = worker
+        self._optimize_base = self.current_plan
+        worker.start()
+        return True
+    
+    def cancel_optimization(self):
+        """진행 중인 최적화 취소 (그리디 계획 유지)"""
+        if self._optimize_worker is not None:
+            self._optimize_worker.cancel()
+    
+    def is_optimizing(self) -> bool:
+        """최적화 스레드가 실행 중인지 여부 (취소 후 풀이가 끝나기 전까지 포함)"""
+        return self._optimize_worker is not None and self._optimize_worker.isRunning()
+    
+    def wait_optimization(self):
+        """최적화 스레드 종료 대기 (프로그램 종료 시)"""
+        if self._optimize_worker is not None:
+            self._optimize_worker.cancel()
+            self._optimize_worker.wait()
+    
+    def _on_optimization_finished(self):
+        """최적화 결과 반영 (UI 스레드)"""
+        worker = self._optimize_worker
+        if worker is None or worker.result is None:
+            return
+        plan, stats = worker.result
+        if worker.cancelled or self.current_plan is not self._optimize_base:
+            # 취소되었거나 그 사이 계획이 바뀌었으면 결과를 버린다
+            stats = dict(stats, status='Cancelled')
+        elif plan is not worker.plan:
+            self.current_plan = plan
+            self.scheduler.production_plan = plan
+            self.schedule_generated.emit(plan)
+        
+        if stats.get('status') != 'Cancelled':
+            self.optimization_stats = stats
+        self.optimization_finished.emit(stats)
+    
     def move_batch(self, batch_id: str, new_equipment_id: str, new_date: datetime):
         """배치 이동"""
         if not self.current_plan:
@@ -157,9 +247,9 @@ class MainController(QObject):
         
         # 작업자 용량 확인
         process_id = equipment['process_id']
-        operator_capacity = self.master_data.get_operator_capacity(
-            process_id, 
-            date.strftime('%Y-%m-%d')
+        operator_capacity = self.master_data.get_operator_calendar().capacity(
+            process_id,
+            date.toordinal()
         )
         
         if operator_capacity > 0:
@@ -246,29 +336,31 @@ class MainController(QObject):
         # 향후 30일간의 작업자 설정
         base_date = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
         
-        for i in range(30):
-            date = base_date + timedelta(days=i)
-            date_str = date.strftime('%Y-%m-%d')
+        # 공정×날짜마다 저장하지 않고 한 번에 저장
+        with self.master_data.batch():
+            for i in range(30):
+                date = base_date + timedelta(days=i)
+                date_str = date.strftime('%Y-%m-%d')
             
-            # 주말 제외
-            if date.weekday() >= 5:  # 토요일(5), 일요일(6)
-                continue
+                # 주말 제외
+                if date.weekday() >= 5:  # 토요일(5), 일요일(6)
+                    continue
             
-            for process in processes:
-                # 공정별로 다른 작업자 수 설정
-                if process['name'] in ['계량', '혼합']:
-                    worker_count = 2
-                    batches_per_worker = 3.0
-                elif process['name'] in ['타정', '코팅']:
-                    worker_count = 3
-                    batches_per_worker = 2.5
-                else:  # 선별, 포장
-                    worker_count = 4
-                    batches_per_worker = 2.0
+                for process in processes:
+                    # 공정별로 다른 작업자 수 설정
+                    if process['name'] in ['계량', '혼합']:
+                        worker_count = 2
+                        batches_per_worker = 3.0
+                    elif process['name'] in ['타정', '코팅']:
+                        worker_count = 3
+                        batches_per_worker = 2.5
+                    else:  # 선별, 포장
+                        worker_count = 4
+                        batches_per_worker = 2.0
                 
-                self.master_data.set_operator_capacity(
-                    process['id'],
-                    date_str,
-                    worker_count,
-                    batches_per_worker
-                )
\ No newline at end of file
+                    self.master_data.set_operator_capacity(
+                        process['id'],
+                        date_str,
+                        worker_count,
+                        batches_per_worker
+                    )
\ No newline at end of file
@@ -0,0 +1,415 @@
+"""
+MILP 스케줄 최적화
+그리디 스케줄링 결과를 초기해로 하여 장비×일×구간 시간색인 MILP(PuLP/CBC)로 재배치
+배치마다 그리디 시작일 전후 window_days 일 안의 구간만 후보로 두고, 로트를 그리디 시작 순서의 블록으로 나눠
+블록별로 나머지 배치를 고정한 채 푸는 롤링 호라이즌 방식이라 실제 규모의 계획도 제한 시간 안에 개선한다.
+공정/일 작업자 용량은 max(용량, 그리디 배치 수) 를 넘을 수 없으므로 용량을 넘는 그리디 결과도 초기해로 쓸 수 있지만
+최적화가 초과분을 늘리지는 않는다. 해를 찾지 못하거나 모델이 너무 크면 그리디 결과를 그대로 유지한다
+"""
+import math
+import os
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from pulp import (LpProblem, LpMinimize, LpVariable, LpBinary, LpSolution,
+                  PULP_CBC_CMD, lpSum, value)
+
+from app.models.production_plan import ProductionPlan, Batch
+from app.core.slot_occupancy import SlotOccupancy, SLOTS_PER_DAY
+
+
+class ScheduleOptimizer:
+    """시간색인(장비×일×구간) MILP 기반 스케줄 최적화"""
+
+    # 해를 돌려받은 풀이 상태 (최적해, 정수 가능해)
+    SOLVED = (LpSolution[1], LpSolution[2])
+
+    def __init__(self, master_data, time_limit: float = 30, mip_gap: float = 0.01,
+                 threads: Optional[int] = None, horizon_slack_days: int = 7,
+                 makespan_weight: float = 1.0, tardiness_weight: float = 1.0,
+                 window_days: int = 3, block_candidates: int = 6000, max_candidates: int = 200000):
+        """
+        Args:
+            master_data: 마스터 데이터
+            time_limit: 최대 풀이 시간(초), 블록들이 나눠 쓴다
+            mip_gap: 허용 상대 갭
+            threads: CBC 스레드 수 (None이면 CPU 코어 수)
+            horizon_slack_days: 그리디 계획 종료일 이후 추가로 허용할 일수
+            makespan_weight: 목적함수의 makespan(일) 가중치
+            tardiness_weight: 목적함수의 납기지연(일) 가중치
+            window_days: 배치별 후보 시작일 범위 (그리디 시작일 ± 일수)
+            block_candidates: 한 번에 푸는 블록의 후보 변수 수 (로트 단위로 나누므로 근사치)
+            max_candidates: 전체 후보 변수 수 상한. 넘으면 최적화하지 않는다
+        """
+        self.master_data = master_data
+        self.time_limit = time_limit
+        self.mip_gap = mip_gap
+        self.threads = threads or os.cpu_count() or 1
+        self.horizon_slack_days = horizon_slack_days
+        self.makespan_weight = makespan_weight
+        self.tardiness_weight = tardiness_weight
+        self.window_days = window_days
+        self.block_candidates = block_candidates
+        self.max_candidates = max_candidates
+
+    def optimize(self, plan: ProductionPlan, job_info: Dict) -> Tuple[ProductionPlan, Dict]:
+        """
+        생산계획 최적화 (롤링 호라이즌)
+
+        로트를 그리디 시작 순서로 block_candidates 크기의 블록으로 나누고,
+        앞 블록부터 나머지 배치를 고정한 채 블록 하나씩 MILP 로 다시 배치한다.
+
+        Args:
+            plan: 그리디 스케줄링 결과
+            job_info: {job_id: {'release': date, 'due': date}} 로트별 투입 가능일/납기일
+
+        Returns:
+            (최적화된 ProductionPlan, 통계 딕셔너리)
+            어느 블록에서도 해를 찾지 못하거나 후보 수가 max_candidates 를 넘으면 입력 계획을 그대로 반환한다.
+        """
+        jobs = self._collect_jobs(plan)
+        if not jobs:
+            return plan, self._build_stats(plan, plan, job_info, 'Empty', 0.0)
+
+        horizon_start = min(
+            [b.start_time.date() for ops in jobs.values() for b in ops] +
+            [self._to_date(info['release']) for job_id, info in job_info.items() if job_id in jobs]
+        )
+        horizon_end = max(b.start_time.date() for ops in jobs.values() for b in ops)
+        horizon_end += timedelta(days=min(self.horizon_slack_days, self.window_days))
+        num_days = (horizon_end - horizon_start).days + 1
+
+        batches = {b.id: b for ops in jobs.values() for b in ops}
+        candidates = self._build_candidates(jobs, job_info, horizon_start, num_days)
+        if candidates is None:
+            # 배치할 수 없는 공정이 있으면 최적화하지 않음
+            return plan, self._build_stats(plan, plan, job_info, 'NoCandidate', 0.0)
+        if sum(len(keys) for keys in candidates.values()) > self.max_candidates:
+            # 모델이 너무 크면 제한 시간 안에 개선하지 못하므로 최적화하지 않음
+            return plan, self._build_stats(plan, plan, job_info, 'TooLarge', 0.0)
+
+        # 현재 위치 (블록을 풀 때마다 갱신) 와 공정/일 그리디 배치 수
+        positions = {batch_id: self._slot_key(batch, horizon_start) for batch_id, batch in batches.items()}
+        greedy_load = {}
+        for batch_id, (_, t) in positions.items():
+            key = (batches[batch_id].process_id, t // SLOTS_PER_DAY)
+            greedy_load[key] = greedy_load.get(key, 0) + 1
+
+        blocks = self._split_blocks(jobs, candidates, positions)
+        statuses = []
+        started = time.perf_counter()
+        for idx, block in enumerate(blocks):
+            remaining = self.time_limit - (time.perf_counter() - started)
+            if remaining <= 0:
+                break
+            status, assignment = self._solve_block(block, jobs, batches, candidates, positions, greedy_load,
+                                                   job_info, horizon_start, remaining / (len(blocks) - idx))
+            statuses.append(status)
+            if assignment is not None:
+                positions.update(assignment)
+        solve_seconds = time.perf_counter() - started
+
+        solved = [status for status in statuses if status in self.SOLVED]
+        if not solved:
+            return plan, self._build_stats(plan, plan, job_info, statuses[0] if statuses else 'NotSolved',
+                                           solve_seconds, blocks=(0, len(blocks)))
+        if len(solved) == len(blocks) and all(status == LpSolution[1] for status in solved):
+            status = LpSolution[1]
+        else:
+            status = LpSolution[2]
+
+        optimized = ProductionPlan()
+        for batch in plan.batches.values():
+            if batch.id not in positions:
+                optimized.add_batch(batch)
+                continue
+            equipment_id, t = positions[batch.id]
+            day = horizon_start + timedelta(days=t // SLOTS_PER_DAY)
+            new_batch = Batch(
+                batch_id=batch.id,
+                product_id=batch.product_id,
+                product_name=batch.product_name,
+                equipment_id=equipment_id,
+                start_time=datetime.combine(day, datetime.min.time()).replace(hour=t % SLOTS_PER_DAY),
+                duration_hours=batch.duration_hours,
+                lot_number=batch.lot_number,
+                process_id=batch.process_id
+            )
+            new_batch.is_cleaning = batch.is_cleaning
+            optimized.add_batch(new_batch)
+
+        return optimized, self._build_stats(plan, optimized, job_info, status, solve_seconds,
+                                            blocks=(len(solved), len(blocks)))
+
+    def _build_candidates(self, jobs: Dict[str, List[Batch]], job_info: Dict, horizon_start: date,
+                          num_days: int) -> Optional[Dict[str, List[Tuple[str, int]]]]:
+        """배치별 후보 (장비, 시작 구간) - 그리디 시작일 ± window_days. 후보가 없는 배치가 있으면 None"""
+        occupancy = SlotOccupancy(self.master_data)
+        candidates = {}
+        for job_id, ops in jobs.items():
+            earliest_day = 0
+            if job_id in job_info:
+                earliest_day = max(0, (self._to_date(job_info[job_id]['release']) - horizon_start).days)
+
+            for batch in ops:
+                duration_slots = self._duration_slots(batch)
+                greedy_day = (batch.start_time.date() - horizon_start).days
+                # 공정 순서상 앞 공정의 가장 빠른 날보다 먼저 시작할 수 없음
+                first_day = max(earliest_day, greedy_day - self.window_days)
+                last_day = min(num_days - 1, greedy_day + self.window_days)
+                earliest_day = first_day
+                keys = []
+                for equipment_id in occupancy.get_eligible_equipment(batch.process_id, batch.product_id):
+                    for day_idx in range(first_day, last_day + 1):
+                        day = horizon_start + timedelta(days=day_idx)
+                        if not occupancy.is_working_day(batch.process_id, day):
+                            continue
+                        for slot in range(SLOTS_PER_DAY - duration_slots + 1):
+                            keys.append((equipment_id, day_idx * SLOTS_PER_DAY + slot))
+                if not keys:
+                    return None
+                candidates[batch.id] = keys
+        return candidates
+
+    def _split_blocks(self, jobs: Dict[str, List[Batch]], candidates: Dict,
+                      positions: Dict) -> List[List[str]]:
+        """로트를 그리디 시작 순서로 후보 수 block_candidates 이하의 블록으로 나눔 (로트는 나누지 않음)"""
+        order = sorted(jobs, key=lambda job_id: (positions[jobs[job_id][0].id][1], job_id))
+        blocks, block, size = [], [], 0
+        for job_id in order:
+            job_size = sum(len(candidates[batch.id]) for batch in jobs[job_id])
+            if block and size + job_size > self.block_candidates:
+                blocks.append(block)
+                block, size = [], 0
+            block.append(job_id)
+            size += job_size
+        if block:
+            blocks.append(block)
+        return blocks
+
+    def _solve_block(self, block: List[str], jobs: Dict[str, List[Batch]], batches: Dict[str, Batch],
+                     candidates: Dict, positions: Dict, greedy_load: Dict, job_info: Dict,
+                     horizon_start: date, time_limit: float) -> Tuple[str, Optional[Dict]]:
+        """
+        블록의 로트만 다시 배치하고 나머지 배치는 현재 위치에 고정
+
+        Returns:
+            (풀이 상태, {batch_id: (equipment_id, 구간)} - 해를 찾지 못하면 None)
+        """
+        block_ids = [batch.id for job_id in block for batch in jobs[job_id]]
+        in_block = set(block_ids)
+
+        # 블록 밖 배치가 점유한 장비 구간과 공정/일 작업자 부하
+        fixed_cells = set()
+        fixed_load = {}
+        for batch_id, (equipment_id, t) in positions.items():
+            if batch_id in in_block:
+                continue
+            batch = batches[batch_id]
+            for k in range(self._duration_slots(batch)):
+                fixed_cells.add((equipment_id, t + k))
+            key = (batch.process_id, t // SLOTS_PER_DAY)
+            fixed_load[key] = fixed_load.get(key, 0) + 1
+
+        prob = LpProblem("APS_Schedule", LpMinimize)
+
+        # 배치별 후보 (장비, 시작 구간) 변수 - 고정된 배치와 겹치는 후보는 제외
+        x = {}  # batch_id -> {(equipment_id, t): var}
+        for batch_id in block_ids:
+            duration_slots = self._duration_slots(batches[batch_id])
+            x[batch_id] = {
+                (equipment_id, t): LpVariable(f"x_{len(x)}_{equipment_id}_{t}", cat=LpBinary)
+                for equipment_id, t in candidates[batch_id]
+                if not any((equipment_id, t + k) in fixed_cells for k in range(duration_slots))
+            }
+
+        # 각 배치는 정확히 한 번 배치
+        for batch_id, batch_vars in x.items():
+            prob += lpSum(batch_vars.values()) == 1, f"assign_{batch_id}"
+
+        # 장비별 구간 중복 금지 / 공정별 일 작업자 용량
+        equipment_cover = {}  # (equipment_id, t) -> [var]
+        operator_load = {}  # (process_id, day_idx) -> [var]
+        for batch_id, batch_vars in x.items():
+            batch = batches[batch_id]
+            duration_slots = self._duration_slots(batch)
+            for (equipment_id, t), var in batch_vars.items():
+                for k in range(duration_slots):
+                    equipment_cover.setdefault((equipment_id, t + k), []).append(var)
+                operator_load.setdefault((batch.process_id, t // SLOTS_PER_DAY), []).append(var)
+
+        for (equipment_id, t), cover in equipment_cover.items():
+            if len(cover) > 1:
+                prob += lpSum(cover) <= 1, f"equipment_{equipment_id}_{t}"
+
+        # 공정/일 작업자 용량: 그리디 결과가 이미 초과한 날은 그 배치 수까지만 허용 (초과분을 늘리지 않음)
+        for (process_id, day_idx), load in operator_load.items():
+            capacity = self._operator_capacity(process_id, horizon_start + timedelta(days=day_idx))
+            if capacity is None:
+                continue
+            limit = max(capacity, greedy_load.get((process_id, day_idx), 0)) - fixed_load.get((process_id, day_idx), 0)
+            if len(load) > limit:
+                prob += lpSum(load) <= limit, f"operator_{process_id}_{day_idx}"
+
+        def start_expr(batch_id):
+            return lpSum(t * var for (_, t), var in x[batch_id].items())
+
+        def day_expr(batch_id):
+            return lpSum((t // SLOTS_PER_DAY) * var for (_, t), var in x[batch_id].items())
+
+        # 공정 순서 및 공정별 리드타임
+        makespan = LpVariable("makespan", lowBound=0)
+        tardiness = {}
+        due_days = {}
+        for job_id in block:
+            ops = jobs[job_id]
+            leadtimes = self.master_data.products.get(ops[0].product_id, {}).get('process_leadtimes', {})
+            for prev, nxt in zip(ops, ops[1:]):
+                prev_slots = self._duration_slots(prev)
+                leadtime_days = leadtimes.get(nxt.process_id, 0)
+                if leadtime_days > 0:
+                    # 이전 공정 완료일(마지막 구간이면 다음 날) + 리드타임 이후 시작
+                    end_day = lpSum(((t + prev_slots) // SLOTS_PER_DAY) * var
+                                    for (_, t), var in x[prev.id].items())
+                    prob += day_expr(nxt.id) >= end_day + leadtime_days, f"lead_{nxt.id}"
+                else:
+                    prob += start_expr(nxt.id) >= start_expr(prev.id) + prev_slots, f"prec_{nxt.id}"
+
+            last = ops[-1]
+            prob += makespan >= start_expr(last.id) + self._duration_slots(last), f"makespan_{job_id}"
+
+            if job_id in job_info:
+                due_days[job_id] = (self._to_date(job_info[job_id]['due']) - horizon_start).days
+                tardiness[job_id] = LpVariable(f"tardy_{job_id}", lowBound=0)
+                prob += tardiness[job_id] >= day_expr(last.id) - due_days[job_id], f"due_{job_id}"
+
+        prob += (self.tardiness_weight * lpSum(tardiness.values()) +
+                 self.makespan_weight * makespan / SLOTS_PER_DAY)
+
+        # 현재 위치로 초기해 설정 (고정 배치와 겹치지 않으므로 항상 후보에 있음)
+        for batch_id, batch_vars in x.items():
+            for key, var in batch_vars.items():
+                var.setInitialValue(1 if key == positions[batch_id] else 0)
+        makespan.setInitialValue(max(positions[jobs[job_id][-1].id][1] + self._duration_slots(jobs[job_id][-1])
+                                     for job_id in block))
+        for job_id, var in tardiness.items():
+            last_day = positions[jobs[job_id][-1].id][1] // SLOTS_PER_DAY
+            var.setInitialValue(max(0, last_day - due_days[job_id]))
+
+        solver = PULP_CBC_CMD(msg=False, timeLimit=time_limit, gapRel=self.mip_gap,
+                              threads=self.threads, warmStart=True)
+        prob.solve(solver)
+
+        # 1: 최적해, 2: 정수 가능해 (시간 제한 도달). 그 외에는 현재 위치 유지
+        status = LpSolution[prob.sol_status]
+        if prob.sol_status not in (1, 2):
+            return status, None
+
+        assignment = {}
+        for batch_id, batch_vars in x.items():
+            chosen = [key for key, var in batch_vars.items() if (value(var) or 0) > 0.5]
+            if len(chosen) != 1:
+                return 'InvalidSolution', None
+            assignment[batch_id] = chosen[0]
+        return status, assignment
+
+    def _collect_jobs(self, plan: ProductionPlan) -> Dict[str, List[Batch]]:
+        """배치를 로트(job) 단위로 묶고 공정 순서대로 정렬"""
+        jobs = {}
+        for batch in plan.batches.values():
+            if batch.is_cleaning or not batch.process_id:
+                continue
+            # 배치 ID 형식: "{job_id}_{process_id}"
+            job_id = batch.id.rsplit('_', 1)[0]
+            jobs.setdefault(job_id, []).append(batch)
+
+        for job_id, ops in jobs.items():
+            process_order = self.master_data.products.get(ops[0].product_id, {}).get('process_order', [])
+            rank = {process_id: idx for idx, process_id in enumerate(process_order)}
+            ops.sort(key=lambda b: (rank.get(b.process_id, len(rank)), b.start_time))
+        return jobs
+
+    def _build_stats(self, before: ProductionPlan, after: ProductionPlan, job_info: Dict,
+                     status: str, solve_seconds: float, blocks: Tuple[int, int] = (0, 0)) -> Dict:
+        """최적화 전후 makespan/납기지연 비교 통계"""
+        before_jobs = self._collect_jobs(before)
+        after_jobs = self._collect_jobs(after)
+        all_starts = [b.start_time.date() for ops in before_jobs.values() for b in ops]
+        all_starts += [b.start_time.date() for ops in after_jobs.values() for b in ops]
+        origin = min(all_starts) if all_starts else date.today()
+
+        makespan_before, tardiness_before = self._evaluate(before_jobs, job_info, origin)
+        makespan_after, tardiness_after = self._evaluate(after_jobs, job_info, origin)
+        tardiness_before = sum(tardiness_before.values())
+        tardiness_after = sum(tardiness_after.values())
+
+        return {
+            'status': status,
+            'objective': self.tardiness_weight * tardiness_after + self.makespan_weight * makespan_after / SLOTS_PER_DAY,
+            'solve_seconds': solve_seconds,
+            'blocks_solved': blocks[0],  # 해를 찾은 블록 수
+            'blocks': blocks[1],
+            'makespan_before': makespan_before,  # 구간 수
+            'makespan_after': makespan_after,
+            'makespan_improvement': makespan_before - makespan_after,
+            'tardiness_before': tardiness_before,  # 일 수
+            'tardiness_after': tardiness_after,
+            'tardiness_improvement': tardiness_before - tardiness_after,
+            'operator_overflow': self._operator_overflow(after)  # {(공정, 날짜): 용량 초과 배치 수}
+        }
+
+    def _evaluate(self, jobs: Dict[str, List[Batch]], job_info: Dict,
+                  origin: date) -> Tuple[int, Dict[str, int]]:
+        """(origin 기준 makespan 구간 수, 로트별 납기지연 일수) 계산"""
+        makespan = 0
+        tardiness = {}
+        for job_id, ops in jobs.items():
+            for batch in ops:
+                t = self._slot_key(batch, origin)[1]
+                makespan = max(makespan, t + self._duration_slots(batch))
+            if job_id in job_info:
+                last_day = ops[-1].start_time.date()
+                due = self._to_date(job_info[job_id]['due'])
+                tardiness[job_id] = max(0, (last_day - due).days)
+        return makespan, tardiness
+
+    def _operator_overflow(self, plan: ProductionPlan) -> Dict[Tuple[str, date], int]:
+        """공정/일별 작업자 용량을 넘는 배치 수"""
+        load = {}
+        for batch in plan.batches.values():
+            if batch.is_cleaning or not batch.process_id:
+                continue
+            key = (batch.process_id, batch.start_time.date())
+            load[key] = load.get(key, 0) + 1
+
+        overflow = {}
+        for (process_id, day), count in sorted(load.items()):
+            capacity = self._operator_capacity(process_id, day)
+            if capacity is not None and count > capacity:
+                overflow[(process_id, day)] = count - capacity
+        return overflow
+
+    def _operator_capacity(self, process_id: str, day: date) -> Optional[int]:
+        """공정/일 최대 배치 수 (용량 미설정 시 None)"""
+        capacity = self.master_data.get_operator_calendar().capacity(process_id, day.toordinal())
+        if capacity <= 0:
+            return None
+        # validate_batch_move 기준: 기존 배치 수가 용량 미만이면 추가 가능
+        return math.ceil(capacity)
+
+    @staticmethod
+    def _duration_slots(batch: Batch) -> int:
+        """소요시간을 구간 수로 변환 (2시간 = 1구간)"""
+        return max(1, int(batch.duration_hours / 2))
+
+    @staticmethod
+    def _slot_key(batch: Batch, origin: date) -> Tuple[str, int]:
+        """배치의 (장비, origin 기준 구간 번호)"""
+        day_idx = (batch.start_time.date() - origin).days
+        return batch.equipment_id, day_idx * SLOTS_PER_DAY + min(batch.start_time.hour, SLOTS_PER_DAY - 1)
+
+    @staticmethod
+    def _to_date(value) -> date:
+        """datetime/date를 date로 변환"""
+        return value.date() if isinstance(value, datetime) else value
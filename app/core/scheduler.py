@@ -11,15 +11,27 @@ from pulp import *
 
 from app.models.master_data import MasterDataManager
 from app.models.production_plan import ProductionPlan, Batch
+from app.core.slot_occupancy import SlotOccupancy
+from app.core.schedule_optimizer import ScheduleOptimizer
 
 
 class APSScheduler:
     """APS 스케줄링 엔진"""
     
+    # 일별 수요 테이블 컬럼 (seq: 같은 날짜/우선순위 내 입력 순서)
+    DEMAND_COLUMNS = ['date', 'product_id', 'product_name', 'lot_number', 'priority',
+                      'batch_count', 'quantity', 'due_date', 'seq']
+    
     def __init__(self, master_data: MasterDataManager):
         self.master_data = master_data
         self.production_plan = ProductionPlan()
         self.daily_work_hours = 8  # 1일 근무시간 8시간
+        self.job_info = {}  # job_id -> {'release': 투입 가능일, 'due': 납기일}
+        
+        # MILP 최적화 설정
+        self.optimize_time_limit = 30  # 초
+        self.optimize_mip_gap = 0.01
+        self.optimize_threads = None  # None이면 CPU 코어 수
         
     def schedule_from_sales_plan(self, sales_plan_df: pd.DataFrame, 
                                start_date: datetime) -> ProductionPlan:
@@ -49,269 +61,215 @@ class APSScheduler:
         
         return self.production_plan
     
-    def _process_new_format(self, sales_plan_df: pd.DataFrame) -> Dict:
-        """새로운 형식의 판매계획 처리"""
-        daily_demands = {}
-        
-        for _, row in sales_plan_df.iterrows():
-            product_code = str(row['제품코드'])
-            product_name = row['제품명']
-            lot_number = str(row['제조번호'])
-            quantity = int(row['수량'])
-            delivery_date = pd.to_datetime(row['납기일'])
-            priority = row.get('우선순위', '보통')
-            
-            # 제품 정보 조회
-            product = self.master_data.products.get(product_code)
-            if not product:
-                continue
-            
-            # 엑셀의 각 행을 하나의 배치로 처리 (중복 방지)
-            batch_count = 1  # 항상 1개의 배치로 처리
-            
-            # 우선순위 매핑
-            priority_map = {'긴급': 1, '높음': 2, '보통': 3, '낮음': 4}
-            priority_value = priority_map.get(priority, 3)
-            
-            # 납기일 기준으로 역산하여 생산일 계산
-            lead_time_hours = product.get('lead_time_hours', 24)
-            production_date = delivery_date - timedelta(hours=lead_time_hours)
-            
-            # 날짜별 수요에 추가
-            date_key = production_date.date()
-            if date_key not in daily_demands:
-                daily_demands[date_key] = []
-            
-            daily_demands[date_key].append({
-                'product_id': product_code,
-                'product_name': product_name,
-                'lot_number': lot_number,
-                'priority': priority_value,
-                'batch_count': batch_count,
-                'process_order': product['process_order'],
-                'equipment_list': product['equipment_list'],
-                'quantity': quantity
-            })
-        
-        return daily_demands
+    def _get_products_table(self) -> pd.DataFrame:
+        """제품 마스터를 조인용 DataFrame으로 변환"""
+        products = self.master_data.products.values()
+        return pd.DataFrame({
+            'product_id': [p['id'] for p in products],
+            'master_name': [p['name'] for p in products],
+            'master_priority': [p.get('priority') for p in products],
+            'lead_time_hours': [p.get('lead_time_hours', 24) for p in products]
+        })
     
-    def _split_monthly_to_daily(self, sales_plan_df: pd.DataFrame, 
-                              start_date: datetime) -> Dict:
-        """월별 수요를 일별로 분할"""
-        daily_demands = {}
+    def _process_new_format(self, sales_plan_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        새로운 형식의 판매계획 처리
         
-        for _, row in sales_plan_df.iterrows():
-            product_name = row['제품명']
-            
-            # 제품 정보 조회
-            product = None
-            for p in self.master_data.products.values():
-                if p['name'] == product_name:
-                    product = p
-                    break
-            
-            if not product:
-                continue
-            
-            # 월별 필요 배치수를 일별로 분할
-            for month_col in sales_plan_df.columns:
-                if '월' in month_col and pd.notna(row[month_col]):
-                    month_num = int(month_col.replace('월', ''))
-                    batches_needed = int(row[month_col])
-                    
-                    if batches_needed > 0:
-                        # 해당 월의 영업일 계산
-                        month_start = datetime(start_date.year, month_num, 1)
-                        if month_num == 12:
-                            month_end = datetime(start_date.year + 1, 1, 1) - timedelta(days=1)
-                        else:
-                            month_end = datetime(start_date.year, month_num + 1, 1) - timedelta(days=1)
-                        
-                        working_days = self._get_working_days(month_start, month_end)
-                        
-                        # 일별 배치수 계산
-                        daily_batch = batches_needed / len(working_days)
-                        
-                        for day in working_days:
-                            if day not in daily_demands:
-                                daily_demands[day] = []
-                            
-                            daily_demands[day].append({
-                                'product_id': product['id'],
-                                'product_name': product['name'],
-                                'priority': product['priority'],
-                                'batch_count': daily_batch,
-                                'process_order': product['process_order'],
-                                'equipment_list': product['equipment_list']
-                            })
-        
-        return daily_demands
-    
-    def _get_working_days(self, start_date: datetime, end_date: datetime) -> List[datetime]:
-        """주말을 제외한 영업일 목록 반환"""
-        working_days = []
-        current = start_date
-        
-        while current <= end_date:
-            # 주말 제외 (토요일: 5, 일요일: 6)
-            if current.weekday() < 5:
-                working_days.append(current)
-            current += timedelta(days=1)
-        
-        return working_days
+        엑셀의 각 행을 하나의 배치로 처리하고, 납기일에서 제품 리드타임을 역산하여 생산일을 계산
+        
+        Returns:
+            DataFrame: 일별 수요 테이블 (DEMAND_COLUMNS)
+        """
+        # 우선순위 매핑
+        priority_map = {'긴급': 1, '높음': 2, '보통': 3, '낮음': 4}
+        if '우선순위' in sales_plan_df.columns:
+            priority = sales_plan_df['우선순위'].map(priority_map).fillna(3).astype(int)
+        else:
+            priority = 3
+        
+        demands = pd.DataFrame({
+            'product_id': sales_plan_df['제품코드'].astype(str),
+            'product_name': sales_plan_df['제품명'],
+            'lot_number': sales_plan_df['제조번호'].astype(str),
+            'priority': priority,
+            'batch_count': 1.0,  # 항상 1개의 배치로 처리
+            'quantity': sales_plan_df['수량'].astype(int),
+            'due_time': pd.to_datetime(sales_plan_df['납기일'], format='mixed'),
+            'seq': np.arange(len(sales_plan_df))
+        })
+        
+        # 제품 정보 조회 (마스터에 없는 제품은 제외, 입력 순서 유지)
+        demands = demands.merge(self._get_products_table()[['product_id', 'lead_time_hours']],
+                                on='product_id', how='inner')
+        
+        # 납기 시각 기준으로 역산하여 생산일 계산 (리드타임을 뺀 뒤 날짜로 자름)
+        production_date = demands['due_time'] - pd.to_timedelta(demands['lead_time_hours'], unit='h')
+        demands['date'] = production_date.dt.normalize()
+        demands['due_date'] = demands['due_time'].dt.normalize()
+        
+        return demands[self.DEMAND_COLUMNS]
     
-    def _sort_by_priority(self, daily_demands: Dict) -> Dict:
-        """제품 우선순위별로 정렬"""
-        sorted_demands = {}
+    def _split_monthly_to_daily(self, sales_plan_df: pd.DataFrame, 
+                              start_date: datetime) -> pd.DataFrame:
+        """
+        월별 수요를 일별로 분할
+        
+        월별 필요 배치수를 해당 월의 영업일 수로 나누어 영업일마다 배분
+        
+        Returns:
+            DataFrame: 일별 수요 테이블 (DEMAND_COLUMNS)
+        """
+        month_cols = [col for col in sales_plan_df.columns if isinstance(col, str) and '월' in col]
+        if not month_cols:
+            return pd.DataFrame(columns=self.DEMAND_COLUMNS)
+        
+        # 제품명 -> 제품 (같은 이름이 여러 개면 먼저 등록된 제품)
+        products = self._get_products_table().drop_duplicates('master_name')
         
-        for date, demands in daily_demands.items():
-            # 우선순위 높은 순으로 정렬 (숫자가 작을수록 우선순위 높음)
-            sorted_demands[date] = sorted(demands, key=lambda x: x['priority'])
+        # 행 x 월 수요를 긴 형식으로 변환
+        monthly = sales_plan_df[month_cols].copy()
+        monthly.columns = range(len(month_cols))
+        monthly['row'] = np.arange(len(sales_plan_df))
+        monthly['product_name'] = sales_plan_df['제품명'].values
+        monthly = monthly.melt(id_vars=['row', 'product_name'], var_name='col', value_name='batches')
+        monthly = monthly[monthly['batches'].notna()]
+        monthly['batches'] = monthly['batches'].astype(float).astype(int)
+        monthly = monthly[monthly['batches'] > 0]
+        monthly['month'] = [int(month_cols[col].replace('월', '')) for col in monthly['col']]
         
-        return sorted_demands
+        monthly = monthly.merge(products, left_on='product_name', right_on='master_name', how='inner')
+        if monthly.empty:
+            return pd.DataFrame(columns=self.DEMAND_COLUMNS)
+        
+        # 해당 월의 영업일 달력 (월별 1회 계산) 과 결합하여 일별로 전개
+        calendar = self._get_business_calendar(start_date.year, monthly['month'].unique())
+        daily = monthly.merge(calendar, on='month', how='inner')
+        
+        return pd.DataFrame({
+            'date': daily['date'],
+            'product_id': daily['product_id'],
+            'product_name': daily['master_name'],
+            'lot_number': None,
+            'priority': daily['master_priority'],
+            'batch_count': daily['batches'] / daily['working_days'],
+            'quantity': np.nan,
+            'due_date': daily['date'],
+            'seq': daily['row'] * len(month_cols) + daily['col']
+        })[self.DEMAND_COLUMNS]
+    
+    def _get_business_calendar(self, year: int, months) -> pd.DataFrame:
+        """월별 영업일(주말 제외) 달력 반환: month, date, working_days"""
+        frames = []
+        for month_num in sorted(int(m) for m in months):
+            month_start = datetime(year, month_num, 1)
+            month_end = month_start + pd.offsets.MonthEnd(0)
+            days = pd.bdate_range(month_start, month_end)
+            frames.append(pd.DataFrame({
+                'month': month_num,
+                'date': days,
+                'working_days': len(days)
+            }))
+        return pd.concat(frames, ignore_index=True)
+    
+    def _sort_by_priority(self, daily_demands: pd.DataFrame) -> pd.DataFrame:
+        """날짜별 제품 우선순위 정렬 (숫자가 작을수록 우선순위 높음, 같으면 입력 순서)"""
+        return daily_demands.sort_values(['date', 'priority', 'seq'], kind='stable').reset_index(drop=True)
     
-    def _run_scheduling(self, daily_demands: Dict, start_date: datetime):
+    def _run_scheduling(self, daily_demands: pd.DataFrame, start_date: datetime):
         """실제 스케줄링 실행 - 레고 블록 방식 (4구간)"""
         
-        # 장비별 구간별 할당 관리
-        slot_allocation = {}  # {(equipment_id, date, slot): occupied}
+        # 장비별 구간별 점유 인덱스
+        occupancy = SlotOccupancy(self.master_data)
         
-        # 제품-배치별 마지막 공정 완료 시간 추적
-        batch_end_slots = {}  # {(product_id, batch_num, process_idx): (date, end_slot)}
+        # 로트별 공정 완료 구간 추적 (같은 제품의 다른 로트와 섞이지 않도록 job 단위)
+        batch_end_slots = {}  # {(batch_id, process_idx): (date, end_slot)}
         
-        for date, demands in sorted(daily_demands.items()):
-            for demand in demands:
-                product_id = demand['product_id']
-                product_name = demand['product_name']
-                batch_count = int(np.ceil(demand['batch_count']))  # 올림 처리
-                process_order = demand['process_order']
-                equipment_list = demand['equipment_list']
-                lot_number = demand.get('lot_number')  # 제조번호
+        for demand in daily_demands.itertuples(index=False):
+            product_id = demand.product_id
+            product_name = demand.product_name
+            batch_count = int(np.ceil(demand.batch_count))  # 올림 처리
+            product = self.master_data.products.get(product_id, {})
+            process_order = product.get('process_order', [])
+            lot_number = demand.lot_number if isinstance(demand.lot_number, str) else None  # 제조번호
+            
+            # 각 배치 스케줄링
+            for batch_num in range(batch_count):
+                batch_id = str(uuid.uuid4())[:8]
                 
-                # 각 배치 스케줄링
-                for batch_num in range(batch_count):
-                    batch_id = str(uuid.uuid4())[:8]
-                    
-                    # 시작 날짜와 구간 설정
-                    current_date = date if not isinstance(date, datetime) else date.date()
-                    current_slot = 0  # 첫 구간부터 시작
-                    
-                    # 공정 순서대로 처리
-                    for process_idx, process_id in enumerate(process_order):
-                        # 이전 공정이 있으면 그 완료 다음 구간부터 시작
-                        if process_idx > 0:
-                            prev_key = (product_id, batch_num, process_idx - 1)
-                            if prev_key in batch_end_slots:
-                                # 이전 공정 완료 위치
-                                prev_date, prev_end_slot = batch_end_slots[prev_key]
-                                
-                                # 다음 구간에서 시작
-                                current_date = prev_date
-                                current_slot = prev_end_slot + 1
-                                
-                                # 다음 날로 넘어가야 하는 경우
-                                if current_slot >= 4:
-                                    current_date = current_date + timedelta(days=1)
-                                    current_slot = 0
-                                
-                                # 공정별 리드타임 적용
-                                product = self.master_data.products.get(product_id, {})
-                                process_leadtimes = product.get('process_leadtimes', {})
-                                leadtime_days = process_leadtimes.get(process_id, 0)
-                                
-                                if leadtime_days > 0:
-                                    current_date = current_date + timedelta(days=leadtime_days)
-                                    current_slot = 0  # 리드타임 후 첫 구간부터
-                        
-                        # 공정별 장비 찾기
-                        process_equipment = self.master_data.get_equipment_by_process(process_id)
-                        if not process_equipment:
-                            continue
-                        
-                        # 가용한 구간과 장비 찾기
-                        scheduled = False
-                        search_date = current_date
-                        search_slot = current_slot
-                        max_search_days = 30
-                        
-                        # 공정 소요시간을 구간 수로 변환 (2시간 = 1구간)
-                        duration = self._get_process_duration(product_id, process_id)
-                        duration_slots = max(1, int(duration / 2))
-                        
-                        # 날짜별로 검색
-                        for day_offset in range(max_search_days):
-                            check_date = search_date + timedelta(days=day_offset)
+                # 시작 날짜와 구간 설정
+                current_date = demand.date.date()
+                current_slot = 0  # 첫 구간부터 시작
+                
+                # 최적화용 로트 정보 (투입 가능일, 납기일)
+                self.job_info[batch_id] = {
+                    'release': current_date,
+                    'due': demand.due_date
+                }
+                
+                # 공정 순서대로 처리
+                for process_idx, process_id in enumerate(process_order):
+                    # 이전 공정이 있으면 그 완료 다음 구간부터 시작
+                    if process_idx > 0:
+                        prev_key = (batch_id, process_idx - 1)
+                        if prev_key in batch_end_slots:
+                            # 이전 공정 완료 위치
+                            prev_date, prev_end_slot = batch_end_slots[prev_key]
                             
-                            # 주말 건너뛰기
-                            if check_date.weekday() >= 5:
-                                continue
+                            # 다음 구간에서 시작
+                            current_date = prev_date
+                            current_slot = prev_end_slot + 1
                             
-                            # 첫 날이 아니면 0구간부터 시작
-                            start_slot = search_slot if day_offset == 0 else 0
+                            # 다음 날로 넘어가야 하는 경우
+                            if current_slot >= 4:
+                                current_date = current_date + timedelta(days=1)
+                                current_slot = 0
                             
-                            # 구간별로 검색
-                            for slot in range(start_slot, 4):
-                                # 남은 구간이 충분한지 확인
-                                if slot + duration_slots > 4:
-                                    break
-                                
-                                # 작업자 정보 확인
-                                operator_info = self.master_data.get_operator_info(
-                                    process_id, check_date.strftime('%Y-%m-%d')
-                                )
-                                
-                                if not operator_info:
-                                    continue
-                                
-                                # 장비별로 가용성 확인
-                                for eq in process_equipment:
-                                    if product_id not in eq['available_products']:
-                                        continue
-                                    
-                                    # 해당 장비-구간이 비어있는지 확인
-                                    can_schedule = True
-                                    for s in range(duration_slots):
-                                        slot_key = (eq['id'], check_date, slot + s)
-                                        if slot_key in slot_allocation:
-                                            can_schedule = False
-                                            break
-                                    
-                                    if can_schedule:
-                                        # 구간 기반 단순화 - 구간 번호를 그대로 시간으로 사용
-                                        # 0구간=0시, 1구간=1시, 2구간=2시, 3구간=3시
-                                        start_time = datetime.combine(check_date, datetime.min.time()).replace(hour=slot)
-                                        
-                                        # 배치 생성
-                                        batch = Batch(
-                                            batch_id=f"{batch_id}_{process_id}",
-                                            product_id=product_id,
-                                            product_name=product_name,
-                                            equipment_id=eq['id'],
-                                            start_time=start_time,
-                                            duration_hours=duration,
-                                            lot_number=lot_number
-                                        )
-                                        batch.process_id = process_id
-                                        
-                                        self.production_plan.add_batch(batch)
-                                        
-                                        # 구간 점유 표시
-                                        for s in range(duration_slots):
-                                            slot_key = (eq['id'], check_date, slot + s)
-                                            slot_allocation[slot_key] = True
-                                        
-                                        # 완료 구간 저장
-                                        end_slot = slot + duration_slots - 1
-                                        batch_end_slots[(product_id, batch_num, process_idx)] = (check_date, end_slot)
-                                        
-                                        scheduled = True
-                                        break
-                                
-                                if scheduled:
-                                    break
+                            # 공정별 리드타임 적용
+                            process_leadtimes = product.get('process_leadtimes', {})
+                            leadtime_days = process_leadtimes.get(process_id, 0)
                             
-                            if scheduled:
-                                break
+                            if leadtime_days > 0:
+                                current_date = current_date + timedelta(days=leadtime_days)
+                                current_slot = 0  # 리드타임 후 첫 구간부터
+                    
+                    # 공정 소요시간을 구간 수로 변환 (2시간 = 1구간)
+                    duration = self._get_process_duration(product_id, process_id)
+                    duration_slots = max(1, int(duration / 2))
+                    
+                    # 가용한 구간과 장비 찾기 (주말/작업자 미등록일 제외, 최대 30일)
+                    placement = occupancy.find_earliest(
+                        process_id, product_id, current_date, current_slot,
+                        duration_slots, max_search_days=30
+                    )
+                    if placement is None:
+                        continue
+                    
+                    equipment_id, check_date, slot = placement
+                    
+                    # 구간 기반 단순화 - 구간 번호를 그대로 시간으로 사용
+                    # 0구간=0시, 1구간=1시, 2구간=2시, 3구간=3시
+                    start_time = datetime.combine(check_date, datetime.min.time()).replace(hour=slot)
+                    
+                    # 배치 생성
+                    batch = Batch(
+                        batch_id=f"{batch_id}_{process_id}",
+                        product_id=product_id,
+                        product_name=product_name,
+                        equipment_id=equipment_id,
+                        start_time=start_time,
+                        duration_hours=duration,
+                        lot_number=lot_number,
+                        process_id=process_id
+                    )
+                    
+                    self.production_plan.add_batch(batch)
+                    
+                    # 구간 점유 표시
+                    occupancy.occupy(equipment_id, check_date, slot, duration_slots)
+                    
+                    # 완료 구간 저장
+                    end_slot = slot + duration_slots - 1
+                    batch_end_slots[(batch_id, process_idx)] = (check_date, end_slot)
     
     def _find_available_equipment(self, process_id: str, product_id: str,
                                 preferred_equipment: List[str], 
@@ -390,11 +348,45 @@ class APSScheduler:
         
         return count
     
-    def optimize_schedule(self):
-        """선형계획법을 사용한 스케줄 최적화"""
-        # PuLP를 사용한 최적화 (추후 구현)
-        # 현재는 휴리스틱 방식으로 스케줄링
-        pass
+    def create_optimizer(self, time_limit: Optional[float] = None,
+                         mip_gap: Optional[float] = None,
+                         threads: Optional[int] = None) -> ScheduleOptimizer:
+        """
+        스케줄러 설정으로 MILP 최적화기 생성
+        
+        Args:
+            time_limit: 최대 풀이 시간(초), None이면 optimize_time_limit
+            mip_gap: 허용 상대 갭, None이면 optimize_mip_gap
+            threads: CBC 스레드 수, None이면 optimize_threads
+        """
+        return ScheduleOptimizer(
+            self.master_data,
+            time_limit=time_limit if time_limit is not None else self.optimize_time_limit,
+            mip_gap=mip_gap if mip_gap is not None else self.optimize_mip_gap,
+            threads=threads if threads is not None else self.optimize_threads
+        )
+    
+    def optimize_schedule(self, time_limit: Optional[float] = None,
+                          mip_gap: Optional[float] = None,
+                          threads: Optional[int] = None) -> Tuple[ProductionPlan, Dict]:
+        """
+        선형계획법을 사용한 스케줄 최적화
+        
+        그리디 결과를 초기해로 장비×일×구간 MILP를 CBC로 풀어 재배치한다.
+        공정 순서, 공정별 리드타임, 장비별 생산 가능 제품을 준수하고 작업자 용량 초과에는 벌점을 준다.
+        해를 찾지 못하거나 모델이 너무 크면 그리디 결과를 그대로 유지한다.
+        
+        Args:
+            time_limit: 최대 풀이 시간(초), None이면 optimize_time_limit
+            mip_gap: 허용 상대 갭, None이면 optimize_mip_gap
+            threads: CBC 스레드 수, None이면 optimize_threads
+            
+        Returns:
+            (ProductionPlan, 통계): 통계에는 makespan(구간)/납기지연(일)의 전후 값과 개선량 포함
+        """
+        optimizer = self.create_optimizer(time_limit, mip_gap, threads)
+        self.production_plan, stats = optimizer.optimize(self.production_plan, self.job_info)
+        return self.production_plan, stats
     
     def add_cleaning_blocks(self):
         """제품 전환 시 세척 블록 추가 - 현재 비활성화"""
@@ -413,5 +405,5 @@ class APSScheduler:
         
         for batch in batches:
             if batch.start_time >= after_time:
-                batch.start_time += time_shift
-                batch.end_time += time_shift
\ No newline at end of file
+                self.production_plan.move_batch(batch.id, equipment_id,
+                                                batch.start_time + time_shift)
\ No newline at end of file
@@ -0,0 +1,136 @@
+"""
+구간 점유 인덱스
+장비별 일/구간 점유 비트맵과 공정→제품→장비 적격성 인덱스를 관리하여
+스케줄링 시 가장 빠른 배치 위치를 빠르게 찾는다
+"""
+from bisect import bisect_left
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+
+SLOTS_PER_DAY = 4  # 하루 4구간
+FULL_DAY_MASK = (1 << SLOTS_PER_DAY) - 1
+
+
+def _build_first_fit_table() -> Dict[int, List[List[int]]]:
+    """
+    (소요 구간 수, 점유 마스크, 시작 구간) -> 배치 가능한 가장 빠른 구간 테이블 생성
+
+    Returns:
+        Dict: table[duration_slots][mask][start_slot] = 가장 빠른 구간 (-1: 불가)
+    """
+    table = {}
+    for duration_slots in range(1, SLOTS_PER_DAY + 1):
+        span = (1 << duration_slots) - 1
+        per_mask = []
+        for mask in range(FULL_DAY_MASK + 1):
+            earliest = [-1] * (SLOTS_PER_DAY + 1)
+            # 뒤에서부터 채워 각 시작 구간 이후의 첫 빈 구간을 기록
+            for slot in range(SLOTS_PER_DAY - 1, -1, -1):
+                fits = slot + duration_slots <= SLOTS_PER_DAY and not (mask & (span << slot))
+                earliest[slot] = slot if fits else earliest[slot + 1]
+            per_mask.append(earliest)
+        table[duration_slots] = per_mask
+    return table
+
+
+_FIRST_FIT = _build_first_fit_table()
+
+
+class SlotOccupancy:
+    """장비별 구간 점유 현황 인덱스"""
+
+    def __init__(self, master_data):
+        self.master_data = master_data
+        self._occupied = {}  # equipment_id -> {day_ordinal: mask}
+        self._eligible = {}  # (process_id, product_id) -> [equipment_id] (마스터 순서 유지)
+        self._calendar = master_data.get_operator_calendar()  # 작업자 용량 캘린더
+        self._build_indexes()
+
+    def _build_indexes(self):
+        """적격성 인덱스 생성"""
+        for eq in self.master_data.equipment.values():
+            process_id = eq['process_id']
+            for product_id in eq.get('available_products', []):
+                self._eligible.setdefault((process_id, product_id), []).append(eq['id'])
+
+    def get_eligible_equipment(self, process_id: str, product_id: str) -> List[str]:
+        """공정/제품 조합으로 생산 가능한 장비 ID 목록"""
+        return self._eligible.get((process_id, product_id), [])
+
+    def is_working_day(self, process_id: str, day: date) -> bool:
+        """평일이고 해당 공정에 작업자가 등록된 날인지 확인"""
+        if day.weekday() >= 5:
+            return False
+        return self._calendar.is_registered(process_id, day.toordinal())
+
+    def is_free(self, equipment_id: str, day: date, slot: int, duration_slots: int) -> bool:
+        """구간이 비어있는지 확인"""
+        if slot + duration_slots > SLOTS_PER_DAY:
+            return False
+        mask = self._occupied.get(equipment_id, {}).get(day.toordinal(), 0)
+        span = (1 << duration_slots) - 1
+        return not (mask & (span << slot))
+
+    def occupy(self, equipment_id: str, day: date, slot: int, duration_slots: int):
+        """구간 점유 표시"""
+        days = self._occupied.setdefault(equipment_id, {})
+        ordinal = day.toordinal()
+        span = (1 << duration_slots) - 1
+        days[ordinal] = days.get(ordinal, 0) | ((span << slot) & FULL_DAY_MASK)
+
+    def find_earliest(self, process_id: str, product_id: str, start_day: date,
+                      start_slot: int, duration_slots: int,
+                      max_search_days: int = 30) -> Optional[Tuple[str, date, int]]:
+        """
+        가장 빠른 배치 가능 위치 검색
+
+        같은 구간이면 마스터 데이터의 장비 순서를 우선한다.
+        주말과 작업자가 등록되지 않은 날은 건너뛴다.
+
+        Args:
+            process_id: 공정 ID
+            product_id: 제품 ID
+            start_day: 검색 시작일
+            start_slot: 검색 시작일의 시작 구간
+            duration_slots: 소요 구간 수
+            max_search_days: 최대 검색 일수
+
+        Returns:
+            (equipment_id, date, slot) 또는 None
+        """
+        eligible = self._eligible.get((process_id, product_id))
+        operator_days = self._calendar.registered_days(process_id)
+        if not eligible or not operator_days or duration_slots > SLOTS_PER_DAY:
+            return None
+
+        fit_table = _FIRST_FIT[duration_slots]
+        first = start_day.toordinal()
+        last = first + max_search_days
+
+        # 작업자가 등록된 날만 순회
+        for idx in range(bisect_left(operator_days, first), len(operator_days)):
+            ordinal = operator_days[idx]
+            if ordinal >= last:
+                break
+            day = date.fromordinal(ordinal)
+            if day.weekday() >= 5:
+                continue
+
+            slot_from = start_slot if ordinal == first else 0
+            if slot_from >= SLOTS_PER_DAY:
+                continue
+
+            best = None
+            for equipment_id in eligible:
+                mask = self._occupied.get(equipment_id, {}).get(ordinal, 0)
+                slot = fit_table[mask][slot_from]
+                if slot != -1 and (best is None or slot < best[2]):
+                    best = (equipment_id, day, slot)
+                    if slot == slot_from:
+                        break
+
+            if best is not None:
+                return best
+
+        return None
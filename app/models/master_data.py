@@ -1,18 +1,49 @@
 """
 마스터 데이터 모델
 제품, 공정, 장비, 작업자 정보를 관리
+
+변경 사항은 즉시 파일에 쓰지 않고 모아두었다가(write-behind)
+트랜잭션 종료 시 또는 일정 시간 후 한 번에 저장한다.
 """
+import atexit
 import json
 import os
+import tempfile
+import threading
+import weakref
+from contextlib import contextmanager
 from typing import Dict, List, Optional
 from datetime import datetime
 import pandas as pd
 
+from app.models.operator_calendar import OperatorCalendar
+
+
+DATA_TYPES = ("products", "processes", "equipment", "operators")
+
+# 종료 시 저장할 인스턴스 (인스턴스마다 atexit 에 등록하면 인스턴스가 해제되지 않고 훅이 계속 쌓임)
+_instances = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_all():
+    """프로세스 종료 시 살아 있는 모든 인스턴스의 저장 대기 변경 기록"""
+    for manager in list(_instances):
+        try:
+            manager.flush()
+        except Exception as e:
+            print(f"마스터 데이터 저장 오류 ({manager.data_dir}): {e}")
+
 
 class MasterDataManager:
     """마스터 데이터를 관리하는 클래스"""
     
-    def __init__(self, data_dir: str = None):
+    def __init__(self, data_dir: str = None, autosave_delay: float = 1.0):
+        """
+        Args:
+            data_dir: 마스터 데이터 디렉토리 (기본: 프로젝트 data/masters)
+            autosave_delay: 트랜잭션 밖의 변경을 모아 저장하기까지 대기 시간(초), 0이면 즉시 저장
+        """
         if data_dir is None:
             # 프로젝트 루트 경로 찾기
             current_file = os.path.abspath(__file__)
@@ -25,8 +56,18 @@ class MasterDataManager:
         self.processes = {}
         self.equipment = {}
         self.operators = {}
+
+        # 지연 저장 상태
+        self.autosave_delay = autosave_delay
+        self._lock = threading.RLock()
+        self._dirty = set()  # 저장 대기 중인 데이터 타입
+        self._batch_depth = 0
+        self._flush_timer = None
+        self._operator_calendar = None  # 작업자 변경 시 무효화
+
         self._ensure_data_dir()
         self.load_all_data()
+        _instances.add(self)
     
     def _ensure_data_dir(self):
         """데이터 디렉토리 확인 및 생성"""
@@ -37,7 +78,11 @@ class MasterDataManager:
         return os.path.join(self.data_dir, f"{data_type}.json")
     
     def load_all_data(self):
-        """모든 마스터 데이터 로드"""
+        """모든 마스터 데이터 로드 (저장 대기 중인 변경은 버림)"""
+        with self._lock:
+            self._cancel_flush_timer()
+            self._dirty.clear()
+            self._operator_calendar = None
         self.products = self._load_data("products")
         self.processes = self._load_data("processes")
         self.equipment = self._load_data("equipment")
@@ -58,37 +103,118 @@ class MasterDataManager:
         return {}
     
     def save_data(self, data_type: str, data: Dict):
-        """데이터 저장"""
+        """데이터 저장 (임시 파일에 쓴 뒤 교체)"""
         file_path = self._get_file_path(data_type)
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        with self._lock:
+            content = json.dumps(data, ensure_ascii=False, indent=2)
+            fd, temp_path = tempfile.mkstemp(prefix=f".{data_type}.", suffix=".tmp", dir=self.data_dir)
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    f.write(content)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(temp_path, file_path)
+            except BaseException:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
+            if data is getattr(self, data_type, None):
+                self._dirty.discard(data_type)
+
+    # 지연 저장 관련 메서드
+    @contextmanager
+    def batch(self):
+        """
+        여러 변경을 하나의 트랜잭션으로 묶어 종료 시 한 번만 저장
+
+        사용 예:
+            with master_data.batch():
+                for ...:
+                    master_data.set_operator_capacity(...)
+        """
+        with self._lock:
+            self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._batch_depth -= 1
+                outermost = self._batch_depth == 0
+            if outermost:
+                self.flush()
+
+    def mark_dirty(self, data_type: str):
+        """데이터 변경 표시 (트랜잭션 밖이면 지연 저장 예약)"""
+        with self._lock:
+            self._dirty.add(data_type)
+            if data_type in ("operators", "processes"):
+                self._operator_calendar = None
+            if self._batch_depth > 0:
+                return
+            if self.autosave_delay and self.autosave_delay > 0:
+                if self._flush_timer is None:
+                    self._flush_timer = threading.Timer(self.autosave_delay, self._autosave)
+                    self._flush_timer.daemon = True
+                    self._flush_timer.start()
+                return
+        self.flush()
+
+    def flush(self):
+        """저장 대기 중인 데이터를 파일에 기록"""
+        with self._lock:
+            self._cancel_flush_timer()
+            pending = [data_type for data_type in DATA_TYPES if data_type in self._dirty]
+            for data_type in pending:
+                self.save_data(data_type, getattr(self, data_type))
+
+    def _autosave(self):
+        """타이머 저장 (트랜잭션 진행 중이면 종료 시점 저장에 맡김)"""
+        with self._lock:
+            if self._flush_timer is not threading.current_thread():
+                return  # 이미 취소/교체된 타이머
+            self._flush_timer = None
+            if self._batch_depth > 0:
+                return
+            self.flush()
+
+    def has_pending_changes(self) -> bool:
+        """저장 대기 중인 변경 여부"""
+        return bool(self._dirty)
+
+    def _cancel_flush_timer(self):
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
     
     # 제품 관련 메서드
     def add_product(self, product_id: str, name: str, priority: int, 
                    equipment_list: List[str], process_order: List[str], 
                    lead_time: float):
         """제품 추가"""
-        self.products[product_id] = {
-            "id": product_id,
-            "name": name,
-            "priority": priority,
-            "equipment_list": equipment_list,
-            "process_order": process_order,
-            "lead_time_hours": lead_time
-        }
-        self.save_data("products", self.products)
+        with self._lock:
+            self.products[product_id] = {
+                "id": product_id,
+                "name": name,
+                "priority": priority,
+                "equipment_list": equipment_list,
+                "process_order": process_order,
+                "lead_time_hours": lead_time
+            }
+            self.mark_dirty("products")
     
     def update_product(self, product_id: str, **kwargs):
         """제품 정보 업데이트"""
-        if product_id in self.products:
-            self.products[product_id].update(kwargs)
-            self.save_data("products", self.products)
+        with self._lock:
+            if product_id in self.products:
+                self.products[product_id].update(kwargs)
+                self.mark_dirty("products")
     
     def delete_product(self, product_id: str):
         """제품 삭제"""
-        if product_id in self.products:
-            del self.products[product_id]
-            self.save_data("products", self.products)
+        with self._lock:
+            if product_id in self.products:
+                del self.products[product_id]
+                self.mark_dirty("products")
     
     def get_product(self, product_id: str) -> Optional[Dict]:
         """제품 정보 조회"""
@@ -97,12 +223,25 @@ class MasterDataManager:
     # 공정 관련 메서드
     def add_process(self, process_id: str, name: str, order: int):
         """공정 추가"""
-        self.processes[process_id] = {
-            "id": process_id,
-            "name": name,
-            "order": order
-        }
-        self.save_data("processes", self.processes)
+        with self._lock:
+            self.processes[process_id] = {
+                "id": process_id,
+                "name": name,
+                "order": order
+            }
+            self.mark_dirty("processes")
+    
+    def update_process(self, process_id: str, **kwargs):
+        """공정 정보 업데이트"""
+        with self._lock:
+            if process_id in self.processes:
+                kwargs.pop('process_id', None)
+                self.processes[process_id].update(kwargs)
+                self.mark_dirty("processes")
+    
+    def get_process(self, process_id: str) -> Optional[Dict]:
+        """공정 정보 조회"""
+        return self.processes.get(process_id)
     
     def get_process_list(self) -> List[Dict]:
         """공정 목록 반환 (순서대로)"""
@@ -113,15 +252,16 @@ class MasterDataManager:
                      available_products: List[str], requires_cleaning: bool,
                      restrictions: Optional[Dict] = None):
         """장비 추가"""
-        self.equipment[equipment_id] = {
-            "id": equipment_id,
-            "name": name,
-            "process_id": process_id,
-            "available_products": available_products,
-            "requires_cleaning": requires_cleaning,
-            "restrictions": restrictions or {}
-        }
-        self.save_data("equipment", self.equipment)
+        with self._lock:
+            self.equipment[equipment_id] = {
+                "id": equipment_id,
+                "name": name,
+                "process_id": process_id,
+                "available_products": available_products,
+                "requires_cleaning": requires_cleaning,
+                "restrictions": restrictions or {}
+            }
+            self.mark_dirty("equipment")
     
     def get_equipment_by_process(self, process_id: str) -> List[Dict]:
         """특정 공정의 장비 목록 반환"""
@@ -154,18 +294,27 @@ class MasterDataManager:
                             worker_count: int, batches_per_worker: float = None):
         """작업자 용량 설정"""
         key = f"{process_id}_{date}"
-        self.operators[key] = {
-            "process_id": process_id,
-            "date": date,
-            "worker_count": worker_count
-        }
-        
-        # 기존 방식과의 호환성 유지
-        if batches_per_worker is not None:
-            self.operators[key]["batches_per_worker"] = batches_per_worker
-            self.operators[key]["total_capacity"] = worker_count * batches_per_worker
+        with self._lock:
+            self.operators[key] = {
+                "process_id": process_id,
+                "date": date,
+                "worker_count": worker_count
+            }
             
-        self.save_data("operators", self.operators)
+            # 기존 방식과의 호환성 유지
+            if batches_per_worker is not None:
+                self.operators[key]["batches_per_worker"] = batches_per_worker
+                self.operators[key]["total_capacity"] = worker_count * batches_per_worker
+                
+            self.mark_dirty("operators")
+    
+    def update_operator(self, process_id: str, date: str, **kwargs):
+        """작업자 정보 일부 업데이트 (없으면 생성)"""
+        key = f"{process_id}_{date}"
+        with self._lock:
+            operator = self.operators.setdefault(key, {"process_id": process_id, "date": date})
+            operator.update(kwargs)
+            self.mark_dirty("operators")
     
     def get_operator_capacity(self, process_id: str, date: str) -> float:
         """특정 공정/날짜의 작업자 용량 반환"""
@@ -175,6 +324,15 @@ class MasterDataManager:
             return operator_data['total_capacity']
         return 0.0
     
+    def get_operator_calendar(self) -> OperatorCalendar:
+        """공정 × 일 서수로 색인된 작업자 용량 캘린더 (작업자 변경 시 재생성)"""
+        calendar = self._operator_calendar
+        if calendar is None:
+            with self._lock:
+                calendar = OperatorCalendar(self.operators, self.processes.keys())
+                self._operator_calendar = calendar
+        return calendar
+    
     def get_operator_info(self, process_id: str, date: str) -> Optional[Dict]:
         """특정 공정/날짜의 작업자 정보 반환"""
         key = f"{process_id}_{date}"
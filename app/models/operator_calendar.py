@@ -0,0 +1,149 @@
+"""
+작업자 용량 캘린더
+"{process_id}_{YYYY-MM-DD}" 문자열 키로 저장된 작업자 정보를
+공정 × 일 서수(date.toordinal) 2차원 NumPy 배열로 변환하여
+정수 일 서수로 바로 조회하고, 기간 합계 등은 벡터 연산으로 계산한다
+"""
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Union
+
+import numpy as np
+
+
+DayLike = Union[date, datetime, str, int]
+
+
+def to_ordinal(day: DayLike) -> int:
+    """날짜(date/datetime/'YYYY-MM-DD'/서수)를 일 서수로 변환"""
+    if isinstance(day, (int, np.integer)):
+        return int(day)
+    if isinstance(day, str):
+        return datetime.strptime(day[:10], '%Y-%m-%d').toordinal()
+    return day.toordinal()
+
+
+class OperatorCalendar:
+    """공정별 일 단위 작업자 용량 캘린더"""
+
+    def __init__(self, operators: Dict[str, Dict], process_ids: Iterable[str] = ()):
+        """
+        Args:
+            operators: MasterDataManager.operators ("{process_id}_{YYYY-MM-DD}" -> 작업자 정보)
+            process_ids: 작업자 정보가 없어도 행을 만들 공정 ID
+        """
+        rows, ordinals, workers, capacities = [], [], [], []
+        process_index = {process_id: idx for idx, process_id in enumerate(dict.fromkeys(process_ids))}
+
+        for key, info in operators.items():
+            if not info:
+                continue
+            # 키 형식: "{process_id}_{YYYY-MM-DD}"
+            process_id, _, date_str = key.rpartition('_')
+            try:
+                ordinal = datetime.strptime(date_str, '%Y-%m-%d').toordinal()
+            except ValueError:
+                continue
+            rows.append(process_index.setdefault(process_id, len(process_index)))
+            ordinals.append(ordinal)
+            workers.append(info.get('worker_count', 0) or 0)
+            capacities.append(info.get('total_capacity', 0) or 0)
+
+        self.process_ids = list(process_index)
+        self._process_index = process_index
+
+        if ordinals:
+            ordinals = np.asarray(ordinals, dtype=np.int64)
+            self.first_ordinal = int(ordinals.min())
+            n_days = int(ordinals.max()) - self.first_ordinal + 1
+        else:
+            self.first_ordinal = 0
+            n_days = 0
+
+        shape = (len(self.process_ids), n_days)
+        self.registered = np.zeros(shape, dtype=bool)  # 작업자 등록 여부
+        self.worker_count = np.zeros(shape, dtype=np.float64)
+        self.total_capacity = np.zeros(shape, dtype=np.float64)  # 일 최대 배치 수
+        if n_days:
+            cols = ordinals - self.first_ordinal
+            self.registered[rows, cols] = True
+            self.worker_count[rows, cols] = workers
+            self.total_capacity[rows, cols] = capacities
+
+        self._registered_days = {}  # process_id -> 등록일 서수 목록 (정렬)
+
+    @property
+    def n_days(self) -> int:
+        return self.registered.shape[1]
+
+    def _locate(self, process_id: str, day: DayLike):
+        """(행, 열) 위치, 캘린더 밖이면 None"""
+        row = self._process_index.get(process_id)
+        if row is None:
+            return None
+        col = to_ordinal(day) - self.first_ordinal
+        if col < 0 or col >= self.n_days:
+            return None
+        return row, col
+
+    def is_registered(self, process_id: str, day: DayLike) -> bool:
+        """해당 공정/일에 작업자가 등록되어 있는지"""
+        loc = self._locate(process_id, day)
+        return loc is not None and bool(self.registered[loc])
+
+    def capacity(self, process_id: str, day: DayLike) -> float:
+        """해당 공정/일 작업자 용량 (미등록 시 0)"""
+        loc = self._locate(process_id, day)
+        return float(self.total_capacity[loc]) if loc is not None else 0.0
+
+    def workers(self, process_id: str, day: DayLike) -> float:
+        """해당 공정/일 작업자 수 (미등록 시 0)"""
+        loc = self._locate(process_id, day)
+        return float(self.worker_count[loc]) if loc is not None else 0.0
+
+    def registered_days(self, process_id: str) -> List[int]:
+        """작업자가 등록된 날의 서수 목록 (오름차순)"""
+        days = self._registered_days.get(process_id)
+        if days is None:
+            row = self._process_index.get(process_id)
+            if row is None:
+                days = []
+            else:
+                days = (np.flatnonzero(self.registered[row]) + self.first_ordinal).tolist()
+            self._registered_days[process_id] = days
+        return days
+
+    def capacity_range(self, process_id: str, start: DayLike, end: DayLike) -> np.ndarray:
+        """start~end(포함) 일별 작업자 용량 배열 (캘린더 밖은 0)"""
+        first, last = to_ordinal(start), to_ordinal(end)
+        result = np.zeros(max(0, last - first + 1), dtype=np.float64)
+        row = self._process_index.get(process_id)
+        if row is None or not len(result):
+            return result
+        lo = max(first, self.first_ordinal)
+        hi = min(last, self.first_ordinal + self.n_days - 1)
+        if lo <= hi:
+            result[lo - first:hi - first + 1] = \
+                self.total_capacity[row, lo - self.first_ordinal:hi - self.first_ordinal + 1]
+        return result
+
+    def total_capacity_between(self, process_id: str, start: DayLike, end: DayLike) -> float:
+        """start~end(포함) 기간 작업자 용량 합계"""
+        return float(self.capacity_range(process_id, start, end).sum())
+
+    def month_capacity(self, year: int, month: int, process_id: Optional[str] = None):
+        """
+        월간 작업자 용량 합계
+
+        Returns:
+            process_id 지정 시 float, 미지정 시 {process_id: float}
+        """
+        start = date(year, month, 1)
+        end = date(year + (month == 12), month % 12 + 1, 1).toordinal() - 1
+        if process_id is not None:
+            return self.total_capacity_between(process_id, start, end)
+        lo = max(start.toordinal(), self.first_ordinal) - self.first_ordinal
+        hi = min(end, self.first_ordinal + self.n_days - 1) - self.first_ordinal
+        if lo > hi:
+            return {pid: 0.0 for pid in self.process_ids}
+        totals = self.total_capacity[:, lo:hi + 1].sum(axis=1)
+        return dict(zip(self.process_ids, totals.tolist()))
@@ -7,14 +7,18 @@ import numpy as np
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
 import uuid
+from bisect import bisect_left, insort
 
 
 class Batch:
     """배치 정보를 나타내는 클래스"""
     
+    __slots__ = ('id', 'product_id', 'product_name', 'equipment_id', 'start_time',
+                 'duration_hours', 'end_time', 'process_id', 'is_cleaning', 'lot_number')
+    
     def __init__(self, batch_id: str, product_id: str, product_name: str,
                  equipment_id: str, start_time: datetime, duration_hours: int = 8,
-                 lot_number: str = None):
+                 lot_number: str = None, process_id: str = None):
         self.id = batch_id
         self.product_id = product_id
         self.product_name = product_name
@@ -22,7 +26,7 @@ class Batch:
         self.start_time = start_time
         self.duration_hours = duration_hours
         self.end_time = start_time + timedelta(hours=duration_hours)
-        self.process_id = None
+        self.process_id = process_id
         self.is_cleaning = False
         self.lot_number = lot_number  # 제조번호 추가
         
@@ -42,6 +46,113 @@ class Batch:
         }
 
 
+class BatchStore:
+    """
+    배치 속성을 열 단위 NumPy 배열로 보관하는 저장소 (struct-of-arrays)
+    
+    장비/제품/공정 ID는 정수 코드로 저장한다.
+    ProductionPlan의 add_batch/move_batch/remove_batch를 통해서만 갱신된다.
+    삭제된 행은 표시만 해두었다가 열을 읽을 때 한 번에 압축하여 추가 순서를 유지한다.
+    """
+    
+    CODED_COLUMNS = ('equipment_id', 'product_id', 'process_id')
+    
+    def __init__(self, capacity: int = 256):
+        self.rows = {}  # batch_id -> 행 번호
+        self.categories = {name: [] for name in self.CODED_COLUMNS}  # 코드 -> ID
+        self._codes = {name: {} for name in self.CODED_COLUMNS}  # ID -> 코드
+        self._size = 0  # 사용한 행 수 (삭제 표시된 행 포함)
+        self._columns = {
+            'batch_id': np.empty(capacity, dtype=object),
+            'product_name': np.empty(capacity, dtype=object),
+            'lot_number': np.empty(capacity, dtype=object),
+            'start_time': np.empty(capacity, dtype='datetime64[ns]'),
+            'end_time': np.empty(capacity, dtype='datetime64[ns]'),
+            'duration_hours': np.empty(capacity, dtype=np.float64),
+            'equipment_id': np.empty(capacity, dtype=np.int32),
+            'product_id': np.empty(capacity, dtype=np.int32),
+            'process_id': np.empty(capacity, dtype=np.int32),
+            'is_cleaning': np.empty(capacity, dtype=bool),
+            'valid': np.empty(capacity, dtype=bool)
+        }
+    
+    def __len__(self):
+        return len(self.rows)
+    
+    def code(self, column: str, value) -> int:
+        """ID를 정수 코드로 변환 (처음 보는 ID는 등록, None은 -1)"""
+        if value is None:
+            return -1
+        codes = self._codes[column]
+        code = codes.get(value)
+        if code is None:
+            code = len(codes)
+            codes[value] = code
+            self.categories[column].append(value)
+        return code
+    
+    def add(self, batch: Batch):
+        """배치 행 추가"""
+        if batch.id in self.rows:
+            self.remove(batch.id)
+        
+        capacity = len(self._columns['valid'])
+        if self._size == capacity:
+            for name, column in self._columns.items():
+                grown = np.empty(capacity * 2, dtype=column.dtype)
+                grown[:capacity] = column
+                self._columns[name] = grown
+        
+        row = self._size
+        self._size += 1
+        self.rows[batch.id] = row
+        
+        columns = self._columns
+        columns['batch_id'][row] = batch.id
+        columns['product_name'][row] = batch.product_name
+        columns['lot_number'][row] = batch.lot_number
+        columns['duration_hours'][row] = batch.duration_hours
+        columns['product_id'][row] = self.code('product_id', batch.product_id)
+        columns['process_id'][row] = self.code('process_id', batch.process_id)
+        columns['is_cleaning'][row] = batch.is_cleaning
+        columns['valid'][row] = True
+        self.update(batch)
+    
+    def update(self, batch: Batch):
+        """배치의 장비/시간 갱신 (move_batch 후)"""
+        row = self.rows[batch.id]
+        columns = self._columns
+        columns['start_time'][row] = np.datetime64(batch.start_time, 'ns')
+        columns['end_time'][row] = np.datetime64(batch.end_time, 'ns')
+        columns['equipment_id'][row] = self.code('equipment_id', batch.equipment_id)
+    
+    def remove(self, batch_id: str):
+        """배치 행 삭제 표시"""
+        row = self.rows.pop(batch_id, None)
+        if row is not None:
+            self._columns['valid'][row] = False
+            self._columns['batch_id'][row] = None
+    
+    def _compact(self):
+        """삭제 표시된 행 제거 (추가 순서 유지)"""
+        if self._size == len(self.rows):
+            return
+        keep = np.flatnonzero(self._columns['valid'][:self._size])
+        for name, column in self._columns.items():
+            column[:len(keep)] = column[keep]
+        self._size = len(keep)
+        self.rows = {batch_id: row for row, batch_id in enumerate(self._columns['batch_id'][:self._size])}
+    
+    def columns(self) -> Dict[str, np.ndarray]:
+        """유효한 행들의 열 배열 (저장소 배열의 뷰)"""
+        self._compact()
+        return {name: column[:self._size] for name, column in self._columns.items() if name != 'valid'}
+    
+    def categorical(self, column: str, codes: np.ndarray) -> pd.Categorical:
+        """코드 배열을 Categorical로 변환 (코드 배열 재사용)"""
+        return pd.Categorical.from_codes(codes, categories=pd.Index(self.categories[column], dtype=object))
+
+
 class ProductionPlan:
     """생산계획 전체를 관리하는 클래스"""
     
@@ -50,6 +161,43 @@ class ProductionPlan:
         self.equipment_schedule = {}  # equipment_id -> List[batch_id]
         self.date_range = None
         self._df = None  # 캐시된 DataFrame
+        self._store = BatchStore()  # 열 단위 배치 저장소
+        
+        # 인덱스 (add_batch/move_batch/remove_batch에서 증분 갱신)
+        self._timelines = {}  # equipment_id -> [(start_time, seq, batch_id)] 시작시간순 정렬
+        self._max_duration = {}  # equipment_id -> 최대 소요시간 (중복 검사 탐색 범위)
+        self._date_index = {}  # date -> {batch_id: None} (삽입 순서 유지)
+        self._timeline_keys = {}  # batch_id -> 타임라인 키
+        self._added_order = {}  # batch_id -> 추가 순서 (같은 시간 배치 정렬용)
+        self._seq = 0
+    
+    def _index_batch(self, batch: Batch):
+        """배치를 장비 타임라인과 날짜 인덱스에 등록"""
+        self._seq += 1
+        key = (batch.start_time, self._seq, batch.id)
+        insort(self._timelines.setdefault(batch.equipment_id, []), key)
+        self._timeline_keys[batch.id] = key
+        
+        duration = timedelta(hours=batch.duration_hours)
+        if duration > self._max_duration.get(batch.equipment_id, timedelta(0)):
+            self._max_duration[batch.equipment_id] = duration
+        
+        self._date_index.setdefault(batch.start_time.date(), {})[batch.id] = None
+    
+    def _unindex_batch(self, batch: Batch):
+        """장비 타임라인과 날짜 인덱스에서 배치 제거"""
+        key = self._timeline_keys.pop(batch.id, None)
+        timeline = self._timelines.get(batch.equipment_id)
+        if key is not None and timeline:
+            idx = bisect_left(timeline, key)
+            if idx < len(timeline) and timeline[idx] == key:
+                del timeline[idx]
+        
+        date_batches = self._date_index.get(batch.start_time.date())
+        if date_batches is not None:
+            date_batches.pop(batch.id, None)
+            if not date_batches:
+                del self._date_index[batch.start_time.date()]
         
     def add_batch(self, batch: Batch):
         """배치 추가"""
@@ -59,6 +207,9 @@ class ProductionPlan:
         if batch.equipment_id not in self.equipment_schedule:
             self.equipment_schedule[batch.equipment_id] = []
         self.equipment_schedule[batch.equipment_id].append(batch.id)
+        self._index_batch(batch)
+        self._added_order[batch.id] = self._seq
+        self._store.add(batch)
         
         # DataFrame 캐시 무효화
         self._df = None
@@ -71,6 +222,9 @@ class ProductionPlan:
             # 장비 스케줄에서 제거
             if batch.equipment_id in self.equipment_schedule:
                 self.equipment_schedule[batch.equipment_id].remove(batch_id)
+            self._unindex_batch(batch)
+            self._added_order.pop(batch_id, None)
+            self._store.remove(batch_id)
             
             del self.batches[batch_id]
             self._df = None
@@ -86,6 +240,7 @@ class ProductionPlan:
         # 기존 장비 스케줄에서 제거
         if old_equipment_id in self.equipment_schedule:
             self.equipment_schedule[old_equipment_id].remove(batch_id)
+        self._unindex_batch(batch)
         
         # 새 장비와 시간으로 업데이트
         batch.equipment_id = new_equipment_id
@@ -96,74 +251,93 @@ class ProductionPlan:
         if new_equipment_id not in self.equipment_schedule:
             self.equipment_schedule[new_equipment_id] = []
         self.equipment_schedule[new_equipment_id].append(batch_id)
+        self._index_batch(batch)
+        self._store.update(batch)
         
         self._df = None
         return True
     
+    def copy(self) -> 'ProductionPlan':
+        """배치를 복제한 독립된 사본 (추가 순서 유지)"""
+        plan = ProductionPlan()
+        for batch in self.batches.values():
+            clone = Batch(
+                batch_id=batch.id,
+                product_id=batch.product_id,
+                product_name=batch.product_name,
+                equipment_id=batch.equipment_id,
+                start_time=batch.start_time,
+                duration_hours=batch.duration_hours,
+                lot_number=batch.lot_number,
+                process_id=batch.process_id
+            )
+            clone.is_cleaning = batch.is_cleaning
+            plan.add_batch(clone)
+        plan.date_range = self.date_range
+        return plan
+    
     def get_batches_by_equipment(self, equipment_id: str) -> List[Batch]:
         """특정 장비의 배치 목록 반환 (시간순)"""
-        batch_ids = self.equipment_schedule.get(equipment_id, [])
-        batches = [self.batches[bid] for bid in batch_ids if bid in self.batches]
-        return sorted(batches, key=lambda b: b.start_time)
+        return [self.batches[bid] for _, _, bid in self._timelines.get(equipment_id, [])]
     
     def get_batches_by_date(self, date) -> List[Batch]:
         """특정 날짜의 배치 목록 반환"""
         if isinstance(date, datetime):
-            date_start = date.replace(hour=0, minute=0, second=0, microsecond=0)
-        else:
-            # date 객체인 경우
-            date_start = datetime.combine(date, datetime.min.time())
-        date_end = date_start + timedelta(days=1)
-        
-        batches = []
-        for batch in self.batches.values():
-            if date_start <= batch.start_time < date_end:
-                batches.append(batch)
+            date = date.date()
         
-        return sorted(batches, key=lambda b: (b.equipment_id, b.start_time))
+        batches = [self.batches[bid] for bid in self._date_index.get(date, {})]
+        return sorted(batches, key=lambda b: (b.equipment_id, b.start_time, self._added_order[b.id]))
     
     def check_overlap(self, equipment_id: str, start_time: datetime, 
                      duration_hours: int, exclude_batch_id: Optional[str] = None) -> bool:
         """시간 중복 확인"""
+        timeline = self._timelines.get(equipment_id)
+        if not timeline:
+            return False
+        
         end_time = start_time + timedelta(hours=duration_hours)
         
-        for batch_id in self.equipment_schedule.get(equipment_id, []):
+        # 겹칠 수 있는 배치는 (start_time - 최대 소요시간, end_time) 사이에 시작한 배치뿐
+        lo = bisect_left(timeline, (start_time - self._max_duration[equipment_id],))
+        hi = bisect_left(timeline, (end_time,))
+        for _, _, batch_id in timeline[lo:hi]:
             if batch_id == exclude_batch_id:
                 continue
-                
-            batch = self.batches.get(batch_id)
-            if batch:
-                # 시간 중복 확인
-                if not (end_time <= batch.start_time or start_time >= batch.end_time):
-                    return True
+            
+            batch = self.batches[batch_id]
+            # 시간 중복 확인
+            if start_time < batch.end_time:
+                return True
         
         return False
     
     def to_dataframe(self) -> pd.DataFrame:
-        """DataFrame으로 변환"""
+        """
+        DataFrame으로 변환 (열 저장소 배열로 구성)
+        
+        저장소 배열은 이후 배치 이동/삭제/압축 시 제자리에서 바뀌므로 복사해서 담는다.
+        """
         if self._df is not None:
             return self._df
         
         if not self.batches:
             return pd.DataFrame()
         
-        data = []
-        for batch in self.batches.values():
-            data.append({
-                'batch_id': batch.id,
-                'date': batch.start_time.date(),
-                'equipment_id': batch.equipment_id,
-                'product_id': batch.product_id,
-                'product_name': batch.product_name,
-                'start_time': batch.start_time,
-                'end_time': batch.end_time,
-                'duration_hours': batch.duration_hours,
-                'process_id': batch.process_id,
-                'is_cleaning': batch.is_cleaning,
-                'lot_number': batch.lot_number
-            })
-        
-        self._df = pd.DataFrame(data)
+        store = self._store
+        columns = store.columns()
+        self._df = pd.DataFrame({
+            'batch_id': columns['batch_id'],
+            'date': columns['start_time'].astype('datetime64[D]').astype(object),  # datetime.date
+            'equipment_id': store.categorical('equipment_id', columns['equipment_id']),
+            'product_id': store.categorical('product_id', columns['product_id']),
+            'product_name': columns['product_name'],
+            'start_time': columns['start_time'],
+            'end_time': columns['end_time'],
+            'duration_hours': columns['duration_hours'],
+            'process_id': store.categorical('process_id', columns['process_id']),
+            'is_cleaning': columns['is_cleaning'],
+            'lot_number': columns['lot_number']
+        }, copy=True)
         return self._df
     
     def to_grid_format(self) -> pd.DataFrame:
@@ -229,31 +403,37 @@ class ProductionPlan:
                 'date_range': None
             }
         
-        # 제품별 배치 수
+        store = self._store
+        columns = store.columns()
+        
+        # 제품별 배치 수 (처음 등장한 순서)
+        product_codes = columns['product_id']
+        unique_codes, first_rows, counts = np.unique(product_codes, return_index=True, return_counts=True)
         products = {}
-        for batch in self.batches.values():
-            if batch.product_id not in products:
-                products[batch.product_id] = {
-                    'name': batch.product_name,
-                    'count': 0
-                }
-            products[batch.product_id]['count'] += 1
+        for idx in np.argsort(first_rows):
+            products[store.categories['product_id'][unique_codes[idx]]] = {
+                'name': columns['product_name'][first_rows[idx]],
+                'count': int(counts[idx])
+            }
         
         # 장비 가동률
+        equipment_codes = columns['equipment_id']
+        num_equipment = len(store.categories['equipment_id'])
+        total_hours = np.bincount(equipment_codes, weights=columns['duration_hours'], minlength=num_equipment)
+        batch_counts = np.bincount(equipment_codes, minlength=num_equipment)
         equipment_util = {}
-        for eq_id, batch_ids in self.equipment_schedule.items():
-            total_hours = sum(self.batches[bid].duration_hours 
-                            for bid in batch_ids if bid in self.batches)
+        for eq_id in self.equipment_schedule:
+            code = store.code('equipment_id', eq_id)
             equipment_util[eq_id] = {
-                'total_hours': total_hours,
-                'batch_count': len(batch_ids)
+                'total_hours': float(total_hours[code]),
+                'batch_count': int(batch_counts[code])
             }
         
         # 날짜 범위
-        all_dates = [b.start_time for b in self.batches.values()]
+        start_times = columns['start_time']
         date_range = {
-            'start': min(all_dates),
-            'end': max(all_dates)
+            'start': pd.Timestamp(start_times.min()).to_pydatetime(),
+            'end': pd.Timestamp(start_times.max()).to_pydatetime()
         }
         
         return {
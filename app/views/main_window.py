@@ -216,6 +216,11 @@ class MainWindow(QMainWindow):
         """)
         btn_layout.addWidget(generate_btn)
         
+        optimize_btn = QPushButton("🔧 MILP 최적화")
+        optimize_btn.setToolTip("생성된 스케줄을 초기해로 납기지연/완료일을 줄이도록 재배치합니다 (최대 수십 초)")
+        optimize_btn.clicked.connect(self.optimize_schedule)
+        btn_layout.addWidget(optimize_btn)
+        
         btn_layout.addStretch()
         layout.addLayout(btn_layout)
         
@@ -326,6 +331,7 @@ class MainWindow(QMainWindow):
         self.controller.schedule_generated.connect(self.on_schedule_generated)
         self.controller.schedule_updated.connect(self.refresh_schedule_view)
         self.controller.error_occurred.connect(self.show_error)
+        self.controller.optimization_finished.connect(self.on_optimization_finished)
         
         # 그리드 뷰 시그널
         self.schedule_grid.batch_moved.connect(self.on_batch_moved)
@@ -377,6 +383,54 @@ class MainWindow(QMainWindow):
             self.log_message("스케줄 생성 완료!")
             QMessageBox.information(self, "완료", "스케줄이 성공적으로 생성되었습니다.")
     
+    def optimize_schedule(self):
+        """MILP 최적화 (작업 스레드에서 실행, 취소 시 그리디 스케줄 유지)"""
+        if not self.controller.current_plan:
+            QMessageBox.warning(self, "경고", "먼저 스케줄을 생성해주세요.")
+            return
+        
+        if not self.controller.start_optimization():
+            return
+        
+        self.log_message("MILP 최적화 시작...")
+        self.optimize_progress = QProgressDialog("MILP 최적화 중...", "취소", 0, 0, self)
+        self.optimize_progress.setWindowModality(Qt.WindowModal)
+        self.optimize_progress.canceled.connect(self.controller.cancel_optimization)
+        self.optimize_progress.show()
+    
+    def on_optimization_finished(self, stats):
+        """MILP 최적화 완료"""
+        progress = getattr(self, 'optimize_progress', None)
+        if progress is not None:
+            # close() 도 canceled 를 발생시키므로 먼저 연결 해제
+            progress.canceled.disconnect()
+            progress.close()
+            self.optimize_progress = None
+        
+        status = stats.get('status')
+        if status == 'Cancelled':
+            self.log_message("MILP 최적화 취소 (기존 스케줄 유지)")
+        elif status == 'TooLarge':
+            self.log_message("MILP 최적화 생략: 스케줄이 너무 커서 기존 스케줄을 유지합니다")
+        elif 'makespan_improvement' in stats:
+            self.log_message(
+                f"MILP 최적화 완료 ({status}, {stats['solve_seconds']:.1f}초): "
+                f"납기지연 {stats['tardiness_improvement']}일, "
+                f"완료 구간 {stats['makespan_improvement']}개 단축"
+            )
+            overflow = stats.get('operator_overflow')
+            if overflow:
+                self.log_message("작업자 용량 초과 (기존 계획 수준 허용): " + ", ".join(
+                    f"{process_id} {day} +{excess}" for (process_id, day), excess in sorted(overflow.items())
+                ))
+        else:
+            self.log_message(f"MILP 최적화 실패 ({status}): 기존 스케줄을 유지합니다")
+    
+    def closeEvent(self, event):
+        """종료 시 실행 중인 최적화 스레드 정리"""
+        self.controller.wait_optimization()
+        super().closeEvent(event)
+    
     def on_schedule_generated(self, plan):
         """스케줄 생성 완료"""
         self.schedule_status_label.setText(f"스케줄: 생성됨 ({len(plan.batches)}개 배치)")
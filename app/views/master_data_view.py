@@ -491,16 +491,11 @@ class MasterDataView(QWidget):
                 self.operator_table.setItem(row, 3, capacity_item)
                 
                 # 데이터 저장
-                operator_key = f"{process_id}_{date}"
-                if operator_key not in self.master_data.operators:
-                    self.master_data.operators[operator_key] = {
-                        'process_id': process_id,
-                        'date': date
-                    }
-                
-                self.master_data.operators[operator_key]['worker_count'] = worker_count
-                self.master_data.operators[operator_key]['total_capacity'] = capacity
-                self.master_data.save_data("operators", self.master_data.operators)
+                self.master_data.update_operator(
+                    process_id, date,
+                    worker_count=worker_count,
+                    total_capacity=capacity
+                )
                 
                 # 데이터 변경 시그널 발생
                 self.data_changed.emit()
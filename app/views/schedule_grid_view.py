@@ -2,902 +2,302 @@
 스케줄 그리드 뷰
 드래그&드롭을 지원하는 생산 스케줄 그리드
 POSS-dev의 item_grid_widget.py를 참고하여 구현
+
+장비×날짜×구간마다 위젯을 만들지 않고 화면에 보이는 영역만 직접 그린다.
+드래그&드롭 위치는 (장비, 날짜, 구간) 점유 인덱스로 판정한다.
 """
-from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QScrollArea,
-                           QGridLayout, QLabel, QFrame, QSizePolicy)
-from PyQt5.QtCore import Qt, pyqtSignal, QMimeData, QPoint
-from PyQt5.QtGui import QDrag, QPainter, QColor, QPixmap, QFont, QPen, QPainterPath
+import json
+import math
+import re
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+from PyQt5.QtWidgets import QAbstractScrollArea
+from PyQt5.QtCore import Qt, pyqtSignal, QMimeData, QPoint, QRect
+from PyQt5.QtGui import (QDrag, QPainter, QColor, QPixmap, QFont, QPen, QPainterPath,
+                         QLinearGradient)
 
 from app.models.production_plan import ProductionPlan, Batch
+from app.core.slot_occupancy import SLOTS_PER_DAY
 from app.resources.styles.screen_manager import w, h, f
-from app.resources.styles.app_style import AppStyle
-from datetime import datetime, timedelta
-import json
 
 
-class DraggableBatchLabel(QFrame):
-    """드래그 가능한 배치 라벨"""
-    
-    # 시그널
-    batch_selected = pyqtSignal(object)  # 배치 선택
-    batch_double_clicked = pyqtSignal(object)  # 배치 더블클릭
-    
-    def __init__(self, batch: Batch, master_data=None, parent=None):
-        super().__init__(parent)
-        self.batch = batch
-        self.master_data = master_data
-        self.is_selected = False
-        self.current_row = -1  # 현재 그리드 행
-        self.current_col = -1  # 현재 그리드 열
-        self.init_ui()
-    
-    def init_ui(self):
-        """UI 초기화"""
-        self.setFrameStyle(QFrame.NoFrame)  # 프레임 제거
-        self.setCursor(Qt.OpenHandCursor)
-        
-        # 기본 크기 설정 (나중에 부모에서 조정)
-        self.setMinimumHeight(h(40))
-        self.setMaximumHeight(h(45))
-        
-        # 레이아웃
-        layout = QVBoxLayout(self)
-        layout.setContentsMargins(4, 2, 4, 2)
-        layout.setSpacing(0)
-        
-        # 소요시간 아이콘 표시 (시계 아이콘 대신 시간 표시)
-        duration_container = QWidget()
-        duration_layout = QHBoxLayout(duration_container)
-        duration_layout.setContentsMargins(0, 0, 0, 2)
-        duration_layout.setSpacing(2)
-        
-        # 소요시간을 시각적으로 표시 (블록 개수로)
-        duration_hours = int(self.batch.duration_hours)
-        block_count = min(4, max(1, duration_hours // 2))  # 2시간당 1블록
-        
-        for i in range(block_count):
-            block = QLabel()
-            block.setFixedSize(w(10), h(4))
-            block.setStyleSheet("""
-                background-color: rgba(255, 255, 255, 0.6);
-                border: 1px solid rgba(255, 255, 255, 0.8);
-                border-radius: 2px;
-            """)
-            duration_layout.addWidget(block)
-        
-        # 시간 텍스트 추가
-        time_label = QLabel(f"{duration_hours}h")
-        time_label.setStyleSheet(f"color: rgba(255, 255, 255, 0.9); font-size: {f(8)}px;")
-        duration_layout.addWidget(time_label)
-        
-        duration_layout.addStretch()
-        layout.addWidget(duration_container, alignment=Qt.AlignHCenter)
-        
-        # 배치 번호 (엑셀의 배치번호를 125, 225, 325 형식으로 변환)
-        if hasattr(self.batch, 'lot_number') and self.batch.lot_number:
-            lot_num = int(self.batch.lot_number)
-            # 1 -> 125, 2 -> 225, 3 -> 325, 4 -> 425 형식으로 변환
-            batch_text = f"{lot_num * 100 + 25}"
-        else:
-            # 없으면 batch_id에서 숫자 추출
-            import re
-            numbers = re.findall(r'\d+', self.batch.id)
-            if numbers:
-                batch_num = int(numbers[0])
-                batch_text = f"{batch_num * 100 + 25}"
-            else:
-                batch_text = "125"
-        
-        batch_label = QLabel(batch_text)
-        batch_label.setAlignment(Qt.AlignCenter)
-        batch_label.setStyleSheet(f"font-weight: bold; font-size: {f(12)}px; color: white;")
-        layout.addWidget(batch_label)
-        
-        # 제품명 (짧게)
-        product_name_short = self.batch.product_name.split()[0][:6]
-        product_label = QLabel(product_name_short)
-        product_label.setAlignment(Qt.AlignCenter)
-        product_label.setStyleSheet(f"font-size: {f(8)}px; color: rgba(255, 255, 255, 0.9);")
-        layout.addWidget(product_label)
-        
-        # 스타일 적용
-        self.update_style()
-    
-    def update_style(self):
-        """스타일 업데이트"""
-        # 기본 색상 정의
-        default_colors = {
-            # 기넥신에프정 - 파란색 계열
-            '기넥신에프정 40mg 100T': '#1e88e5',
-            '기넥신에프정 40mg 300T': '#1565c0',
-            '기넥신에프정 80mg 100T': '#42a5f5',
-            '기넥신에프정 80mg 500T': '#0d47a1',
-            # 리넥신정 - 녹색 계열
-            '리넥신정 80/100mg 300T': '#43a047',
-            '리넥신정 80/100mg 30T': '#66bb6a',
-            '리넥신서방정 30T': '#2e7d32',
-            '리넥신서방정 300T': '#1b5e20',
-            # 조인스정 - 주황색 계열
-            '조인스정 200mg 500T': '#fb8c00',
-            # 페브릭정 - 보라색 계열
-            '페브릭정 40mg 30T': '#8e24aa',
-            '페브릭정 40mg 100T': '#6a1b9a',
-            '페브릭정 80mg 30T': '#ab47bc',
-            '페브릭정 80mg 100T': '#4a148c',
-            # 신플랙스세이프정 - 빨간색 계열
-            '신플랙스세이프정 100T': '#e53935',
-            '신플랙스세이프정 30T': '#ef5350'
-        }
-        
-        # 장비별 제품 색상 확인
-        bg_color = default_colors.get(self.batch.product_name, '#3498db')
-        
-        if self.master_data and hasattr(self.batch, 'equipment_id'):
-            equipment = self.master_data.equipment.get(self.batch.equipment_id)
-            if equipment and 'product_colors' in equipment:
-                # 장비에 설정된 제품별 색상이 있으면 사용
-                if self.batch.product_id in equipment['product_colors']:
-                    bg_color = equipment['product_colors'][self.batch.product_id]
-        
-        if self.is_selected:
-            border_color = '#1428A0'
-            border_width = '3px'
-        else:
-            border_color = '#ddd'
-            border_width = '1px'
-        
-        # 배치 스타일 - 레고/테트리스 스타일
-        self.setStyleSheet(f"""
-            DraggableBatchLabel {{
-                background-color: {bg_color};
-                border: {border_width} solid {border_color};
-                border-radius: 6px;
-                background: qlineargradient(x1: 0, y1: 0, x2: 1, y2: 1,
-                    stop: 0 {bg_color},
-                    stop: 0.5 {bg_color},
-                    stop: 1 {self._darken_color(bg_color)});
-            }}
-            QLabel {{
-                color: white;
-                background: transparent;
-            }}
-        """)
-    
-    def mousePressEvent(self, event):
-        """마우스 클릭 이벤트"""
-        if event.button() == Qt.LeftButton:
-            self.drag_start_position = event.pos()
-            self.batch_selected.emit(self)
-        # 부모 클래스의 이벤트 핸들러도 호출
-        super().mousePressEvent(event)
-    
-    def mouseMoveEvent(self, event):
-        """마우스 이동 이벤트"""
-        if not (event.buttons() & Qt.LeftButton):
-            return
-        
-        if (event.pos() - self.drag_start_position).manhattanLength() < 5:
-            return
-        
-        # 드래그 시작
-        print(f"[DEBUG] Starting drag for batch {self.batch.id}")
-        drag = QDrag(self)
-        mime_data = QMimeData()
-        
-        # 배치 데이터를 JSON으로 직렬화
-        batch_data = {
-            'batch_id': self.batch.id,
-            'product_id': self.batch.product_id,
-            'product_name': self.batch.product_name,
-            'equipment_id': self.batch.equipment_id,
-            'start_time': self.batch.start_time.isoformat(),
-            'duration_hours': self.batch.duration_hours,
-            'process_id': getattr(self.batch, 'process_id', None),
-            'lot_number': getattr(self.batch, 'lot_number', None)
-        }
-        
-        mime_data.setText(json.dumps(batch_data))
-        drag.setMimeData(mime_data)
-        
-        # 드래그 중 표시할 픽스맵 생성
-        pixmap = QPixmap(self.size())
-        self.render(pixmap)
-        drag.setPixmap(pixmap)
-        drag.setHotSpot(event.pos())
-        
-        drag.exec_(Qt.MoveAction)
-    
-    def mouseDoubleClickEvent(self, event):
-        """마우스 더블클릭 이벤트"""
-        if event.button() == Qt.LeftButton:
-            self.batch_double_clicked.emit(self)
-    
-    def set_selected(self, selected):
-        """선택 상태 설정"""
-        self.is_selected = selected
-        self.update_style()
-    
-    def _darken_color(self, color):
-        """색상을 어둡게 만드는 헬퍼 메서드"""
-        # 간단한 구현 - 실제로는 더 정교한 색상 변환 필요
-        if color.startswith('#'):
-            # Hex to RGB
-            r = int(color[1:3], 16)
-            g = int(color[3:5], 16)
-            b = int(color[5:7], 16)
-            # Darken by 20%
-            r = int(r * 0.8)
-            g = int(g * 0.8)
-            b = int(b * 0.8)
-            return f"#{r:02x}{g:02x}{b:02x}"
-        return color
-
-
-class EquipmentTimeSlot(QFrame):
-    """장비별 시간 슬롯 (1시간 = 1칸)"""
-    
-    # 시그널
-    batch_dropped = pyqtSignal(object, object)  # 이전 컨테이너, 배치 데이터
-    
-    def __init__(self, equipment_id: str, date, slot: int, parent=None):
-        super().__init__(parent)
-        self.equipment_id = equipment_id
-        self.date = date
-        self.slot = slot  # 0-3 (하루 4구간)
-        self.batch = None
-        self.init_ui()
-    
-    def init_ui(self):
-        """UI 초기화"""
-        self.setAcceptDrops(True)
-        self.setFrameStyle(QFrame.Box)
-        self.setFixedWidth(w(120))  # 각 구간의 너비 (더 크게)
-        self.setMinimumHeight(h(70))  # 높이도 증가
-        
-        # 빈 셀 스타일 - 더 명확한 경계선
-        self.setStyleSheet("""
-            QFrame {
-                background-color: #ffffff;
-                border: 1px solid #dee2e6;
-                border-style: solid;
-            }
-        """)
-    
-    def can_accept_batch(self, batch_data):
-        """배치를 받을 수 있는지 확인"""
-        # 수동 편집 모드에서는 모든 제약 무시 (자유로운 배치)
-        # 이미 배치가 있는 곳에만 놓을 수 없음
-        print(f"[DEBUG] can_accept_batch - self.batch: {self.batch}, batch_data: {batch_data.get('batch_id')}")
-        if self.batch:
-            print(f"[DEBUG] Slot already occupied by: {self.batch}")
-            return False
-        
-        # 초안 이후 수동 편집은 완전 자유
-        # duration 체크 제거 - 어디든 놓을 수 있음
-        return True
-    
-    def dragEnterEvent(self, event):
-        """드래그 진입 이벤트"""
-        print(f"[DEBUG] dragEnterEvent - equipment: {self.equipment_id}, date: {self.date}, slot: {self.slot}")
-        if event.mimeData().hasText():
-            batch_data = json.loads(event.mimeData().text())
-            if self.can_accept_batch(batch_data):
-                print("[DEBUG] Accepting drag enter")
-                event.acceptProposedAction()
-                # 드래그 중 하이라이트
-                self.setStyleSheet("""
-                    QFrame {
-                        background-color: #e3f2fd;
-                        border: 2px solid #1428A0;
-                    }
-                """)
-            else:
-                print("[DEBUG] Ignoring drag enter")
-                event.ignore()
-        else:
-            print("[DEBUG] No text in mime data")
-            event.ignore()
-    
-    def dragLeaveEvent(self, event):
-        """드래그 떠남 이벤트"""
-        # 하이라이트 제거
-        self.setStyleSheet("""
-            QFrame {
-                background-color: #f8f9fa;
-                border: 1px solid #dee2e6;
-            }
-        """)
-    
-    def dropEvent(self, event):
-        """드롭 이벤트"""
-        print(f"[DEBUG] EquipmentTimeSlot.dropEvent called - equipment_id: {self.equipment_id}, date: {self.date}, slot: {self.slot}")
-        
-        if event.mimeData().hasText():
-            batch_data = json.loads(event.mimeData().text())
-            print(f"[DEBUG] Batch data: {batch_data.get('batch_id')}")
-            
-            if self.can_accept_batch(batch_data):
-                # 드래그 소스 찾기
-                source_widget = event.source()
-                source_container = None
-                
-                print(f"[DEBUG] Source widget type: {type(source_widget).__name__}")
-                
-                if source_widget and hasattr(source_widget, 'parent'):
-                    # DraggableBatchLabel의 부모 찾기
-                    parent = source_widget.parent()
-                    print(f"[DEBUG] Parent widget type: {type(parent).__name__ if parent else 'None'}")
-                    # 그리드 레이아웃에 직접 배치된 경우를 처리
-                    if parent and hasattr(parent, 'batch'):
-                        source_container = parent
-                
-                # 배치 이동 시그널 발생
-                print(f"[DEBUG] Emitting batch_dropped signal")
-                self.batch_dropped.emit(source_container, batch_data)
-                event.acceptProposedAction()
-            else:
-                print("[DEBUG] Cannot accept batch at this location")
-        
-        # 스타일 복원
-        self.setStyleSheet("""
-            QFrame {
-                background-color: #f8f9fa;
-                border: 1px solid #dee2e6;
-            }
-        """)
-
-
-class ProcessTimeSlot(QFrame):
-    """공정별 시간 슬롯 (1시간 단위)"""
-    
-    # 시그널
-    batch_dropped = pyqtSignal(object, object)  # 이전 컨테이너, 배치 데이터
-    
-    def __init__(self, process_id: str, team_idx: int, hour: int, parent=None):
-        super().__init__(parent)
-        self.process_id = process_id
-        self.team_idx = team_idx
-        self.hour = hour
-        self.batch = None  # 이 슬롯의 배치
-        self.init_ui()
-    
-    def init_ui(self):
-        """UI 초기화"""
-        self.setAcceptDrops(True)
-        self.setFrameStyle(QFrame.Box)
-        self.setFixedWidth(self.parent().hour_width if hasattr(self.parent(), 'hour_width') else w(20))
-        self.setMinimumHeight(h(35))
-        
-        # 빈 셀 스타일
-        self.setStyleSheet("""
-            QFrame {
-                background-color: #f8f9fa;
-                border: 1px solid #dee2e6;
-            }
-        """)
-    
-    def can_accept_batch(self, batch_data):
-        """배치를 받을 수 있는지 확인"""
-        # 이미 배치가 있으면 불가
-        if self.batch:
-            return False
-        
-        # 공정이 맞는지 확인
-        if batch_data.get('process_id') != self.process_id:
-            return False
-        
-        return True
-    
-    def dragEnterEvent(self, event):
-        """드래그 진입 이벤트"""
-        if event.mimeData().hasText():
-            batch_data = json.loads(event.mimeData().text())
-            if self.can_accept_batch(batch_data):
-                event.acceptProposedAction()
-                # 드래그 중 하이라이트
-                self.setStyleSheet("""
-                    QFrame {
-                        background-color: #e3f2fd;
-                        border: 2px solid #1428A0;
-                    }
-                """)
-            else:
-                event.ignore()
-    
-    def dragLeaveEvent(self, event):
-        """드래그 떠남 이벤트"""
-        # 하이라이트 제거
-        self.setStyleSheet("""
-            QFrame {
-                background-color: #f8f9fa;
-                border: 1px solid #dee2e6;
-            }
-        """)
-    
-    def dropEvent(self, event):
-        """드롭 이벤트"""
-        if event.mimeData().hasText():
-            batch_data = json.loads(event.mimeData().text())
-            
-            if self.can_accept_batch(batch_data):
-                # 드래그 소스 찾기
-                source_widget = event.source()
-                if source_widget and hasattr(source_widget, 'parent'):
-                    source_container = source_widget.parent()
-                    if isinstance(source_container, ProcessTimeSlot):
-                        # 배치 이동 시그널 발생
-                        self.batch_dropped.emit(source_container, batch_data)
-                
-                event.acceptProposedAction()
-        
-        # 스타일 복원
-        self.setStyleSheet("""
-            QFrame {
-                background-color: #f8f9fa;
-                border: 1px solid #dee2e6;
-            }
-        """)
-
-
-class BatchContainer(QFrame):
-    """배치를 담는 컨테이너 (그리드의 한 셀) - 기존 호환성 유지"""
-    
-    # 시그널
-    batch_dropped = pyqtSignal(object, object)  # 이전 컨테이너, 배치 데이터
-    
-    def __init__(self, equipment_id: str, date: datetime, parent=None):
-        super().__init__(parent)
-        self.equipment_id = equipment_id
-        self.date = date
-        self.batches = []  # 이 셀의 배치들
-        self.init_ui()
-    
-    def init_ui(self):
-        """UI 초기화"""
-        self.setAcceptDrops(True)
-        self.setFrameStyle(QFrame.Box)
-        self.setMinimumHeight(h(100))
-        self.setMinimumWidth(w(140))
-        
-        # 레이아웃 - 플로우 레이아웃처럼 동작하도록
-        self.layout = QVBoxLayout(self)
-        self.layout.setContentsMargins(1, 1, 1, 1)
-        self.layout.setSpacing(1)
-        
-        # 빈 셀 스타일
-        self.setStyleSheet("""
-            QFrame {
-                background-color: #f8f9fa;
-                border: 1px solid #dee2e6;
-            }
-        """)
-    
-    def add_batch(self, batch_label: DraggableBatchLabel):
-        """배치 추가"""
-        self.batches.append(batch_label)
-        self.layout.addWidget(batch_label)
-        
-        # 배치가 많을 때 컨테이너 높이 자동 조정
-        batch_count = len(self.batches)
-        if batch_count > 2:
-            # 배치당 높이 + 여백
-            new_height = h(35) * batch_count + h(10)
-            self.setMinimumHeight(new_height)
-    
-    def remove_batch(self, batch_label: DraggableBatchLabel):
-        """배치 제거"""
-        if batch_label in self.batches:
-            self.batches.remove(batch_label)
-            self.layout.removeWidget(batch_label)
-            batch_label.setParent(None)
-    
-    def dragEnterEvent(self, event):
-        """드래그 진입 이벤트"""
-        if event.mimeData().hasText():
-            event.acceptProposedAction()
-            # 드래그 중 하이라이트
-            self.setStyleSheet("""
-                QFrame {
-                    background-color: #e3f2fd;
-                    border: 2px solid #1428A0;
-                }
-            """)
-    
-    def dragLeaveEvent(self, event):
-        """드래그 떠남 이벤트"""
-        # 하이라이트 제거
-        self.setStyleSheet("""
-            QFrame {
-                background-color: #f8f9fa;
-                border: 1px solid #dee2e6;
-            }
-        """)
-    
-    def dropEvent(self, event):
-        """드롭 이벤트"""
-        if event.mimeData().hasText():
-            # 드롭된 배치 데이터 파싱
-            batch_data = json.loads(event.mimeData().text())
-            
-            # 드래그 소스 찾기
-            source_widget = event.source()
-            if source_widget and hasattr(source_widget, 'parent'):
-                source_container = source_widget.parent()
-                if isinstance(source_container, BatchContainer):
-                    # 배치 이동 시그널 발생
-                    self.batch_dropped.emit(source_container, batch_data)
-            
-            event.acceptProposedAction()
-        
-        # 스타일 복원
-        self.setStyleSheet("""
-            QFrame {
-                background-color: #f8f9fa;
-                border: 1px solid #dee2e6;
-            }
-        """)
-
-
-class ScheduleGridView(QWidget):
-    """스케줄 그리드 뷰 - 레고 블록 방식"""
-    
+# 제품별 기본 색상
+DEFAULT_PRODUCT_COLORS = {
+    # 기넥신에프정 - 파란색 계열
+    '기넥신에프정 40mg 100T': '#1e88e5',
+    '기넥신에프정 40mg 300T': '#1565c0',
+    '기넥신에프정 80mg 100T': '#42a5f5',
+    '기넥신에프정 80mg 500T': '#0d47a1',
+    # 리넥신정 - 녹색 계열
+    '리넥신정 80/100mg 300T': '#43a047',
+    '리넥신정 80/100mg 30T': '#66bb6a',
+    '리넥신서방정 30T': '#2e7d32',
+    '리넥신서방정 300T': '#1b5e20',
+    # 조인스정 - 주황색 계열
+    '조인스정 200mg 500T': '#fb8c00',
+    # 페브릭정 - 보라색 계열
+    '페브릭정 40mg 30T': '#8e24aa',
+    '페브릭정 40mg 100T': '#6a1b9a',
+    '페브릭정 80mg 30T': '#ab47bc',
+    '페브릭정 80mg 100T': '#4a148c',
+    # 신플랙스세이프정 - 빨간색 계열
+    '신플랙스세이프정 100T': '#e53935',
+    '신플랙스세이프정 30T': '#ef5350'
+}
+
+PRIMARY_COLOR = '#1428A0'
+CELL_BORDER_COLOR = '#dee2e6'
+DAY_BORDER_COLOR = '#999999'
+
+
+def _darken_color(color: str) -> str:
+    """색상을 20% 어둡게 변환"""
+    if color.startswith('#') and len(color) >= 7:
+        r = int(int(color[1:3], 16) * 0.8)
+        g = int(int(color[3:5], 16) * 0.8)
+        b = int(int(color[5:7], 16) * 0.8)
+        return f"#{r:02x}{g:02x}{b:02x}"
+    return color
+
+
+def _slot_from_hour(hour: int) -> Optional[int]:
+    """시작 시각을 구간으로 변환 (0-3이면 구간 그대로, 그 외 레거시 시간 매핑)"""
+    if 0 <= hour <= 3:
+        return hour
+    # 레거시 시간 매핑 (8시→0구간, 10시→1구간...)
+    if 8 <= hour < 10:
+        return 0
+    if 10 <= hour < 12:
+        return 1
+    if 13 <= hour < 15:
+        return 2
+    if 15 <= hour < 17:
+        return 3
+    return None
+
+
+def _duration_slots(duration_hours: float) -> int:
+    """소요 시간을 구간 수로 변환 (2시간 = 1구간)"""
+    return max(1, int(duration_hours / 2))
+
+
+def _batch_text(batch: Batch) -> str:
+    """배치 번호 표시 (엑셀의 배치번호를 125, 225, 325 형식으로 변환)"""
+    lot_number = getattr(batch, 'lot_number', None)
+    if lot_number and str(lot_number).isdigit():
+        # 1 -> 125, 2 -> 225, 3 -> 325, 4 -> 425 형식으로 변환
+        return f"{int(lot_number) * 100 + 25}"
+    if lot_number:
+        return str(lot_number)
+    # 없으면 batch_id에서 숫자 추출
+    numbers = re.findall(r'\d+', batch.id)
+    if numbers:
+        return f"{int(numbers[0]) * 100 + 25}"
+    return "125"
+
+
+class ScheduleGridView(QAbstractScrollArea):
+    """스케줄 그리드 뷰 - 레고 블록 방식 (가상화 캔버스)"""
+
     # 시그널
     batch_moved = pyqtSignal(str, str, datetime)  # batch_id, new_equipment_id, new_date
     batch_selected = pyqtSignal(object)  # 선택된 배치
-    
+
     def __init__(self, production_plan: ProductionPlan = None, master_data=None, parent=None):
         super().__init__(parent)
         self.production_plan = production_plan
         self.master_data = master_data
-        self.containers = {}  # (equipment_id, date) -> BatchContainer
-        self.batch_labels = {}  # batch_id -> DraggableBatchLabel
+        self.equipment_rows = []  # 행 순서의 장비 ID
+        self.equipment_names = []  # 행 순서의 장비명
+        self.date_range = []  # 열 순서의 날짜 (날짜당 4구간)
+        self._row_index = {}  # equipment_id -> 행
+        self._day_index = {}  # date -> 날짜 인덱스 (열 = 날짜 인덱스 * 4 + 구간)
+        self._equipment_id_by_name = {}  # 장비명 -> equipment_id
+        self.cell_owner = {}  # (equipment_id, date, slot) -> batch_id - 점유 인덱스
         self.batch_positions = {}  # batch_id -> (equipment_id, date, slot, duration_slots) - 시각적 위치 추적
-        self.selected_batch = None
-        self.hour_width = w(60)  # 1시간당 픽셀 너비 (더 크게)
+        self.selected_batch = None  # 선택된 batch_id
+        self._drag_start_position = None
+        self._drag_batch_id = None
+        self._drop_target = None  # (equipment_id, date, slot, duration_slots) - 드롭 하이라이트
+        self._lot_chains = None  # [(색상, [batch_id])] 공정 순서로 정렬된 로트 체인 - 계획 변경 시 무효화
+        self._connection_segments = None  # [(색상, 경로, 끝점, 화살표1, 화살표2, 영역)] 콘텐츠 좌표 - 이동 시 무효화
+        self._segments_by_day = {}  # 날짜 인덱스 -> 해당 날짜 열을 지나는 연결선 인덱스
         self.init_ui()
-    
+
     def init_ui(self):
         """UI 초기화"""
-        layout = QVBoxLayout(self)
-        layout.setContentsMargins(0, 0, 0, 0)
-        
-        # 스크롤 영역
-        scroll = QScrollArea()
-        scroll.setWidgetResizable(True)
-        
-        # 그리드 위젯
-        self.grid_widget = QWidget()
-        self.grid_layout = QGridLayout(self.grid_widget)
-        self.grid_layout.setSpacing(2)
-        
-        scroll.setWidget(self.grid_widget)
-        layout.addWidget(scroll)
-    
+        # 셀/헤더 크기
+        self.cell_width = w(120)  # 각 구간의 너비
+        self.row_height = h(70)
+        self.header_width = w(120)  # 장비 헤더 너비
+        self.date_header_height = h(30)
+        self.slot_header_height = h(24)
+        self.header_height = self.date_header_height + self.slot_header_height
+        self.batch_margin = (self.row_height - h(60)) // 2  # 배치 블록 높이 h(60)
+        self.block_width = w(10)  # 소요시간 블록
+        self.block_height = h(4)
+        self.text_unit = h(4)  # 배치 블록 내부 텍스트 배치 단위
+
+        # 폰트
+        self.header_font = QFont()
+        self.header_font.setPixelSize(f(12))
+        self.header_font.setBold(True)
+        self.slot_font = QFont()
+        self.slot_font.setPixelSize(f(10))
+        self.batch_font = QFont()
+        self.batch_font.setPixelSize(f(12))
+        self.batch_font.setBold(True)
+        self.small_font = QFont()
+        self.small_font.setPixelSize(f(8))
+
+        self.setAcceptDrops(True)
+        self.viewport().setAcceptDrops(True)
+        self.viewport().setMouseTracking(False)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAsNeeded)
+        self.setVerticalScrollBarPolicy(Qt.ScrollBarAsNeeded)
+
+    # ------------------------------------------------------------------
+    # 그리드 구성
+    # ------------------------------------------------------------------
+
     def setup_grid(self, equipment_list, date_range):
         """그리드 설정 - Y축: 장비, X축: 날짜"""
-        # 기존 위젯 제거
-        for i in reversed(range(self.grid_layout.count())):
-            widget = self.grid_layout.itemAt(i).widget()
-            if widget:
-                widget.setParent(None)
-        
-        self.containers.clear()
-        self.batch_labels.clear()
-        
-        # 날짜 헤더 (각 날짜를 4구간으로 나눔)
-        col = 1
-        cells_per_day = 4  # 하루를 4구간으로 표현
-        
-        for date in date_range:
-            # 날짜 라벨 (4구간을 차지)
-            date_label = QLabel(date.strftime('%m월 %d일'))
-            date_label.setAlignment(Qt.AlignCenter)
-            date_label.setStyleSheet(f"""
-                background-color: #f0f0f0;
-                border: 2px solid #999;
-                font-weight: bold;
-                font-size: {f(12)}px;
-                padding: {h(5)}px;
-            """)
-            self.grid_layout.addWidget(date_label, 0, col, 1, cells_per_day)
-            
-            # 구간 헤더 추가 (1구간, 2구간, 3구간, 4구간)
-            for slot in range(cells_per_day):
-                slot_label = QLabel(f"{slot + 1}구간")
-                slot_label.setAlignment(Qt.AlignCenter)
-                slot_label.setStyleSheet(f"""
-                    background-color: #f8f9fa;
-                    border: 1px solid #ccc;
-                    font-size: {f(10)}px;
-                    padding: {h(3)}px;
-                """)
-                self.grid_layout.addWidget(slot_label, 1, col + slot)
-            
-            col += cells_per_day
-        
-        # 장비별 행 생성 (헤더가 2줄이므로 2부터 시작)
-        row = 2
-        
+        self.cell_owner.clear()
+        self.batch_positions.clear()
+        self.selected_batch = None
+        self._drop_target = None
+        self._invalidate_connections(plan_changed=True)
+
+        self.date_range = list(date_range)
+
         # 모든 장비 수집 (공정별로 정렬)
         all_equipment = []
-        if self.master_data:
+        if equipment_list:
+            all_equipment = list(equipment_list)
+        elif self.master_data:
             # 공정 순서대로 처리
+            equipment_by_process = {}
+            for eq in self.master_data.equipment.values():
+                equipment_by_process.setdefault(eq.get('process_id'), []).append(eq)
             for process in sorted(self.master_data.processes.values(), key=lambda x: x.get('order', 0)):
-                process_id = process['id']
-                # 해당 공정의 장비들
-                process_equipment = [eq for eq in self.master_data.equipment.values() 
-                                   if eq.get('process_id') == process_id]
+                process_equipment = equipment_by_process.get(process['id'], [])
                 all_equipment.extend(sorted(process_equipment, key=lambda x: x.get('name', '')))
-        
-        # 장비별로 행 생성
-        for equipment in all_equipment:
-            equipment_id = equipment['id']
-            equipment_name = equipment['name']
-            
-            # 장비 헤더
-            equipment_label = QLabel(equipment_name)
-            equipment_label.setAlignment(Qt.AlignCenter)
-            equipment_label.setStyleSheet(f"""
-                background-color: #1428A0;
-                color: white;
-                border: 1px solid #0C1A6B;
-                padding: {h(5)}px;
-                font-weight: bold;
-                font-size: {f(12)}px;
-                min-width: {w(100)}px;
-            """)
-            self.grid_layout.addWidget(equipment_label, row, 0)
-            
-            # 각 날짜별로 셀 생성
-            col = 1
-            for date in date_range:
-                # 하루를 4개 구간으로 나눔
-                for slot in range(cells_per_day):
-                    container = EquipmentTimeSlot(equipment_id, date, slot, self)
-                    container.batch_dropped.connect(self.handle_batch_drop)
-                    # 더 명확한 경계선
-                    container.setStyleSheet("""
-                        QFrame {
-                            background-color: #ffffff;
-                            border: 1px solid #dee2e6;
-                            border-style: solid;
-                        }
-                        QFrame:hover {
-                            background-color: #f8f9fa;
-                        }
-                    """)
-                    self.grid_layout.addWidget(container, row, col)
-                    self.containers[(equipment_id, date, slot)] = container
-                    col += 1
-            
-            row += 1
-    
+
+        self.equipment_rows = [eq['id'] for eq in all_equipment]
+        self.equipment_names = [eq['name'] for eq in all_equipment]
+
+        # 좌표 인덱스
+        self._row_index = {equipment_id: row for row, equipment_id in enumerate(self.equipment_rows)}
+        self._day_index = {day: idx for idx, day in enumerate(self.date_range)}
+        self._equipment_id_by_name = {name: equipment_id for equipment_id, name
+                                      in zip(self.equipment_rows, self.equipment_names)}
+
+        self._update_scrollbars()
+        self.viewport().update()
+
     def load_schedule(self, production_plan: ProductionPlan):
         """스케줄 로드 - 레고 블록 방식"""
         self.production_plan = production_plan
-        
+
         if not production_plan or not production_plan.batches:
             return
-        
+
         # 날짜 범위 추출
-        dates = []
+        min_date = None
+        max_date = None
         for batch in production_plan.batches.values():
-            dates.append(batch.start_time.date())
-        
-        if not dates:
-            return
-        
-        # 날짜 범위 생성
-        min_date = min(dates)
-        max_date = max(dates)
-        date_range = []
-        current_date = min_date
-        while current_date <= max_date:
-            date_range.append(current_date)
-            current_date += timedelta(days=1)
-        
-        # 날짜 범위 저장
-        self.date_range = date_range
-        
+            day = batch.start_time.date()
+            if min_date is None or day < min_date:
+                min_date = day
+            if max_date is None or day > max_date:
+                max_date = day
+
+        date_range = [min_date + timedelta(days=i) for i in range((max_date - min_date).days + 1)]
+
         # 그리드 설정 (공정별로 그룹화)
-        self.setup_grid(None, date_range)  # equipment_list는 사용하지 않음
-        
+        self.setup_grid(None, date_range)
+
         # 배치들을 장비 시간 슬롯에 배치
         for batch in production_plan.batches.values():
             self.add_batch_to_equipment_slots(batch)
-    
+
+        self._invalidate_connections(plan_changed=True)
+        self.viewport().update()
+
     def add_batch_to_equipment_slots(self, batch: Batch):
         """배치를 장비 시간 슬롯에 추가"""
-        # 구간 기반 단순화 - 시간이 0-3이면 그대로 구간으로 사용
-        hour = batch.start_time.hour
-        if 0 <= hour <= 3:
-            start_slot = hour
-        else:
-            # 레거시 시간 매핑 (8시→0구간, 10시→1구간...)
-            if hour >= 8 and hour < 10:
-                start_slot = 0
-            elif hour >= 10 and hour < 12:
-                start_slot = 1
-            elif hour >= 13 and hour < 15:
-                start_slot = 2
-            elif hour >= 15 and hour < 17:
-                start_slot = 3
-            else:
-                return  # 유효하지 않은 시간
-        
-        # 소요 시간을 구간 수로 변환 (2시간 = 1구간)
-        duration_slots = max(1, int(batch.duration_hours / 2))
-        
-        # 해당 장비의 슬롯 찾기
-        date = batch.start_time.date()
-        
-        # 배치 가능한지 확인
-        can_place = True
-        for slot_offset in range(duration_slots):
-            slot_idx = start_slot + slot_offset
-            if slot_idx >= 4:  # 하루 4구간을 넘어가면
-                can_place = False
-                break
-            
-            key = (batch.equipment_id, date, slot_idx)
-            if key in self.containers:
-                if self.containers[key].batch is not None:
-                    can_place = False
-                    break
-            else:
-                can_place = False
-                break
-        
-        if can_place:
-            # 배치 라벨 생성 (duration에 맞는 크기)
-            batch_label = DraggableBatchLabel(batch, self.master_data)
-            batch_label.batch_selected.connect(self.on_batch_selected)
-            
-            # 크기를 duration에 맞게 설정 (구간 단위)
-            batch_width = w(120) * duration_slots - 4  # 1구간 = 120픽셀, 경계선 고려
-            batch_label.setFixedWidth(batch_width)
-            batch_label.setFixedHeight(h(60))  # 높이 고정
-            
-            # 배치를 그리드에 직접 추가 - 장비명으로 행 찾기
-            row = -1
-            
-            # 장비명으로 정확한 행 찾기
-            if self.master_data and batch.equipment_id in self.master_data.equipment:
-                equipment_name = self.master_data.equipment[batch.equipment_id]['name']
-                
-                for r in range(self.grid_layout.rowCount()):
-                    item = self.grid_layout.itemAtPosition(r, 0)
-                    if item and item.widget():
-                        label = item.widget()
-                        if isinstance(label, QLabel) and label.text() == equipment_name:
-                            row = r
-                            break
-            
-            if row != -1:
-                # 열 위치 계산 (날짜별 4구간)
-                days_diff = (date - self.date_range[0]).days if hasattr(self, 'date_range') else 0
-                col_start = 1 + days_diff * 4 + start_slot
-                
-                # 배치 라벨을 그리드에 직접 추가 (columnSpan 사용)
-                # 중요: 빈 슬롯 위젯들을 숨기거나 제거
-                for slot_offset in range(duration_slots):
-                    col = col_start + slot_offset
-                    item = self.grid_layout.itemAtPosition(row, col)
-                    if item and item.widget():
-                        widget = item.widget()
-                        if isinstance(widget, EquipmentTimeSlot):
-                            # 슬롯 위젯 숨기기 (제거하면 레이아웃이 깨짐)
-                            widget.hide()
-                
-                # 배치 라벨 추가
-                self.grid_layout.addWidget(batch_label, row, col_start, 1, duration_slots)
-                
-                # 배치 라벨에 위치 정보 저장
-                batch_label.current_row = row
-                batch_label.current_col = col_start
-                
-                # 위치 추적 딕셔너리에 저장
-                self.batch_positions[batch.id] = {
-                    'equipment_id': batch.equipment_id,
-                    'date': date,
-                    'slot': start_slot,
-                    'duration_slots': duration_slots
-                }
-                
-                # 컨테이너들에 점유 표시
-                for slot_offset in range(duration_slots):
-                    slot_idx = start_slot + slot_offset
-                    key = (batch.equipment_id, date, slot_idx)
-                    if key in self.containers:
-                        self.containers[key].batch = "occupied"
-            
-            self.batch_labels[batch.id] = batch_label
-    
-    def add_batch_to_grid(self, batch: Batch):
-        """그리드에 배치 추가 - 기존 호환성 유지"""
-        key = (batch.equipment_id, batch.start_time.date())
-        if key in self.containers:
-            container = self.containers[key]
-            
-            # 배치 라벨 생성 (master_data 전달)
-            batch_label = DraggableBatchLabel(batch, self.master_data)
-            batch_label.batch_selected.connect(self.on_batch_selected)
-            
-            # 컨테이너에 추가
-            container.add_batch(batch_label)
-            self.batch_labels[batch.id] = batch_label
-    
-    def handle_batch_drop(self, source_container, batch_data: dict):
-        """배치 드롭 처리"""
-        print(f"[DEBUG] handle_batch_drop called - batch_id: {batch_data.get('batch_id')}")
-        
-        target_container = self.sender()
-        
-        # EquipmentTimeSlot인지 확인
-        if not isinstance(target_container, EquipmentTimeSlot):
-            print("[DEBUG] Target is not EquipmentTimeSlot")
-            return
-        
-        # 배치 ID로 라벨 찾기
-        batch_id = batch_data['batch_id']
-        if batch_id not in self.batch_labels:
-            print(f"[DEBUG] Batch {batch_id} not found in batch_labels")
-            return
-        
-        batch_label = self.batch_labels[batch_id]
-        
-        # 대상 슬롯이 비어있는지 확인
-        if target_container.batch is not None:
-            print("[DEBUG] Target slot is not empty")
+        start_slot = _slot_from_hour(batch.start_time.hour)
+        if start_slot is None:
+            return  # 유효하지 않은 시간
+
+        duration_slots = _duration_slots(batch.duration_hours)
+        if not self._can_place(batch.equipment_id, batch.start_time.date(), start_slot, duration_slots):
             return
-        
-        print(f"[DEBUG] Target equipment: {target_container.equipment_id}, date: {target_container.date}, slot: {target_container.slot}")
-        
-        # 기존 위치에서 제거 (슬롯 복원 포함)
-        print("[DEBUG] Removing batch from grid and restoring slots...")
-        self._remove_batch_from_grid_and_restore_slots(batch_id)
-        
-        # 새 위치에 배치
-        target_date = target_container.date
-        target_slot = target_container.slot
-        
-        # 배치의 duration 정보 가져오기
-        duration_hours = batch_data.get('duration_hours', 2)
-        duration_slots = max(1, int(duration_hours / 2))
-        
-        # 위치 추적 딕셔너리만 업데이트 (production_plan은 건드리지 않음)
+
+        self._place_cells(batch.id, batch.equipment_id, batch.start_time.date(), start_slot, duration_slots)
+
+    def _can_place(self, equipment_id: str, day, slot: int, duration_slots: int,
+                   ignore_batch_id: str = None) -> bool:
+        """구간이 그리드 안에 있고 비어있는지 확인"""
+        if slot + duration_slots > SLOTS_PER_DAY:  # 하루 4구간을 넘어가면
+            return False
+        if equipment_id not in self._row_index or day not in self._day_index:
+            return False
+        for slot_idx in range(slot, slot + duration_slots):
+            owner = self.cell_owner.get((equipment_id, day, slot_idx))
+            if owner is not None and owner != ignore_batch_id:
+                return False
+        return True
+
+    def _place_cells(self, batch_id: str, equipment_id: str, day, slot: int, duration_slots: int):
+        """배치 위치 기록 및 구간 점유 표시"""
         self.batch_positions[batch_id] = {
-            'equipment_id': target_container.equipment_id,
-            'date': target_date,
-            'slot': target_slot,
+            'equipment_id': equipment_id,
+            'date': day,
+            'slot': slot,
             'duration_slots': duration_slots
         }
-        
-        print(f"[DEBUG] Updated batch position: {self.batch_positions[batch_id]}")
-        
-        # 시각적으로만 이동
-        print("[DEBUG] Moving batch visually...")
-        self._move_batch_visual(batch_id, target_container)
-    
-    def on_batch_selected(self, batch_label: DraggableBatchLabel):
-        """배치 선택 처리"""
-        # 이전 선택 해제 - 객체가 삭제되었는지 확인
-        if self.selected_batch:
-            try:
-                # 위젯이 아직 유효한지 확인 - parent가 None이면 삭제된 것
-                if self.selected_batch.parent() is not None:
-                    self.selected_batch.set_selected(False)
-            except RuntimeError:
-                # 객체가 삭제된 경우 무시
-                pass
-        
-        # 새로운 선택
-        self.selected_batch = batch_label
-        if batch_label and batch_label.parent() is not None:
-            batch_label.set_selected(True)
-            # 시그널 발생
-            self.batch_selected.emit(batch_label.batch)
-    
+        for slot_idx in range(slot, slot + duration_slots):
+            self.cell_owner[(equipment_id, day, slot_idx)] = batch_id
+
+    def _remove_batch_from_grid(self, batch_id: str):
+        """그리드에서 배치 제거하고 구간 점유 해제"""
+        position = self.batch_positions.pop(batch_id, None)
+        if not position:
+            return
+        for slot_idx in range(position['slot'], position['slot'] + position['duration_slots']):
+            key = (position['equipment_id'], position['date'], slot_idx)
+            if self.cell_owner.get(key) == batch_id:
+                del self.cell_owner[key]
+
+    def handle_batch_drop(self, batch_data: dict, equipment_id: str, target_date, target_slot: int):
+        """배치 드롭 처리"""
+        batch_id = batch_data['batch_id']
+        if batch_id not in self.batch_positions:
+            return False
+
+        # 배치의 duration 정보 가져오기
+        duration_slots = _duration_slots(batch_data.get('duration_hours', 2))
+
+        # 수동 편집 모드에서는 공정/작업자 제약 무시 (자유로운 배치)
+        # 다른 배치가 차지한 구간에만 놓을 수 없음
+        if not self._can_place(equipment_id, target_date, target_slot, duration_slots,
+                               ignore_batch_id=batch_id):
+            return False
+
+        # 위치 추적 인덱스만 업데이트 (production_plan은 건드리지 않음)
+        self._move_batch_visual(batch_id, equipment_id, target_date, target_slot, duration_slots)
+        return True
+
+    def _move_batch_visual(self, batch_id: str, equipment_id: str, target_date, target_slot: int,
+                           duration_slots: int):
+        """배치를 시각적으로만 이동 (전체 새로고침 없이)"""
+        self._remove_batch_from_grid(batch_id)
+        self._place_cells(batch_id, equipment_id, target_date, target_slot, duration_slots)
+        self._invalidate_connections()
+        self.viewport().update()
+
     def refresh_view(self):
         """뷰 새로고침"""
         if self.production_plan and self.production_plan.batches:
@@ -905,473 +305,619 @@ class ScheduleGridView(QWidget):
         else:
             # 배치가 없으면 빈 그리드 표시
             self.clear_grid()
-    
+
     def clear_grid(self):
         """그리드 초기화"""
-        # 모든 배치 라벨 제거
-        for batch_label in self.batch_labels.values():
-            batch_label.setParent(None)
-        self.batch_labels.clear()
-        
-        # 숨겨진 슬롯들 다시 표시
-        for container in self.containers.values():
-            container.batch = None
-            container.show()
-        
-        # 그리드 재설정 (날짜 범위가 있으면)
-        if hasattr(self, 'date_range') and self.date_range:
-            self.setup_grid(None, self.date_range)
-    
-    def _validate_process_connection(self, batch_data: dict, target_container) -> bool:
-        """공정 연결 규칙 검증 (테트리스 규칙)"""
-        if not self.master_data:
-            return True
-        
-        lot_number = batch_data.get('lot_number')
-        if not lot_number:
-            return True
-        
-        # 같은 lot_number의 다른 공정들 찾기
-        same_lot_batches = []
-        for batch in self.production_plan.batches.values():
-            if getattr(batch, 'lot_number', None) == lot_number and batch.id != batch_data['batch_id']:
-                same_lot_batches.append(batch)
-        
-        if not same_lot_batches:
-            return True
-        
-        # 현재 공정과 대상 장비의 공정 확인
-        current_process_id = batch_data.get('process_id')
-        target_equipment_id = target_container.equipment_id
-        
-        # 대상 장비의 공정 찾기
-        target_process_id = None
-        for eq in self.master_data.equipment.values():
-            if eq['id'] == target_equipment_id:
-                target_process_id = eq.get('process_id')
-                break
-        
-        if not current_process_id or not target_process_id:
-            return True
-        
-        # 같은 공정으로는 이동 가능
-        if current_process_id == target_process_id:
-            return True
-        
-        # 공정 순서 확인
-        product = self.master_data.products.get(batch_data['product_id'])
-        if not product:
-            return True
-        
-        process_order = product.get('process_order', [])
-        if current_process_id not in process_order or target_process_id not in process_order:
-            return True
-        
-        current_idx = process_order.index(current_process_id)
-        target_idx = process_order.index(target_process_id)
-        
-        # 역순 이동은 불가
-        if target_idx < current_idx:
-            return False
-        
-        # 이전 공정이 완료되었는지 확인
-        for i in range(current_idx, target_idx):
-            process_id = process_order[i]
-            found = False
-            for batch in same_lot_batches:
-                if hasattr(batch, 'process_id') and batch.process_id == process_id:
-                    found = True
-                    break
-            if not found and i < target_idx:
-                return False
-        
-        # 이전 공정의 완료 시점 확인 (다음 구간에서 시작해야 함)
-        if target_idx > 0:
-            prev_process_id = process_order[target_idx - 1]
-            for batch in same_lot_batches:
-                if hasattr(batch, 'process_id') and batch.process_id == prev_process_id:
-                    # 이전 공정의 종료 구간 계산
-                    prev_hour = batch.start_time.hour
-                    prev_slot = 0
-                    if prev_hour >= 8 and prev_hour < 10:
-                        prev_slot = 0
-                    elif prev_hour >= 10 and prev_hour < 12:
-                        prev_slot = 1
-                    elif prev_hour >= 13 and prev_hour < 15:
-                        prev_slot = 2
-                    elif prev_hour >= 15 and prev_hour < 17:
-                        prev_slot = 3
-                    
-                    duration_slots = max(1, int(batch.duration_hours / 2))
-                    prev_end_slot = prev_slot + duration_slots - 1
-                    
-                    # 같은 날인 경우 다음 구간에서 시작해야 함
-                    if batch.start_time.date() == target_container.date:
-                        if target_container.slot != prev_end_slot + 1:
-                            return False
-                    # 다음 날인 경우 첫 구간부터 가능
-                    elif batch.start_time.date() < target_container.date:
-                        return True
-                    else:
-                        return False
-        
-        return True
-    
-    def _remove_batch_from_grid(self, batch_id: str):
-        """그리드에서 배치 제거"""
-        if batch_id in self.batch_labels:
-            batch_label = self.batch_labels[batch_id]
-            
-            # 그리드에서 위젯 제거
-            index = self.grid_layout.indexOf(batch_label)
-            if index != -1:
-                self.grid_layout.takeAt(index)
-                batch_label.setParent(None)
-            
-            # 숨겨진 슬롯들 다시 표시
-            if batch_id in self.production_plan.batches:
-                batch = self.production_plan.batches[batch_id]
-                date = batch.start_time.date()
-                
-                # 시작 슬롯 계산
-                hour = batch.start_time.hour
-                start_slot = 0
-                if hour >= 8 and hour < 10:
-                    start_slot = 0
-                elif hour >= 10 and hour < 12:
-                    start_slot = 1
-                elif hour >= 13 and hour < 15:
-                    start_slot = 2
-                elif hour >= 15 and hour < 17:
-                    start_slot = 3
-                
-                duration_slots = max(1, int(batch.duration_hours / 2))
-                
-                # 해당 슬롯들의 점유 해제
-                for s in range(duration_slots):
-                    key = (batch.equipment_id, date, start_slot + s)
-                    if key in self.containers:
-                        self.containers[key].batch = None
-                        self.containers[key].show()  # 숨겨진 슬롯 다시 표시
-    
-    def _remove_batch_from_grid_and_restore_slots(self, batch_id: str):
-        """그리드에서 배치 제거하고 슬롯 복원"""
-        if batch_id not in self.batch_labels:
+        self.cell_owner.clear()
+        self.batch_positions.clear()
+        self.selected_batch = None
+        self._drop_target = None
+        self._invalidate_connections(plan_changed=True)
+        self.viewport().update()
+
+    # ------------------------------------------------------------------
+    # 좌표 변환
+    # ------------------------------------------------------------------
+
+    def _column_count(self) -> int:
+        return len(self.date_range) * SLOTS_PER_DAY
+
+    def _update_scrollbars(self):
+        """콘텐츠 크기에 맞게 스크롤바 범위 갱신"""
+        viewport = self.viewport()
+        body_width = viewport.width() - self.header_width
+        body_height = viewport.height() - self.header_height
+        content_width = self._column_count() * self.cell_width
+        content_height = len(self.equipment_rows) * self.row_height
+
+        hbar = self.horizontalScrollBar()
+        hbar.setRange(0, max(0, content_width - body_width))
+        hbar.setPageStep(max(1, body_width))
+        hbar.setSingleStep(self.cell_width)
+
+        vbar = self.verticalScrollBar()
+        vbar.setRange(0, max(0, content_height - body_height))
+        vbar.setPageStep(max(1, body_height))
+        vbar.setSingleStep(self.row_height)
+
+    def _cell_at(self, pos: QPoint) -> Optional[Tuple[int, int]]:
+        """뷰포트 좌표 -> (행, 열), 헤더나 그리드 밖이면 None"""
+        x = pos.x() - self.header_width
+        y = pos.y() - self.header_height
+        if x < 0 or y < 0:
+            return None
+        col = (x + self.horizontalScrollBar().value()) // self.cell_width
+        row = (y + self.verticalScrollBar().value()) // self.row_height
+        if row >= len(self.equipment_rows) or col >= self._column_count():
+            return None
+        return row, col
+
+    def _column(self, day, slot: int) -> Optional[int]:
+        """(날짜, 구간) -> 열, 그리드 밖이면 None"""
+        day_idx = self._day_index.get(day)
+        if day_idx is None:
+            return None
+        return day_idx * SLOTS_PER_DAY + slot
+
+    def _cell_rect(self, row: int, col: int, span: int = 1) -> QRect:
+        """(행, 열) -> 뷰포트 좌표의 셀 영역"""
+        x = self.header_width + col * self.cell_width - self.horizontalScrollBar().value()
+        y = self.header_height + row * self.row_height - self.verticalScrollBar().value()
+        return QRect(x, y, self.cell_width * span, self.row_height)
+
+    def _content_offset(self) -> QPoint:
+        """콘텐츠 좌표(그리드 본문 좌상단 기준) -> 뷰포트 좌표 이동량"""
+        return QPoint(self.header_width - self.horizontalScrollBar().value(),
+                      self.header_height - self.verticalScrollBar().value())
+
+    def _batch_content_rect(self, batch_id: str) -> Optional[QRect]:
+        """배치 블록의 콘텐츠 좌표 영역 (스크롤과 무관)"""
+        position = self.batch_positions.get(batch_id)
+        if not position:
+            return None
+        row = self._row_index.get(position['equipment_id'])
+        col = self._column(position['date'], position['slot'])
+        if row is None or col is None:
+            return None
+        # 경계선 고려
+        return QRect(col * self.cell_width + 2, row * self.row_height + self.batch_margin,
+                     self.cell_width * position['duration_slots'] - 4,
+                     self.row_height - 2 * self.batch_margin)
+
+    def _batch_rect(self, batch_id: str) -> Optional[QRect]:
+        """배치 블록의 뷰포트 좌표 영역"""
+        rect = self._batch_content_rect(batch_id)
+        return rect.translated(self._content_offset()) if rect is not None else None
+
+    def _batch_at(self, pos: QPoint) -> Optional[str]:
+        """뷰포트 좌표에 있는 batch_id"""
+        cell = self._cell_at(pos)
+        if cell is None:
+            return None
+        row, col = cell
+        day_idx, slot = divmod(col, SLOTS_PER_DAY)
+        return self.cell_owner.get((self.equipment_rows[row], self.date_range[day_idx], slot))
+
+    # ------------------------------------------------------------------
+    # 그리기
+    # ------------------------------------------------------------------
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._update_scrollbars()
+
+    def scrollContentsBy(self, dx, dy):
+        """헤더가 고정되어 있으므로 스크롤 시 전체 다시 그리기"""
+        self.viewport().update()
+
+    def _batch_color(self, batch: Batch) -> str:
+        """장비별 제품 색상 확인"""
+        bg_color = DEFAULT_PRODUCT_COLORS.get(batch.product_name, '#3498db')
+        if self.master_data:
+            equipment = self.master_data.equipment.get(batch.equipment_id)
+            if equipment and batch.product_id in equipment.get('product_colors', {}):
+                # 장비에 설정된 제품별 색상이 있으면 사용
+                bg_color = equipment['product_colors'][batch.product_id]
+        return bg_color
+
+    def _draw_batch(self, painter: QPainter, rect: QRect, batch: Batch, selected: bool):
+        """배치 블록 그리기 - 레고/테트리스 스타일"""
+        bg_color = self._batch_color(batch)
+        gradient = QLinearGradient(rect.topLeft(), rect.bottomRight())
+        gradient.setColorAt(0, QColor(bg_color))
+        gradient.setColorAt(0.5, QColor(bg_color))
+        gradient.setColorAt(1, QColor(_darken_color(bg_color)))
+
+        if selected:
+            pen = QPen(QColor(PRIMARY_COLOR), 3)
+        else:
+            pen = QPen(QColor('#dddddd'), 1)
+        painter.setPen(pen)
+        painter.setBrush(gradient)
+        painter.drawRoundedRect(rect, 6, 6)
+
+        # 소요시간을 시각적으로 표시 (블록 개수로, 2시간당 1블록)
+        duration_hours = int(batch.duration_hours)
+        block_count = min(4, max(1, duration_hours // 2))
+        block_w, block_h = self.block_width, self.block_height
+        unit = self.text_unit
+        time_text = f"{duration_hours}h"
+        painter.setFont(self.small_font)
+        text_w = painter.fontMetrics().horizontalAdvance(time_text)
+        row_w = block_count * (block_w + 2) + text_w
+        x = rect.center().x() - row_w // 2
+        y = rect.top() + unit + unit // 2
+        painter.setPen(QPen(QColor(255, 255, 255, 204), 1))
+        painter.setBrush(QColor(255, 255, 255, 153))
+        for i in range(block_count):
+            painter.drawRoundedRect(x + i * (block_w + 2), y, block_w, block_h, 2, 2)
+        painter.setPen(QColor(255, 255, 255, 230))
+        painter.drawText(QRect(x + block_count * (block_w + 2), y - unit, text_w + 2, unit * 3),
+                         Qt.AlignLeft | Qt.AlignVCenter, time_text)
+
+        # 배치 번호
+        painter.setFont(self.batch_font)
+        painter.setPen(Qt.white)
+        number_rect = QRect(rect.left(), rect.top() + unit * 3, rect.width(), unit * 6)
+        painter.drawText(number_rect, Qt.AlignCenter, _batch_text(batch))
+
+        # 제품명 (짧게)
+        parts = batch.product_name.split()
+        product_name_short = parts[0][:6] if parts else ''
+        painter.setFont(self.small_font)
+        painter.setPen(QColor(255, 255, 255, 230))
+        name_rect = QRect(rect.left(), rect.top() + unit * 9, rect.width(), unit * 4)
+        painter.drawText(name_rect, Qt.AlignCenter, product_name_short)
+
+    def paintEvent(self, event):
+        """페인트 이벤트 - 노출 영역의 셀/배치/연결선/헤더 그리기"""
+        painter = QPainter(self.viewport())
+        exposed = event.rect()
+        painter.fillRect(exposed, QColor('#ffffff'))
+
+        if not self.equipment_rows or not self.date_range:
             return
-        
-        batch_label = self.batch_labels[batch_id]
-        
-        # 현재 위치 정보 가져오기
-        if batch_id in self.production_plan.batches:
-            batch = self.production_plan.batches[batch_id]
-            date = batch.start_time.date()
-            
-            # 시작 슬롯 계산 - 구간 기반
-            hour = batch.start_time.hour
-            if 0 <= hour <= 3:
-                start_slot = hour
-            else:
-                # 레거시 처리
-                if hour >= 8 and hour < 10:
-                    start_slot = 0
-                elif hour >= 10 and hour < 12:
-                    start_slot = 1
-                elif hour >= 13 and hour < 15:
-                    start_slot = 2
-                elif hour >= 15 and hour < 17:
-                    start_slot = 3
-                else:
-                    start_slot = 0
-            
-            duration_slots = max(1, int(batch.duration_hours / 2))
-            
-            # 저장된 위치 정보 사용
-            if batch_label.current_row != -1 and batch_label.current_col != -1:
-                row = batch_label.current_row
-                col_start = batch_label.current_col
-                
-                # 숨겨진 슬롯들 다시 표시
-                for slot_offset in range(duration_slots):
-                    col = col_start + slot_offset
-                    # 슬롯 복원을 위해 위젯 찾기
-                    for key, container in self.containers.items():
-                        if isinstance(container, EquipmentTimeSlot):
-                            # 해당 위치의 슬롯 찾기
-                            idx = self.grid_layout.indexOf(container)
-                            if idx != -1:
-                                r, c, _, _ = self.grid_layout.getItemPosition(idx)
-                                if r == row and c == col:
-                                    container.batch = None
-                                    container.show()
-                                    container.setStyleSheet("""
-                                        QFrame {
-                                            background-color: #ffffff;
-                                            border: 1px solid #dee2e6;
-                                            border-style: solid;
-                                        }
-                                        QFrame:hover {
-                                            background-color: #f8f9fa;
-                                        }
-                                    """)
-                                    break
-            else:
-                # 기존 방식으로 슬롯 복원
-                for s in range(duration_slots):
-                    key = (batch.equipment_id, date, start_slot + s)
-                    if key in self.containers:
-                        self.containers[key].batch = None
-                        self.containers[key].show()
-                        self.containers[key].setStyleSheet("""
-                            QFrame {
-                                background-color: #ffffff;
-                                border: 1px solid #dee2e6;
-                                border-style: solid;
-                            }
-                            QFrame:hover {
-                                background-color: #f8f9fa;
-                            }
-                        """)
-        
-        # 그리드에서 위젯 제거
-        index = self.grid_layout.indexOf(batch_label)
-        if index != -1:
-            self.grid_layout.takeAt(index)
-            batch_label.setParent(None)
-    
-    def _move_batch_visual(self, batch_id: str, target_container):
-        """배치를 시각적으로만 이동 (전체 새로고침 없이)"""
-        if batch_id not in self.batch_labels:
+
+        painter.setRenderHint(QPainter.Antialiasing)
+
+        viewport = self.viewport()
+        hval = self.horizontalScrollBar().value()
+        vval = self.verticalScrollBar().value()
+
+        # 노출 영역에 걸친 행/열 범위
+        first_col = max(0, (max(exposed.left(), self.header_width) - self.header_width + hval) // self.cell_width)
+        last_col = min(self._column_count() - 1, (exposed.right() - self.header_width + hval) // self.cell_width)
+        first_row = max(0, (max(exposed.top(), self.header_height) - self.header_height + vval) // self.row_height)
+        last_row = min(len(self.equipment_rows) - 1, (exposed.bottom() - self.header_height + vval) // self.row_height)
+
+        body_rect = QRect(self.header_width, self.header_height,
+                          viewport.width() - self.header_width, viewport.height() - self.header_height)
+        body_exposed = exposed.intersected(body_rect)
+        if not body_exposed.isEmpty() and first_col <= last_col and first_row <= last_row:
+            painter.save()
+            painter.setClipRect(body_exposed)
+
+            # 셀 경계선
+            grid_top = self.header_height + first_row * self.row_height - vval
+            grid_left = self.header_width + first_col * self.cell_width - hval
+            grid_right = self.header_width + (last_col + 1) * self.cell_width - hval
+            grid_bottom = self.header_height + (last_row + 1) * self.row_height - vval
+            cell_pen = QPen(QColor(CELL_BORDER_COLOR), 1)
+            day_pen = QPen(QColor(DAY_BORDER_COLOR), 1)
+            for col in range(first_col, last_col + 2):
+                x = self.header_width + col * self.cell_width - hval
+                painter.setPen(day_pen if col % SLOTS_PER_DAY == 0 else cell_pen)
+                painter.drawLine(x, grid_top, x, grid_bottom)
+            painter.setPen(cell_pen)
+            for row in range(first_row, last_row + 2):
+                y = self.header_height + row * self.row_height - vval
+                painter.drawLine(grid_left, y, grid_right, y)
+
+            # 드롭 하이라이트
+            target_rect = self._drop_target_rect(self._drop_target)
+            if target_rect is not None:
+                painter.setPen(QPen(QColor(PRIMARY_COLOR), 2))
+                painter.setBrush(QColor('#e3f2fd'))
+                painter.drawRect(target_rect)
+
+            # 노출된 셀의 배치 수집
+            visible_batches = {}
+            for row in range(first_row, last_row + 1):
+                equipment_id = self.equipment_rows[row]
+                for col in range(first_col, last_col + 1):
+                    day_idx, slot = divmod(col, SLOTS_PER_DAY)
+                    batch_id = self.cell_owner.get((equipment_id, self.date_range[day_idx], slot))
+                    if batch_id is not None:
+                        visible_batches[batch_id] = True
+
+            batches = self.production_plan.batches if self.production_plan else {}
+            for batch_id in visible_batches:
+                batch = batches.get(batch_id)
+                rect = self._batch_rect(batch_id)
+                if batch is not None and rect is not None:
+                    self._draw_batch(painter, rect, batch, batch_id == self.selected_batch)
+
+            self._draw_lot_connections(painter, body_exposed)
+            painter.restore()
+
+        self._draw_headers(painter, exposed, first_col, last_col, first_row, last_row)
+
+    def _invalidate_connections(self, plan_changed: bool = False):
+        """연결선 캐시 무효화 (계획 변경 시 로트 체인까지, 배치 이동 시 좌표만)"""
+        if plan_changed:
+            self._lot_chains = None
+        self._connection_segments = None
+        self._segments_by_day = {}
+
+    def _get_lot_chains(self) -> list:
+        """같은 제품/제조번호 배치를 공정 순서로 정렬한 로트 체인"""
+        if self._lot_chains is not None:
+            return self._lot_chains
+
+        chains = []
+        if self.production_plan and self.master_data:
+            # 배치별로 그룹화
+            batches_by_lot = {}
+            for batch in self.production_plan.batches.values():
+                key = (batch.product_id, getattr(batch, 'lot_number', None))
+                batches_by_lot.setdefault(key, []).append(batch)
+
+            for (product_id, lot_number), batches in batches_by_lot.items():
+                product = self.master_data.products.get(product_id)
+                if not product or len(batches) < 2:
+                    continue
+
+                # 공정 순서에 따라 정렬 (같은 공정은 계획 순서 유지)
+                process_rank = {process_id: idx for idx, process_id
+                                in enumerate(product.get('process_order', []))}
+                sorted_batches = sorted(
+                    (batch for batch in batches if getattr(batch, 'process_id', None) in process_rank),
+                    key=lambda batch: process_rank[batch.process_id]
+                )
+                if len(sorted_batches) < 2:
+                    continue
+
+                color = QColor(product.get('color', '#3498db'))
+                color.setAlpha(180)
+                chains.append((color, [batch.id for batch in sorted_batches]))
+
+        self._lot_chains = chains
+        return chains
+
+    def _get_connection_segments(self) -> list:
+        """로트 체인의 연결선 좌표 (콘텐츠 좌표) 계산 및 날짜 열 단위 색인"""
+        if self._connection_segments is not None:
+            return self._connection_segments
+
+        segments = []
+        segments_by_day = {}
+        day_width = self.cell_width * SLOTS_PER_DAY
+        arrow_size = 8
+        angle = 150  # 화살표 각도
+        arrow_dx1 = arrow_size * math.cos(math.radians(angle))
+        arrow_dy1 = arrow_size * math.sin(math.radians(angle))
+        arrow_dx2 = arrow_size * math.cos(math.radians(-angle))
+        arrow_dy2 = arrow_size * math.sin(math.radians(-angle))
+
+        for color, chain in self._get_lot_chains():
+            rects = [self._batch_content_rect(batch_id) for batch_id in chain]
+            for current_rect, next_rect in zip(rects, rects[1:]):
+                if current_rect is None or next_rect is None:
+                    continue
+
+                start_pos = QPoint(current_rect.right(), current_rect.center().y())
+                end_pos = QPoint(next_rect.left(), next_rect.center().y())
+
+                # 곡선 (제어점은 두 점 사이 위쪽)
+                control_x = (start_pos.x() + end_pos.x()) // 2
+                control_y = min(start_pos.y(), end_pos.y()) - 20
+                path = QPainterPath()
+                path.moveTo(start_pos)
+                path.quadTo(QPoint(control_x, control_y), end_pos)
+
+                # 화살표 끝점
+                arrow_p1 = QPoint(int(end_pos.x() - arrow_dx1), int(end_pos.y() - arrow_dy1))
+                arrow_p2 = QPoint(int(end_pos.x() - arrow_dx2), int(end_pos.y() - arrow_dy2))
+
+                # 펜 두께와 화살표를 포함한 영역
+                bounds = path.controlPointRect().toAlignedRect().united(
+                    QRect(end_pos.x() - arrow_size, end_pos.y() - arrow_size, arrow_size * 2, arrow_size * 2)
+                ).adjusted(-3, -3, 3, 3)
+
+                idx = len(segments)
+                segments.append((color, path, end_pos, arrow_p1, arrow_p2, bounds))
+                for day_idx in range(max(0, bounds.left() // day_width), bounds.right() // day_width + 1):
+                    segments_by_day.setdefault(day_idx, []).append(idx)
+
+        self._connection_segments = segments
+        self._segments_by_day = segments_by_day
+        return segments
+
+    def _draw_lot_connections(self, painter: QPainter, exposed: QRect):
+        """노출 영역을 지나는 로트 연결선만 그리기"""
+        segments = self._get_connection_segments()
+        if not segments:
             return
-            
-        batch_label = self.batch_labels[batch_id]
-        batch = self.production_plan.batches[batch_id]
-        
-        # 새 위치 계산
-        target_date = target_container.date
-        target_slot = target_container.slot
-        
-        # 배치의 duration에 따른 슬롯 수 계산
-        duration_slots = max(1, int(batch.duration_hours / 2))
-        
-        # 새 위치가 유효한지 확인
-        can_place = True
-        for slot_offset in range(duration_slots):
-            slot_idx = target_slot + slot_offset
-            if slot_idx >= 4:  # 하루 4구간을 넘어가면
-                can_place = False
-                break
-            
-            key = (target_container.equipment_id, target_date, slot_idx)
-            if key in self.containers:
-                if self.containers[key].batch is not None and self.containers[key].batch != "occupied":
-                    can_place = False
-                    break
-            else:
-                can_place = False
-                break
-        
-        if not can_place:
-            print("[DEBUG] Cannot place batch at target location")
+
+        offset = self._content_offset()
+        content_exposed = exposed.translated(-offset)
+        day_width = self.cell_width * SLOTS_PER_DAY
+
+        # 노출된 날짜 열을 지나는 연결선 후보
+        candidates = set()
+        for day_idx in range(max(0, content_exposed.left() // day_width),
+                             content_exposed.right() // day_width + 1):
+            candidates.update(self._segments_by_day.get(day_idx, ()))
+        if not candidates:
             return
-        
-        # 그리드에서 배치 라벨의 현재 위치를 찾기
-        row = -1
-        if self.master_data and target_container.equipment_id in self.master_data.equipment:
-            equipment_name = self.master_data.equipment[target_container.equipment_id]['name']
-            
-            for r in range(self.grid_layout.rowCount()):
-                item = self.grid_layout.itemAtPosition(r, 0)
-                if item and item.widget():
-                    label = item.widget()
-                    if isinstance(label, QLabel) and label.text() == equipment_name:
-                        row = r
-                        break
-        
-        if row == -1:
-            print("[DEBUG] Cannot find equipment row")
+
+        painter.save()
+        painter.translate(offset)
+        painter.setBrush(Qt.NoBrush)
+        current_color = None
+        for idx in sorted(candidates):
+            color, path, end_pos, arrow_p1, arrow_p2, bounds = segments[idx]
+            if not bounds.intersects(content_exposed):
+                continue
+            if color is not current_color:
+                painter.setPen(QPen(color, 3))
+                current_color = color
+            painter.drawPath(path)
+            painter.drawLine(end_pos, arrow_p1)
+            painter.drawLine(end_pos, arrow_p2)
+        painter.restore()
+
+    def _draw_headers(self, painter: QPainter, exposed: QRect, first_col: int, last_col: int,
+                      first_row: int, last_row: int):
+        """고정 헤더 그리기 (날짜/구간 헤더, 장비 헤더) - 노출된 부분만"""
+        viewport = self.viewport()
+        hval = self.horizontalScrollBar().value()
+        vval = self.verticalScrollBar().value()
+
+        # 날짜 헤더 (각 날짜를 4구간으로 나눔)
+        date_header_rect = QRect(self.header_width, 0, viewport.width() - self.header_width,
+                                 self.header_height).intersected(exposed)
+        painter.save()
+        painter.setClipRect(date_header_rect)
+        day_range = range(first_col // SLOTS_PER_DAY, last_col // SLOTS_PER_DAY + 1) \
+            if not date_header_rect.isEmpty() and first_col <= last_col else range(0)
+        for day_idx in day_range:
+            x = self.header_width + day_idx * SLOTS_PER_DAY * self.cell_width - hval
+            date_rect = QRect(x, 0, self.cell_width * SLOTS_PER_DAY, self.date_header_height)
+            painter.setPen(QPen(QColor(DAY_BORDER_COLOR), 2))
+            painter.setBrush(QColor('#f0f0f0'))
+            painter.drawRect(date_rect.adjusted(1, 1, -1, -1))
+            painter.setFont(self.header_font)
+            painter.setPen(QColor('#333333'))
+            painter.drawText(date_rect, Qt.AlignCenter, self.date_range[day_idx].strftime('%m월 %d일'))
+
+            # 구간 헤더 (1구간, 2구간, 3구간, 4구간)
+            painter.setFont(self.slot_font)
+            for slot in range(SLOTS_PER_DAY):
+                slot_rect = QRect(x + slot * self.cell_width, self.date_header_height,
+                                  self.cell_width, self.slot_header_height)
+                painter.setPen(QColor('#cccccc'))
+                painter.setBrush(QColor('#f8f9fa'))
+                painter.drawRect(slot_rect.adjusted(0, 0, -1, -1))
+                painter.setPen(QColor('#333333'))
+                painter.drawText(slot_rect, Qt.AlignCenter, f"{slot + 1}구간")
+        painter.restore()
+
+        # 장비 헤더
+        equipment_header_rect = QRect(0, self.header_height, self.header_width,
+                                      viewport.height() - self.header_height).intersected(exposed)
+        painter.save()
+        painter.setClipRect(equipment_header_rect)
+        painter.setFont(self.header_font)
+        row_range = range(first_row, last_row + 1) if not equipment_header_rect.isEmpty() else range(0)
+        for row in row_range:
+            y = self.header_height + row * self.row_height - vval
+            row_rect = QRect(0, y, self.header_width, self.row_height)
+            painter.setPen(QColor('#0C1A6B'))
+            painter.setBrush(QColor(PRIMARY_COLOR))
+            painter.drawRect(row_rect.adjusted(0, 0, -1, -1))
+            painter.setPen(Qt.white)
+            painter.drawText(row_rect, Qt.AlignCenter | Qt.TextWordWrap, self.equipment_names[row])
+        painter.restore()
+
+        # 좌상단 모서리
+        painter.fillRect(QRect(0, 0, self.header_width, self.header_height), QColor('#ffffff'))
+
+    # ------------------------------------------------------------------
+    # 마우스 / 드래그&드롭
+    # ------------------------------------------------------------------
+
+    def mousePressEvent(self, event):
+        """마우스 클릭 이벤트 - 배치 선택"""
+        if event.button() == Qt.LeftButton:
+            batch_id = self._batch_at(event.pos())
+            self._drag_start_position = event.pos()
+            self._drag_batch_id = batch_id
+            if batch_id is not None:
+                self.on_batch_selected(batch_id)
+        super().mousePressEvent(event)
+
+    def mouseMoveEvent(self, event):
+        """마우스 이동 이벤트 - 드래그 시작"""
+        if not (event.buttons() & Qt.LeftButton) or self._drag_batch_id is None:
             return
-        
-        # 열 위치 계산
-        days_diff = (target_date - self.date_range[0]).days if hasattr(self, 'date_range') else 0
-        col_start = 1 + days_diff * 4 + target_slot
-        
-        # 새 위치의 슬롯들을 숨기기
-        for slot_offset in range(duration_slots):
-            col = col_start + slot_offset
-            item = self.grid_layout.itemAtPosition(row, col)
-            if item and item.widget():
-                widget = item.widget()
-                if isinstance(widget, EquipmentTimeSlot):
-                    widget.hide()
-        
-        # 배치 라벨을 새 위치로 이동
-        self.grid_layout.addWidget(batch_label, row, col_start, 1, duration_slots)
-        
-        # 배치 라벨에 새 위치 정보 저장
-        batch_label.current_row = row
-        batch_label.current_col = col_start
-        
-        # 새 위치의 슬롯들을 점유 상태로 표시
-        for slot_offset in range(duration_slots):
-            slot_idx = target_slot + slot_offset
-            key = (target_container.equipment_id, target_date, slot_idx)
-            if key in self.containers:
-                self.containers[key].batch = "occupied"
-        
-        print(f"[DEBUG] Batch {batch_id} moved to new position (row={row}, col={col_start})")
-    
-    def paintEvent(self, event):
-        """페인트 이벤트 - 연결선 그리기"""
-        super().paintEvent(event)
-        
-        if not self.production_plan:
+
+        if (event.pos() - self._drag_start_position).manhattanLength() < 5:
             return
-        
-        painter = QPainter(self)
-        painter.setRenderHint(QPainter.Antialiasing)
-        
-        # 배치별로 그룹화
-        batches_by_product = {}
-        for batch in self.production_plan.batches.values():
-            key = (batch.product_id, getattr(batch, 'lot_number', None))
-            if key not in batches_by_product:
-                batches_by_product[key] = []
-            batches_by_product[key].append(batch)
-        
-        # 각 제품의 공정 순서대로 연결선 그리기
-        for (product_id, lot_number), batches in batches_by_product.items():
-            # 공정 순서대로 정렬
-            if self.master_data and product_id in self.master_data.products:
-                product = self.master_data.products[product_id]
-                process_order = product.get('process_order', [])
-                
-                # 공정 순서에 따라 정렬
-                sorted_batches = []
-                for process_id in process_order:
-                    for batch in batches:
-                        if hasattr(batch, 'process_id') and batch.process_id == process_id:
-                            sorted_batches.append(batch)
-                
-                # 연결선 그리기
-                for i in range(len(sorted_batches) - 1):
-                    current_batch = sorted_batches[i]
-                    next_batch = sorted_batches[i + 1]
-                    
-                    if current_batch.id in self.batch_labels and next_batch.id in self.batch_labels:
-                        # 위젯 위치 가져오기
-                        current_widget = self.batch_labels[current_batch.id]
-                        next_widget = self.batch_labels[next_batch.id]
-                        
-                        # 글로벌 좌표를 로컬 좌표로 변환
-                        start_pos = self.mapFromGlobal(current_widget.mapToGlobal(
-                            QPoint(current_widget.width(), current_widget.height() // 2)
-                        ))
-                        end_pos = self.mapFromGlobal(next_widget.mapToGlobal(
-                            QPoint(0, next_widget.height() // 2)
-                        ))
-                        
-                        # 색상 설정
-                        color = QColor(current_widget.batch.product_id in self.master_data.products and 
-                                     self.master_data.products[current_widget.batch.product_id].get('color', '#3498db') or '#3498db')
-                        color.setAlpha(180)
-                        
-                        # 펜 설정
-                        pen = painter.pen()
-                        pen.setColor(color)
-                        pen.setWidth(3)
-                        painter.setPen(pen)
-                        
-                        # 곡선 그리기
-                        path = QPainterPath()
-                        path.moveTo(start_pos)
-                        
-                        # 제어점 계산
-                        control_x = (start_pos.x() + end_pos.x()) // 2
-                        control_y = min(start_pos.y(), end_pos.y()) - 20
-                        
-                        path.quadTo(QPoint(control_x, control_y), end_pos)
-                        painter.drawPath(path)
-                        
-                        # 화살표 그리기
-                        arrow_size = 8
-                        angle = 150  # 화살표 각도
-                        
-                        # 화살표 끝점 계산
-                        import math
-                        arrow_p1 = QPoint(
-                            int(end_pos.x() - arrow_size * math.cos(math.radians(angle))),
-                            int(end_pos.y() - arrow_size * math.sin(math.radians(angle)))
-                        )
-                        arrow_p2 = QPoint(
-                            int(end_pos.x() - arrow_size * math.cos(math.radians(-angle))),
-                            int(end_pos.y() - arrow_size * math.sin(math.radians(-angle)))
-                        )
-                        
-                        painter.drawLine(end_pos, arrow_p1)
-                        painter.drawLine(end_pos, arrow_p2)
-    
+
+        batch = self.production_plan.batches.get(self._drag_batch_id) if self.production_plan else None
+        rect = self._batch_rect(self._drag_batch_id)
+        self._drag_batch_id = None
+        if batch is None or rect is None:
+            return
+
+        drag = QDrag(self)
+        mime_data = QMimeData()
+
+        # 배치 데이터를 JSON으로 직렬화
+        batch_data = {
+            'batch_id': batch.id,
+            'product_id': batch.product_id,
+            'product_name': batch.product_name,
+            'equipment_id': batch.equipment_id,
+            'start_time': batch.start_time.isoformat(),
+            'duration_hours': batch.duration_hours,
+            'process_id': getattr(batch, 'process_id', None),
+            'lot_number': getattr(batch, 'lot_number', None)
+        }
+
+        mime_data.setText(json.dumps(batch_data))
+        drag.setMimeData(mime_data)
+
+        # 드래그 중 표시할 픽스맵 생성
+        pixmap = QPixmap(rect.size())
+        pixmap.fill(Qt.transparent)
+        pixmap_painter = QPainter(pixmap)
+        pixmap_painter.setRenderHint(QPainter.Antialiasing)
+        self._draw_batch(pixmap_painter, QRect(0, 0, rect.width(), rect.height()), batch, True)
+        pixmap_painter.end()
+        drag.setPixmap(pixmap)
+        drag.setHotSpot(event.pos() - rect.topLeft())
+
+        drag.exec_(Qt.MoveAction)
+
+    def _drop_position(self, event) -> Optional[Tuple[dict, str, object, int, int]]:
+        """드래그 위치의 (배치 데이터, 장비, 날짜, 구간, 구간 수), 놓을 수 없으면 None"""
+        if not event.mimeData().hasText():
+            return None
+        try:
+            batch_data = json.loads(event.mimeData().text())
+        except ValueError:
+            return None
+        cell = self._cell_at(event.pos())
+        if cell is None or 'batch_id' not in batch_data:
+            return None
+        row, col = cell
+        day_idx, slot = divmod(col, SLOTS_PER_DAY)
+        equipment_id = self.equipment_rows[row]
+        day = self.date_range[day_idx]
+        duration_slots = _duration_slots(batch_data.get('duration_hours', 2))
+        if not self._can_place(equipment_id, day, slot, duration_slots,
+                               ignore_batch_id=batch_data['batch_id']):
+            return None
+        return batch_data, equipment_id, day, slot, duration_slots
+
+    def _drop_target_rect(self, target) -> Optional[QRect]:
+        """드롭 하이라이트의 뷰포트 좌표 영역"""
+        if not target:
+            return None
+        equipment_id, day, slot, duration_slots = target
+        row = self._row_index.get(equipment_id)
+        col = self._column(day, slot)
+        if row is None or col is None:
+            return None
+        return self._cell_rect(row, col, duration_slots).adjusted(1, 1, -1, -1)
+
+    def _set_drop_target(self, target):
+        """드롭 하이라이트 변경 (이전/새 영역만 다시 그리기)"""
+        if target == self._drop_target:
+            return
+        for rect in (self._drop_target_rect(self._drop_target), self._drop_target_rect(target)):
+            if rect is not None:
+                self.viewport().update(rect.adjusted(-2, -2, 2, 2))
+        self._drop_target = target
+
+    def dragEnterEvent(self, event):
+        """드래그 진입 이벤트"""
+        if event.mimeData().hasText():
+            event.acceptProposedAction()
+        else:
+            event.ignore()
+
+    def dragMoveEvent(self, event):
+        """드래그 이동 이벤트 - 놓을 수 있는 구간 하이라이트"""
+        position = self._drop_position(event)
+        if position is None:
+            self._set_drop_target(None)
+            event.ignore()
+            return
+        _, equipment_id, day, slot, duration_slots = position
+        self._set_drop_target((equipment_id, day, slot, duration_slots))
+        event.acceptProposedAction()
+
+    def dragLeaveEvent(self, event):
+        """드래그 떠남 이벤트 - 하이라이트 제거"""
+        self._set_drop_target(None)
+
+    def dropEvent(self, event):
+        """드롭 이벤트"""
+        position = self._drop_position(event)
+        self._set_drop_target(None)
+        if position is None:
+            event.ignore()
+            return
+        batch_data, equipment_id, day, slot, _ = position
+        if self.handle_batch_drop(batch_data, equipment_id, day, slot):
+            event.acceptProposedAction()
+        else:
+            event.ignore()
+
+    def on_batch_selected(self, batch_id: str):
+        """배치 선택 처리 (이전/새 배치 영역만 다시 그리기)"""
+        for selected_id in (self.selected_batch, batch_id):
+            rect = self._batch_rect(selected_id) if selected_id is not None else None
+            if rect is not None:
+                self.viewport().update(rect.adjusted(-3, -3, 3, 3))
+        self.selected_batch = batch_id
+        batch = self.production_plan.batches.get(batch_id) if self.production_plan else None
+        if batch is not None:
+            # 시그널 발생
+            self.batch_selected.emit(batch)
+
+    # ------------------------------------------------------------------
+    # 내보내기
+    # ------------------------------------------------------------------
+
     def extract_schedule_from_grid(self):
         """그리드에서 현재 스케줄을 추출하여 DataFrame으로 반환"""
         import pandas as pd
-        
+
         schedule_data = []
-        
-        # 그리드의 모든 행과 열을 순회
-        for row in range(2, self.grid_layout.rowCount()):  # 헤더 2줄 제외
-            # 장비 정보 가져오기
-            equipment_item = self.grid_layout.itemAtPosition(row, 0)
-            if not equipment_item or not equipment_item.widget():
-                continue
-                
-            equipment_label = equipment_item.widget()
-            if not isinstance(equipment_label, QLabel):
+        batches = self.production_plan.batches if self.production_plan else {}
+
+        # 그리드에 놓인 배치의 시각적 위치 기준으로 수집
+        for batch_id, position in self.batch_positions.items():
+            batch = batches.get(batch_id)
+            row = self._row_index.get(position['equipment_id'])
+            if batch is None or row is None:
                 continue
-                
-            equipment_name = equipment_label.text()
-            
-            # 해당 행의 모든 배치 찾기
-            for col in range(1, self.grid_layout.columnCount()):
-                item = self.grid_layout.itemAtPosition(row, col)
-                if item and item.widget():
-                    widget = item.widget()
-                    if isinstance(widget, DraggableBatchLabel):
-                        # 배치 정보 수집
-                        batch = widget.batch
-                        
-                        # 날짜와 슬롯 계산
-                        days = (col - 1) // 4  # 하루 4구간
-                        slot = (col - 1) % 4
-                        date = self.date_range[days] if hasattr(self, 'date_range') and days < len(self.date_range) else None
-                        
-                        if date:
-                            # 시간 계산 (각 슬롯은 2시간)
-                            hour = slot * 2 + 8  # 8시부터 시작
-                            
-                            schedule_data.append({
-                                'batch_id': batch.id,
-                                'product_id': batch.product_id,
-                                'product_name': batch.product_name,
-                                'equipment_name': equipment_name,
-                                'equipment_id': batch.equipment_id,
-                                'date': date,
-                                'start_hour': hour,
-                                'duration_hours': batch.duration_hours,
-                                'lot_number': getattr(batch, 'lot_number', '')
-                            })
-        
+
+            # 시간 계산 (각 슬롯은 2시간)
+            hour = position['slot'] * 2 + 8  # 8시부터 시작
+
+            schedule_data.append({
+                'batch_id': batch.id,
+                'product_id': batch.product_id,
+                'product_name': batch.product_name,
+                'equipment_name': self.equipment_names[row],
+                'equipment_id': position['equipment_id'],
+                'date': position['date'],
+                'start_hour': hour,
+                'duration_hours': batch.duration_hours,
+                'lot_number': getattr(batch, 'lot_number', '')
+            })
+
         # DataFrame으로 변환
         df = pd.DataFrame(schedule_data)
-        
+
         # 정렬
         if not df.empty:
             df = df.sort_values(['date', 'equipment_name', 'start_hour'])
-        
+
         return df
-    
+
     def get_equipment_id_from_name(self, equipment_name):
         """장비명으로 장비 ID 찾기"""
+        equipment_id = self._equipment_id_by_name.get(equipment_name)
+        if equipment_id is not None:
+            return equipment_id
         if self.master_data:
             for eq_id, eq_data in self.master_data.equipment.items():
                 if eq_data.get('name') == equipment_name:
                     return eq_id
-        return None
\ No newline at end of file
+        return None
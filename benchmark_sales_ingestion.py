@@ -0,0 +1,159 @@
+"""
+판매계획 수요 전개 벤치마크
+기존 iterrows 기반 수요 전개와 벡터화된 일별 수요 테이블 비교
+
+사용법:
+    python benchmark_sales_ingestion.py [행수]
+
+마스터 제품으로 합성한 판매계획(납기일 형식, 월별 형식)을 각각 생성하여
+두 방식의 실행시간과 결과(날짜/제품/제조번호/우선순위/배치수 및 순서) 일치 여부를 출력한다.
+"""
+import sys
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from app.models.master_data import MasterDataManager
+from app.core.scheduler import APSScheduler
+
+
+def legacy_process_new_format(master_data, sales_plan_df):
+    """기존 방식: 행 단위 iterrows"""
+    daily_demands = {}
+    priority_map = {'긴급': 1, '높음': 2, '보통': 3, '낮음': 4}
+    for _, row in sales_plan_df.iterrows():
+        product_code = str(row['제품코드'])
+        delivery_date = pd.to_datetime(row['납기일'])
+        product = master_data.products.get(product_code)
+        if not product:
+            continue
+        priority_value = priority_map.get(row.get('우선순위', '보통'), 3)
+        production_date = delivery_date - timedelta(hours=product.get('lead_time_hours', 24))
+        daily_demands.setdefault(production_date.date(), []).append({
+            'product_id': product_code,
+            'lot_number': str(row['제조번호']),
+            'priority': priority_value,
+            'batch_count': 1
+        })
+    return daily_demands
+
+
+def legacy_split_monthly_to_daily(master_data, sales_plan_df, start_date):
+    """기존 방식: 행 단위 iterrows + 제품명 선형 탐색 + 행/월마다 영업일 재계산"""
+    daily_demands = {}
+    for _, row in sales_plan_df.iterrows():
+        product = None
+        for p in master_data.products.values():
+            if p['name'] == row['제품명']:
+                product = p
+                break
+        if not product:
+            continue
+        for month_col in sales_plan_df.columns:
+            if '월' in month_col and pd.notna(row[month_col]):
+                month_num = int(month_col.replace('월', ''))
+                batches_needed = int(row[month_col])
+                if batches_needed > 0:
+                    month_start = datetime(start_date.year, month_num, 1)
+                    if month_num == 12:
+                        month_end = datetime(start_date.year + 1, 1, 1) - timedelta(days=1)
+                    else:
+                        month_end = datetime(start_date.year, month_num + 1, 1) - timedelta(days=1)
+                    working_days = []
+                    current = month_start
+                    while current <= month_end:
+                        if current.weekday() < 5:
+                            working_days.append(current)
+                        current += timedelta(days=1)
+                    daily_batch = batches_needed / len(working_days)
+                    for day in working_days:
+                        daily_demands.setdefault(day, []).append({
+                            'product_id': product['id'],
+                            'lot_number': None,
+                            'priority': product['priority'],
+                            'batch_count': daily_batch
+                        })
+    return daily_demands
+
+
+def legacy_rows(daily_demands):
+    """기존 결과를 정렬 순서대로 비교용 튜플 목록으로 변환"""
+    rows = []
+    for day, demands in sorted(daily_demands.items()):
+        for demand in sorted(demands, key=lambda x: x['priority']):
+            rows.append((pd.Timestamp(day), demand['product_id'], demand['lot_number'],
+                         int(demand['priority']), round(float(demand['batch_count']), 9)))
+    return rows
+
+
+def table_rows(table):
+    """벡터화 결과를 비교용 튜플 목록으로 변환"""
+    return [(pd.Timestamp(r.date), r.product_id, r.lot_number if isinstance(r.lot_number, str) else None,
+             int(r.priority), round(float(r.batch_count), 9))
+            for r in table.itertuples(index=False)]
+
+
+def make_new_format(master_data, rows, rng):
+    """납기일 형식 합성 판매계획"""
+    products = list(master_data.products.values())
+    picks = rng.integers(0, len(products), rows)
+    due = pd.Timestamp('2025-02-03') + pd.to_timedelta(rng.integers(0, 25, rows), unit='D')
+    return pd.DataFrame({
+        '제품코드': [products[i]['id'] for i in picks],
+        '제품명': [products[i]['name'] for i in picks],
+        '제조번호': np.arange(rows).astype(str),
+        '수량': rng.integers(1000, 100000, rows),
+        '납기일': due.strftime('%Y-%m-%d'),
+        '우선순위': rng.choice(['긴급', '높음', '보통', '낮음'], rows)
+    })
+
+
+def make_monthly_format(master_data, rows, rng):
+    """월별 형식 합성 판매계획 (행마다 한 달에만 수요)"""
+    products = list(master_data.products.values())
+    picks = rng.integers(0, len(products), rows)
+    df = pd.DataFrame({'제품명': [products[i]['name'] for i in picks]})
+    months = rng.integers(1, 13, rows)
+    for month_num in range(1, 13):
+        df[f'{month_num}월'] = np.where(months == month_num, rng.integers(1, 30, rows), np.nan)
+    return df
+
+
+def timed(func, *args):
+    started = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - started, result
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    master_data = MasterDataManager()
+    scheduler = APSScheduler(master_data)
+    rng = np.random.default_rng(0)
+    start_date = datetime(2025, 1, 1)
+
+    print(f"행수: {rows}")
+    print(f"{'형식':<10} {'일별 수요':>10} {'기존(s)':>9} {'벡터화(s)':>10} {'배속':>7} 일치")
+
+    sales_df = make_new_format(master_data, rows, rng)
+    legacy_time, legacy = timed(legacy_process_new_format, master_data, sales_df)
+    vector_time, table = timed(
+        lambda df: scheduler._sort_by_priority(scheduler._process_new_format(df)), sales_df)
+    same = legacy_rows(legacy) == table_rows(table)
+    print(f"{'납기일':<10} {len(table):>10} {legacy_time:>9.3f} {vector_time:>10.3f} "
+          f"{legacy_time / vector_time:>6.1f}x {'O' if same else 'X'}")
+
+    sales_df = make_monthly_format(master_data, rows, rng)
+    legacy_time, legacy = timed(legacy_split_monthly_to_daily, master_data, sales_df, start_date)
+    vector_time, table = timed(
+        lambda df: scheduler._sort_by_priority(scheduler._split_monthly_to_daily(df, start_date)),
+        sales_df)
+    same = legacy_rows(legacy) == table_rows(table)
+    print(f"{'월별':<10} {len(table):>10} {legacy_time:>9.3f} {vector_time:>10.3f} "
+          f"{legacy_time / vector_time:>6.1f}x {'O' if same else 'X'}")
+
+
+if __name__ == '__main__':
+    main()
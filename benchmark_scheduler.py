@@ -0,0 +1,159 @@
+"""
+스케줄러 벤치마크
+기존 선형 탐색 루프와 구간 점유 인덱스(SlotOccupancy) 기반 _run_scheduling 비교
+
+사용법:
+    python benchmark_scheduler.py [반복배수]
+
+samples/sales_plan_bulk_*.xlsx 의 각 행을 반복배수만큼 복제(제조번호만 변경)하여
+로트 수를 늘린 뒤 두 방식의 실행시간과 배치 결과 일치 여부를 출력한다.
+"""
+import glob
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from app.models.master_data import MasterDataManager
+from app.models.production_plan import Batch
+from app.core.scheduler import APSScheduler
+
+
+class LegacyScheduler(APSScheduler):
+    """기존 방식 (매 탐색마다 장비 목록/작업자 정보 조회)"""
+
+    def _run_scheduling(self, daily_demands, start_date):
+        slot_allocation = {}
+        batch_end_slots = {}
+
+        for demand in daily_demands.itertuples(index=False):
+            product_id = demand.product_id
+            product_name = demand.product_name
+            batch_count = int(np.ceil(demand.batch_count))
+            process_order = self.master_data.products.get(product_id, {}).get('process_order', [])
+            lot_number = demand.lot_number if isinstance(demand.lot_number, str) else None
+
+            for batch_num in range(batch_count):
+                batch_id = str(uuid.uuid4())[:8]
+                current_date = demand.date.date()
+                current_slot = 0
+
+                for process_idx, process_id in enumerate(process_order):
+                    if process_idx > 0:
+                        prev_key = (batch_id, process_idx - 1)
+                        if prev_key in batch_end_slots:
+                            prev_date, prev_end_slot = batch_end_slots[prev_key]
+                            current_date = prev_date
+                            current_slot = prev_end_slot + 1
+                            if current_slot >= 4:
+                                current_date = current_date + timedelta(days=1)
+                                current_slot = 0
+                            product = self.master_data.products.get(product_id, {})
+                            leadtime_days = product.get('process_leadtimes', {}).get(process_id, 0)
+                            if leadtime_days > 0:
+                                current_date = current_date + timedelta(days=leadtime_days)
+                                current_slot = 0
+
+                    process_equipment = self.master_data.get_equipment_by_process(process_id)
+                    if not process_equipment:
+                        continue
+
+                    scheduled = False
+                    duration = self._get_process_duration(product_id, process_id)
+                    duration_slots = max(1, int(duration / 2))
+
+                    for day_offset in range(30):
+                        check_date = current_date + timedelta(days=day_offset)
+                        if check_date.weekday() >= 5:
+                            continue
+                        start_slot = current_slot if day_offset == 0 else 0
+                        for slot in range(start_slot, 4):
+                            if slot + duration_slots > 4:
+                                break
+                            operator_info = self.master_data.get_operator_info(
+                                process_id, check_date.strftime('%Y-%m-%d')
+                            )
+                            if not operator_info:
+                                continue
+                            for eq in process_equipment:
+                                if product_id not in eq['available_products']:
+                                    continue
+                                if any((eq['id'], check_date, slot + s) in slot_allocation
+                                       for s in range(duration_slots)):
+                                    continue
+                                start_time = datetime.combine(check_date, datetime.min.time()).replace(hour=slot)
+                                batch = Batch(
+                                    batch_id=f"{batch_id}_{process_id}",
+                                    product_id=product_id,
+                                    product_name=product_name,
+                                    equipment_id=eq['id'],
+                                    start_time=start_time,
+                                    duration_hours=duration,
+                                    lot_number=lot_number,
+                                    process_id=process_id
+                                )
+                                self.production_plan.add_batch(batch)
+                                for s in range(duration_slots):
+                                    slot_allocation[(eq['id'], check_date, slot + s)] = True
+                                batch_end_slots[(batch_id, process_idx)] = (
+                                    check_date, slot + duration_slots - 1)
+                                scheduled = True
+                                break
+                            if scheduled:
+                                break
+                        if scheduled:
+                            break
+
+
+def load_sales_plan(file_path, repeat):
+    """판매계획 로드 후 반복배수만큼 복제"""
+    df = pd.read_excel(file_path)
+    df['제품코드'] = df['제품코드'].astype(str)
+    df['제조번호'] = df['제조번호'].astype(str)
+    if repeat > 1:
+        copies = []
+        for i in range(repeat):
+            copy = df.copy()
+            copy['제조번호'] = copy['제조번호'] + f"-{i}"
+            copies.append(copy)
+        df = pd.concat(copies, ignore_index=True)
+    return df
+
+
+def run(scheduler_cls, master_data, sales_df):
+    """_run_scheduling 단계만 측정하여 (소요시간, 배치 지문) 반환"""
+    scheduler = scheduler_cls(master_data)
+    start_date = datetime(2025, 2, 1)
+    daily_demands = scheduler._sort_by_priority(scheduler._process_new_format(sales_df))
+    started = time.perf_counter()
+    scheduler._run_scheduling(daily_demands, start_date)
+    elapsed = time.perf_counter() - started
+    plan = scheduler.production_plan
+    fingerprint = sorted(
+        (b.product_id, str(b.lot_number), b.process_id, b.equipment_id, b.start_time)
+        for b in plan.batches.values()
+    )
+    return elapsed, fingerprint
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    master_data = MasterDataManager()
+
+    print(f"반복배수: {repeat}")
+    print(f"{'파일':<40} {'로트':>6} {'배치':>6} {'기존(s)':>9} {'인덱스(s)':>10} {'배속':>7} 일치")
+    for file_path in sorted(glob.glob('samples/sales_plan_bulk_*.xlsx')):
+        sales_df = load_sales_plan(file_path, repeat)
+        legacy_time, legacy_fp = run(LegacyScheduler, master_data, sales_df)
+        indexed_time, indexed_fp = run(APSScheduler, master_data, sales_df)
+        speedup = legacy_time / indexed_time if indexed_time else float('inf')
+        print(f"{file_path:<40} {len(sales_df):>6} {len(indexed_fp):>6} "
+              f"{legacy_time:>9.3f} {indexed_time:>10.3f} {speedup:>6.1f}x "
+              f"{'O' if legacy_fp == indexed_fp else 'X'}")
+
+
+if __name__ == '__main__':
+    main()
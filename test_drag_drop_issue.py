@@ -11,8 +11,9 @@ from datetime import datetime
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from PyQt5.QtWidgets import QApplication, QMainWindow, QVBoxLayout, QWidget, QLabel
-from PyQt5.QtCore import Qt
-from app.views.schedule_grid_view import ScheduleGridView, DraggableBatchLabel, EquipmentTimeSlot
+from PyQt5.QtCore import Qt, QMimeData, QPointF
+from PyQt5.QtGui import QDropEvent
+from app.views.schedule_grid_view import ScheduleGridView
 from app.models.production_plan import ProductionPlan, Batch
 from app.models.master_data import MasterDataManager
 from app.controllers.main_controller import MainController
@@ -137,55 +138,64 @@ class TestWindow(QMainWindow):
 
 
 def test_drag_drop_components():
-    """개별 컴포넌트 테스트"""
+    """그리드 캔버스 테스트 (배치 위치 인덱스, 위치 판정, 드롭 처리)"""
     print("\n=== 드래그&드롭 컴포넌트 테스트 ===")
-    
-    # 1. DraggableBatchLabel 테스트
-    print("\n1. DraggableBatchLabel 테스트:")
-    batch = Batch(
-        batch_id="TEST001",
-        product_id="PROD001",
-        product_name="테스트 제품",
-        equipment_id="EQ001",
-        start_time=datetime.now(),
-        duration_hours=4
-    )
-    
-    label = DraggableBatchLabel(batch)
-    print(f"   - 배치 라벨 생성: {label}")
-    print(f"   - acceptDrops: {label.acceptDrops()}")
-    print(f"   - dragEnabled: {label.hasMouseTracking()}")
-    
-    # 2. EquipmentTimeSlot 테스트
-    print("\n2. EquipmentTimeSlot 테스트:")
-    slot = EquipmentTimeSlot("EQ001", datetime.now().date(), 0)
-    print(f"   - 슬롯 생성: {slot}")
-    print(f"   - acceptDrops: {slot.acceptDrops()}")
-    print(f"   - equipment_id: {slot.equipment_id}")
-    print(f"   - slot: {slot.slot}")
-    
-    # 3. 시그널 연결 테스트
-    print("\n3. 시그널 연결 테스트:")
+    if QApplication.instance() is None:
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    app = QApplication.instance() or QApplication(sys.argv)
+
+    day = datetime(2025, 2, 1).date()
+    plan = ProductionPlan()
+    plan.add_batch(Batch("TEST001", "PROD001", "테스트 제품", "EQ001", datetime(2025, 2, 1, 0), 4, "1", "P003"))
+    plan.add_batch(Batch("TEST002", "PROD002", "테스트 제품2", "EQ002", datetime(2025, 2, 1, 1), 2, "2", "P003"))
+
     grid = ScheduleGridView()
-    print(f"   - batch_moved 시그널: {grid.batch_moved}")
-    print(f"   - batch_selected 시그널: {grid.batch_selected}")
-    
-    # 4. 이벤트 핸들러 확인
-    print("\n4. 이벤트 핸들러 확인:")
-    print(f"   - DraggableBatchLabel.mousePressEvent: {hasattr(label, 'mousePressEvent')}")
-    print(f"   - DraggableBatchLabel.mouseMoveEvent: {hasattr(label, 'mouseMoveEvent')}")
-    print(f"   - EquipmentTimeSlot.dragEnterEvent: {hasattr(slot, 'dragEnterEvent')}")
-    print(f"   - EquipmentTimeSlot.dropEvent: {hasattr(slot, 'dropEvent')}")
+    grid.resize(1200, 400)
+    grid.production_plan = plan
+    grid.setup_grid([{'id': 'EQ001', 'name': '타정기 1호'}, {'id': 'EQ002', 'name': '타정기 2호'}], [day])
+    for batch in plan.batches.values():
+        grid.add_batch_to_equipment_slots(batch)
+
+    # 1. 배치 위치 인덱스 (4시간 = 2구간)
+    print("\n1. 배치 위치 인덱스:")
+    print(f"   - batch_positions: {grid.batch_positions}")
+    assert grid.batch_positions["TEST001"] == {'equipment_id': 'EQ001', 'date': day, 'slot': 0, 'duration_slots': 2}
+    assert grid.cell_owner[("EQ001", day, 1)] == "TEST001"
+
+    # 2. 화면 좌표 -> 배치 판정
+    print("\n2. 위치 판정:")
+    center = grid._batch_rect("TEST002").center()
+    print(f"   - TEST002 블록 중심: {center}")
+    assert grid._batch_at(center) == "TEST002"
+
+    # 3. 다른 배치가 차지한 구간에는 놓을 수 없음
+    print("\n3. 드롭 처리:")
+    batch_data = {'batch_id': "TEST002", 'duration_hours': 2}
+    assert not grid.handle_batch_drop(batch_data, "EQ001", day, 1)
+    assert grid.batch_positions["TEST002"]['equipment_id'] == "EQ002"
+
+    # 4. 드롭 이벤트로 빈 구간에 이동 (시각적 위치만 변경)
+    mime_data = QMimeData()
+    mime_data.setText(json.dumps(batch_data))
+    target = grid._cell_rect(grid._row_index["EQ001"], 3).center()
+    event = QDropEvent(QPointF(target), Qt.MoveAction, mime_data, Qt.LeftButton, Qt.NoModifier)
+    grid.dropEvent(event)
+    print(f"   - 드롭 후 위치: {grid.batch_positions['TEST002']}")
+    assert event.isAccepted()
+    assert grid.batch_positions["TEST002"] == {'equipment_id': 'EQ001', 'date': day, 'slot': 3, 'duration_slots': 1}
+    assert ("EQ002", day, 1) not in grid.cell_owner
+    assert plan.batches["TEST002"].equipment_id == "EQ002"
 
 
 def main():
     """메인 함수"""
+    app = QApplication(sys.argv)
+
     # 컴포넌트 테스트 먼저 실행
     test_drag_drop_components()
     
     # GUI 테스트
     print("\n=== GUI 드래그&드롭 테스트 시작 ===")
-    app = QApplication(sys.argv)
     
     # 드래그 설정 확인
     print(f"\nQApplication 설정:")
@@ -0,0 +1,58 @@
+"""
+생산계획 모델 테스트
+to_dataframe 이 반환한 DataFrame 이 이후 배치 이동/삭제/압축에 영향을 받지 않는지 확인
+"""
+from datetime import date, datetime
+
+from app.models.production_plan import ProductionPlan, Batch
+
+
+def make_plan(count=6):
+    plan = ProductionPlan()
+    for i in range(count):
+        plan.add_batch(Batch(
+            batch_id=f"B{i}",
+            product_id=f"P{i % 2}",
+            product_name=f"제품{i % 2}",
+            equipment_id=f"EQ{i % 3}",
+            start_time=datetime(2025, 2, 3 + i, 8),
+            duration_hours=8,
+            lot_number=f"L{i}",
+            process_id="PR01"
+        ))
+    return plan
+
+
+def test_dataframe_is_not_changed_by_later_edits():
+    plan = make_plan()
+    df = plan.to_dataframe()
+    snapshot = df.copy(deep=True)
+
+    plan.move_batch("B0", "EQ9", datetime(2025, 3, 1, 10))
+    plan.remove_batch("B1")
+    plan.add_batch(Batch("B9", "P9", "제품9", "EQ0", datetime(2025, 2, 20, 8), 8, "L9", "PR02"))
+    plan.to_dataframe()  # 삭제 행 압축
+
+    assert df.equals(snapshot)
+
+
+def test_dataframe_reflects_current_plan():
+    plan = make_plan()
+    plan.to_dataframe()
+    plan.move_batch("B0", "EQ9", datetime(2025, 3, 1, 10))
+    plan.remove_batch("B1")
+
+    df = plan.to_dataframe()
+
+    assert df['batch_id'].tolist() == ["B0", "B2", "B3", "B4", "B5"]
+    moved = df.iloc[0]
+    assert moved['equipment_id'] == "EQ9"
+    assert moved['start_time'] == datetime(2025, 3, 1, 10)
+    assert moved['date'] == date(2025, 3, 1)
+
+
+def test_date_column_holds_python_dates():
+    df = make_plan().to_dataframe()
+
+    assert all(type(value) is date for value in df['date'])
+    assert df['date'].iloc[0] == date(2025, 2, 3)
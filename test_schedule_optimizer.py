@@ -0,0 +1,145 @@
+"""
+MILP 스케줄 최적화 테스트
+해를 찾지 못하거나 모델이 너무 크면 그리디 계획을 그대로 유지하는지,
+그리디 계획이 작업자 용량을 넘어도 최적화 모델이 불가능해지지 않는지,
+샘플 판매계획에서 선후행/리드타임을 지키면서 그리디보다 나은 계획을 내는지 확인
+"""
+import glob
+import os
+import shutil
+from datetime import datetime
+
+import pandas as pd
+import pytest
+from pulp import LpSolutionNoSolutionFound
+
+from app.models.master_data import MasterDataManager
+from app.core.scheduler import APSScheduler
+from app.core import schedule_optimizer
+
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+MASTERS_DIR = os.path.join(ROOT_DIR, "data", "masters")
+SAMPLES_DIR = os.path.join(ROOT_DIR, "samples")
+
+
+@pytest.fixture
+def master_data(tmp_path):
+    """저장소 마스터 데이터의 사본 (테스트 중 변경이 저장소에 쓰이지 않도록)"""
+    data_dir = tmp_path / "masters"
+    shutil.copytree(MASTERS_DIR, data_dir)
+    return MasterDataManager(data_dir=str(data_dir), autosave_delay=0)
+
+
+def make_greedy_plan(master_data, lots=4):
+    """2025년 2월 납기 판매계획으로 그리디 스케줄 생성"""
+    sales_df = pd.DataFrame({
+        '제품코드': ['500002'] * lots,
+        '제품명': ['기넥신에프정 40mg 100T'] * lots,
+        '제조번호': [f'T{i:03d}' for i in range(lots)],
+        '수량': [10000] * lots,
+        '납기일': ['2025-02-20'] * lots,
+        '우선순위': [1] * lots
+    })
+    scheduler = APSScheduler(master_data)
+    plan = scheduler.schedule_from_sales_plan(sales_df, datetime(2025, 2, 1))
+    assert plan.batches
+    return scheduler, plan
+
+
+def test_keeps_greedy_plan_when_solver_finds_no_solution(master_data, monkeypatch):
+    scheduler, plan = make_greedy_plan(master_data)
+    starts = {batch_id: batch.start_time for batch_id, batch in plan.batches.items()}
+
+    def no_solution(prob, solver=None, **kwargs):
+        prob.sol_status = LpSolutionNoSolutionFound
+        return 0
+
+    monkeypatch.setattr(schedule_optimizer.LpProblem, "solve", no_solution)
+    optimized, stats = scheduler.create_optimizer(time_limit=5).optimize(plan, scheduler.job_info)
+
+    assert optimized is plan
+    assert stats['status'] == 'No Solution Found'
+    assert stats['makespan_improvement'] == 0
+    assert {batch_id: batch.start_time for batch_id, batch in optimized.batches.items()} == starts
+
+
+def test_skips_model_over_candidate_limit(master_data, monkeypatch):
+    scheduler, plan = make_greedy_plan(master_data)
+    optimizer = scheduler.create_optimizer(time_limit=5)
+    optimizer.max_candidates = 10
+
+    def fail(*args, **kwargs):
+        raise AssertionError("모델이 너무 크면 풀지 않아야 한다")
+
+    monkeypatch.setattr(schedule_optimizer.LpProblem, "solve", fail)
+    optimized, stats = optimizer.optimize(plan, scheduler.job_info)
+
+    assert optimized is plan
+    assert stats['status'] == 'TooLarge'
+
+
+def test_operator_overflow_in_greedy_plan_stays_feasible(master_data):
+    scheduler, plan = make_greedy_plan(master_data)
+
+    # 계량(PR01) 작업자를 그리디 계획이 쓴 날에만 1배치 용량으로 남겨, 하드 제약이면 불가능한 모델을 만든다
+    days = sorted({b.start_time.date() for b in plan.batches.values() if b.process_id == 'PR01'})
+    batch_count = sum(1 for b in plan.batches.values() if b.process_id == 'PR01')
+    assert batch_count > len(days)
+    with master_data.batch():
+        for key in [key for key, op in master_data.operators.items() if op['process_id'] == 'PR01']:
+            del master_data.operators[key]
+        for day in days:
+            master_data.set_operator_capacity('PR01', day.strftime('%Y-%m-%d'), 1, 1.0)
+
+    optimized, stats = scheduler.create_optimizer(time_limit=20).optimize(plan, scheduler.job_info)
+
+    assert stats['status'] in ('Optimal Solution Found', 'Solution Found')
+    assert set(optimized.batches) == set(plan.batches)
+
+
+def load_sample_sales_plan(rows):
+    """samples 폴더 판매계획을 합쳐 앞에서 rows 행 (납기일이 없는 행 제외, 제조번호는 새로 부여)"""
+    frames = []
+    for path in sorted(glob.glob(os.path.join(SAMPLES_DIR, "sales_plan_*.xlsx"))):
+        df = pd.read_excel(path)
+        frames.append(df[pd.to_datetime(df['납기일'], errors='coerce').notna()])
+    sales_df = pd.concat(frames, ignore_index=True).head(rows)
+    sales_df['제품코드'] = sales_df['제품코드'].astype(str)
+    sales_df['제조번호'] = [f'L{i:04d}' for i in range(len(sales_df))]
+    return sales_df
+
+
+def test_optimizer_improves_greedy_plan(master_data):
+    master_data.products['500002']['process_leadtimes'] = {'PR03': 1}
+    master_data.products['500005']['process_leadtimes'] = {'PR04': 1}
+    scheduler = APSScheduler(master_data)
+    plan = scheduler.schedule_from_sales_plan(load_sample_sales_plan(20), datetime(2025, 2, 1))
+    optimizer = scheduler.create_optimizer(time_limit=30)
+    greedy_overflow = optimizer._operator_overflow(plan)
+
+    optimized, stats = optimizer.optimize(plan, scheduler.job_info)
+
+    assert stats['status'] in ('Optimal Solution Found', 'Solution Found')
+    assert stats['makespan_improvement'] > 0 or stats['tardiness_improvement'] > 0
+    assert stats['makespan_after'] <= stats['makespan_before']
+    assert stats['tardiness_after'] <= stats['tardiness_before']
+    assert set(optimized.batches) == set(plan.batches)
+
+    # 선후행과 리드타임 (구간 단위, 리드타임은 이전 공정 완료일 기준 일 단위)
+    origin = min(b.start_time.date() for b in optimized.batches.values())
+    for job_id, ops in optimizer._collect_jobs(optimized).items():
+        leadtimes = master_data.products[ops[0].product_id].get('process_leadtimes', {})
+        for prev, nxt in zip(ops, ops[1:]):
+            prev_end = optimizer._slot_key(prev, origin)[1] + optimizer._duration_slots(prev)
+            next_start = optimizer._slot_key(nxt, origin)[1]
+            lead = leadtimes.get(nxt.process_id, 0)
+            if lead > 0:
+                assert next_start // schedule_optimizer.SLOTS_PER_DAY >= \
+                    prev_end // schedule_optimizer.SLOTS_PER_DAY + lead, (prev.id, nxt.id)
+            else:
+                assert next_start >= prev_end, (prev.id, nxt.id)
+
+    # 작업자 용량은 하드 제약: 초과분은 그리디 계획이 이미 넘긴 공정/일의 초과분 이내
+    for key, excess in stats['operator_overflow'].items():
+        assert excess <= greedy_overflow.get(key, 0), key